@@ -0,0 +1,146 @@
+"""
+Aegis V0 — Plan memory benchmark (measurement only)
+
+Reports retained bytes per Plan for the slotted, tuple-backed
+representation in orchestrator.plan against the previous layout
+(dict-backed frozen dataclasses holding lists), reproduced locally below.
+
+Usage:
+    python -m benchmarks.bench_plan_memory [--plans N] [--steps N]
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import gc
+import tracemalloc
+import uuid
+
+from orchestrator.plan import Plan, RiskLevel, create_dry_run_plan
+from orchestrator.policy import PolicyRegistry
+
+
+# ---- Previous layout (for comparison only) ----
+
+@dataclass(frozen=True)
+class _LegacyConstraints:
+    paths: List[str] = field(default_factory=list)
+    domains: List[str] = field(default_factory=list)
+    apps: List[str] = field(default_factory=list)
+    methods: List[str] = field(default_factory=list)
+    max_bytes: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class _LegacyScope:
+    scope_token: str
+    constraints: _LegacyConstraints = field(default_factory=_LegacyConstraints)
+
+
+@dataclass(frozen=True)
+class _LegacyStep:
+    step_id: int
+    action: str
+    args: Dict[str, Any]
+    scope: _LegacyScope
+    risk: RiskLevel
+    reversible: bool
+    requires_confirmation: bool
+    validators: List[str] = field(default_factory=list)
+    dry_run_supported: bool = True
+
+
+@dataclass(frozen=True)
+class _LegacyPlan:
+    plan_id: str
+    steps: List[_LegacyStep]
+    notes: Optional[str] = None
+
+
+def _legacy_from(plan: Plan) -> _LegacyPlan:
+    # rebuilt with fresh strings and lists, as the old constructor produced
+    steps = []
+    for s in plan.steps:
+        c = s.scope.constraints
+        steps.append(
+            _LegacyStep(
+                step_id=s.step_id,
+                action="".join(s.action),
+                args=dict(s.args),
+                scope=_LegacyScope(
+                    scope_token="".join(s.scope.scope_token),
+                    constraints=_LegacyConstraints(
+                        paths=list(c.paths),
+                        domains=list(c.domains),
+                        apps=list(c.apps),
+                        methods=list(c.methods),
+                        max_bytes=c.max_bytes,
+                    ),
+                ),
+                risk=s.risk,
+                reversible=s.reversible,
+                requires_confirmation=s.requires_confirmation,
+                validators=list(s.validators),
+                dry_run_supported=s.dry_run_supported,
+            )
+        )
+    return _LegacyPlan(plan_id=plan.plan_id, steps=steps, notes=plan.notes)
+
+
+# ---- Workload ----
+
+def requested_steps(count: int) -> List[Dict[str, Any]]:
+    # a mix of constrained and unconstrained steps, as seen in practice
+    steps: List[Dict[str, Any]] = []
+    for i in range(count):
+        step: Dict[str, Any] = {"action": "fs.read", "scope_token": "workspace"}
+        if i % 2 == 0:
+            step["constraints"] = {"paths": [f"/srv/data/{i}"]}
+        steps.append(step)
+    return steps
+
+
+def retained_bytes(build: Callable[[], Any], count: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        held = [build() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del held
+    return after - before
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bytes retained per Plan, previous vs current layout.")
+    parser.add_argument("--plans", type=int, default=20000)
+    parser.add_argument("--steps", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    policy = PolicyRegistry()
+    raw = requested_steps(args.steps)
+    template, _ = create_dry_run_plan(derived_from_intent_id="bench", requested_steps=raw, policy=policy)
+
+    def current() -> Plan:
+        plan, _ = create_dry_run_plan(derived_from_intent_id="bench", requested_steps=raw, policy=policy)
+        return plan
+
+    def legacy() -> _LegacyPlan:
+        return _legacy_from(Plan(plan_id=str(uuid.uuid4()), steps=template.steps))
+
+    old = retained_bytes(legacy, args.plans) / args.plans
+    new = retained_bytes(current, args.plans) / args.plans
+
+    print(f"plans={args.plans} steps/plan={args.steps}")
+    print(f"previous layout : {old:10.1f} bytes/plan")
+    print(f"current layout  : {new:10.1f} bytes/plan")
+    print(f"saved           : {old - new:10.1f} bytes/plan ({(1 - new / old) * 100:.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""
+Aegis V0 — Columnar verification benchmark (measurement only)
+
+Compares per-plan run_verification with PlanBatch (packing, full reports,
+and has_blockers triage) on a seeded synthetic queue, and checks that the
+reports are identical.
+
+Usage:
+    python -m benchmarks.bench_verify_batch [--plans N] [--steps N] [--flag-rate F]
+"""
+
+from __future__ import annotations
+
+from typing import Callable, List, Optional
+import argparse
+import gc
+import random
+import time
+
+from orchestrator.plan import EMPTY_CONSTRAINTS, Plan, PlanStep, RiskLevel, ScopeConstraints, ScopeSpec
+from orchestrator.verification import run_verification
+from orchestrator.verification_batch import HAVE_NUMPY, PlanBatch
+
+
+def synthetic_plans(count: int, steps: int, flag_rate: float, seed: int = 0) -> List[Plan]:
+    rng = random.Random(seed)
+    risks = list(RiskLevel)
+    bounded = ScopeConstraints(paths=("/srv/data",))
+    plans: List[Plan] = []
+    for n in range(count):
+        plans.append(
+            Plan(
+                plan_id=f"plan-{n}",
+                steps=tuple(
+                    PlanStep(
+                        step_id=i,
+                        action="fs.read",
+                        args={},
+                        scope=ScopeSpec("workspace", EMPTY_CONSTRAINTS if rng.random() < flag_rate else bounded),
+                        risk=rng.choice(risks),
+                        reversible=True,
+                        requires_confirmation=rng.random() >= flag_rate,
+                    )
+                    for i in range(1, steps + 1)
+                ),
+            )
+        )
+    return plans
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-plan vs columnar verification throughput.")
+    parser.add_argument("--plans", type=int, default=20000)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--flag-rate", type=float, default=0.01, help="share of steps that produce findings")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if not HAVE_NUMPY:
+        print("numpy is not installed; columnar verification is unavailable.")
+        return 1
+
+    plans = synthetic_plans(args.plans, args.steps, args.flag_rate)
+    total = args.plans * args.steps
+
+    batch = PlanBatch(plans)
+    if batch.verify() != [run_verification(p) for p in plans]:
+        print("MISMATCH: columnar reports differ from run_verification")
+        return 1
+
+    gc.disable()
+    try:
+        rows = [
+            ("run_verification (per plan)", best_of(lambda: [run_verification(p) for p in plans], args.repeat)),
+            ("PlanBatch pack", best_of(lambda: PlanBatch(plans).columns(), args.repeat)),
+            ("PlanBatch.verify (packed)", best_of(batch.verify, args.repeat)),
+            ("PlanBatch.has_blockers (packed)", best_of(batch.has_blockers, args.repeat)),
+        ]
+    finally:
+        gc.enable()
+
+    print(f"plans={args.plans} steps={total} flag_rate={args.flag_rate}")
+    for name, seconds in rows:
+        print(f"{name:34s} {seconds * 1e3:9.2f} ms  {total / seconds / 1e6:8.2f} M steps/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,329 @@
+"""
+Aegis V0 — Mediation pipeline benchmark suite (measurement only)
+
+Runs each pipeline stage over a synthetic workload (benchmarks.workload)
+and reports, per stage:
+- throughput (operations per second over the timed loop)
+- latency percentiles per operation (p50 / p90 / p99 / max, microseconds)
+- allocations per operation (tracemalloc, in a separate untimed pass):
+  blocks and bytes allocated and still live when the operation returns,
+  and the peak bytes reached while it ran
+
+Stages:
+- plan      create_dry_run_plan
+- verify    run_verification (on plans built beforehand)
+- refusal   decide_refusal (on verification built beforehand)
+- mediate   mediate_intent (end to end)
+
+Results can be saved as JSON and compared; compare exits non-zero when any
+stage slowed down by more than the threshold.
+
+Usage:
+    python -m benchmarks.pipeline run [--intents N] [--output FILE] ...
+    python -m benchmarks.pipeline compare BASELINE.json CANDIDATE.json [--threshold 0.10]
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import gc
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.workload import WorkloadSpec, generate_intents
+from orchestrator.intent import Intent
+from orchestrator.mediation import mediate_intent
+from orchestrator.plan import create_dry_run_plan
+from orchestrator.policy import PolicyRegistry
+from orchestrator.refusal import decide_refusal
+from orchestrator.verification import run_verification
+
+STAGES = ("plan", "verify", "refusal", "mediate")
+COMPARE_METRICS = ("p50_us", "p90_us", "p99_us", "mean_us")
+
+
+@dataclass(frozen=True)
+class StageResult:
+    stage: str
+    operations: int
+    ops_per_sec: float
+    mean_us: float
+    p50_us: float
+    p90_us: float
+    p99_us: float
+    max_us: float
+    alloc_blocks: float       # per operation, live on return
+    alloc_bytes: float        # per operation, live on return
+    peak_bytes: float         # per operation, mean tracemalloc peak
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__dataclass_fields__}
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values (q in [0, 100]).
+    """
+    if not sorted_values:
+        return 0.0
+    # q * n before dividing: q / 100 * n can land just above an integer
+    rank = max(1, math.ceil(q * len(sorted_values) / 100.0))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ---- Stage preparation ----
+
+def _plan_or_none(intent: Intent, policy: PolicyRegistry):
+    try:
+        plan, _ = create_dry_run_plan(
+            derived_from_intent_id=intent.intent_id,
+            requested_steps=intent.requested_steps,
+            policy=policy,
+        )
+        return plan
+    except ValueError:
+        return None
+
+
+def build_stages(intents: List[Intent], policy: PolicyRegistry) -> Dict[str, Tuple[List[Any], Callable[[Any], Any]]]:
+    """
+    Stage name -> (inputs, operation). Inputs for later stages are produced
+    up front so each stage times only its own work.
+    """
+    plans = [(i, _plan_or_none(i, policy)) for i in intents]
+    verified = [(i, p, run_verification(p)) for i, p in plans if p is not None]
+
+    def plan_op(intent: Intent) -> Any:
+        try:
+            return create_dry_run_plan(
+                derived_from_intent_id=intent.intent_id,
+                requested_steps=intent.requested_steps,
+                policy=policy,
+            )
+        except ValueError as e:
+            # refused at planning time; still part of the stage's work
+            return e
+
+    return {
+        "plan": (intents, plan_op),
+        "verify": ([p for _, p, _ in verified], run_verification),
+        "refusal": (verified, lambda t: decide_refusal(intent=t[0], plan=t[1], verification=t[2])),
+        "mediate": (intents, lambda intent: mediate_intent(intent=intent, policy=policy)),
+    }
+
+
+# ---- Measurement ----
+
+def _time_stage(inputs: List[Any], op: Callable[[Any], Any], repeat: int) -> Tuple[List[float], float]:
+    clock = time.perf_counter_ns
+    latencies: List[float] = []
+    total = 0
+    for _ in range(repeat):
+        for item in inputs:
+            t0 = clock()
+            op(item)
+            elapsed = clock() - t0
+            latencies.append(elapsed / 1000.0)
+            total += elapsed
+    return latencies, total / 1e9
+
+
+def _allocations(inputs: List[Any], op: Callable[[Any], Any]) -> Tuple[float, float, float]:
+    # results are kept alive until the end so "live on return" is measurable
+    results: List[Any] = []
+    peaks = 0
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for item in inputs:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            results.append(op(item))
+            peaks += tracemalloc.get_traced_memory()[1] - base
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+    n = max(1, len(inputs))
+    return blocks / n, size / n, peaks / n
+
+
+def run_stage(name: str, inputs: List[Any], op: Callable[[Any], Any], *, repeat: int = 1, warmup: int = 50) -> StageResult:
+    for item in inputs[:warmup]:
+        op(item)
+
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        latencies, seconds = _time_stage(inputs, op, repeat)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    blocks, size, peak = _allocations(inputs, op)
+
+    latencies.sort()
+    ops = len(latencies)
+    return StageResult(
+        stage=name,
+        operations=ops,
+        ops_per_sec=ops / seconds if seconds else 0.0,
+        mean_us=(seconds * 1e6 / ops) if ops else 0.0,
+        p50_us=percentile(latencies, 50),
+        p90_us=percentile(latencies, 90),
+        p99_us=percentile(latencies, 99),
+        max_us=latencies[-1] if latencies else 0.0,
+        alloc_blocks=blocks,
+        alloc_bytes=size,
+        peak_bytes=peak,
+    )
+
+
+def run_suite(spec: WorkloadSpec, *, stages: Sequence[str] = STAGES, repeat: int = 1) -> Dict[str, Any]:
+    policy = PolicyRegistry()
+    intents = generate_intents(spec, policy)
+    prepared = build_stages(intents, policy)
+    results = [run_stage(name, *prepared[name], repeat=repeat) for name in stages]
+    return {
+        "workload": spec.to_dict(),
+        "policy_hash": policy.content_hash,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stages": {r.stage: r.to_dict() for r in results},
+    }
+
+
+# ---- Comparison ----
+
+@dataclass(frozen=True)
+class Regression:
+    stage: str
+    metric: str
+    baseline: float
+    candidate: float
+
+    @property
+    def slowdown(self) -> float:
+        return self.candidate / self.baseline - 1.0 if self.baseline else 0.0
+
+
+def compare_runs(
+    baseline: Dict[str, Any],
+    candidate: Dict[str, Any],
+    *,
+    metric: str = "p50_us",
+) -> List[Regression]:
+    """
+    Per-stage change of `metric` (a latency; higher is slower), for stages
+    present in both runs.
+    """
+    if metric not in COMPARE_METRICS:
+        raise ValueError(f"metric must be one of: {', '.join(COMPARE_METRICS)}.")
+    rows: List[Regression] = []
+    stages = baseline.get("stages", {})
+    order = sorted(stages, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES))
+    for stage in order:
+        base = stages[stage]
+        cand = candidate.get("stages", {}).get(stage)
+        if cand is None:
+            continue
+        rows.append(Regression(stage=stage, metric=metric, baseline=float(base[metric]), candidate=float(cand[metric])))
+    return rows
+
+
+# ---- CLI ----
+
+def _print_results(results: Dict[str, Any]) -> None:
+    w = results["workload"]
+    print(
+        f"workload: seed={w['seed']} intents={w['intents']} steps={w['min_steps']}..{w['max_steps']} "
+        f"refusal_ratio={w['refusal_ratio']} warn_ratio={w['warn_ratio']}"
+    )
+    print(
+        f"{'stage':8s} {'ops':>7s} {'ops/s':>10s} {'p50us':>8s} {'p90us':>8s} {'p99us':>8s} "
+        f"{'maxus':>9s} {'blocks/op':>10s} {'bytes/op':>9s} {'peak/op':>9s}"
+    )
+    for r in results["stages"].values():
+        print(
+            f"{r['stage']:8s} {r['operations']:7d} {r['ops_per_sec']:10.0f} {r['p50_us']:8.1f} {r['p90_us']:8.1f} "
+            f"{r['p99_us']:8.1f} {r['max_us']:9.1f} {r['alloc_blocks']:10.1f} {r['alloc_bytes']:9.0f} {r['peak_bytes']:9.0f}"
+        )
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    spec = WorkloadSpec(
+        seed=args.seed,
+        intents=args.intents,
+        min_steps=args.min_steps,
+        max_steps=args.max_steps,
+        constraint_items=args.constraint_items,
+        refusal_ratio=args.refusal_ratio,
+        warn_ratio=args.warn_ratio,
+    )
+    results = run_suite(spec, stages=args.stages or STAGES, repeat=args.repeat)
+    _print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return 0
+
+
+def _cmd_compare(args: argparse.Namespace) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    if baseline.get("workload") != candidate.get("workload"):
+        print("warning: runs used different workloads; comparison may be meaningless", file=sys.stderr)
+
+    failed = False
+    for row in compare_runs(baseline, candidate, metric=args.metric):
+        over = row.slowdown > args.threshold
+        failed = failed or over
+        print(
+            f"{row.stage:8s} {row.metric} {row.baseline:9.1f} -> {row.candidate:9.1f} "
+            f"({row.slowdown * 100:+6.1f}%){'  REGRESSION' if over else ''}"
+        )
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.pipeline", description="Aegis mediation pipeline benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the suite.")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--intents", type=int, default=2000)
+    run.add_argument("--min-steps", type=int, default=1)
+    run.add_argument("--max-steps", type=int, default=12)
+    run.add_argument("--constraint-items", type=int, default=4)
+    run.add_argument("--refusal-ratio", type=float, default=0.2)
+    run.add_argument("--warn-ratio", type=float, default=0.2)
+    run.add_argument("--repeat", type=int, default=3, help="timed passes over the workload per stage")
+    run.add_argument("--stage", dest="stages", action="append", choices=STAGES, help="run only this stage (repeatable)")
+    run.add_argument("--output", help="write results as JSON")
+    run.set_defaults(func=_cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="Compare two saved runs.")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("candidate")
+    cmp_.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, e.g. 0.10 for 10%%")
+    cmp_.add_argument("--metric", choices=COMPARE_METRICS, default="p50_us")
+    cmp_.set_defaults(func=_cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,144 @@
+"""
+Aegis V0 — Synthetic mediation workload (measurement only)
+
+Seeded generator of intents and requested steps for benchmarks. Actions
+are drawn from AEGIS_ALLOWED_ACTIONS_V1.json (via the compiled policy), and
+constraints are shaped by action family (paths for fs.*, domains and
+methods for network actions, apps for app.*).
+
+Outcome mix:
+- refusal_ratio: share of intents that must be refused. Most refusals come
+  from a step with no constraints (SCOPE_UNBOUNDED). invalid_share of them
+  request an action outside the policy instead (PLAN_INVALID).
+- warn_ratio: share of the remaining intents that have a Medium/High step
+  without confirmation (CONFIRMATION_REQUIRED).
+
+The same spec and policy always produce the same intents.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import random
+
+from orchestrator.intent import Intent, IntentMetadata
+from orchestrator.policy import DEFAULT_POLICY_PATH, CompiledPolicy, PolicyLike, load_policy, resolve_policy
+
+# fixed so generated intents are identical across runs
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+_UNKNOWN_ACTION = "shell.exec"
+
+
+@dataclass(frozen=True)
+class WorkloadSpec:
+    seed: int = 1
+    intents: int = 2000
+    min_steps: int = 1
+    max_steps: int = 12
+    constraint_items: int = 4        # max entries per constraint list
+    refusal_ratio: float = 0.2
+    invalid_share: float = 0.25      # of refusals
+    warn_ratio: float = 0.2
+
+    def __post_init__(self) -> None:
+        if self.intents < 1:
+            raise ValueError("intents must be >= 1.")
+        if not 1 <= self.min_steps <= self.max_steps:
+            raise ValueError("Require 1 <= min_steps <= max_steps.")
+        if self.constraint_items < 1:
+            raise ValueError("constraint_items must be >= 1.")
+        for name in ("refusal_ratio", "invalid_share", "warn_ratio"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be within [0, 1].")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _constraints_for(action: str, rng: random.Random, items: int) -> Dict[str, Any]:
+    n = rng.randint(1, items)
+    family = action.split(".", 1)[0]
+    if family in ("net", "http"):
+        c: Dict[str, Any] = {
+            "domains": [f"svc{rng.randrange(1000)}.example.com" for _ in range(n)],
+            "methods": rng.sample(["GET", "HEAD", "POST"], k=min(n, 3)),
+        }
+    elif family == "app":
+        c = {"apps": [f"app-{rng.randrange(100)}" for _ in range(n)]}
+    else:
+        c = {"paths": [f"/srv/data/{rng.randrange(10000)}/{rng.randrange(100)}" for _ in range(n)]}
+    if rng.random() < 0.5:
+        c["max_bytes"] = rng.choice([4096, 65536, 1 << 20])
+    return c
+
+
+def generate_requested_steps(
+    rng: random.Random,
+    spec: WorkloadSpec,
+    policy: CompiledPolicy,
+    *,
+    outcome: str,
+) -> List[Dict[str, Any]]:
+    """
+    Steps for one intent with the given outcome: pass | warn | refuse | invalid.
+    """
+    actions = sorted(policy.actions)
+    risky = [a for a in actions if policy.actions[a].risk.value in ("Medium", "High")]
+    count = rng.randint(spec.min_steps, spec.max_steps)
+
+    steps: List[Dict[str, Any]] = []
+    for _ in range(count):
+        action = rng.choice(actions)
+        steps.append(
+            {
+                "action": action,
+                "scope_token": f"scope-{rng.randrange(16)}",
+                "constraints": _constraints_for(action, rng, spec.constraint_items),
+                "requires_confirmation": True,
+            }
+        )
+
+    target = rng.randrange(count)
+    if outcome == "refuse":
+        steps[target].pop("constraints")
+    elif outcome == "invalid":
+        steps[target]["action"] = _UNKNOWN_ACTION
+    elif outcome == "warn" and risky:
+        steps[target]["action"] = rng.choice(risky)
+        steps[target]["constraints"] = _constraints_for(steps[target]["action"], rng, spec.constraint_items)
+        steps[target]["requires_confirmation"] = False
+    return steps
+
+
+def generate_intents(spec: WorkloadSpec, policy: Optional[PolicyLike] = None) -> List[Intent]:
+    """
+    Deterministic list of intents for `spec` (ids are derived from the seed).
+    Uses the repository policy file when no policy is given.
+    """
+    compiled = resolve_policy(policy) if policy is not None else load_policy(DEFAULT_POLICY_PATH)
+    rng = random.Random(spec.seed)
+    intents: List[Intent] = []
+    for n in range(spec.intents):
+        roll = rng.random()
+        if roll < spec.refusal_ratio:
+            outcome = "invalid" if rng.random() < spec.invalid_share else "refuse"
+        elif rng.random() < spec.warn_ratio:
+            outcome = "warn"
+        else:
+            outcome = "pass"
+        intents.append(
+            Intent(
+                raw_input=f"synthetic request {n}",
+                goal=f"synthetic goal ({outcome})",
+                scope=["workspace"],
+                metadata=IntentMetadata(
+                    request_id=f"bench-{spec.seed}-{n:07d}",
+                    timestamp=_EPOCH,
+                    source="benchmark",
+                ),
+                requested_steps=generate_requested_steps(rng, spec, compiled, outcome=outcome),
+            )
+        )
+    return intents
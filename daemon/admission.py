@@ -0,0 +1,482 @@
+"""
+Aegis V0 — Daemon admission control (mediation-only)
+
+Every parsed request passes through an AdmissionController before it is
+mediated, so one noisy client cannot take the daemon from everyone else:
+
+- Token buckets per user, per source and per connection. An intent
+  needs a token from each bucket that applies; if a bucket is empty, the
+  intent is refused at once (ADMISSION_RATE_LIMITED).
+- Weighted fair queueing across tenants. Each intent is charged its cost
+  (1 + requested steps) divided by its tenant's weight, and the queue
+  serves the lowest virtual finish time first (self-clocked fair
+  queueing). A tenant that floods only delays its own intents.
+- A priority lane for intents whose requested actions are all Low-risk
+  and reversible under the current policy. It is served first. After
+  `priority_burst` priority intents in a row, one regular intent is
+  served if any is waiting.
+- Bounded depth. When the queue is full, the tenant with the most queued
+  intents loses its newest one (ADMISSION_QUEUE_FULL). If the offering
+  tenant has about as many queued, the incoming intent is refused instead.
+  A shed intent's coalesced followers are not refused with it: one of
+  them is queued in its place (see daemon.server).
+
+Who a request comes from: a transport that can authenticate its peer
+passes a `principal` (the daemon uses the peer uid from SO_PEERCRED) and a
+`connection` key. The principal is then the tenant and keys the user
+bucket, so user_id and source claimed in the request body cannot buy a
+fresh bucket or a fresh place in the fair queue. The source bucket is
+skipped for such requests: the daemon stamps every intent with the same
+source, so that bucket would be one budget shared by all peers. Without a
+principal (library use), the tenant is "user:<user_id>", or
+"source:<source>" when there is no user, and buckets key on those fields.
+
+Refusals are ordinary REFUSE decisions, built per AEGIS_REFUSAL_GUIDELINES.md.
+A refused intent is never mediated.
+
+Authoritative sources:
+- AEGIS_RUNTIME_ARCHITECTURE.md (2.1 Aegis Daemon: owns rate limiting;
+  4.1 Capability Gate)
+- AEGIS_REFUSAL_GUIDELINES.md (3. Mandatory Structure of a Refusal)
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, FrozenSet, List, Mapping, Optional, Tuple
+import heapq
+import threading
+import time
+
+from orchestrator.intent import Intent
+from orchestrator.plan import RiskLevel
+from orchestrator.policy import CompiledPolicy
+from orchestrator.refusal import RefusalDecision, RefusalDecisionType, RefusalReason
+from orchestrator.verification import VerificationLevel
+
+LANES = ("priority", "regular")
+SHED_CODES = ("ADMISSION_RATE_LIMITED", "ADMISSION_QUEUE_FULL", "ADMISSION_TENANT_QUEUE_FULL")
+
+_PRIORITY, _REGULAR = 0, 1
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    """
+    Admission budget of one daemon.
+
+    Rates are intents per second; a rate of None leaves that bucket
+    unlimited. The source bucket applies only to intents offered without
+    a principal. `weights` maps a tenant key (a principal such as
+    "uid:1000", or "user:<user_id>" / "source:<source>") to its
+    fair-queue weight (default 1.0).
+    """
+    user_rate: Optional[float] = None
+    user_burst: float = 20.0
+    source_rate: Optional[float] = None
+    source_burst: float = 100.0
+    connection_rate: Optional[float] = None
+    connection_burst: float = 20.0
+    weights: Mapping[str, float] = field(default_factory=dict)
+    max_depth: int = 1024
+    max_tenant_depth: Optional[int] = None
+    priority_burst: int = 8
+    # idle buckets beyond this are forgotten (least recently used first)
+    max_buckets: int = 65_536
+
+    def __post_init__(self) -> None:
+        for name in ("user_rate", "source_rate", "connection_rate"):
+            rate = getattr(self, name)
+            if rate is not None and rate <= 0:
+                raise ValueError(f"{name} must be positive (or None for unlimited).")
+        if self.user_burst < 1 or self.source_burst < 1 or self.connection_burst < 1:
+            raise ValueError("Bucket bursts must be at least 1.")
+        if any(w <= 0 for w in self.weights.values()):
+            raise ValueError("Tenant weights must be positive.")
+        if self.max_depth < 1 or self.priority_burst < 1 or self.max_buckets < 1:
+            raise ValueError("max_depth, priority_burst and max_buckets must be at least 1.")
+        if self.max_tenant_depth is not None and self.max_tenant_depth < 1:
+            raise ValueError("max_tenant_depth must be at least 1 (or None).")
+
+
+@dataclass(frozen=True)
+class AdmissionStats:
+    depth: int
+    depth_by_lane: Dict[str, int]
+    tenants: int
+    admitted_by_lane: Dict[str, int]
+    served: int
+    shed: Dict[str, int]
+
+
+def tenant_of(intent: Intent, principal: Optional[str] = None) -> str:
+    if principal is not None:
+        return principal
+    meta = intent.metadata
+    return f"user:{meta.user_id}" if meta.user_id is not None else f"source:{meta.source}"
+
+
+def intent_cost(intent: Intent) -> int:
+    return 1 + len(intent.requested_steps)
+
+
+def low_risk_actions(policy: CompiledPolicy) -> FrozenSet[str]:
+    """
+    Actions that are Low-risk and reversible under `policy`.
+    """
+    return frozenset(
+        name for name, p in policy.actions.items() if p.risk is RiskLevel.LOW and p.reversible
+    )
+
+
+def admission_refusal(code: str, message: str) -> RefusalDecision:
+    return RefusalDecision(
+        decision=RefusalDecisionType.REFUSE,
+        reasons=[RefusalReason(severity=VerificationLevel.BLOCK, code=code, message=message)],
+        summary="Intent refused by admission control; it was not mediated.",
+    )
+
+
+# ---- Token buckets ----
+
+class TokenBucket:
+    """
+    `burst` tokens, refilled at `rate` per second.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.stamp:
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+
+    def wait_time(self, now: float) -> float:
+        """
+        Seconds until one token is available (0.0 if one is now).
+        """
+        self._refill(now)
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        # callers check wait_time() first, at the same `now`
+        self.tokens -= 1.0
+
+
+class _Buckets:
+    """
+    Buckets keyed by user, source or connection, forgetting the least
+    recently used.
+    """
+
+    def __init__(self, rate: float, burst: float, limit: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.limit = limit
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def get(self, key: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+            if len(self._buckets) > self.limit:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# ---- Weighted fair queue ----
+
+class _Entry:
+    __slots__ = ("tenant", "lane", "intent", "item", "live")
+
+    def __init__(self, tenant: "_Tenant", lane: int, intent: Intent, item: Any) -> None:
+        self.tenant = tenant
+        self.lane = lane
+        self.intent = intent
+        self.item = item
+        self.live = True
+
+
+class _Tenant:
+    __slots__ = ("key", "weight", "finish", "queued")
+
+    def __init__(self, key: str, weight: float) -> None:
+        self.key = key
+        self.weight = weight
+        # last virtual finish time per lane
+        self.finish = [0.0, 0.0]
+        self.queued: Deque[_Entry] = deque()
+
+
+class AdmissionController:
+    """
+    Rate limits, queues and orders intents ahead of mediation.
+
+    offer() admits or refuses an intent together with an opaque `item`
+    (e.g. the future that receives its response). pop() returns the next
+    (intent, item) to mediate. Safe to call from several threads; the
+    daemon calls it from its event loop, and metrics exporters read it
+    from theirs.
+    """
+
+    def __init__(self, limits: Optional[AdmissionLimits] = None, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.limits = limits = limits or AdmissionLimits()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._users = _Buckets(limits.user_rate, limits.user_burst, limits.max_buckets) if limits.user_rate else None
+        self._sources = (
+            _Buckets(limits.source_rate, limits.source_burst, limits.max_buckets) if limits.source_rate else None
+        )
+        self._connections = (
+            _Buckets(limits.connection_rate, limits.connection_burst, limits.max_buckets)
+            if limits.connection_rate
+            else None
+        )
+        self._tenants: Dict[str, _Tenant] = {}
+        self._heaps: Tuple[List[Tuple[float, int, _Entry]], ...] = ([], [])
+        self._vtime = [0.0, 0.0]
+        self._depth = [0, 0]
+        self._seq = 0
+        self._priority_run = 0
+        self._low_risk: Tuple[str, FrozenSet[str]] = ("", frozenset())
+        self._admitted = [0, 0]
+        self._served = 0
+        self._shed: Dict[str, int] = dict.fromkeys(SHED_CODES, 0)
+
+    # ---- Classification ----
+
+    def is_priority(self, intent: Intent, policy: CompiledPolicy) -> bool:
+        """
+        True when every requested action is Low-risk and reversible.
+        """
+        steps = intent.requested_steps
+        if not steps:
+            return False
+        content_hash, low = self._low_risk
+        if content_hash != policy.content_hash:
+            low = low_risk_actions(policy)
+            self._low_risk = (policy.content_hash, low)
+        for step in steps:
+            action = step.get("action") if isinstance(step, dict) else None
+            if not isinstance(action, str) or action not in low:
+                return False
+        return True
+
+    # ---- Admission ----
+
+    def offer(
+        self,
+        intent: Intent,
+        item: Any,
+        *,
+        policy: CompiledPolicy,
+        principal: Optional[str] = None,
+        connection: Optional[str] = None,
+        precharged: bool = False,
+    ) -> Tuple[Optional[RefusalDecision], List[Tuple[Intent, Any, RefusalDecision]]]:
+        """
+        Admit `intent` or refuse it.
+
+        Returns (refusal, displaced). refusal is None when the intent was
+        queued. displaced lists queued intents that were shed to make room;
+        they will not be popped and need a response with their refusal.
+        `principal` and `connection` identify the sender when the
+        transport can (see the module docstring). precharged=True is for a coalesced follower that already paid
+        through charge() and whose leader was shed: it takes no tokens and
+        takes its leader's place even when the queue is full, so depth can
+        exceed max_depth by one per promoted follower.
+        """
+        limits = self.limits
+        lane = _PRIORITY if self.is_priority(intent, policy) else _REGULAR
+        key = tenant_of(intent, principal)
+
+        with self._lock:
+            refusal = None if precharged else self._take_tokens(intent, principal, connection, self._clock())
+            if refusal is not None:
+                self._shed["ADMISSION_RATE_LIMITED"] += 1
+                return refusal, []
+
+            tenant = self._tenants.get(key)
+            if tenant is None:
+                tenant = self._tenants[key] = _Tenant(key, limits.weights.get(key, 1.0))
+            if limits.max_tenant_depth is not None and len(tenant.queued) >= limits.max_tenant_depth:
+                self._forget_if_idle(tenant)
+                self._shed["ADMISSION_TENANT_QUEUE_FULL"] += 1
+                return admission_refusal(
+                    "ADMISSION_TENANT_QUEUE_FULL",
+                    f"Intent not mediated: {key} already has {len(tenant.queued)} intents waiting, the "
+                    f"per-tenant limit. Wait for earlier responses before sending more.",
+                ), []
+
+            displaced: List[Tuple[Intent, Any, RefusalDecision]] = []
+            if not precharged and self._depth[0] + self._depth[1] >= limits.max_depth:
+                victim = max(self._tenants.values(), key=lambda t: len(t.queued))
+                # displacing from a tenant barely ahead would only churn
+                if len(victim.queued) <= len(tenant.queued) + 1:
+                    self._forget_if_idle(tenant)
+                    self._shed["ADMISSION_QUEUE_FULL"] += 1
+                    return self._queue_full(key), []
+                shed = victim.queued.pop()
+                shed.live = False
+                self._depth[shed.lane] -= 1
+                self._shed["ADMISSION_QUEUE_FULL"] += 1
+                displaced.append((shed.intent, shed.item, self._queue_full(victim.key)))
+                self._forget_if_idle(victim)
+
+            entry = _Entry(tenant, lane, intent, item)
+            finish = max(self._vtime[lane], tenant.finish[lane]) + intent_cost(intent) / tenant.weight
+            tenant.finish[lane] = finish
+            tenant.queued.append(entry)
+            self._seq += 1
+            heapq.heappush(self._heaps[lane], (finish, self._seq, entry))
+            self._depth[lane] += 1
+            self._admitted[lane] += 1
+            return None, displaced
+
+    def charge(
+        self,
+        intent: Intent,
+        *,
+        principal: Optional[str] = None,
+        connection: Optional[str] = None,
+    ) -> Optional[RefusalDecision]:
+        """
+        Rate-limit an intent that needs no queue slot (e.g. one coalesced
+        onto an identical request already queued). Returns the refusal, or
+        None once its tokens are taken.
+        """
+        with self._lock:
+            refusal = self._take_tokens(intent, principal, connection, self._clock())
+            if refusal is not None:
+                self._shed["ADMISSION_RATE_LIMITED"] += 1
+            return refusal
+
+    def _take_tokens(
+        self,
+        intent: Intent,
+        principal: Optional[str],
+        connection: Optional[str],
+        now: float,
+    ) -> Optional[RefusalDecision]:
+        limits = self.limits
+        meta = intent.metadata
+        user_key = principal if principal is not None else meta.user_id
+        user = self._users.get(user_key, now) if self._users is not None and user_key is not None else None
+        # an authenticated peer is budgeted by its principal; its source is the transport's, shared by all peers
+        src = self._sources.get(meta.source, now) if self._sources is not None and principal is None else None
+        conn = (
+            self._connections.get(connection, now) if self._connections is not None and connection is not None else None
+        )
+        buckets = (user, src, conn)
+        for bucket, who, rate, burst in (
+            (user, f"user '{user_key}'", limits.user_rate, limits.user_burst),
+            (src, f"source '{meta.source}'", limits.source_rate, limits.source_burst),
+            (conn, "this connection", limits.connection_rate, limits.connection_burst),
+        ):
+            if bucket is None:
+                continue
+            wait = bucket.wait_time(now)
+            if wait > 0.0:
+                return admission_refusal(
+                    "ADMISSION_RATE_LIMITED",
+                    f"Intent not mediated: {who} exceeded its request budget ({rate:g}/s, burst "
+                    f"{burst:g}). Retry after {wait:.2f}s.",
+                )
+        # only charge once every bucket has room
+        for bucket in buckets:
+            if bucket is not None:
+                bucket.take()
+        return None
+
+    @staticmethod
+    def _queue_full(key: str) -> RefusalDecision:
+        return admission_refusal(
+            "ADMISSION_QUEUE_FULL",
+            f"Intent not mediated: the mediation queue is full and {key} has the most intents waiting. "
+            "Retry once earlier requests have been answered.",
+        )
+
+    def _forget_if_idle(self, tenant: _Tenant) -> None:
+        if not tenant.queued:
+            self._tenants.pop(tenant.key, None)
+
+    # ---- Service ----
+
+    def pop(self) -> Optional[Tuple[Intent, Any]]:
+        """
+        Next (intent, item) to mediate, or None when nothing is queued.
+        """
+        with self._lock:
+            if self._depth[_PRIORITY] and (
+                self._priority_run < self.limits.priority_burst or not self._depth[_REGULAR]
+            ):
+                lane = _PRIORITY
+                self._priority_run += 1
+            elif self._depth[_REGULAR]:
+                lane = _REGULAR
+                self._priority_run = 0
+            else:
+                return None
+
+            heap = self._heaps[lane]
+            while True:
+                finish, _, entry = heapq.heappop(heap)
+                if entry.live:
+                    break
+            self._vtime[lane] = finish
+            self._depth[lane] -= 1
+            tenant = entry.tenant
+            # oldest first within a lane; a priority entry may overtake
+            if tenant.queued[0] is entry:
+                tenant.queued.popleft()
+            else:
+                tenant.queued.remove(entry)
+            self._forget_if_idle(tenant)
+            self._served += 1
+            return entry.intent, entry.item
+
+    def __len__(self) -> int:
+        return self._depth[0] + self._depth[1]
+
+    # ---- Inspection ----
+
+    def stats(self) -> AdmissionStats:
+        with self._lock:
+            return AdmissionStats(
+                depth=self._depth[0] + self._depth[1],
+                depth_by_lane=dict(zip(LANES, self._depth)),
+                tenants=len(self._tenants),
+                admitted_by_lane=dict(zip(LANES, self._admitted)),
+                served=self._served,
+                shed=dict(self._shed),
+            )
+
+    def render_prometheus(self, prefix: str = "aegis_admission") -> str:
+        s = self.stats()
+        lines = [
+            f"# HELP {prefix}_queue_depth Intents waiting for mediation.",
+            f"# TYPE {prefix}_queue_depth gauge",
+        ]
+        lines.extend(f'{prefix}_queue_depth{{lane="{lane}"}} {n}' for lane, n in s.depth_by_lane.items())
+        lines.append(f"# HELP {prefix}_tenants Tenants with intents waiting.")
+        lines.append(f"# TYPE {prefix}_tenants gauge")
+        lines.append(f"{prefix}_tenants {s.tenants}")
+        lines.append(f"# HELP {prefix}_admitted_total Intents admitted to the queue.")
+        lines.append(f"# TYPE {prefix}_admitted_total counter")
+        lines.extend(f'{prefix}_admitted_total{{lane="{lane}"}} {n}' for lane, n in s.admitted_by_lane.items())
+        lines.append(f"# HELP {prefix}_shed_total Intents refused by admission control, by refusal code.")
+        lines.append(f"# TYPE {prefix}_shed_total counter")
+        lines.extend(f'{prefix}_shed_total{{code="{code}"}} {n}' for code, n in s.shed.items())
+        return "\n".join(lines) + "\n"
@@ -1,9 +1,256 @@
 """Aegis V0 Daemon Entry Point
 Mediation-only. No execution.
+
+Startup is kept short because the daemon is restarted often (e.g. during
+policy rollouts):
+- the server, asyncio and metrics exporters are imported only after the
+  arguments parse;
+- the policy index and schema validators are restored from a startup
+  snapshot when one matches the current files (orchestrator.snapshot);
+- a per-phase timing line is printed once the socket is listening.
+
+Run with --build-snapshot before a restart to prepare the snapshot ahead.
+
+With --workers N the daemon pre-forks N worker processes on one socket
+under a supervisor (daemon.prefork); without it, one process serves.
 """
 
-def main():
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import errno  # noqa: E402
+
+from orchestrator.policy import DEFAULT_POLICY_PATH  # noqa: E402
+
+
+class _StartupClock:
+    """
+    Wall-clock phases of one daemon start, in milliseconds.
+    """
+
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self._last = started
+        self.phases = []
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    def report(self) -> str:
+        parts = ", ".join(f"{phase} {ms:.1f}ms" for phase, ms in self.phases)
+        return f"Startup: {parts}; ready in {(self._last - self.started) * 1000:.1f}ms"
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="aegis-daemon", description="Aegis V0 mediation daemon (no execution).")
+    parser.add_argument(
+        "--socket", default=None, help="Unix socket path to listen on (default: daemon.server.DEFAULT_SOCKET_PATH)."
+    )
+    parser.add_argument("--policy", default=str(DEFAULT_POLICY_PATH), help="Allowed-actions policy file.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Pre-fork N worker processes sharing the socket (default: serve from this process).",
+    )
+    parser.add_argument("--queue-size", type=int, default=1024, help="Bound on queued requests across all clients.")
+    parser.add_argument(
+        "--max-pending", type=int, default=64, help="Bound on unanswered requests per connection."
+    )
+    parser.add_argument(
+        "--user-rate", type=float, default=None, help="Intents/s allowed per peer uid (default: unlimited)."
+    )
+    parser.add_argument("--user-burst", type=float, default=20.0, help="Token-bucket burst per peer uid.")
+    parser.add_argument(
+        "--connection-rate", type=float, default=None, help="Intents/s allowed per connection (default: unlimited)."
+    )
+    parser.add_argument("--connection-burst", type=float, default=20.0, help="Token-bucket burst per connection.")
+    parser.add_argument(
+        "--tenant-weight",
+        action="append",
+        default=[],
+        metavar="TENANT=WEIGHT",
+        help="Fair-queue weight for a tenant (a peer uid, 'uid:<n>'); repeatable.",
+    )
+    parser.add_argument(
+        "--max-tenant-queue", type=int, default=None, help="Bound on queued intents per tenant (default: none)."
+    )
+    parser.add_argument(
+        "--no-coalesce", action="store_true", help="Mediate identical concurrent requests separately."
+    )
+    parser.add_argument("--drain-timeout", type=float, default=10.0, help="Seconds to finish queued work on SIGTERM.")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics (worker i: PORT+i).",
+    )
+    parser.add_argument(
+        "--metrics-file", default=None, help="Periodically write Prometheus metrics to this file (worker i: FILE.i)."
+    )
+    parser.add_argument("--metrics-interval", type=float, default=15.0, help="Seconds between metrics file writes.")
+    parser.add_argument(
+        "--snapshot-dir", default=None, help="Startup snapshot directory (default: $AEGIS_CACHE_DIR or ~/.cache/aegis)."
+    )
+    parser.add_argument("--no-snapshot", action="store_true", help="Compile policy and validators from source.")
+    parser.add_argument(
+        "--build-snapshot", action="store_true", help="Write the startup snapshot for --policy and exit."
+    )
+    return parser
+
+
+def _tenant_weights(specs):
+    weights = {}
+    for spec in specs:
+        tenant, sep, weight = spec.rpartition("=")
+        try:
+            weights[tenant] = float(weight)
+        except ValueError:
+            sep = ""
+        if not sep or not tenant:
+            raise ValueError(f"--tenant-weight expects TENANT=WEIGHT, got '{spec}'.")
+    return weights
+
+
+def _serve(args, limits, policy, socket_path, *, worker=None, sock=None, on_ready=None):
+    """
+    Serve until SIGTERM/SIGINT: the whole daemon, or one pre-fork worker
+    (worker index and inherited listening socket given).
+    """
+    import asyncio
+
+    from daemon.admission import AdmissionController
+    from daemon.server import serve
+    from orchestrator import metrics
+
+    admission = AdmissionController(limits)
+    exporters = []
+    collected = None
+    if args.metrics_port is not None or args.metrics_file:
+        collected = metrics.enable_metrics()
+        collected.add_collector(admission.render_prometheus)
+        if args.metrics_port is not None:
+            port = args.metrics_port + (worker or 0)
+            exporters.append(metrics.MetricsHTTPServer(collected, port=port).start())
+            print(f"Metrics on http://127.0.0.1:{port}/metrics")
+        if args.metrics_file:
+            path = args.metrics_file if worker is None else f"{args.metrics_file}.{worker}"
+            exporters.append(metrics.MetricsFileExporter(collected, path, interval=args.metrics_interval).start())
+
+    def ready(server) -> None:
+        if collected is not None and server.coalescer is not None:
+            collected.add_collector(server.coalescer.render_prometheus)
+        if on_ready is not None:
+            on_ready(server)
+
+    try:
+        asyncio.run(
+            serve(
+                socket_path,
+                policy=policy,
+                on_ready=ready,
+                reload_on_sighup=sock is None,
+                queue_size=args.queue_size,
+                max_pending_per_connection=args.max_pending,
+                drain_timeout=args.drain_timeout,
+                admission=admission,
+                coalesce=not args.no_coalesce,
+                sock=sock,
+            )
+        )
+    finally:
+        for exporter in exporters:
+            exporter.stop()
+
+
+def main(argv=None):
+    clock = _StartupClock(_IMPORT_STARTED)
+    clock.mark("imports")
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must be >= 0.")
+
+    from orchestrator.snapshot import load_startup
+
+    loaded = load_startup(args.policy, directory=args.snapshot_dir, enabled=not args.no_snapshot)
+    if loaded.error:
+        print(f"Aegis daemon: {loaded.error}")
+    if args.build_snapshot:
+        print(f"Snapshot {loaded.status}: {loaded.path} ({loaded.seconds * 1000:.1f}ms)")
+        return 0 if loaded.path is not None and not loaded.error else 1
+    clock.mark(f"policy+validators (snapshot {loaded.status})")
+
     print("Aegis V0 daemon starting (mediation-only).")
 
+    from daemon.admission import AdmissionLimits
+    from daemon.server import DEFAULT_SOCKET_PATH
+
+    clock.mark("server imports")
+    socket_path = args.socket or DEFAULT_SOCKET_PATH
+    try:
+        limits = AdmissionLimits(
+            user_rate=args.user_rate,
+            user_burst=args.user_burst,
+            connection_rate=args.connection_rate,
+            connection_burst=args.connection_burst,
+            weights=_tenant_weights(args.tenant_weight),
+            max_depth=args.queue_size,
+            max_tenant_depth=args.max_tenant_queue,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    def report() -> None:
+        clock.mark("listen")
+        print(clock.report(), flush=True)
+
+    try:
+        return _run(args, loaded, limits, socket_path, report)
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        print(f"Aegis daemon: {e.strerror}")
+        return 1
+
+
+def _run(args, loaded, limits, socket_path, report):
+    if args.workers:
+        from daemon.prefork import Supervisor
+
+        def run_worker(ctx) -> None:
+            _serve(args, limits, ctx.policy, socket_path, worker=ctx.index, sock=ctx.listener, on_ready=ctx.on_ready)
+
+        print(
+            f"Policy {loaded.policy.version} ({loaded.policy.content_hash[:12]}) listening on {socket_path} "
+            f"with {args.workers} workers"
+        )
+        code = Supervisor(
+            socket_path,
+            workers=args.workers,
+            startup=loaded,
+            run_worker=run_worker,
+            policy_path=args.policy,
+            snapshot_dir=args.snapshot_dir,
+            snapshot_enabled=not args.no_snapshot,
+            stop_timeout=args.drain_timeout + 5.0,
+            on_ready=report,
+        ).run()
+        print("Aegis V0 daemon stopped.")
+        return code
+
+    from orchestrator.policy import PolicyRegistry
+
+    # hits the compiled policy registered by load_startup
+    policy = PolicyRegistry(args.policy)
+    print(f"Policy {policy.current.version} ({policy.content_hash[:12]}) listening on {socket_path}")
+    _serve(args, limits, policy, socket_path, on_ready=lambda _server: report())
+    print("Aegis V0 daemon stopped.")
+    return 0
+
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
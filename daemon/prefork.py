@@ -0,0 +1,549 @@
+"""
+Aegis V0 — Pre-fork mediation daemon (supervisor + workers, mediation-only)
+
+A single asyncio process mediates on one core. With --workers N,
+daemon.main runs a Supervisor instead:
+
+- The supervisor binds the Unix socket once and forks N workers. Each
+  worker runs the usual MediationServer on the inherited listening
+  socket, and the kernel hands each connection to one of them.
+  A stale socket file is replaced; one a daemon is still listening on is
+  not (daemon.server.claim_socket_path).
+- The compiled policy index and schema validators are published once, as
+  startup snapshot bytes (orchestrator.snapshot), in a read-only,
+  owner-only file in shared memory (/dev/shm where available). Workers
+  mmap it read-only and restore from the mapping without reading or
+  compiling the source files. Restarted workers do the same.
+- A worker that exits unexpectedly is restarted. A worker that keeps
+  crashing soon after it starts is restarted with exponential backoff.
+- SIGHUP compiles the policy file once and rolls it out one worker at a
+  time. Each worker maps the new segment, swaps its PolicyRegistry and
+  acknowledges before the next worker is told. If a worker fails to load
+  it, the rollout stops and the workers already updated are moved back,
+  so every worker keeps serving the same policy.
+- SIGTERM/SIGINT drain every worker, as the single-process daemon does,
+  then remove the socket and the segment.
+
+Supervisor and worker talk over one socketpair per worker, one line per
+message:
+
+    worker -> supervisor   "ready"          serving
+                           "ok <hash>"      reload applied
+                           "error <text>"   reload failed
+    supervisor -> worker   "reload <path>"  map this segment and publish it
+
+A worker stops when its supervisor goes away. Admission limits, request
+coalescing and metrics apply per worker.
+
+Authoritative sources:
+- AEGIS_RUNTIME_ARCHITECTURE.md (2.1 Aegis Daemon)
+- AEGIS_IMPLEMENTATION_ROADMAP.md (V0 — Skeleton)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+import mmap
+import os
+import selectors
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+
+from orchestrator.policy import CompiledPolicy, PolicyRegistry, policy_content_hash
+from orchestrator.snapshot import StartupLoad, load_startup, restore_startup_payload
+
+LISTEN_BACKLOG = 1024
+RESTART_BACKOFF_MIN = 0.5
+RESTART_BACKOFF_MAX = 30.0
+# a worker that ran this long before exiting is restarted without delay
+HEALTHY_AFTER = 10.0
+
+
+# ---- Shared policy segment ----
+
+def default_segment_dir() -> str:
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class PolicySegment:
+    """
+    Startup snapshot bytes published as a read-only, owner-only file in
+    shared memory.
+    """
+
+    def __init__(self, path: str, policy_hash: str) -> None:
+        self.path = path
+        self.policy_hash = policy_hash
+
+    @classmethod
+    def publish(
+        cls,
+        payload: bytes,
+        policy_hash: str,
+        *,
+        generation: int,
+        directory: Optional[str] = None,
+    ) -> "PolicySegment":
+        path = os.path.join(directory or default_segment_dir(), f"aegis-policy-{os.getpid()}-{generation}")
+        # the payload holds code objects: never readable by anyone else
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fchmod(fd, 0o400)
+        except BaseException:
+            os.close(fd)
+            os.unlink(path)
+            raise
+        os.close(fd)
+        return cls(path, policy_hash)
+
+    def unlink(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def map_policy_segment(
+    path: Union[str, os.PathLike],
+    schema_path: Union[str, os.PathLike, None] = None,
+) -> CompiledPolicy:
+    """
+    Register the policy and validators of a published segment, read
+    through a read-only mapping, and return the policy.
+    """
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return restore_startup_payload(mapped, schema_path)
+
+
+# ---- Control channel ----
+
+class _Channel:
+    """
+    One end of a supervisor/worker socketpair, carrying text lines.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self._buffer = b""
+
+    def send(self, line: str) -> None:
+        self.sock.sendall(line.encode("utf-8") + b"\n")
+
+    def read_lines(self) -> Optional[List[str]]:
+        """
+        Complete lines available now; None once the peer has gone.
+        """
+        try:
+            data = self.sock.recv(65536)
+        except BlockingIOError:
+            return []
+        except OSError:
+            data = b""
+        if not data:
+            return None
+        *lines, self._buffer = (self._buffer + data).split(b"\n")
+        return [line.decode("utf-8", "replace") for line in lines]
+
+    def wait_line(self, timeout: float) -> Optional[str]:
+        """
+        The next line, or None on timeout or when the peer has gone.
+        """
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.sock, selectors.EVENT_READ)
+            while b"\n" not in self._buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    return None
+                try:
+                    data = self.sock.recv(65536)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b""
+                if not data:
+                    return None
+                self._buffer += data
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line.decode("utf-8", "replace")
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+# ---- Worker side ----
+
+@dataclass(frozen=True)
+class WorkerContext:
+    """
+    What a worker's serve function gets from the supervisor. It must serve
+    on `listener` with `policy`, and call `on_ready(server)` once
+    listening (serve(..., on_ready=...) does that).
+    """
+    index: int
+    listener: socket.socket
+    policy: PolicyRegistry
+    on_ready: Callable[[Any], None]
+
+
+class _WorkerControl:
+    def __init__(self, channel: _Channel, policy: PolicyRegistry, schema_path: Union[str, os.PathLike, None]) -> None:
+        self.channel = channel
+        self.policy = policy
+        self.schema_path = schema_path
+        self._server: Any = None
+
+    def attach(self, server: Any) -> None:
+        import asyncio
+
+        self._server = server
+        self.channel.sock.setblocking(False)
+        asyncio.get_running_loop().add_reader(self.channel.sock.fileno(), self._on_readable)
+        self.channel.send("ready")
+
+    def _on_readable(self) -> None:
+        lines = self.channel.read_lines()
+        if lines is None:
+            # the supervisor is gone: drain and exit rather than linger
+            import asyncio
+
+            asyncio.get_running_loop().remove_reader(self.channel.sock.fileno())
+            self._server.request_stop()
+            return
+        for line in lines:
+            command, _, argument = line.partition(" ")
+            if command == "reload":
+                try:
+                    policy = map_policy_segment(argument, self.schema_path)
+                    self.policy.publish(policy)
+                except (OSError, ValueError) as e:
+                    self.channel.send(f"error {e}".replace("\n", " "))
+                else:
+                    self.channel.send(f"ok {policy.content_hash}")
+
+
+def _worker_main(
+    index: int,
+    sock: socket.socket,
+    listener: socket.socket,
+    segment_path: str,
+    policy_path: Union[str, os.PathLike],
+    schema_path: Union[str, os.PathLike, None],
+    run_worker: Callable[[WorkerContext], None],
+) -> int:
+    policy = PolicyRegistry.from_policy(map_policy_segment(segment_path, schema_path), policy_path)
+    control = _WorkerControl(_Channel(sock), policy, schema_path)
+    run_worker(WorkerContext(index=index, listener=listener, policy=policy, on_ready=control.attach))
+    return 0
+
+
+# ---- Supervisor ----
+
+@dataclass
+class _Worker:
+    index: int
+    pid: int
+    channel: _Channel
+    started: float
+    ready: bool = False
+
+
+class Supervisor:
+    """
+    Pre-forks `workers` mediation workers on one Unix socket and keeps
+    them running until SIGTERM/SIGINT. Unix only (os.fork).
+
+    `startup` is the supervisor's own load_startup() result; its payload
+    becomes the first policy segment. `on_ready` is called once every
+    initial worker is serving.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        *,
+        workers: int,
+        startup: StartupLoad,
+        run_worker: Callable[[WorkerContext], None],
+        policy_path: Union[str, os.PathLike],
+        schema_path: Union[str, os.PathLike, None] = None,
+        snapshot_dir: Union[str, os.PathLike, None] = None,
+        snapshot_enabled: bool = True,
+        reload_timeout: float = 30.0,
+        stop_timeout: float = 15.0,
+        on_ready: Optional[Callable[[], None]] = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1.")
+        self.socket_path = socket_path
+        self.workers = workers
+        self.startup = startup
+        self.run_worker = run_worker
+        self.policy_path = policy_path
+        self.schema_path = schema_path
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_enabled = snapshot_enabled
+        self.reload_timeout = reload_timeout
+        self.stop_timeout = stop_timeout
+        self.on_ready = on_ready
+
+        self._workers: Dict[int, _Worker] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._backoff: Dict[int, float] = {}
+        self._listener: Optional[socket.socket] = None
+        self._segment: Optional[PolicySegment] = None
+        self._generation = 0
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+        self._stopping = False
+        self._reload_requested = False
+        self._announced = False
+
+    # ---- Lifecycle ----
+
+    def run(self) -> int:
+        # imported before forking, so workers (and restarted workers) start
+        # with the server modules loaded instead of importing them
+        from daemon.server import claim_socket_path
+
+        # raises if a daemon is already listening there
+        claim_socket_path(self.socket_path)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        self._listener.listen(LISTEN_BACKLOG)
+        self._segment = PolicySegment.publish(
+            self.startup.payload, self.startup.policy.content_hash, generation=self._generation
+        )
+
+        self._wake, self._wake_w = socket.socketpair()
+        self._wake.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._wake, selectors.EVENT_READ)
+        previous_wakeup = signal.set_wakeup_fd(self._wake_w.fileno())
+        previous = {
+            sig: signal.signal(sig, self._on_signal)
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD)
+        }
+        try:
+            for index in range(self.workers):
+                self._spawn(index)
+            while not self._stopping:
+                self._poll()
+                self._reap()
+                if self._reload_requested and not self._stopping:
+                    self._reload_requested = False
+                    self._rolling_reload()
+                self._restart_due()
+            return 0
+        finally:
+            self._stopping = True
+            self._stop_workers()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            signal.set_wakeup_fd(previous_wakeup)
+            self._selector.close()
+            self._wake.close()
+            self._wake_w.close()
+            self._listener.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._segment.unlink()
+
+    def _on_signal(self, signum: int, _frame: Any) -> None:
+        # only set flags; the wakeup fd gets the main loop out of select()
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self._stopping = True
+        elif signum == signal.SIGHUP:
+            self._reload_requested = True
+
+    def _poll(self) -> None:
+        timeout = 1.0
+        if self._restart_at:
+            timeout = max(0.0, min(timeout, min(self._restart_at.values()) - time.monotonic()))
+        for key, _ in self._selector.select(timeout):
+            if key.fileobj is self._wake:
+                try:
+                    while self._wake.recv(4096):
+                        pass
+                except BlockingIOError:
+                    pass
+                continue
+            worker: _Worker = key.data
+            lines = worker.channel.read_lines()
+            if lines is None:
+                # exited; reaped below
+                self._selector.unregister(worker.channel.sock)
+                continue
+            for line in lines:
+                if line == "ready":
+                    worker.ready = True
+        if not self._announced and len(self._workers) == self.workers and all(w.ready for w in self._workers.values()):
+            self._announced = True
+            if self.on_ready is not None:
+                self.on_ready()
+
+    # ---- Workers ----
+
+    def _spawn(self, index: int) -> None:
+        parent, child = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the worker
+            code = 1
+            try:
+                parent.close()
+                for worker in self._workers.values():
+                    worker.channel.close()
+                signal.set_wakeup_fd(-1)
+                self._selector.close()
+                self._wake.close()
+                self._wake_w.close()
+                for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+                    signal.signal(sig, signal.SIG_DFL)
+                signal.signal(signal.SIGHUP, signal.SIG_IGN)
+                code = _worker_main(
+                    index,
+                    child,
+                    self._listener,
+                    self._segment.path,
+                    self.policy_path,
+                    self.schema_path,
+                    self.run_worker,
+                )
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+
+        child.close()
+        parent.setblocking(False)
+        worker = _Worker(index=index, pid=pid, channel=_Channel(parent), started=time.monotonic())
+        self._workers[pid] = worker
+        self._selector.register(parent, selectors.EVENT_READ, worker)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self._workers.pop(pid, None)
+            if worker is None:
+                continue
+            try:
+                self._selector.unregister(worker.channel.sock)
+            except KeyError:
+                pass
+            worker.channel.close()
+            if self._stopping:
+                continue
+
+            now = time.monotonic()
+            if now - worker.started >= HEALTHY_AFTER:
+                delay = 0.0
+            else:
+                delay = min(RESTART_BACKOFF_MAX, max(RESTART_BACKOFF_MIN, 2 * self._backoff.get(worker.index, 0.0)))
+            self._backoff[worker.index] = delay
+            self._restart_at[worker.index] = now + delay
+            code = os.waitstatus_to_exitcode(status)
+            how = f"killed by signal {-code}" if code < 0 else f"exited with status {code}"
+            print(f"Aegis daemon: worker {worker.index} (pid {pid}) {how}; restarting in {delay:.1f}s", flush=True)
+
+    def _restart_due(self) -> None:
+        now = time.monotonic()
+        for index, due in list(self._restart_at.items()):
+            if due <= now:
+                del self._restart_at[index]
+                self._spawn(index)
+
+    def _stop_workers(self) -> None:
+        for worker in list(self._workers.values()):
+            try:
+                os.kill(worker.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.stop_timeout
+        while self._workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+            self._reap()
+        for worker in list(self._workers.values()):
+            try:
+                os.kill(worker.pid, signal.SIGKILL)
+                os.waitpid(worker.pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            worker.channel.close()
+        self._workers.clear()
+
+    # ---- Rolling reload ----
+
+    def _rolling_reload(self) -> None:
+        try:
+            data = Path(self.policy_path).read_bytes()
+        except OSError as e:
+            print(f"Aegis daemon: policy reload failed, keeping current policy: {e}", flush=True)
+            return
+        if policy_content_hash(data) == self._segment.policy_hash:
+            print("Aegis daemon: policy unchanged; nothing to roll out.", flush=True)
+            return
+        try:
+            loaded = load_startup(
+                self.policy_path, self.schema_path, directory=self.snapshot_dir, enabled=self.snapshot_enabled
+            )
+        except (OSError, ValueError) as e:
+            print(f"Aegis daemon: policy reload failed, keeping current policy: {e}", flush=True)
+            return
+
+        self._generation += 1
+        segment = PolicySegment.publish(loaded.payload, loaded.policy.content_hash, generation=self._generation)
+        updated: List[_Worker] = []
+        for worker in sorted(self._workers.values(), key=lambda w: w.index):
+            if self._tell(worker, segment):
+                updated.append(worker)
+                continue
+            print(
+                f"Aegis daemon: worker {worker.index} did not apply policy {segment.policy_hash[:12]}; "
+                f"rolling {len(updated)} worker(s) back.",
+                flush=True,
+            )
+            for done in updated:
+                self._tell(done, self._segment)
+            segment.unlink()
+            return
+
+        previous, self._segment = self._segment, segment
+        previous.unlink()
+        print(
+            f"Policy {loaded.policy.version} ({segment.policy_hash[:12]}) rolled out to {len(updated)} worker(s).",
+            flush=True,
+        )
+
+    def _tell(self, worker: _Worker, segment: PolicySegment) -> bool:
+        try:
+            worker.channel.send(f"reload {segment.path}")
+        except OSError:
+            return False
+        deadline = time.monotonic() + self.reload_timeout
+        while True:
+            line = worker.channel.wait_line(deadline - time.monotonic())
+            if line is None:
+                return False
+            if line == "ready":
+                worker.ready = True
+                continue
+            return line == f"ok {segment.policy_hash}"
@@ -0,0 +1,519 @@
+"""
+Aegis V0 — Mediation daemon server (Unix domain socket, mediation-only)
+
+Local clients send intent requests over a Unix socket and receive serialized
+MediationResults. The daemon plans, verifies and decides refusal; it never
+executes anything.
+
+Wire protocol (chosen per connection by the first byte the client sends):
+- JSONL: one JSON object per line, one JSON response line per request.
+- Length-prefixed: 4-byte big-endian length + JSON payload, responses framed
+  the same way. Frames are capped below 16 MiB, so a length-prefixed
+  connection always starts with a 0x00 byte.
+
+Responses are written in request order per connection. A request that cannot
+be parsed gets {"error": "..."} instead of a result.
+
+Admission: parsed requests go through daemon.admission, which rate limits
+per user and connection, orders work fairly across tenants
+(Low-risk reversible intents first) and refuses what is over budget with an
+ADMISSION_* refusal instead of mediating it. The admission queue is
+bounded by queue_size. Admission keys on who is on the other end of the
+socket, not on what the request says: the tenant and user bucket are the
+peer uid (SO_PEERCRED, "uid:<n>"; "conn:<n>" where the platform has no
+peer credentials), and a request cannot set its own source. Every daemon
+intent has the same source, so the per-source bucket does not apply here.
+
+Coalescing: a request whose requested steps (under the same policy) match a
+request that is already queued or being mediated does not take a queue
+slot. It is answered from that request's outcome, with its own intent
+identity and plan_id (orchestrator.coalescing). It is still rate limited.
+If the request it follows is shed from a full queue, a follower takes its
+place in the queue instead of receiving its refusal.
+
+Backpressure: each connection has a bounded queue of unanswered requests.
+When it is full the connection stops reading, so a fast client is slowed
+down by the socket instead of growing daemon memory.
+
+Mediation runs on a small thread pool (mediation_threads, default 1), off
+the event loop, so accepting and answering connections never waits behind
+a long mediation. Only that many intents leave the admission queue at a
+time; the rest stay there, in admission order, and can still be shed.
+
+The socket path is only taken over from a stale socket file. If a daemon
+is already listening there, start() raises OSError (EADDRINUSE) instead of
+unlinking it.
+
+Authoritative sources:
+- AEGIS_RUNTIME_ARCHITECTURE.md (2.1 Aegis Daemon)
+- AEGIS_IMPLEMENTATION_ROADMAP.md (V0 — Skeleton)
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+import asyncio
+import errno
+import functools
+import os
+import signal
+import socket
+import stat
+import struct
+
+from daemon.admission import AdmissionController, AdmissionLimits
+from orchestrator.coalescing import MediationCoalescer
+from orchestrator.intent import Intent, intent_from_dict
+from orchestrator.mediation import MediationResult, mediate_intent
+from orchestrator.policy import CompiledPolicy, PolicyRegistry
+from orchestrator.refusal import RefusalDecision
+from orchestrator.serialization import dumps, loads
+
+DEFAULT_SOCKET_PATH = "/tmp/aegis-mediation.sock"
+MAX_FRAME_BYTES = (1 << 24) - 1
+
+_LENGTH = struct.Struct(">I")
+# struct ucred: pid, uid, gid
+_PEERCRED = struct.Struct("3i")
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def encode_response(payload: Union[MediationResult, bytes, Dict[str, Any]]) -> bytes:
+    if isinstance(payload, MediationResult):
+        # canonical, and cached on the result
+        return payload.to_json()
+    return payload if isinstance(payload, bytes) else dumps(payload)
+
+
+def _parse_request(data: bytes) -> Intent:
+    try:
+        obj = loads(data)
+    except ValueError as e:
+        raise ProtocolError(f"Request is not valid JSON: {e}") from e
+    return intent_from_dict(obj, source="daemon", allow_source=False)
+
+
+def _refused(intent: Intent, refusal: RefusalDecision) -> MediationResult:
+    return MediationResult(intent=intent, plan=None, verification=None, refusal=refusal)
+
+
+def claim_socket_path(path: str) -> None:
+    """
+    Remove a stale socket file at `path` so it can be bound again. Raises
+    OSError (EADDRINUSE) if something is listening on it, and leaves
+    anything that is not a socket alone (bind then fails on it).
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        pass  # nobody accepting: left behind by a daemon that died
+    else:
+        raise OSError(errno.EADDRINUSE, f"A daemon is already listening on {path}.")
+    finally:
+        probe.close()
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class MediationServer:
+    """
+    Asyncio mediation server bound to a Unix domain socket.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        *,
+        policy: PolicyRegistry,
+        queue_size: int = 1024,
+        max_pending_per_connection: int = 64,
+        drain_timeout: float = 10.0,
+        admission: Optional[AdmissionController] = None,
+        coalesce: bool = True,
+        sock: Optional[socket.socket] = None,
+        mediation_threads: int = 1,
+    ) -> None:
+        if mediation_threads < 1:
+            raise ValueError("mediation_threads must be >= 1.")
+        self.socket_path = socket_path
+        self.policy = policy
+        self.queue_size = queue_size
+        self.max_pending_per_connection = max_pending_per_connection
+        self.drain_timeout = drain_timeout
+        self.mediation_threads = mediation_threads
+        # AdmissionController has __len__: an empty one is falsy
+        self.admission = (
+            admission if admission is not None else AdmissionController(AdmissionLimits(max_depth=queue_size))
+        )
+        self.coalescer: Optional[MediationCoalescer] = MediationCoalescer() if coalesce else None
+        # a listening socket bound by someone else (the pre-fork supervisor)
+        self._sock = sock
+
+        self._work_ready: Optional[asyncio.Event] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._mediator: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._mediating: Set[asyncio.Future] = set()
+        self._readers: Set[asyncio.Task] = set()
+        self._connections: Set[asyncio.Task] = set()
+        self._stopping: Optional[asyncio.Event] = None
+        self._connection_seq = 0
+        # coalesced followers' principals, in case their leader is shed
+        self._follower_principals: Dict[asyncio.Future, str] = {}
+
+    # ---- Lifecycle ----
+
+    async def start(self) -> None:
+        self._work_ready = asyncio.Event()
+        self._stopping = asyncio.Event()
+        if self._sock is not None:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection,
+                sock=self._sock,
+                limit=MAX_FRAME_BYTES + 1,
+            )
+        else:
+            claim_socket_path(self.socket_path)
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection,
+                path=self.socket_path,
+                limit=MAX_FRAME_BYTES + 1,
+            )
+        self._mediator = asyncio.create_task(self._mediate_forever())
+
+    def request_stop(self) -> None:
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def serve_until_stopped(self) -> None:
+        assert self._stopping is not None
+        await self._stopping.wait()
+        await self.drain()
+
+    async def drain(self) -> None:
+        """
+        Graceful shutdown: stop accepting connections and reading new
+        requests, answer everything already read, then close.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        for task in list(self._readers):
+            task.cancel()
+
+        try:
+            if self._connections:
+                await asyncio.wait_for(
+                    asyncio.gather(*self._connections, return_exceptions=True),
+                    timeout=self.drain_timeout,
+                )
+        except asyncio.TimeoutError:
+            for task in list(self._connections):
+                task.cancel()
+
+        if self._mediator is not None:
+            self._mediator.cancel()
+            await asyncio.gather(self._mediator, return_exceptions=True)
+        if self._executor is not None:
+            # mediations whose connections timed out are not waited for
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+        if self._sock is None and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    # ---- Mediation ----
+
+    async def _mediate_forever(self) -> None:
+        assert self._work_ready is not None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.mediation_threads, thread_name_prefix="aegis-mediate")
+        ready, admission, running = self._work_ready, self.admission, self._mediating
+        loop = asyncio.get_running_loop()
+        while True:
+            # pop only what a thread can start now; the rest keeps its
+            # admission order (and can be shed) while it waits
+            while len(running) < self.mediation_threads:
+                admitted = admission.pop()
+                if admitted is None:
+                    break
+                intent, future = admitted
+                if future.done():
+                    continue
+                job = loop.run_in_executor(
+                    self._executor, functools.partial(mediate_intent, intent=intent, policy=self.policy)
+                )
+                running.add(job)
+                job.add_done_callback(functools.partial(self._mediated, future))
+            # set by new work and by finished mediations
+            ready.clear()
+            await ready.wait()
+
+    def _mediated(self, future: asyncio.Future, job: asyncio.Future) -> None:
+        self._mediating.discard(job)
+        if not future.done():
+            if job.cancelled():
+                future.set_result({"error": "Mediation cancelled: the daemon is stopping."})
+            elif job.exception() is not None:  # pragma: no cover - mediation is total
+                future.set_result({"error": f"Mediation failed: {job.exception()}"})
+            else:
+                future.set_result(job.result())
+        assert self._work_ready is not None
+        self._work_ready.set()
+
+    # ---- Connections ----
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections.add(task)
+
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_per_connection)
+        framed = False
+        reader_task: Optional[asyncio.Task] = None
+        principal, connection = self._identify(writer)
+
+        try:
+            first = await reader.read(1)
+            if not first:
+                return
+            framed = first == b"\x00"
+            reader_task = asyncio.create_task(
+                self._read_requests(reader, first, framed, pending, principal, connection)
+            )
+            self._readers.add(reader_task)
+            reader_task.add_done_callback(self._readers.discard)
+            await self._write_responses(writer, framed, pending, reader_task)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if reader_task is not None and not reader_task.done():
+                reader_task.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self._connections.discard(task)
+
+    def _identify(self, writer: asyncio.StreamWriter) -> Tuple[str, str]:
+        """
+        (principal, connection key) for admission; neither comes from the
+        request body.
+        """
+        self._connection_seq += 1
+        connection = f"conn:{self._connection_seq}"
+        sock = writer.get_extra_info("socket")
+        try:
+            creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEERCRED.size)
+        except (AttributeError, OSError):
+            return connection, connection
+        _pid, uid, _gid = _PEERCRED.unpack(creds)
+        return f"uid:{uid}", connection
+
+    async def _read_frame(self, reader: asyncio.StreamReader, framed: bool, prefix: bytes = b"") -> Optional[bytes]:
+        if not framed:
+            line = await reader.readline()
+            if not line and not prefix:
+                return None
+            return prefix + line
+
+        try:
+            header = prefix + await reader.readexactly(_LENGTH.size - len(prefix))
+        except asyncio.IncompleteReadError as e:
+            if e.partial or prefix:
+                raise ProtocolError("Truncated frame header.") from e
+            return None
+        (length,) = _LENGTH.unpack(header)
+        if length > MAX_FRAME_BYTES:
+            raise ProtocolError(f"Frame of {length} bytes exceeds limit of {MAX_FRAME_BYTES}.")
+        try:
+            return await reader.readexactly(length)
+        except asyncio.IncompleteReadError as e:
+            raise ProtocolError("Truncated frame body.") from e
+
+    async def _read_requests(
+        self,
+        reader: asyncio.StreamReader,
+        first: bytes,
+        framed: bool,
+        pending: asyncio.Queue,
+        principal: str,
+        connection: str,
+    ) -> None:
+        assert self._work_ready is not None
+        loop = asyncio.get_running_loop()
+        prefix = first
+
+        while True:
+            try:
+                data = await self._read_frame(reader, framed, prefix)
+            except ValueError as e:
+                if isinstance(e, ProtocolError):
+                    raise
+                # StreamReader.readline raises ValueError past the size limit
+                raise ProtocolError(f"Request line exceeds limit of {MAX_FRAME_BYTES} bytes.") from e
+            prefix = b""
+            if data is None:
+                return
+            if not framed and not data.strip():
+                continue
+
+            future: asyncio.Future = loop.create_future()
+            try:
+                intent = _parse_request(data)
+            except ValueError as e:
+                future.set_result({"error": str(e)})
+                await pending.put(future)
+                continue
+
+            # per-connection bound first, then coalescing / admission
+            await pending.put(future)
+            policy = self.policy.current
+            coalescer = self.coalescer
+            key = coalescer.key_for(intent, policy) if coalescer is not None else None
+            if key is not None and coalescer.in_flight(key):
+                refusal = self.admission.charge(intent, principal=principal, connection=connection)
+                if refusal is not None:
+                    future.set_result(_refused(intent, refusal))
+                else:
+                    coalescer.follow(key, intent, future)
+                    self._follower_principals[future] = principal
+                    future.add_done_callback(self._follower_principals.pop)
+                continue
+
+            refusal, displaced = self.admission.offer(
+                intent, future, policy=policy, principal=principal, connection=connection
+            )
+            if refusal is not None:
+                future.set_result(_refused(intent, refusal))
+            else:
+                if key is not None:
+                    coalescer.lead(key, future)
+                self._work_ready.set()
+            self._shed(displaced, policy)
+
+    def _shed(self, displaced: List[Tuple[Intent, Any, Any]], policy: CompiledPolicy) -> None:
+        """
+        Answer intents displaced from the admission queue. A displaced
+        coalescing leader's followers were charged but never queued: the
+        first that is admitted leads a new flight in the leader's place (no
+        second charge, no depth check) and the rest follow it, so none gets
+        the leader's refusal.
+        """
+        work = list(displaced)
+        while work:
+            shed_intent, shed_future, shed_refusal = work.pop()
+            orphans: List[Tuple[Intent, asyncio.Future]] = []
+            key = None
+            if self.coalescer is not None:
+                key, orphans = self.coalescer.abandon(shed_future)
+            if not shed_future.done():
+                shed_future.set_result(_refused(shed_intent, shed_refusal))
+            while orphans:
+                intent, future = orphans.pop(0)
+                refusal, more = self.admission.offer(
+                    intent, future, policy=policy, principal=self._follower_principals.get(future), precharged=True
+                )
+                work.extend(more)
+                if refusal is not None:
+                    future.set_result(_refused(intent, refusal))
+                    continue
+                assert key is not None and self._work_ready is not None
+                self.coalescer.lead(key, future)
+                for follower_intent, follower_future in orphans:
+                    self.coalescer.follow(key, follower_intent, follower_future)
+                orphans = []
+                self._work_ready.set()
+
+    async def _write_responses(
+        self,
+        writer: asyncio.StreamWriter,
+        framed: bool,
+        pending: asyncio.Queue,
+        reader_task: asyncio.Task,
+    ) -> None:
+        while True:
+            if reader_task.done():
+                if pending.empty():
+                    exc = None if reader_task.cancelled() else reader_task.exception()
+                    if isinstance(exc, ProtocolError):
+                        await self._write_one(writer, framed, {"error": str(exc)})
+                    return
+                future = pending.get_nowait()
+            else:
+                get = asyncio.ensure_future(pending.get())
+                done, _ = await asyncio.wait({get, reader_task}, return_when=asyncio.FIRST_COMPLETED)
+                if get not in done:
+                    get.cancel()
+                    continue
+                future = get.result()
+
+            payload = await future
+            await self._write_one(writer, framed, payload)
+
+    async def _write_one(
+        self,
+        writer: asyncio.StreamWriter,
+        framed: bool,
+        payload: Union[MediationResult, bytes, Dict[str, Any]],
+    ) -> None:
+        body = encode_response(payload)
+        if framed:
+            writer.write(_LENGTH.pack(len(body)) + body)
+        else:
+            writer.write(body + b"\n")
+        await writer.drain()
+
+
+# ---- Entry point ----
+
+async def serve(
+    socket_path: str = DEFAULT_SOCKET_PATH,
+    *,
+    policy: PolicyRegistry,
+    on_ready: Optional[Callable[[MediationServer], None]] = None,
+    reload_on_sighup: bool = True,
+    **options: Any,
+) -> None:
+    """
+    Run the daemon until SIGTERM/SIGINT, then drain. SIGHUP reloads policy
+    unless reload_on_sighup is False (pre-fork workers are reloaded by
+    their supervisor). `on_ready` is called once the socket is listening.
+    """
+    server = MediationServer(socket_path, policy=policy, **options)
+    await server.start()
+    if on_ready is not None:
+        on_ready(server)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, server.request_stop)
+    if reload_on_sighup:
+        loop.add_signal_handler(signal.SIGHUP, _reload_policy, policy)
+
+    try:
+        await server.serve_until_stopped()
+    finally:
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            loop.remove_signal_handler(sig)
+
+
+def _reload_policy(policy: PolicyRegistry) -> None:
+    try:
+        policy.reload()
+    except (OSError, ValueError) as e:
+        print(f"Aegis daemon: policy reload failed, keeping current policy: {e}")
@@ -0,0 +1,205 @@
+"""
+Aegis V0 — Plan amendment with incremental re-verification (dry-run only)
+
+Clarification loops usually change one or two steps of a long plan.
+Instead of rebuilding and re-verifying everything, amend_plan() applies a
+step-level PlanDiff to a previously verified plan:
+
+- only new or replaced steps are built and schema-validated
+- step hooks run only on steps that differ from the previous plan (new,
+  replaced, or renumbered because steps were inserted/removed before them)
+- every other step reuses its cached per-hook findings
+- plan hooks run on the amended plan as usual
+
+The resulting VerificationReport is identical to run_verification() on the
+amended plan. Step ids stay 1..n in plan order, exactly as
+create_dry_run_plan would number them.
+
+Cached findings are only reused under the same policy content and the same
+step hooks; otherwise every step is re-derived and re-verified.
+
+Authoritative constraints:
+- AEGIS_IMPLEMENTATION_ROADMAP.md (V0 — Skeleton)
+- AEGIS_INTENT_CARD_SPEC.md (planning only from clarified intents)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+import uuid
+
+from orchestrator.plan import Plan, PlanStep, _schema_validators, build_plan_step, validate_step_schema
+from orchestrator.policy import CompiledPolicy, PolicyLike, resolve_policy
+from orchestrator.verification import VerificationFinding, VerificationReport, VerifierRegistry, resolve_registry
+
+StepFindings = Tuple[Sequence[VerificationFinding], ...]
+
+# keeps the previous notes when amend_plan(notes=...) is not given
+_KEEP = object()
+
+
+@dataclass(frozen=True)
+class PlanDiff:
+    """
+    Step-level changes to a plan, addressed by the previous plan's step ids.
+
+    replace        step_id -> requested step description (as for
+                   create_dry_run_plan)
+    remove         step ids to drop
+    insert_before  step_id -> requested steps to insert before that step
+    append         requested steps added at the end
+    """
+    replace: Mapping[int, Mapping[str, Any]] = field(default_factory=dict)
+    remove: Sequence[int] = ()
+    insert_before: Mapping[int, Sequence[Mapping[str, Any]]] = field(default_factory=dict)
+    append: Sequence[Mapping[str, Any]] = ()
+
+    def is_empty(self) -> bool:
+        return not (self.replace or self.remove or self.insert_before or self.append)
+
+
+@dataclass(frozen=True)
+class VerifiedPlan:
+    """
+    A plan with its report and the per-step findings that produced it.
+
+    step_findings is aligned with plan.steps: one tuple per step holding
+    the findings of each step hook. reverified lists the step ids whose
+    hooks actually ran (all of them for verify_plan).
+    """
+    plan: Plan
+    verification: VerificationReport
+    policy_hash: str
+    step_hooks: Tuple[Any, ...] = field(repr=False)
+    step_findings: Tuple[StepFindings, ...] = field(repr=False)
+    reverified: Tuple[int, ...] = ()
+
+
+def verify_plan(
+    plan: Plan,
+    *,
+    policy: Optional[PolicyLike] = None,
+    allowed_actions_json: Optional[Dict[str, Any]] = None,
+    registry: Optional[VerifierRegistry] = None,
+) -> VerifiedPlan:
+    """
+    Verify a plan built under `policy`, keeping per-step findings so later
+    amendments can reuse them. The report equals run_verification(plan).
+    """
+    compiled = resolve_policy(policy, allowed_actions_json)
+    registry = resolve_registry(registry)
+    hooks = registry.step_hooks
+    per_step = tuple([registry.step_findings(s) for s in plan.steps])
+    return VerifiedPlan(
+        plan=plan,
+        verification=registry.assemble(plan, per_step),
+        policy_hash=compiled.content_hash,
+        step_hooks=hooks,
+        step_findings=per_step,
+        reverified=tuple(s.step_id for s in plan.steps),
+    )
+
+
+# ---- Amendment ----
+
+def _check_diff(diff: PlanDiff, known: Mapping[int, int]) -> None:
+    for what, ids in (("replace", diff.replace), ("remove", diff.remove), ("insert_before", diff.insert_before)):
+        for step_id in ids:
+            if step_id not in known:
+                raise ValueError(f"PlanDiff.{what}: step {step_id} is not in the previous plan.")
+    both = set(diff.replace) & set(diff.remove)
+    if both:
+        raise ValueError(f"PlanDiff: steps {sorted(both)} are both replaced and removed.")
+
+
+def _merged(previous: Plan, diff: PlanDiff) -> List[Union[PlanStep, Mapping[str, Any]]]:
+    # previous PlanStep objects where kept, raw descriptions where new
+    removed = set(diff.remove)
+    entries: List[Union[PlanStep, Mapping[str, Any]]] = []
+    for step in previous.steps:
+        entries.extend(diff.insert_before.get(step.step_id, ()))
+        if step.step_id in removed:
+            continue
+        entries.append(diff.replace.get(step.step_id, step))
+    entries.extend(diff.append)
+    return entries
+
+
+def _rederive(step: PlanStep, step_id: int, compiled: CompiledPolicy) -> PlanStep:
+    action_policy = compiled.actions.get(step.action)
+    if action_policy is None:
+        raise ValueError(f"Step {step_id}: action '{step.action}' is not allowed by AEGIS_ALLOWED_ACTIONS_V1.json.")
+    return replace(step, step_id=step_id, risk=action_policy.risk, reversible=action_policy.reversible)
+
+
+def amend_plan(
+    previous: VerifiedPlan,
+    diff: PlanDiff,
+    *,
+    policy: Optional[PolicyLike] = None,
+    allowed_actions_json: Optional[Dict[str, Any]] = None,
+    registry: Optional[VerifierRegistry] = None,
+    notes: Any = _KEEP,
+) -> VerifiedPlan:
+    """
+    Apply `diff` to previous.plan and verify the result incrementally.
+
+    The amended plan gets a new plan_id and keeps the previous notes unless
+    `notes` is given. Invalid or disallowed steps raise ValueError, as
+    create_dry_run_plan does.
+    """
+    compiled = resolve_policy(policy, allowed_actions_json)
+    registry = resolve_registry(registry)
+    hooks = registry.step_hooks
+    old = previous.plan
+    known = {s.step_id: i for i, s in enumerate(old.steps)}
+    _check_diff(diff, known)
+
+    same_policy = compiled.content_hash == previous.policy_hash
+    reuse = same_policy and hooks == previous.step_hooks
+    allowed_index = compiled.actions
+
+    steps: List[PlanStep] = []
+    per_step: List[StepFindings] = []
+    reverified: List[int] = []
+    built: List[PlanStep] = []
+    for step_id, entry in enumerate(_merged(old, diff), start=1):
+        if not isinstance(entry, PlanStep):
+            step = build_plan_step(step_id, entry, allowed_index)
+            built.append(step)
+        elif not same_policy:
+            step = _rederive(entry, step_id, compiled)
+        elif entry.step_id != step_id:
+            step = replace(entry, step_id=step_id)
+        else:
+            step = entry
+        if reuse and step is entry:
+            per_step.append(previous.step_findings[known[step_id]])
+        else:
+            per_step.append(registry.step_findings(step))
+            reverified.append(step_id)
+        steps.append(step)
+
+    plan = Plan(
+        plan_id=str(uuid.uuid4()),
+        steps=tuple(steps),
+        notes=old.notes if notes is _KEEP else notes,
+    )
+
+    # kept steps were validated with the previous plan; only new ones here
+    errors = _schema_validators().errors_plan(plan, "", [], deep=False)
+    for step in built:
+        for err in validate_step_schema(step):
+            errors.append(f"Step {step.step_id}: {err}")
+    if errors:
+        raise ValueError("Plan failed validation:\n- " + "\n- ".join(errors))
+
+    return VerifiedPlan(
+        plan=plan,
+        verification=registry.assemble(plan, per_step),
+        policy_hash=compiled.content_hash,
+        step_hooks=hooks,
+        step_findings=tuple(per_step),
+        reverified=tuple(reverified),
+    )
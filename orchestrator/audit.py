@@ -0,0 +1,534 @@
+"""
+Aegis V0 — Append-only audit log (persistence of mediation events)
+
+Audit events follow AEGIS_ACTION_SCHEMA.json ($defs.auditEvent) and are
+appended, one JSON object per line, to rotating segment files:
+
+    <directory>/audit-00000001.log
+    <directory>/audit-00000002.log
+    ...
+
+Segments are never rewritten, except that a writer opening the log cuts a
+torn last line left by a crash. Writers hand events to a background committer
+that batches them and issues one fsync per batch ("group commit"). An event
+is durable once its batch is committed; callers that need that guarantee
+wait on the sequence number returned by append(). The commit latency bound
+caps how long an event can sit unflushed.
+
+Reading memory-maps each segment and splits lines without copying, so large
+logs can be scanned quickly.
+
+Authoritative sources:
+- AEGIS_ACTION_SCHEMA.json ($defs.auditEvent)
+- AEGIS_RUNTIME_ARCHITECTURE.md (7. Audit Logging)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+import time
+
+if TYPE_CHECKING:
+    from orchestrator.mediation import MediationResult
+
+SEGMENT_PREFIX = "audit-"
+SEGMENT_SUFFIX = ".log"
+_SEGMENT_RE = re.compile(r"^audit-(\d{8})\.log$")
+
+DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_COMMIT_INTERVAL = 0.005
+DEFAULT_COMMIT_MAX_BYTES = 1024 * 1024
+
+
+class AuditEventType(str, Enum):
+    # Must match AEGIS_ACTION_SCHEMA.json $defs.auditEvent.event_type enum
+    INTENT_CREATED = "INTENT_CREATED"
+    CONTEXT_ATTACHED = "CONTEXT_ATTACHED"
+    PLAN_PROPOSED = "PLAN_PROPOSED"
+    PLAN_VERIFIED = "PLAN_VERIFIED"
+    CARD_PRESENTED = "CARD_PRESENTED"
+    USER_DECISION = "USER_DECISION"
+    STEP_EXECUTED = "STEP_EXECUTED"
+    STEP_FAILED = "STEP_FAILED"
+    ROLLBACK_CREATED = "ROLLBACK_CREATED"
+    ROLLBACK_APPLIED = "ROLLBACK_APPLIED"
+    REFUSAL = "REFUSAL"
+    CLARIFICATION_REQUESTED = "CLARIFICATION_REQUESTED"
+
+
+class AuditActor(str, Enum):
+    # Must match AEGIS_ACTION_SCHEMA.json $defs.auditEvent.actor enum
+    USER = "user"
+    AEGIS = "aegis"
+    TOOL = "tool"
+
+
+def format_timestamp(ts: datetime) -> str:
+    """
+    Fixed-width UTC form, so timestamps also sort correctly as strings.
+    """
+    return ts.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def parse_timestamp(value: str) -> datetime:
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    ts = datetime.fromisoformat(value)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+@dataclass(frozen=True)
+class AuditEvent:
+    # Mirrors $defs.auditEvent
+    timestamp_utc: datetime
+    event_type: AuditEventType
+    intent_id: str
+    actor: AuditActor
+    action: Optional[str] = None
+    scope_token: Optional[str] = None
+    inputs_redacted: bool = True
+    output_hash: Optional[str] = None
+    diff_ref: Optional[str] = None
+    result: Optional[str] = None
+    reason: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp_utc": format_timestamp(self.timestamp_utc),
+            "event_type": self.event_type.value,
+            "intent_id": self.intent_id,
+            "actor": self.actor.value,
+            "action": self.action,
+            "scope_token": self.scope_token,
+            "inputs_redacted": bool(self.inputs_redacted),
+            "output_hash": self.output_hash,
+            "diff_ref": self.diff_ref,
+            "result": self.result,
+            "reason": self.reason,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditEvent":
+        unknown = set(data) - _AUDIT_EVENT_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown audit event fields: {sorted(unknown)}.")
+        try:
+            return cls(
+                timestamp_utc=parse_timestamp(data["timestamp_utc"]),
+                event_type=AuditEventType(data["event_type"]),
+                intent_id=str(data["intent_id"]),
+                actor=AuditActor(data["actor"]),
+                action=data.get("action"),
+                scope_token=data.get("scope_token"),
+                inputs_redacted=bool(data.get("inputs_redacted", True)),
+                output_hash=data.get("output_hash"),
+                diff_ref=data.get("diff_ref"),
+                result=data.get("result"),
+                reason=data.get("reason"),
+            )
+        except KeyError as e:
+            raise ValueError(f"Audit event is missing required field {e}.") from e
+
+    def encode(self) -> bytes:
+        return json.dumps(self.to_dict(), separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+_AUDIT_EVENT_FIELDS = frozenset(AuditEvent.__dataclass_fields__)
+
+
+def audit_event(
+    event_type: AuditEventType,
+    intent_id: str,
+    *,
+    actor: AuditActor = AuditActor.AEGIS,
+    **fields: Any,
+) -> AuditEvent:
+    """
+    Convenience factory stamping the current UTC time.
+    """
+    return AuditEvent(
+        timestamp_utc=datetime.now(timezone.utc),
+        event_type=event_type,
+        intent_id=intent_id,
+        actor=actor,
+        **fields,
+    )
+
+
+# ---- Segments ----
+
+def segment_path(directory: Path, number: int) -> Path:
+    return directory / f"{SEGMENT_PREFIX}{number:08d}{SEGMENT_SUFFIX}"
+
+
+def list_segments(directory: Union[str, os.PathLike]) -> List[Tuple[int, Path]]:
+    """
+    Return (segment_number, path) pairs in append order.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    segments = []
+    for entry in directory.iterdir():
+        m = _SEGMENT_RE.match(entry.name)
+        if m:
+            segments.append((int(m.group(1)), entry))
+    segments.sort()
+    return segments
+
+
+def truncate_torn_tail(path: Union[str, os.PathLike]) -> int:
+    """
+    Cut a torn trailing line (a crash mid-write) off an append-only line
+    file, so the next append starts on a fresh line. Returns the number of
+    bytes removed.
+    """
+    with open(path, "r+b") as f:
+        size = os.fstat(f.fileno()).st_size
+        keep, end = 0, size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            end = start
+        if keep == size:
+            return 0
+        f.truncate(keep)
+        os.fsync(f.fileno())
+        return size - keep
+
+
+# ---- Writer ----
+
+# Called by the committer after each durable batch:
+# (segment_number, [(offset, event), ...])
+CommitListener = Callable[[int, List[Tuple[int, AuditEvent]]], None]
+
+
+class AuditLogWriter:
+    """
+    Append-only audit writer with group commit.
+
+    append() encodes the event and queues it; a background thread writes all
+    queued events and fsyncs once per batch. A batch is committed when
+    `commit_interval` seconds have passed since its first event or when it
+    reaches `commit_max_bytes`, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        *,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+        commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+        commit_max_bytes: int = DEFAULT_COMMIT_MAX_BYTES,
+        fsync: bool = True,
+    ) -> None:
+        if segment_max_bytes < 1:
+            raise ValueError("segment_max_bytes must be >= 1.")
+        if commit_interval < 0:
+            raise ValueError("commit_interval must be >= 0.")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.commit_interval = commit_interval
+        self.commit_max_bytes = commit_max_bytes
+        self.fsync = fsync
+
+        self._cond = threading.Condition()
+        self._buffer: List[Tuple[AuditEvent, bytes]] = []
+        self._buffer_bytes = 0
+        self._first_buffered_at: Optional[float] = None
+        self._appended_seq = 0
+        self._committed_seq = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._listeners: List[CommitListener] = []
+
+        segments = list_segments(self.directory)
+        self._segment_number = segments[-1][0] if segments else 1
+        if segments:
+            # a crash can leave a partial last line; appending to it would
+            # make the segment unreadable
+            truncate_torn_tail(segments[-1][1])
+        self._file = open(segment_path(self.directory, self._segment_number), "ab")
+        self._segment_size = self._file.tell()
+
+        self._thread = threading.Thread(target=self._commit_loop, name="aegis-audit-commit", daemon=True)
+        self._thread.start()
+
+    # ---- Public API ----
+
+    @property
+    def segment_number(self) -> int:
+        return self._segment_number
+
+    def add_commit_listener(self, listener: CommitListener) -> None:
+        """
+        Register a callback run on the committer thread after each batch
+        is durable (used e.g. by secondary indexes).
+        """
+        self._listeners.append(listener)
+
+    def append(self, event: AuditEvent) -> int:
+        """
+        Queue an event and return its sequence number. Does not block on disk.
+        """
+        line = event.encode()
+        with self._cond:
+            self._raise_if_unusable()
+            self._buffer.append((event, line))
+            self._buffer_bytes += len(line)
+            if self._first_buffered_at is None:
+                self._first_buffered_at = time.monotonic()
+            self._appended_seq += 1
+            seq = self._appended_seq
+            if self._buffer_bytes >= self.commit_max_bytes or len(self._buffer) == 1:
+                self._cond.notify_all()
+            return seq
+
+    def append_many(self, events: List[AuditEvent]) -> int:
+        seq = 0
+        for event in events:
+            seq = self.append(event)
+        return seq
+
+    def wait_committed(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every event up to `seq` is durable.
+        """
+        with self._cond:
+            ok = self._cond.wait_for(
+                lambda: self._committed_seq >= seq or self._error is not None,
+                timeout=timeout,
+            )
+            if self._error is not None:
+                raise RuntimeError("Audit log commit failed.") from self._error
+            return ok
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Commit everything appended so far and wait for it.
+        """
+        with self._cond:
+            seq = self._appended_seq
+            self._first_buffered_at = float("-inf") if self._buffer else None
+            self._cond.notify_all()
+        return self.wait_committed(seq, timeout=timeout)
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise RuntimeError("Audit log commit failed.") from self._error
+
+    def __enter__(self) -> "AuditLogWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ---- Committer ----
+
+    def _raise_if_unusable(self) -> None:
+        if self._closed:
+            raise ValueError("Audit log writer is closed.")
+        if self._error is not None:
+            raise RuntimeError("Audit log commit failed.") from self._error
+
+    def _batch_due(self) -> bool:
+        if not self._buffer:
+            return False
+        if self._closed or self._buffer_bytes >= self.commit_max_bytes:
+            return True
+        assert self._first_buffered_at is not None
+        return time.monotonic() - self._first_buffered_at >= self.commit_interval
+
+    def _commit_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._batch_due():
+                    if self._closed and not self._buffer:
+                        return
+                    timeout = None
+                    if self._first_buffered_at is not None:
+                        timeout = max(0.0, self.commit_interval - (time.monotonic() - self._first_buffered_at))
+                    self._cond.wait(timeout=timeout)
+                batch = self._buffer
+                seq = self._appended_seq
+                self._buffer = []
+                self._buffer_bytes = 0
+                self._first_buffered_at = None
+
+            try:
+                committed = self._write_batch(batch)
+            except BaseException as e:  # surfaced to writers and waiters
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self._committed_seq = seq
+                self._cond.notify_all()
+
+            try:
+                for segment_number, entries in committed:
+                    for listener in self._listeners:
+                        listener(segment_number, entries)
+            except BaseException as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+    def _write_batch(self, batch: List[Tuple[AuditEvent, bytes]]) -> List[Tuple[int, List[Tuple[int, AuditEvent]]]]:
+        committed: List[Tuple[int, List[Tuple[int, AuditEvent]]]] = []
+        chunk: List[bytes] = []
+        entries: List[Tuple[int, AuditEvent]] = []
+
+        for event, line in batch:
+            if self._segment_size and self._segment_size + len(line) > self.segment_max_bytes:
+                self._write_chunk(chunk)
+                committed.append((self._segment_number, entries))
+                chunk, entries = [], []
+                self._rotate()
+            entries.append((self._segment_size, event))
+            chunk.append(line)
+            self._segment_size += len(line)
+
+        self._write_chunk(chunk)
+        committed.append((self._segment_number, entries))
+        return [c for c in committed if c[1]]
+
+    def _write_chunk(self, chunk: List[bytes]) -> None:
+        if not chunk:
+            return
+        self._file.write(b"".join(chunk))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._segment_number += 1
+        self._file = open(segment_path(self.directory, self._segment_number), "ab")
+        self._segment_size = self._file.tell()
+
+
+# ---- Reader ----
+
+def iter_segment_lines(path: Union[str, os.PathLike], start: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (offset, line_bytes) for each complete line of one segment,
+    starting at byte `start`. A torn trailing line (crash mid-write) is
+    skipped.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= start:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            find = mm.find
+            while pos < size:
+                end = find(b"\n", pos)
+                if end < 0:
+                    return
+                yield pos, mm[pos:end]
+                pos = end + 1
+
+
+def iter_audit_records(directory: Union[str, os.PathLike]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield raw event dicts from every segment in append order.
+    """
+    loads = json.loads
+    for _number, path in list_segments(directory):
+        for _offset, line in iter_segment_lines(path):
+            yield loads(line)
+
+
+def iter_audit_events(directory: Union[str, os.PathLike]) -> Iterator[AuditEvent]:
+    for record in iter_audit_records(directory):
+        yield AuditEvent.from_dict(record)
+
+
+# ---- Mediation events ----
+
+def mediation_audit_events(result: "MediationResult") -> List[AuditEvent]:
+    """
+    Translate one MediationResult into the audit events it implies:
+    INTENT_CREATED, PLAN_PROPOSED, PLAN_VERIFIED and (if refused) REFUSAL.
+    """
+    now = datetime.now(timezone.utc)
+    intent_id = result.intent.intent_id
+    events = [
+        AuditEvent(
+            timestamp_utc=now,
+            event_type=AuditEventType.INTENT_CREATED,
+            intent_id=intent_id,
+            actor=AuditActor.USER,
+        )
+    ]
+
+    if result.plan is not None:
+        # canonical bytes, cached on the plan (orchestrator.serialization)
+        plan_json = result.plan.to_json()
+        events.append(
+            AuditEvent(
+                timestamp_utc=now,
+                event_type=AuditEventType.PLAN_PROPOSED,
+                intent_id=intent_id,
+                actor=AuditActor.AEGIS,
+                output_hash="sha256:" + hashlib.sha256(plan_json).hexdigest(),
+                result=result.plan.plan_id,
+            )
+        )
+
+    if result.verification is not None and result.refusal is not None:
+        events.append(
+            AuditEvent(
+                timestamp_utc=now,
+                event_type=AuditEventType.PLAN_VERIFIED,
+                intent_id=intent_id,
+                actor=AuditActor.AEGIS,
+                result=result.refusal.decision.value,
+            )
+        )
+
+    if result.refusal is not None and result.refusal.decision.value == "REFUSE":
+        events.append(
+            AuditEvent(
+                timestamp_utc=now,
+                event_type=AuditEventType.REFUSAL,
+                intent_id=intent_id,
+                actor=AuditActor.AEGIS,
+                result=result.refusal.decision.value,
+                reason="; ".join(f"{r.code}: {r.message}" for r in result.refusal.reasons)
+                or result.refusal.summary,
+            )
+        )
+
+    return events
@@ -0,0 +1,494 @@
+"""
+Aegis V0 — Secondary indexes over the audit log (read-side only)
+
+Two append-only index structures are kept next to the segments:
+
+1. Per-segment sidecar `audit-NNNNNNNN.idx`, one JSON line per committed
+   batch, for the low-cardinality fields and time:
+
+    {"start": <first byte>, "end": <byte after last event>,
+     "ts": [<min timestamp_utc>, <max timestamp_utc>],
+     "event_type": {"<type>": [<offset>, ...]},
+     "actor":      {"<actor>":[<offset>, ...]}}
+
+   The time index is sparse: it only records the timestamp range of each
+   batch, which is enough to skip whole batches (and segments) that cannot
+   match a time window.
+
+2. Intent buckets `intent-index/XX.idx` (256 buckets by CRC32 of the
+   intent_id), one `<intent_id> <segment> <offset>` line per event. The
+   intent_id is written as a JSON string: it comes from the request, and a
+   raw newline or space in it would forge or hide postings. Looking up one
+   intent reads a single small bucket instead of every sidecar.
+
+Offsets point at event lines in the segment.
+
+The indexer is attached to an AuditLogWriter as a commit listener, so the
+sidecars grow incrementally as events become durable. Segments written
+without an indexer are caught up on demand.
+
+Several indexers may run over one directory (the writer's, plus an
+AuditIndex catching up). Each appends under an exclusive lock on
+`intent-index/.lock` and first re-reads how far the sidecar already
+covers, so no range is indexed twice.
+
+Authoritative sources:
+- AEGIS_ACTION_SCHEMA.json ($defs.auditEvent)
+- AEGIS_RUNTIME_ARCHITECTURE.md (7. Audit Logging)
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+import json
+import mmap
+import os
+import shutil
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - platform without flock
+    fcntl = None
+
+from orchestrator.audit import (
+    AuditEvent,
+    AuditLogWriter,
+    format_timestamp,
+    iter_segment_lines,
+    list_segments,
+    segment_path,
+)
+
+INDEX_SUFFIX = ".idx"
+INDEXED_FIELDS = ("event_type", "actor")
+INTENT_INDEX_DIR = "intent-index"
+INTENT_BUCKETS = 256
+LOCK_NAME = ".lock"
+
+
+def index_path_for(segment: Path) -> Path:
+    return segment.with_suffix(INDEX_SUFFIX)
+
+
+def intent_bucket_path(directory: Path, intent_id: str) -> Path:
+    bucket = zlib.crc32(intent_id.encode("utf-8")) % INTENT_BUCKETS
+    return directory / INTENT_INDEX_DIR / f"{bucket:02x}{INDEX_SUFFIX}"
+
+
+def _intent_key(intent_id: str) -> str:
+    return json.dumps(intent_id)
+
+
+def _batch_entry(
+    items: Iterable[Tuple[int, Dict[str, Any]]],
+    end: int,
+) -> Tuple[Optional[Dict[str, Any]], List[Tuple[str, int]]]:
+    """
+    Build one sidecar line plus (intent_id, offset) postings from
+    (offset, event_dict) pairs.
+    """
+    postings: Dict[str, Dict[str, List[int]]] = {name: {} for name in INDEXED_FIELDS}
+    intents: List[Tuple[str, int]] = []
+    start: Optional[int] = None
+    ts_min: Optional[str] = None
+    ts_max: Optional[str] = None
+
+    for offset, record in items:
+        if start is None:
+            start = offset
+        ts = record["timestamp_utc"]
+        if ts_min is None or ts < ts_min:
+            ts_min = ts
+        if ts_max is None or ts > ts_max:
+            ts_max = ts
+        for name in INDEXED_FIELDS:
+            postings[name].setdefault(str(record[name]), []).append(offset)
+        intents.append((str(record["intent_id"]), offset))
+
+    if start is None:
+        return None, intents
+    entry: Dict[str, Any] = {"start": start, "end": end, "ts": [ts_min, ts_max]}
+    entry.update(postings)
+    return entry, intents
+
+
+# ---- Index maintenance ----
+
+class AuditIndexer:
+    """
+    Maintains sidecar indexes for one audit directory.
+
+    Use attach() on a freshly opened writer: it first catches up any
+    segment bytes that are not yet indexed, then indexes every subsequent
+    committed batch.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike]) -> None:
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        # segment -> (sidecar size, indexed end); valid while the size matches
+        self._indexed_end: Dict[int, Tuple[int, int]] = {}
+
+    def attach(self, writer: AuditLogWriter) -> "AuditIndexer":
+        self.catch_up()
+        writer.add_commit_listener(self._on_commit)
+        return self
+
+    def catch_up(self) -> None:
+        """
+        Index whatever committed bytes the sidecars do not cover yet.
+        """
+        with self._locked():
+            for number, path in list_segments(self.directory):
+                self._catch_up_segment(number, path)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            lock_dir = self.directory / INTENT_INDEX_DIR
+            lock_dir.mkdir(exist_ok=True)
+            with open(lock_dir / LOCK_NAME, "a+b") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _known_end(self, number: int, path: Path) -> int:
+        # another indexer may have appended since we last looked
+        sidecar = index_path_for(path)
+        try:
+            size = sidecar.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        cached = self._indexed_end.get(number)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        last = _last_index_line(sidecar) if size else None
+        end = last["end"] if last is not None else 0
+        self._indexed_end[number] = (size, end)
+        return end
+
+    def _catch_up_segment(self, number: int, path: Path, upto: Optional[int] = None) -> None:
+        start = self._known_end(number, path)
+        items: List[Tuple[int, Dict[str, Any]]] = []
+        end = start
+        for offset, line in iter_segment_lines(path, start):
+            if upto is not None and offset >= upto:
+                break
+            items.append((offset, json.loads(line)))
+            end = offset + len(line) + 1
+        self._append_entry(number, path, *_batch_entry(items, end), end)
+
+    def _on_commit(self, segment_number: int, entries: List[Tuple[int, AuditEvent]]) -> None:
+        path = segment_path(self.directory, segment_number)
+        with self._locked():
+            known = self._known_end(segment_number, path)
+            if entries and entries[0][0] > known:
+                # bytes committed before this indexer was attached
+                self._catch_up_segment(segment_number, path, upto=entries[0][0])
+                known = self._known_end(segment_number, path)
+            fresh = [(offset, event) for offset, event in entries if offset >= known]
+            if not fresh:
+                return
+            last_offset, last_event = fresh[-1]
+            end = last_offset + len(last_event.encode())
+            self._append_entry(
+                segment_number,
+                path,
+                *_batch_entry(((o, e.to_dict()) for o, e in fresh), end),
+                end,
+            )
+
+    def _append_entry(
+        self,
+        number: int,
+        path: Path,
+        entry: Optional[Dict[str, Any]],
+        intents: List[Tuple[str, int]],
+        end: int,
+    ) -> None:
+        if entry is None:
+            return
+
+        # buckets first: the sidecar "end" marks what is fully indexed, and a
+        # crash in between only leaves duplicate postings (deduped on read)
+        by_bucket: Dict[Path, List[str]] = {}
+        for intent_id, offset in intents:
+            by_bucket.setdefault(intent_bucket_path(self.directory, intent_id), []).append(
+                f"{_intent_key(intent_id)} {number} {offset}\n"
+            )
+        if by_bucket:
+            (self.directory / INTENT_INDEX_DIR).mkdir(exist_ok=True)
+        for bucket, lines in by_bucket.items():
+            with open(bucket, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+
+        with open(index_path_for(path), "ab") as f:
+            f.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
+            self._indexed_end[number] = (f.tell(), end)
+
+
+def _read_index_lines(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                yield json.loads(line)
+
+
+def _last_index_line(path: Path, block: int = 64 * 1024) -> Optional[Dict[str, Any]]:
+    """
+    Read only the tail of a sidecar to find the last complete entry.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        tail = b""
+        pos = size
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            complete = tail[: tail.rfind(b"\n") + 1]
+            cut = complete.rfind(b"\n", 0, len(complete) - 1)
+            if cut >= 0 or (pos == 0 and complete):
+                return json.loads(complete[cut + 1:])
+        return None
+
+
+def rebuild_indexes(directory: Union[str, os.PathLike]) -> int:
+    """
+    Drop and rebuild every sidecar. Returns the number of segments indexed.
+    """
+    directory = Path(directory)
+    segments = list_segments(directory)
+    for _number, path in segments:
+        idx = index_path_for(path)
+        if idx.exists():
+            idx.unlink()
+    shutil.rmtree(directory / INTENT_INDEX_DIR, ignore_errors=True)
+    AuditIndexer(directory).catch_up()
+    return len(segments)
+
+
+# ---- Query side ----
+
+@dataclass
+class _SegmentIndex:
+    path: Path
+    stamp: Tuple[int, int]
+    batches: List[Dict[str, Any]] = field(default_factory=list)
+    ts_min: Optional[str] = None
+    ts_max: Optional[str] = None
+    # value -> offsets merged across batches, built lazily per field
+    merged: Dict[str, Dict[str, List[int]]] = field(default_factory=dict)
+
+    def postings(self, name: str) -> Dict[str, List[int]]:
+        table = self.merged.get(name)
+        if table is None:
+            table = {}
+            for batch in self.batches:
+                for value, offsets in batch[name].items():
+                    table.setdefault(value, []).extend(offsets)
+            self.merged[name] = table
+        return table
+
+
+def _as_ts(value: Union[None, str, datetime]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return format_timestamp(value)
+
+
+class AuditIndex:
+    """
+    Indexed queries over an audit directory.
+
+    Sidecars are loaded on first use and reloaded when they change, so one
+    AuditIndex can serve many queries while the log keeps growing.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike], *, catch_up: bool = True) -> None:
+        self.directory = Path(directory)
+        self._segments: Dict[int, _SegmentIndex] = {}
+        if catch_up:
+            AuditIndexer(self.directory).catch_up()
+
+    def _load(self) -> List[_SegmentIndex]:
+        loaded: List[_SegmentIndex] = []
+        for number, path in list_segments(self.directory):
+            idx = index_path_for(path)
+            try:
+                st = idx.stat()
+            except FileNotFoundError:
+                continue
+            stamp = (st.st_mtime_ns, st.st_size)
+            seg = self._segments.get(number)
+            if seg is None or seg.stamp != stamp:
+                seg = _SegmentIndex(path=path, stamp=stamp, batches=list(_read_index_lines(idx)))
+                if seg.batches:
+                    seg.ts_min = min(b["ts"][0] for b in seg.batches)
+                    seg.ts_max = max(b["ts"][1] for b in seg.batches)
+                self._segments[number] = seg
+            loaded.append(seg)
+        return loaded
+
+    def query(
+        self,
+        *,
+        intent_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        actor: Optional[str] = None,
+        since: Union[None, str, datetime] = None,
+        until: Union[None, str, datetime] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield matching raw event dicts in log order.
+
+        since/until bound timestamp_utc (inclusive, exclusive).
+        """
+        since_s, until_s = _as_ts(since), _as_ts(until)
+        event_type = getattr(event_type, "value", event_type)
+        actor = getattr(actor, "value", actor)
+
+        if intent_id is not None:
+            located = self._intent_locations(intent_id)
+        else:
+            keys = [(n, v) for n, v in (("event_type", event_type), ("actor", actor)) if v is not None]
+            located = self._field_locations(keys, since_s, until_s)
+
+        produced = 0
+        for path, offsets in located:
+            for record in _read_records_at(path, offsets):
+                if intent_id is not None and record["intent_id"] != intent_id:
+                    continue
+                if event_type is not None and record["event_type"] != event_type:
+                    continue
+                if actor is not None and record["actor"] != actor:
+                    continue
+                ts = record["timestamp_utc"]
+                if since_s is not None and ts < since_s:
+                    continue
+                if until_s is not None and ts >= until_s:
+                    continue
+                yield record
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+
+    def _intent_locations(self, intent_id: str) -> List[Tuple[Path, List[int]]]:
+        bucket = intent_bucket_path(self.directory, intent_id)
+        prefix = _intent_key(intent_id) + " "
+        found: Dict[int, Set[int]] = {}
+        try:
+            with open(bucket, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith(prefix):
+                        _id, number, offset = line.rsplit(" ", 2)
+                        found.setdefault(int(number), set()).add(int(offset))
+        except FileNotFoundError:
+            return []
+        segments = dict(list_segments(self.directory))
+        return [
+            (segments[number], sorted(offsets))
+            for number, offsets in sorted(found.items())
+            if number in segments
+        ]
+
+    def _field_locations(
+        self,
+        keys: Sequence[Tuple[str, str]],
+        since_s: Optional[str],
+        until_s: Optional[str],
+    ) -> Iterator[Tuple[Path, List[int]]]:
+        for seg in self._load():
+            if seg.ts_min is None:
+                continue
+            if since_s is not None and seg.ts_max < since_s:
+                continue
+            if until_s is not None and seg.ts_min >= until_s:
+                continue
+            offsets = self._candidate_offsets(seg, keys, since_s, until_s)
+            if offsets:
+                yield seg.path, offsets
+
+    def _candidate_offsets(
+        self,
+        seg: _SegmentIndex,
+        keys: Sequence[Tuple[str, str]],
+        since_s: Optional[str],
+        until_s: Optional[str],
+    ) -> List[int]:
+        if keys and (since_s is None or seg.ts_min >= since_s) and (until_s is None or seg.ts_max < until_s):
+            # whole segment is in range: use merged posting lists
+            sets: List[Set[int]] = []
+            for name, value in keys:
+                offsets = seg.postings(name).get(value)
+                if not offsets:
+                    return []
+                sets.append(set(offsets))
+            return sorted(set.intersection(*sets))
+
+        result: List[int] = []
+        for batch in seg.batches:
+            lo, hi = batch["ts"]
+            if since_s is not None and hi < since_s:
+                continue
+            if until_s is not None and lo >= until_s:
+                continue
+            if keys:
+                sets = []
+                for name, value in keys:
+                    offsets = batch[name].get(value)
+                    if not offsets:
+                        break
+                    sets.append(set(offsets))
+                else:
+                    result.extend(set.intersection(*sets))
+            else:
+                for offsets in batch["actor"].values():
+                    result.extend(offsets)
+        # overlapping batches (older sidecars) must not yield an event twice
+        return sorted(set(result))
+
+    def events_for_intent(self, intent_id: str) -> List[AuditEvent]:
+        """
+        The full recorded lifecycle of one intent, in log order.
+        """
+        return [AuditEvent.from_dict(r) for r in self.query(intent_id=intent_id)]
+
+    def recent(
+        self,
+        window: timedelta,
+        *,
+        event_type: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        now = now or datetime.now(timezone.utc)
+        return self.query(event_type=event_type, since=now - window)
+
+
+def _read_records_at(path: Path, offsets: Sequence[int]) -> Iterator[Dict[str, Any]]:
+    loads = json.loads
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            find = mm.find
+            for offset in offsets:
+                end = find(b"\n", offset)
+                if end < 0:
+                    continue
+                yield loads(mm[offset:end])
@@ -0,0 +1,324 @@
+"""
+Aegis V0 — Request coalescing for identical concurrent intents (singleflight)
+
+Retries and fan-out clients often send byte-identical requested steps
+within milliseconds of each other. Plan generation, verification and the
+refusal decision are pure functions of (requested steps, policy content,
+verifier set); see orchestrator.mediation_cache. So concurrent identical
+requests can share one computation:
+
+- the first request for a key (the leader) is mediated as usual;
+- requests for the same key that arrive while it is in flight (followers)
+  wait for it instead of mediating;
+- each follower gets its own MediationResult: its own intent, and a plan
+  with a freshly minted plan_id, as if it had been mediated alone.
+
+Nothing is remembered once the leader finishes; use a MediationCache for
+reuse across time. Coalescing changes only how much work is done, never
+a decision.
+
+Entry points:
+- MediationCoalescer.mediate(): blocking, for threads (mediate_intents
+  and mediate_jsonl with coalesce=True and thread workers).
+- MediationCoalescer.mediate_async(): for asyncio code.
+- MediationCoalescer.lead() and follow(): the callback form the daemon
+  uses, so a flight spans the time the leader waits in the admission
+  queue. If the leader is shed from that queue, abandon() ends the flight
+  and hands its followers back unresolved, so that one of them can lead
+  instead. Followers never receive another intent's admission refusal.
+
+Authoritative sources:
+- AEGIS_IMPLEMENTATION_ROADMAP.md (V0 — Skeleton)
+- AEGIS_RUNTIME_ARCHITECTURE.md (2.1 Aegis Daemon)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import threading
+import time
+import uuid
+
+from orchestrator import metrics
+from orchestrator.intent import Intent
+from orchestrator.mediation import MediationResult, _finish, mediate_intent
+from orchestrator.mediation_cache import plan_fingerprint
+from orchestrator.plan import Plan
+from orchestrator.policy import CompiledPolicy, PolicyLike, resolve_policy
+from orchestrator.verification import VerifierRegistry
+
+if TYPE_CHECKING:
+    from orchestrator.audit import AuditLogWriter
+
+
+def rebase_result(result: MediationResult, intent: Intent) -> MediationResult:
+    """
+    `result` under another intent's identity, with a fresh plan_id.
+    Steps, verification and refusal are shared, not copied.
+    """
+    plan = result.plan
+    if plan is not None:
+        plan = Plan(plan_id=str(uuid.uuid4()), steps=plan.steps, notes=plan.notes)
+    return MediationResult(intent=intent, plan=plan, verification=result.verification, refusal=result.refusal)
+
+
+@dataclass(frozen=True)
+class CoalescingStats:
+    leaders: int
+    followers: int
+    uncoalescable: int
+    in_flight: int
+
+    @property
+    def coalesced_ratio(self) -> float:
+        total = self.leaders + self.followers
+        return self.followers / total if total else 0.0
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[MediationResult] = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncFlight:
+    __slots__ = ("key", "leader", "followers")
+
+    def __init__(self, key: str, leader: asyncio.Future) -> None:
+        self.key = key
+        self.leader = leader
+        # (intent, future, audit, hooks, started) per follower
+        self.followers: List[Tuple[Intent, asyncio.Future, Optional[AuditLogWriter], Any, int]] = []
+
+
+class MediationCoalescer:
+    """
+    Singleflight for mediate_intent, keyed on plan_fingerprint().
+
+    Thread flights (mediate) are shared across threads. Asyncio flights
+    (mediate_async, lead, follow) belong to the event loop that created
+    them; use one coalescer per loop for those.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[str, _AsyncFlight] = {}
+        self._async_leaders: Dict[asyncio.Future, _AsyncFlight] = {}
+        self._leaders = 0
+        self._followers = 0
+        self._uncoalescable = 0
+
+    def key_for(
+        self,
+        intent: Intent,
+        policy: CompiledPolicy,
+        verifiers: Optional[VerifierRegistry] = None,
+    ) -> Optional[str]:
+        """
+        Flight key for an intent, or None if its steps cannot be fingerprinted.
+        """
+        try:
+            return plan_fingerprint(intent.requested_steps, policy.content_hash, verifiers=verifiers)
+        except (TypeError, ValueError):
+            with self._lock:
+                self._uncoalescable += 1
+            return None
+
+    # ---- Threads ----
+
+    def mediate(
+        self,
+        intent: Intent,
+        *,
+        policy: Optional[PolicyLike] = None,
+        allowed_actions_json: Optional[Dict[str, Any]] = None,
+        verifiers: Optional[VerifierRegistry] = None,
+        audit: Optional[AuditLogWriter] = None,
+    ) -> MediationResult:
+        """
+        mediate_intent(), sharing the computation with any identical request
+        already in flight on another thread. A follower re-raises the
+        leader's exception, if any.
+        """
+        snapshot = resolve_policy(policy, allowed_actions_json)
+        key = self.key_for(intent, snapshot, verifiers)
+        if key is None:
+            return mediate_intent(intent=intent, policy=snapshot, verifiers=verifiers, audit=audit)
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leading = flight is None
+            if leading:
+                flight = self._flights[key] = _Flight()
+                self._leaders += 1
+            else:
+                self._followers += 1
+
+        if not leading:
+            hooks = metrics.HOOKS
+            started = time.perf_counter_ns() if hooks else 0
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _finish(rebase_result(flight.result, intent), audit, hooks, started, cached=True)
+
+        try:
+            flight.result = mediate_intent(intent=intent, policy=snapshot, verifiers=verifiers, audit=audit)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    # ---- Asyncio ----
+
+    def lead(self, key: str, future: asyncio.Future) -> None:
+        """
+        Register `future` as the flight for `key`. Its result (a
+        MediationResult, or any other payload such as an error object) is
+        handed to every follower; the flight ends when it is done.
+        """
+        flight = _AsyncFlight(key, future)
+        self._async_flights[key] = flight
+        self._async_leaders[future] = flight
+        with self._lock:
+            self._leaders += 1
+        future.add_done_callback(lambda f: self._land(flight))
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._async_flights
+
+    def _end(self, flight: _AsyncFlight) -> None:
+        if self._async_flights.get(flight.key) is flight:
+            del self._async_flights[flight.key]
+        self._async_leaders.pop(flight.leader, None)
+
+    def _land(self, flight: _AsyncFlight) -> None:
+        self._end(flight)
+        done = flight.leader
+        followers, flight.followers = flight.followers, []
+        for intent, future, audit, hooks, started in followers:
+            if future.done():
+                continue
+            if done.cancelled():
+                future.cancel()
+            elif done.exception() is not None:
+                future.set_exception(done.exception())
+            else:
+                payload = done.result()
+                if isinstance(payload, MediationResult):
+                    payload = _finish(rebase_result(payload, intent), audit, hooks, started, cached=True)
+                future.set_result(payload)
+
+    def abandon(self, leader: asyncio.Future) -> Tuple[Optional[str], List[Tuple[Intent, asyncio.Future]]]:
+        """
+        End the flight led by `leader` without resolving its followers,
+        e.g. because the leader was shed and will never be mediated.
+        Returns (key, followers still waiting); key is None when `leader`
+        leads no flight. The caller must answer those followers, for
+        example by letting one of them lead a new flight.
+        """
+        flight = self._async_leaders.get(leader)
+        if flight is None:
+            return None, []
+        self._end(flight)
+        followers, flight.followers = flight.followers, []
+        return flight.key, [(intent, future) for intent, future, *_ in followers if not future.done()]
+
+    def follow(
+        self,
+        key: str,
+        intent: Intent,
+        future: asyncio.Future,
+        *,
+        audit: Optional[AuditLogWriter] = None,
+    ) -> bool:
+        """
+        Resolve `future` from the flight for `key`, rebased onto `intent`.
+        Returns False (and does nothing) when no such flight is running.
+        """
+        flight = self._async_flights.get(key)
+        if flight is None:
+            return False
+        with self._lock:
+            self._followers += 1
+        hooks = metrics.HOOKS
+        started = time.perf_counter_ns() if hooks else 0
+        flight.followers.append((intent, future, audit, hooks, started))
+        return True
+
+    async def mediate_async(
+        self,
+        intent: Intent,
+        *,
+        policy: Optional[PolicyLike] = None,
+        allowed_actions_json: Optional[Dict[str, Any]] = None,
+        verifiers: Optional[VerifierRegistry] = None,
+        audit: Optional[AuditLogWriter] = None,
+        run: Optional[Callable[[Intent], Awaitable[MediationResult]]] = None,
+    ) -> MediationResult:
+        """
+        Coalescing mediation for asyncio callers. The leader awaits
+        `run(intent)` when given (e.g. to mediate on an executor), else it
+        calls mediate_intent() inline.
+        """
+        snapshot = resolve_policy(policy, allowed_actions_json)
+        key = self.key_for(intent, snapshot, verifiers)
+        future = asyncio.get_running_loop().create_future()
+        if key is not None:
+            if self.follow(key, intent, future, audit=audit):
+                return await future
+            self.lead(key, future)
+
+        try:
+            if run is not None:
+                result = await run(intent)
+            else:
+                result = mediate_intent(intent=intent, policy=snapshot, verifiers=verifiers, audit=audit)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # followers re-raise it; the leader's caller sees it here
+            future.exception()
+            raise
+        future.set_result(result)
+        return result
+
+    # ---- Inspection ----
+
+    def render_prometheus(self, prefix: str = "aegis_coalescing") -> str:
+        s = self.stats()
+        return "\n".join(
+            [
+                f"# HELP {prefix}_leaders_total Mediations computed for a coalescing key.",
+                f"# TYPE {prefix}_leaders_total counter",
+                f"{prefix}_leaders_total {s.leaders}",
+                f"# HELP {prefix}_followers_total Requests answered from an identical request in flight.",
+                f"# TYPE {prefix}_followers_total counter",
+                f"{prefix}_followers_total {s.followers}",
+                f"# HELP {prefix}_in_flight Coalescing keys currently in flight.",
+                f"# TYPE {prefix}_in_flight gauge",
+                f"{prefix}_in_flight {s.in_flight}",
+            ]
+        ) + "\n"
+
+    def stats(self) -> CoalescingStats:
+        with self._lock:
+            return CoalescingStats(
+                leaders=self._leaders,
+                followers=self._followers,
+                uncoalescable=self._uncoalescable,
+                in_flight=len(self._flights) + len(self._async_flights),
+            )
+
@@ -0,0 +1,517 @@
+"""
+Aegis V0 — Content-addressed context store for mem:// context refs
+
+$defs.contextRef lets an intent attach context, and the runtime
+architecture keeps session objects behind mem:// references. The same
+large documents tend to be attached to many intents. ContextStore keeps
+each distinct blob once on local disk, keyed by its SHA-256. Intents
+carry only {"scheme": "mem", "ref": "sha256:<hex>"} in context_refs.
+
+Layout under the store directory:
+
+    objects/<hh>/<hex>   one read-only file per blob (hh = first two hex digits)
+    objects/tmp/         in-progress writes, renamed into place when complete
+    refs.log             append-only reference journal, one line per change:
+                         "+<hex> <holder>" or "-<hex> <holder>"
+
+- Writes stream in chunks (put_stream), hashing as they go. A blob that
+  is already stored is not written again.
+- Reads map the blob read-only (open_blob) and hand out a memoryview, so
+  nothing is copied.
+- A blob is referenced while any holder (normally an intent_id) holds it.
+  The journal is replayed on open and compacted when it grows. A torn
+  last line from a crash is cut off before appending, and lines that do
+  not parse as a digest and a valid holder are ignored.
+- Under a disk budget, collect() (also run by puts that would exceed it)
+  removes unreferenced blobs least recently used first. Referenced blobs
+  are never removed; a put that cannot fit raises ValueError.
+
+Reference counts live in the process that opened the store, so one
+process should own a store directory at a time. Blob files are
+written atomically and can be read by anyone.
+
+Authoritative sources:
+- AEGIS_ACTION_SCHEMA.json ($defs.contextRef, intent.context_refs)
+- AEGIS_RUNTIME_ARCHITECTURE.md (Session Orchestrator, mem:// references)
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Mapping, Optional, Set, Union
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import threading
+
+from orchestrator.audit import AuditActor, AuditEventType, AuditLogWriter, audit_event, truncate_torn_tail
+from orchestrator.intent import Intent
+
+MEM_SCHEME = "mem"
+REF_PREFIX = "sha256:"
+OBJECTS_DIR = "objects"
+REFS_LOG = "refs.log"
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_HEX_RE = re.compile(r"^[0-9a-f]{64}$")
+_EMPTY = memoryview(b"")
+
+
+def context_ref(digest: str) -> Dict[str, str]:
+    """The $defs.contextRef object for a stored blob."""
+    return {"scheme": MEM_SCHEME, "ref": REF_PREFIX + digest}
+
+
+def ref_digest(ref: Union[str, Mapping[str, Any]]) -> str:
+    """
+    Hex digest named by a mem:// context ref ({"scheme": "mem", "ref":
+    "sha256:<hex>"}), its "ref" string, or a bare hex digest.
+    """
+    if isinstance(ref, Mapping):
+        if ref.get("scheme") != MEM_SCHEME:
+            raise ValueError(f"Not a mem:// context ref: {dict(ref)!r}.")
+        ref = ref.get("ref")
+    if isinstance(ref, str):
+        digest = ref[len(REF_PREFIX):] if ref.startswith(REF_PREFIX) else ref
+        if _HEX_RE.match(digest):
+            return digest
+    raise ValueError(f"Malformed mem:// context ref: {ref!r}.")
+
+
+@dataclass(frozen=True)
+class ContextStoreStats:
+    blobs: int
+    bytes: int
+    referenced: int
+    referenced_bytes: int
+    budget_bytes: Optional[int]
+    deduplicated: int
+    evicted: int
+
+
+def _check_holder(holder: str) -> None:
+    # holders are journal tokens
+    if not isinstance(holder, str) or not holder or any(c.isspace() for c in holder):
+        raise ValueError("A context ref holder must be a non-empty string without whitespace.")
+
+
+class ContextBlob:
+    """
+    A read-only mapping of one stored blob. `view` is a memoryview over
+    the mapping; release every view taken from it before close().
+    """
+
+    __slots__ = ("digest", "_mmap", "view")
+
+    def __init__(self, digest: str, path: Path) -> None:
+        self.digest = digest
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # a zero-length file cannot be mapped
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.view = memoryview(self._mmap) if self._mmap is not None else _EMPTY
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self.view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "ContextBlob":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ContextStore:
+    """
+    Local content-addressed blob store with reference counting and
+    LRU eviction under an optional disk budget (see the module docstring).
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        *,
+        budget_bytes: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        if budget_bytes is not None and budget_bytes < 0:
+            raise ValueError("budget_bytes must be >= 0.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1.")
+        self.directory = Path(directory)
+        self.budget_bytes = budget_bytes
+        self.chunk_size = chunk_size
+        self._objects = self.directory / OBJECTS_DIR
+        self._tmp = self._objects / "tmp"
+        self._tmp.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        # digest -> size, least recently used first
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._holders: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._deduplicated = 0
+        self._evicted = 0
+        self._scan()
+        self._journal_lines = self._replay()
+        self._journal = open(self.directory / REFS_LOG, "ab", buffering=0)
+        self._compact_at = 0
+        self._compact_if_grown()
+
+    # ---- Startup ----
+
+    def _scan(self) -> None:
+        found = []
+        for fan in os.scandir(self._objects):
+            if not fan.is_dir() or len(fan.name) != 2:
+                continue
+            for entry in os.scandir(fan.path):
+                if _HEX_RE.match(entry.name):
+                    st = entry.stat()
+                    found.append((st.st_mtime_ns, entry.name, st.st_size))
+        for _mtime, digest, size in sorted(found):
+            self._sizes[digest] = size
+            self._bytes += size
+        for leftover in os.scandir(self._tmp):
+            # interrupted writes
+            os.unlink(leftover.path)
+
+    def _replay(self) -> int:
+        path = self.directory / REFS_LOG
+        if not path.exists():
+            return 0
+        # otherwise the next entry would be glued onto the partial line
+        truncate_torn_tail(path)
+        lines = 0
+        with open(path, "rb") as f:
+            for line in f:
+                lines += 1
+                op, _, rest = line.rstrip(b"\n").partition(b" ")
+                if len(op) != 65 or op[:1] not in (b"+", b"-"):
+                    continue
+                try:
+                    digest, holder = op[1:].decode("ascii"), rest.decode("utf-8")
+                    _check_holder(holder)
+                except ValueError:  # includes UnicodeDecodeError
+                    continue
+                if not _HEX_RE.match(digest):
+                    continue
+                if op[:1] == b"+":
+                    self._holders.setdefault(digest, set()).add(holder)
+                else:
+                    held = self._holders.get(digest)
+                    if held is not None:
+                        held.discard(holder)
+                        if not held:
+                            del self._holders[digest]
+        # references to blobs that are gone (e.g. deleted by hand) are void
+        for digest in [d for d in self._holders if d not in self._sizes]:
+            del self._holders[digest]
+        return lines
+
+    def _compact(self) -> None:
+        path = self.directory / REFS_LOG
+        tmp = path.with_name(f".{REFS_LOG}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            for digest, holders in self._holders.items():
+                f.write(b"".join(f"+{digest} {h}\n".encode("utf-8") for h in sorted(holders)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._journal.close()
+        self._journal = open(path, "ab", buffering=0)
+        self._journal_lines = sum(len(h) for h in self._holders.values())
+
+    def _compact_if_grown(self) -> None:
+        # compact once the journal is more than twice the live references
+        # (plus slack); _compact_at defers counting them until it could be
+        if self._journal_lines <= self._compact_at:
+            return
+        limit = 2 * sum(len(h) for h in self._holders.values()) + 1024
+        if self._journal_lines > limit:
+            self._compact()
+        self._compact_at = limit
+
+    # ---- Paths ----
+
+    def _path(self, digest: str) -> Path:
+        return self._objects / digest[:2] / digest
+
+    def __contains__(self, ref: object) -> bool:
+        try:
+            return ref_digest(ref) in self._sizes  # type: ignore[arg-type]
+        except ValueError:
+            return False
+
+    # ---- Writes ----
+
+    def put(self, data: Union[bytes, bytearray, memoryview], *, holder: Optional[str] = None) -> Dict[str, str]:
+        """
+        Store `data` (skipped if already stored) and return its context
+        ref. With `holder`, the blob is referenced on its behalf in the
+        same step, so a concurrent collect() cannot remove it in between.
+        """
+        if holder is not None:
+            _check_holder(holder)
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._sizes:
+                return self._stored(digest, holder, deduplicated=True)
+        return self.put_stream((data,), holder=holder, _digest=digest)
+
+    def put_stream(
+        self,
+        source: Union[IO[bytes], Iterable[bytes]],
+        *,
+        holder: Optional[str] = None,
+        _digest: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """
+        Store a blob from a binary file object (read in chunk_size pieces)
+        or an iterable of byte chunks, hashing while writing, and return its
+        context ref. Only one chunk is held in memory at a time.
+        """
+        if hasattr(source, "read"):
+            read, chunk_size = source.read, self.chunk_size  # type: ignore[union-attr]
+            chunks: Iterable[bytes] = iter(lambda: read(chunk_size), b"")
+        else:
+            chunks = source  # type: ignore[assignment]
+        if holder is not None:
+            _check_holder(holder)
+        fd, tmp_name = tempfile.mkstemp(dir=self._tmp)
+        size = 0
+        h = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if self.budget_bytes is not None and size > self.budget_bytes:
+                        raise ValueError(f"Context blob exceeds the store budget of {self.budget_bytes} bytes.")
+                    if _digest is None:
+                        h.update(chunk)
+                    f.write(chunk)
+            digest = _digest or h.hexdigest()
+            with self._lock:
+                if digest in self._sizes:
+                    os.unlink(tmp_name)
+                    return self._stored(digest, holder, deduplicated=True)
+                self._make_room(size)
+                path = self._path(digest)
+                path.parent.mkdir(exist_ok=True)
+                os.chmod(tmp_name, 0o444)
+                os.replace(tmp_name, path)
+                self._sizes[digest] = size
+                self._bytes += size
+                return self._stored(digest, holder, deduplicated=False)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def _stored(self, digest: str, holder: Optional[str], *, deduplicated: bool) -> Dict[str, str]:
+        if deduplicated:
+            self._deduplicated += 1
+            self._touch(digest)
+        if holder is not None:
+            self._acquire(digest, holder)
+        return context_ref(digest)
+
+    def _touch(self, digest: str) -> None:
+        self._sizes.move_to_end(digest)
+        try:
+            # recency survives a restart through the blob's mtime
+            os.utime(self._path(digest))
+        except OSError:
+            pass
+
+    # ---- Reads ----
+
+    def open_blob(self, ref: Union[str, Mapping[str, Any]]) -> ContextBlob:
+        """
+        Map a stored blob read-only; raises KeyError if it is not stored.
+        The mapping stays valid even if the blob is collected meanwhile.
+        """
+        digest = ref_digest(ref)
+        with self._lock:
+            if digest not in self._sizes:
+                raise KeyError(digest)
+            self._touch(digest)
+            return ContextBlob(digest, self._path(digest))
+
+    def read(self, ref: Union[str, Mapping[str, Any]]) -> bytes:
+        """The blob's content as bytes (a copy; see open_blob for none)."""
+        with self.open_blob(ref) as blob:
+            return bytes(blob.view)
+
+    def verify(self, ref: Union[str, Mapping[str, Any]]) -> bool:
+        """Re-hash a stored blob and compare it with its address."""
+        with self.open_blob(ref) as blob:
+            return hashlib.sha256(blob.view).hexdigest() == blob.digest
+
+    # ---- References ----
+
+    def _log(self, line: str) -> None:
+        self._journal.write(line.encode("utf-8"))
+        self._journal_lines += 1
+        self._compact_if_grown()
+
+    def _acquire(self, digest: str, holder: str) -> bool:
+        _check_holder(holder)
+        held = self._holders.setdefault(digest, set())
+        if holder in held:
+            return False
+        held.add(holder)
+        self._log(f"+{digest} {holder}\n")
+        return True
+
+    def acquire(self, ref: Union[str, Mapping[str, Any]], holder: str) -> bool:
+        """
+        Reference a stored blob on behalf of `holder`. Idempotent per
+        holder; returns True if the reference is new.
+        """
+        digest = ref_digest(ref)
+        with self._lock:
+            if digest not in self._sizes:
+                raise KeyError(digest)
+            return self._acquire(digest, holder)
+
+    def release(self, ref: Union[str, Mapping[str, Any]], holder: str) -> bool:
+        """
+        Drop `holder`'s reference. The blob stays stored but becomes
+        collectable once nothing references it.
+        """
+        digest = ref_digest(ref)
+        with self._lock:
+            held = self._holders.get(digest)
+            if held is None or holder not in held:
+                return False
+            held.discard(holder)
+            if not held:
+                del self._holders[digest]
+            self._log(f"-{digest} {holder}\n")
+            return True
+
+    def refcount(self, ref: Union[str, Mapping[str, Any]]) -> int:
+        digest = ref_digest(ref)
+        with self._lock:
+            return len(self._holders.get(digest, ()))
+
+    # ---- Intents ----
+
+    def attach(
+        self,
+        intent: Intent,
+        content: Union[bytes, bytearray, memoryview, IO[bytes], Iterable[bytes]],
+        *,
+        audit: Optional[AuditLogWriter] = None,
+    ) -> Intent:
+        """
+        Store `content`, reference it for the intent, and return the intent
+        with the mem:// ref appended to context_refs (once). With `audit`,
+        a CONTEXT_ATTACHED event records the blob hash.
+        """
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            ref = self.put(content, holder=intent.intent_id)
+        else:
+            ref = self.put_stream(content, holder=intent.intent_id)
+        if audit is not None:
+            audit.append(
+                audit_event(
+                    AuditEventType.CONTEXT_ATTACHED,
+                    intent.intent_id,
+                    actor=AuditActor.USER,
+                    output_hash=ref["ref"],
+                )
+            )
+        if ref in intent.context_refs:
+            return intent
+        return replace(intent, context_refs=list(intent.context_refs) + [ref])
+
+    def release_intent(self, intent: Intent) -> int:
+        """
+        Release every mem:// ref the intent holds (e.g. when its session
+        closes or expires). Returns the number released.
+        """
+        released = 0
+        for ref in intent.context_refs:
+            if ref.get("scheme") == MEM_SCHEME and self.release(ref, intent.intent_id):
+                released += 1
+        return released
+
+    # ---- Garbage collection ----
+
+    def _make_room(self, incoming: int) -> None:
+        if self.budget_bytes is None or self._bytes + incoming <= self.budget_bytes:
+            return
+        referenced = sum(self._sizes.get(d, 0) for d in self._holders)
+        if referenced + incoming > self.budget_bytes:
+            # fail before evicting anything
+            raise ValueError(
+                f"Context store budget of {self.budget_bytes} bytes exceeded: "
+                f"{referenced} bytes are still referenced."
+            )
+        self._collect(self.budget_bytes - incoming)
+
+    def _collect(self, target: int) -> int:
+        freed = 0
+        for digest in list(self._sizes):
+            if self._bytes <= target:
+                break
+            if digest in self._holders:
+                continue
+            size = self._sizes.pop(digest)
+            try:
+                os.unlink(self._path(digest))
+            except FileNotFoundError:
+                pass
+            self._bytes -= size
+            self._evicted += 1
+            freed += size
+        return freed
+
+    def collect(self, budget_bytes: Optional[int] = None) -> int:
+        """
+        Remove unreferenced blobs, least recently used first, until the
+        store fits `budget_bytes` (default: the store budget; with neither,
+        every unreferenced blob). Returns the bytes freed.
+        """
+        budget = budget_bytes if budget_bytes is not None else self.budget_bytes
+        with self._lock:
+            return self._collect(0 if budget is None else budget)
+
+    # ---- Inspection ----
+
+    def stats(self) -> ContextStoreStats:
+        with self._lock:
+            referenced = [d for d in self._holders if d in self._sizes]
+            return ContextStoreStats(
+                blobs=len(self._sizes),
+                bytes=self._bytes,
+                referenced=len(referenced),
+                referenced_bytes=sum(self._sizes[d] for d in referenced),
+                budget_bytes=self.budget_bytes,
+                deduplicated=self._deduplicated,
+                evicted=self._evicted,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._journal.close()
+
+    def __enter__(self) -> "ContextStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
@@ -4,14 +4,63 @@ Intent representation for Aegis (Phase 1).
 An Intent is a record of human intent.
 It is not a command.
 It has no execution authority.
+
+Lifecycle states and transitions follow AEGIS_INTENT_CARD_SPEC.md
+("Intent Lifecycle States"); no state grants permission to execute.
 """
 
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import List, Optional, Dict
+from enum import Enum
+from typing import Any, FrozenSet, List, Mapping, Optional, Dict
 import uuid
 
 
+class IntentState(str, Enum):
+    # Must match AEGIS_INTENT_CARD_SPEC.md "States"
+    DRAFT = "draft"
+    CLARIFYING = "clarifying"
+    BLOCKED = "blocked"
+    APPROVED = "approved"
+    PLANNED = "planned"
+
+
+# AEGIS_INTENT_CARD_SPEC.md "Allowed State Transitions"; anything else is forbidden
+ALLOWED_TRANSITIONS: Mapping[IntentState, FrozenSet[IntentState]] = {
+    IntentState.DRAFT: frozenset({IntentState.CLARIFYING, IntentState.BLOCKED, IntentState.APPROVED}),
+    IntentState.CLARIFYING: frozenset({IntentState.DRAFT, IntentState.BLOCKED, IntentState.APPROVED}),
+    IntentState.APPROVED: frozenset({IntentState.PLANNED}),
+    IntentState.BLOCKED: frozenset({IntentState.DRAFT}),
+    IntentState.PLANNED: frozenset(),
+}
+
+
+# str-valued members hash like their values, so this maps both forms
+_STATES: Mapping[Any, IntentState] = {s.value: s for s in IntentState}
+
+
+# AEGIS_ACTION_SCHEMA.json $defs.contextRef.scheme enum
+CONTEXT_REF_SCHEMES = ("file", "template", "index", "web", "mem")
+
+
+def _is_context_ref(value: Any) -> bool:
+    return (
+        isinstance(value, dict)
+        and set(value) == {"scheme", "ref"}
+        and value["scheme"] in CONTEXT_REF_SCHEMES
+        and isinstance(value["ref"], str)
+    )
+
+
+def coerce_state(value: Any) -> IntentState:
+    try:
+        return _STATES[value]
+    except (KeyError, TypeError):
+        raise ValueError(
+            f"Invalid intent state '{value}'. Must be one of: {[s.value for s in IntentState]}"
+        ) from None
+
+
 @dataclass(frozen=True)
 class IntentMetadata:
     """
@@ -40,6 +89,36 @@ class Intent:
         timestamp=datetime.now(timezone.utc),
         source="unknown",
     ))
+    # Step descriptions handed to plan generation (see create_dry_run_plan)
+    requested_steps: List[Dict[str, Any]] = field(default_factory=list)
+    # Lifecycle state; changed only through explicit transitions (orchestrator.sessions)
+    state: IntentState = IntentState.DRAFT
+    # $defs.contextRef objects ({"scheme", "ref"}); attached content lives
+    # elsewhere (mem:// refs: orchestrator.context_store), never inline
+    context_refs: List[Dict[str, str]] = field(default_factory=list)
+
+    @property
+    def intent_id(self) -> str:
+        return self.metadata.request_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "intent_id": self.intent_id,
+            "raw_input": self.raw_input,
+            "goal": self.goal,
+            "scope": list(self.scope),
+            "constraints": dict(self.constraints),
+            "assumptions": dict(self.assumptions),
+            "requested_steps": [dict(s) for s in self.requested_steps],
+            "state": self.state.value,
+            "context_refs": [dict(r) for r in self.context_refs],
+            "metadata": {
+                "request_id": self.metadata.request_id,
+                "timestamp": self.metadata.timestamp.isoformat(),
+                "source": self.metadata.source,
+                "user_id": self.metadata.user_id,
+            },
+        }
 
 
 def create_intent(
@@ -51,6 +130,7 @@ def create_intent(
     assumptions: Optional[Dict[str, str]] = None,
     source: str = "cli",
     user_id: Optional[str] = None,
+    requested_steps: Optional[List[Dict[str, Any]]] = None,
 ) -> Intent:
     """
     Factory function to create an Intent safely.
@@ -69,4 +149,95 @@ def create_intent(
         constraints=constraints or {},
         assumptions=assumptions or {},
         metadata=metadata,
+        requested_steps=requested_steps or [],
+    )
+
+
+def intent_from_record(data: Mapping[str, Any]) -> Intent:
+    """
+    Inverse of Intent.to_dict() for records Aegis wrote itself (e.g. a
+    session snapshot): metadata and state are restored as recorded. Use
+    intent_from_dict() for untrusted requests.
+    """
+    try:
+        meta = data["metadata"]
+        return Intent(
+            raw_input=data["raw_input"],
+            goal=data["goal"],
+            scope=list(data["scope"]),
+            constraints=dict(data.get("constraints") or {}),
+            assumptions=dict(data.get("assumptions") or {}),
+            metadata=IntentMetadata(
+                request_id=meta["request_id"],
+                timestamp=datetime.fromisoformat(meta["timestamp"]),
+                source=meta["source"],
+                user_id=meta.get("user_id"),
+            ),
+            requested_steps=list(data.get("requested_steps") or []),
+            state=coerce_state(data.get("state", IntentState.DRAFT.value)),
+            context_refs=list(data.get("context_refs") or []),
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed intent record: {e!r}") from None
+
+
+def intent_from_dict(data: Dict[str, Any], *, source: str = "api", allow_source: bool = True) -> Intent:
+    """
+    Build an Intent from an untrusted request object (e.g. one JSON line).
+
+    Recognized keys: raw_input, goal, scope, constraints, assumptions,
+    requested_steps, context_refs, source, user_id, request_id. Raises
+    ValueError on malformed input; nothing here grants authority.
+    allow_source=False ignores a "source" in the request and records
+    `source`, for callers that key decisions on it (the daemon).
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Intent request must be a JSON object.")
+
+    raw_input = data.get("raw_input", "")
+    goal = data.get("goal", raw_input)
+    if not isinstance(raw_input, str) or not isinstance(goal, str):
+        raise ValueError("raw_input and goal must be strings.")
+
+    scope = data.get("scope", []) or []
+    if not isinstance(scope, list) or any(not isinstance(s, str) for s in scope):
+        raise ValueError("scope must be a list of strings.")
+
+    requested_steps = data.get("requested_steps", []) or []
+    if not isinstance(requested_steps, list) or any(not isinstance(s, dict) for s in requested_steps):
+        raise ValueError("requested_steps must be a list of objects.")
+
+    context_refs = data.get("context_refs", []) or []
+    if not isinstance(context_refs, list) or any(not _is_context_ref(r) for r in context_refs):
+        raise ValueError(
+            "context_refs must be a list of {scheme, ref} objects with scheme one of "
+            f"{list(CONTEXT_REF_SCHEMES)}."
+        )
+
+    for key in ("constraints", "assumptions"):
+        value = data.get(key, {}) or {}
+        if not isinstance(value, dict):
+            raise ValueError(f"{key} must be an object.")
+
+    request_id = data.get("request_id") or str(uuid.uuid4())
+    user_id = data.get("user_id")
+    if not isinstance(request_id, str) or (user_id is not None and not isinstance(user_id, str)):
+        raise ValueError("request_id and user_id must be strings.")
+
+    metadata = IntentMetadata(
+        request_id=request_id,
+        timestamp=datetime.now(timezone.utc),
+        source=str((data.get("source") if allow_source else None) or source),
+        user_id=user_id,
+    )
+
+    return Intent(
+        raw_input=raw_input,
+        goal=goal,
+        scope=list(scope),
+        constraints=dict(data.get("constraints") or {}),
+        assumptions=dict(data.get("assumptions") or {}),
+        metadata=metadata,
+        requested_steps=list(requested_steps),
+        context_refs=[{"scheme": r["scheme"], "ref": r["ref"]} for r in context_refs],
     )
@@ -19,13 +19,47 @@ Authoritative behavior:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+import json
+import os
+import time
 
-from orchestrator.intent import Intent
+from orchestrator import metrics
+from orchestrator.intent import Intent, intent_from_dict
 from orchestrator.plan import create_dry_run_plan, Plan
-from orchestrator.verification import verify_plan, VerificationResult
+from orchestrator.policy import CompiledPolicy, PolicyLike, compile_policy_bytes, resolve_policy
+from orchestrator.verification import run_verification, VerificationReport, VerifierRegistry
 from orchestrator.refusal import decide_refusal, RefusalDecision
+from orchestrator.serialization import (
+    loads,
+    mediation_result_from_bytes,
+    mediation_result_from_dict,
+    mediation_result_to_json,
+)
+
+if TYPE_CHECKING:
+    # imported on use: a mediation without audit or cache never loads them
+    from orchestrator.audit import AuditLogWriter
+    from orchestrator.coalescing import MediationCoalescer
+    from orchestrator.mediation_cache import MediationCache
 
 
 @dataclass(frozen=True)
@@ -38,18 +72,59 @@ class MediationResult:
     """
     intent: Intent
     plan: Optional[Plan]
-    verification: Optional[VerificationResult]
+    verification: Optional[VerificationReport]
     refusal: Optional[RefusalDecision]
+    # canonical JSON, filled by orchestrator.serialization on first encode
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "intent_id": self.intent.intent_id,
+            "plan": self.plan.to_dict() if self.plan is not None else None,
+            "verification": self.verification.to_dict() if self.verification is not None else None,
+            "refusal": self.refusal.to_dict() if self.refusal is not None else None,
+        }
+
+    def to_json(self) -> bytes:
+        """Canonical JSON bytes; nested plan/report/decision bytes are cached."""
+        return mediation_result_to_json(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], *, intent: Optional[Intent] = None) -> "MediationResult":
+        return mediation_result_from_dict(data, intent=intent)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, *, intent: Optional[Intent] = None) -> "MediationResult":
+        return mediation_result_from_bytes(data, intent=intent)
 
 
 def mediate_intent(
     *,
     intent: Intent,
-    allowed_actions_json: Dict[str, Any],
+    allowed_actions_json: Optional[Dict[str, Any]] = None,
+    policy: Optional[PolicyLike] = None,
+    audit: Optional[AuditLogWriter] = None,
+    verifiers: Optional[VerifierRegistry] = None,
+    cache: Optional[MediationCache] = None,
 ) -> MediationResult:
     """
     Perform full mediation for a single intent.
 
+    Pass a PolicyRegistry (or CompiledPolicy) as `policy` to share one
+    compiled action index across calls. The registry snapshot is taken once
+    up front, so a concurrent hot-reload never changes policy mid-mediation.
+
+    When `audit` is given, the resulting audit events are queued on the
+    writer (group-committed; this call does not wait for fsync).
+
+    `verifiers` selects the verifier registry (default: DEFAULT_VERIFIERS).
+    With a `cache`, a repeat of the same requested steps under the same
+    policy and verifiers reuses the earlier plan steps, verification and
+    refusal; only a new plan_id is minted.
+
+    Stage timings and outcomes go to the hooks registered in
+    orchestrator.metrics; with none registered no clock is read.
+
     Steps:
     1. Generate dry-run plan
     2. Verify plan against policy and constraints
@@ -58,15 +133,38 @@ def mediate_intent(
     No execution or approval logic exists here.
     """
 
+    snapshot = resolve_policy(policy, allowed_actions_json)
+
+    hooks = metrics.HOOKS
+    started = t = time.perf_counter_ns() if hooks else 0
+
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key_for(intent.requested_steps, snapshot, verifiers)
+        cached = cache.get(cache_key) if cache_key is not None else None
+        if hooks:
+            t = metrics.stage_done(hooks, "cache", t)
+        if cached is not None:
+            plan, verification, refusal = cached.materialize()
+            return _finish(
+                MediationResult(intent=intent, plan=plan, verification=verification, refusal=refusal),
+                audit,
+                hooks,
+                started,
+                cached=True,
+            )
+
     # ---- Step 1: Plan generation (dry-run only) ----
     try:
         plan, _audit = create_dry_run_plan(
             derived_from_intent_id=intent.intent_id,
             requested_steps=intent.requested_steps,
-            allowed_actions_json=allowed_actions_json,
+            policy=snapshot,
             notes="Generated via V0 mediation pipeline",
         )
     except Exception as e:
+        if hooks:
+            t = metrics.stage_done(hooks, "plan", t)
         # Planning failure is treated as a refusal condition
         refusal = decide_refusal(
             intent=intent,
@@ -74,15 +172,30 @@ def mediate_intent(
             verification=None,
             error=str(e),
         )
-        return MediationResult(
-            intent=intent,
-            plan=None,
-            verification=None,
-            refusal=refusal,
+        if hooks:
+            t = metrics.stage_done(hooks, "refusal", t)
+        if cache_key is not None:
+            from orchestrator.mediation_cache import CachedMediation
+
+            cache.put(cache_key, CachedMediation(steps=None, notes=None, verification=None, refusal=refusal))
+        return _finish(
+            MediationResult(
+                intent=intent,
+                plan=None,
+                verification=None,
+                refusal=refusal,
+            ),
+            audit,
+            hooks,
+            started,
         )
+    if hooks:
+        t = metrics.stage_done(hooks, "plan", t)
 
     # ---- Step 2: Verification ----
-    verification = verify_plan(plan)
+    verification = run_verification(plan, registry=verifiers)
+    if hooks:
+        t = metrics.stage_done(hooks, "verify", t)
 
     # ---- Step 3: Refusal / clarification decision ----
     refusal = decide_refusal(
@@ -91,10 +204,304 @@ def mediate_intent(
         verification=verification,
         error=None,
     )
+    if hooks:
+        t = metrics.stage_done(hooks, "refusal", t)
 
-    return MediationResult(
-        intent=intent,
-        plan=plan,
-        verification=verification,
-        refusal=refusal,
+    if cache_key is not None:
+        from orchestrator.mediation_cache import CachedMediation
+
+        cache.put(
+            cache_key,
+            CachedMediation(steps=plan.steps, notes=plan.notes, verification=verification, refusal=refusal),
+        )
+
+    return _finish(
+        MediationResult(
+            intent=intent,
+            plan=plan,
+            verification=verification,
+            refusal=refusal,
+        ),
+        audit,
+        hooks,
+        started,
+    )
+
+
+def _finish(
+    result: MediationResult,
+    audit: Optional[AuditLogWriter],
+    hooks: Sequence[metrics.MediationHook] = (),
+    started: int = 0,
+    *,
+    cached: bool = False,
+) -> MediationResult:
+    if audit is not None:
+        from orchestrator.audit import mediation_audit_events
+
+        t = time.perf_counter_ns() if hooks else 0
+        audit.append_many(mediation_audit_events(result))
+        if hooks:
+            metrics.stage_done(hooks, "audit", t)
+    if hooks:
+        metrics.mediation_done(hooks, result, started, cached=cached)
+    return result
+
+
+# ---- Batch mediation ----
+
+EXECUTOR_KINDS = ("thread", "process")
+
+# Per-process policy for process-pool workers (set once by the initializer)
+_WORKER_POLICY: Optional[CompiledPolicy] = None
+
+
+def _init_process_worker(policy_source: bytes) -> None:
+    global _WORKER_POLICY
+    _WORKER_POLICY = compile_policy_bytes(policy_source)
+
+
+def _mediate_chunk_in_process(chunk: List[Intent]) -> List[MediationResult]:
+    return _mediate_chunk(chunk, _worker_policy())
+
+
+def _mediate_chunk(
+    chunk: List[Intent],
+    policy: CompiledPolicy,
+    coalescer: Optional[MediationCoalescer] = None,
+) -> List[MediationResult]:
+    if coalescer is not None:
+        return [coalescer.mediate(intent, policy=policy) for intent in chunk]
+    return [mediate_intent(intent=intent, policy=policy) for intent in chunk]
+
+
+def _worker_policy() -> CompiledPolicy:
+    if _WORKER_POLICY is None:
+        raise RuntimeError("Mediation worker was started without a policy.")
+    return _WORKER_POLICY
+
+
+def _stream_through_pool(
+    items: Iterable[Any],
+    *,
+    run_chunk: Callable[[List[Any], CompiledPolicy], List[Any]],
+    run_chunk_in_process: Callable[[List[Any]], List[Any]],
+    snapshot: CompiledPolicy,
+    coalesce: bool,
+    workers: Optional[int],
+    executor: str,
+    ordered: bool,
+    chunksize: int,
+    max_in_flight: Optional[int],
+    init_process: Optional[Tuple[Callable[..., None], Tuple[Any, ...]]] = None,
+) -> Iterator[Any]:
+    """
+    Run chunks of `items` on a bounded worker pool and stream the results.
+    Shared by mediate_intents, mediate_jsonl and orchestrator.replay. A
+    single thread worker runs inline on the caller's thread (no pool
+    hand-off). `init_process` is the (initializer, initargs) pair for
+    process workers; by default they compile `snapshot`.
+    """
+    if executor not in EXECUTOR_KINDS:
+        raise ValueError(f"executor must be one of {EXECUTOR_KINDS}, got '{executor}'.")
+    if coalesce and executor != "thread":
+        raise ValueError("coalesce=True needs executor='thread' (process workers share no flights).")
+    if chunksize < 1:
+        raise ValueError("chunksize must be >= 1.")
+
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be >= 1.")
+    max_in_flight = max_in_flight or 2 * workers
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be >= 1.")
+
+    if coalesce:
+        from functools import partial
+
+        from orchestrator.coalescing import MediationCoalescer
+
+        run_chunk = partial(run_chunk, coalescer=MediationCoalescer())
+
+    source = iter(items)
+
+    def next_chunk() -> List[Any]:
+        return list(islice(source, chunksize))
+
+    if workers == 1 and executor == "thread":
+        while True:
+            chunk = next_chunk()
+            if not chunk:
+                return
+            yield from run_chunk(chunk, snapshot)
+
+    pool: Executor
+    if executor == "process":
+        # multiprocessing is only imported by callers that ask for it
+        from concurrent.futures import ProcessPoolExecutor
+
+        initializer, initargs = init_process or (_init_process_worker, (snapshot.source,))
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aegis-mediate")
+
+    def submit(chunk: List[Any]) -> Future:
+        if executor == "process":
+            return pool.submit(run_chunk_in_process, chunk)
+        return pool.submit(run_chunk, chunk, snapshot)
+
+    try:
+        if ordered:
+            pending: Deque[Future] = deque()
+            while True:
+                while len(pending) < max_in_flight:
+                    chunk = next_chunk()
+                    if not chunk:
+                        break
+                    pending.append(submit(chunk))
+                if not pending:
+                    break
+                yield from pending.popleft().result()
+        else:
+            running: Set[Future] = set()
+            exhausted = False
+            while True:
+                while not exhausted and len(running) < max_in_flight:
+                    chunk = next_chunk()
+                    if not chunk:
+                        exhausted = True
+                        break
+                    running.add(submit(chunk))
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def mediate_intents(
+    intents: Iterable[Intent],
+    *,
+    workers: Optional[int] = None,
+    executor: str = "thread",
+    ordered: bool = True,
+    chunksize: int = 1,
+    max_in_flight: Optional[int] = None,
+    allowed_actions_json: Optional[Dict[str, Any]] = None,
+    policy: Optional[PolicyLike] = None,
+    coalesce: bool = False,
+) -> Iterator[MediationResult]:
+    """
+    Mediate many intents on a worker pool, streaming results back.
+
+    - executor: "thread" shares one policy snapshot across threads;
+      "process" compiles the policy once per worker process.
+    - ordered: yield results in input order (True) or as they complete.
+    - chunksize: intents per task; larger chunks amortize pickling in
+      process mode.
+    - max_in_flight: upper bound on submitted-but-unconsumed chunks
+      (default 2 x workers), so the input is consumed lazily and memory
+      stays bounded for arbitrarily long iterables.
+    - coalesce: identical requested steps mediated concurrently on
+      different threads share one computation (orchestrator.coalescing);
+      thread executor only.
+
+    The policy snapshot is taken once when the batch starts; a registry
+    hot-reload during the batch applies to the next batch.
+    """
+    return _stream_through_pool(
+        intents,
+        run_chunk=_mediate_chunk,
+        run_chunk_in_process=_mediate_chunk_in_process,
+        snapshot=resolve_policy(policy, allowed_actions_json),
+        coalesce=coalesce,
+        workers=workers,
+        executor=executor,
+        ordered=ordered,
+        chunksize=chunksize,
+        max_in_flight=max_in_flight,
+    )
+
+
+# ---- JSON lines mediation ----
+
+ERROR_OUTCOME = "ERROR"
+
+
+def _mediate_line(
+    number: int,
+    line: Union[str, bytes],
+    policy: CompiledPolicy,
+    coalescer: Optional[MediationCoalescer] = None,
+) -> Tuple[str, str]:
+    try:
+        intent = intent_from_dict(loads(line), source="cli")
+    except ValueError as e:
+        return ERROR_OUTCOME, json.dumps({"line": number, "error": str(e)}, separators=(",", ":"))
+    if coalescer is not None:
+        result = coalescer.mediate(intent, policy=policy)
+    else:
+        result = mediate_intent(intent=intent, policy=policy)
+    outcome = result.refusal.decision.value if result.refusal is not None else ERROR_OUTCOME
+    # splice the line number into the result's cached canonical encoding
+    return outcome, f'{{"line":{number},' + result.to_json()[1:].decode("ascii")
+
+
+def _mediate_lines_chunk(
+    chunk: List[Tuple[int, Union[str, bytes]]],
+    policy: CompiledPolicy,
+    coalescer: Optional[MediationCoalescer] = None,
+) -> List[Tuple[str, str]]:
+    return [_mediate_line(number, line, policy, coalescer) for number, line in chunk]
+
+
+def _mediate_lines_chunk_in_process(chunk: List[Tuple[int, Union[str, bytes]]]) -> List[Tuple[str, str]]:
+    return _mediate_lines_chunk(chunk, _worker_policy())
+
+
+def numbered_lines(lines: Iterable[Union[str, bytes]]) -> Iterator[Tuple[int, Union[str, bytes]]]:
+    """
+    (1-based line number, line) for every non-blank line, read lazily.
+    """
+    for number, line in enumerate(lines, start=1):
+        if line.strip():
+            yield number, line
+
+
+def mediate_jsonl(
+    lines: Iterable[Union[str, bytes]],
+    *,
+    workers: Optional[int] = None,
+    executor: str = "thread",
+    ordered: bool = True,
+    chunksize: int = 16,
+    max_in_flight: Optional[int] = None,
+    allowed_actions_json: Optional[Dict[str, Any]] = None,
+    policy: Optional[PolicyLike] = None,
+    coalesce: bool = False,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Mediate a stream of JSON lines (one intent request per line, see
+    intent_from_dict) and yield (outcome, output line) pairs.
+
+    Parsing, mediation and JSON encoding all run on the workers. Each
+    output line is a JSON object carrying the input "line" number and
+    either the mediation result or an "error" for malformed input (outcome
+    "ERROR"). Blank lines are skipped. Memory is bounded by max_in_flight
+    chunks regardless of input length; pool and coalesce options as for
+    mediate_intents.
+    """
+    return _stream_through_pool(
+        numbered_lines(lines),
+        run_chunk=_mediate_lines_chunk,
+        run_chunk_in_process=_mediate_lines_chunk_in_process,
+        snapshot=resolve_policy(policy, allowed_actions_json),
+        coalesce=coalesce,
+        workers=workers,
+        executor=executor,
+        ordered=ordered,
+        chunksize=chunksize,
+        max_in_flight=max_in_flight,
     )
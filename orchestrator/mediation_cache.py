@@ -0,0 +1,208 @@
+"""
+Aegis V0 — Memoized mediation (deterministic reuse, no execution)
+
+Plan generation, verification and the refusal decision are pure functions
+of (requested steps, compiled policy, verifier set). Only the plan_id and
+the intent identity differ between repeats. This module fingerprints the
+deterministic inputs and keeps a bounded LRU/TTL cache of outcomes, so a
+repeated step shape skips recomputation while still receiving a freshly
+minted plan_id.
+
+The fingerprint deliberately ignores plan_id and intent metadata (ids,
+timestamps, source, user).
+
+Outcomes are stored and served as copies: step args and finding/reason
+lists are mutable, and a caller editing its result must not change what
+the next hit receives.
+
+Authoritative sources:
+- AEGIS_IMPLEMENTATION_ROADMAP.md (V0 — Skeleton)
+- AEGIS_ACTION_SCHEMA.json ($defs.plan)
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import copy
+import hashlib
+import json
+import threading
+import time
+import uuid
+
+from orchestrator.plan import Plan, PlanStep
+from orchestrator.policy import CompiledPolicy
+from orchestrator.refusal import RefusalDecision
+from orchestrator.verification import VerificationReport, VerifierRegistry, resolve_registry
+
+
+def plan_fingerprint(
+    requested_steps: List[Dict[str, Any]],
+    policy_hash: str,
+    *,
+    verifiers: Optional[VerifierRegistry] = None,
+) -> str:
+    """
+    Canonical fingerprint of requested steps under a policy version.
+
+    Raises TypeError/ValueError for steps that are not JSON-serializable.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(policy_hash.encode("ascii"))
+    h.update(b"\0")
+    # hooks may hold state (e.g. scope grants) and the default registry can
+    # gain verifiers: key on the registry's version, which register() bumps
+    registry = resolve_registry(verifiers)
+    h.update(f"{registry.version}:{','.join(registry.names)}".encode("utf-8"))
+    h.update(b"\0")
+    h.update(
+        json.dumps(
+            requested_steps,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            allow_nan=False,
+        ).encode("utf-8")
+    )
+    return h.hexdigest()
+
+
+def _copy_steps(steps: Optional[Sequence[PlanStep]]) -> Optional[Tuple[PlanStep, ...]]:
+    if steps is None:
+        return None
+    return tuple(replace(s, args=copy.deepcopy(s.args)) for s in steps)
+
+
+def _copy_report(report: Optional[VerificationReport]) -> Optional[VerificationReport]:
+    if report is None:
+        return None
+    timings = dict(report.timings) if report.timings is not None else None
+    return replace(report, findings=list(report.findings), timings=timings)
+
+
+def _copy_refusal(refusal: RefusalDecision) -> RefusalDecision:
+    return replace(refusal, reasons=list(refusal.reasons))
+
+
+@dataclass(frozen=True)
+class CachedMediation:
+    """
+    The identity-free part of a mediation outcome. Holds its own copy of
+    the outcome it was built from.
+    """
+    steps: Optional[Sequence[PlanStep]]
+    notes: Optional[str]
+    verification: Optional[VerificationReport]
+    refusal: RefusalDecision
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "steps", _copy_steps(self.steps))
+        object.__setattr__(self, "verification", _copy_report(self.verification))
+        object.__setattr__(self, "refusal", _copy_refusal(self.refusal))
+
+    def materialize(self) -> Tuple[Optional[Plan], Optional[VerificationReport], RefusalDecision]:
+        """
+        Rebuild the outcome with a freshly minted plan_id, as copies the
+        caller may modify.
+        """
+        plan = None
+        if self.steps is not None:
+            plan = Plan(plan_id=str(uuid.uuid4()), steps=_copy_steps(self.steps), notes=self.notes)
+        return plan, _copy_report(self.verification), _copy_refusal(self.refusal)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    uncacheable: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MediationCache:
+    """
+    Thread-safe bounded LRU cache with optional TTL (seconds).
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be > 0 when provided.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, CachedMediation]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._uncacheable = 0
+
+    def key_for(
+        self,
+        requested_steps: List[Dict[str, Any]],
+        policy: CompiledPolicy,
+        verifiers: Optional[VerifierRegistry] = None,
+    ) -> Optional[str]:
+        """
+        Fingerprint for a request, or None if it cannot be cached.
+        """
+        try:
+            return plan_fingerprint(requested_steps, policy.content_hash, verifiers=verifiers)
+        except (TypeError, ValueError):
+            with self._lock:
+                self._uncacheable += 1
+            return None
+
+    def get(self, key: str) -> Optional[CachedMediation]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if self.ttl is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: str, value: CachedMediation) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                uncacheable=self._uncacheable,
+                size=len(self._entries),
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,460 @@
+"""
+Aegis V0 — Mediation instrumentation & metrics (observation only)
+
+mediate_intent reports each stage it runs to the registered hooks:
+
+    cache   cache lookup (only when a cache is passed)
+    plan    create_dry_run_plan
+    verify  run_verification
+    refusal decide_refusal
+    audit   queueing audit events (only when an audit writer is passed)
+
+and then the whole mediation (result, total time, whether it was a cache
+hit). Timings use the monotonic perf_counter_ns clock.
+
+With no hooks registered, mediate_intent skips the clock entirely; the only
+cost is one check of an empty tuple per stage. Hooks observe, they never
+influence a decision: an exception raised by a hook is counted in
+hook_errors() and otherwise ignored. Hooks are per process: workers of
+mediate_intents(executor="process") do not report to the parent's hooks.
+
+MediationMetrics is the built-in hook: per-stage latency histograms
+(HDR-style log-linear buckets) plus counters per RefusalDecisionType and per
+finding code. It renders Prometheus text format, which can be served by
+MetricsHTTPServer or written periodically to a file (node_exporter
+textfile collector style) by MetricsFileExporter.
+
+Authoritative sources:
+- AEGIS_RUNTIME_ARCHITECTURE.md
+- AEGIS_IMPLEMENTATION_ROADMAP.md (V0 — Skeleton)
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import os
+import sys
+import threading
+import time
+
+if TYPE_CHECKING:
+    from orchestrator.mediation import MediationResult
+
+STAGES = ("cache", "plan", "verify", "refusal", "audit")
+
+
+# ---- Hooks ----
+
+class MediationHook:
+    """
+    Base class for instrumentation hooks; override what you need.
+    """
+
+    def on_stage(self, stage: str, elapsed_ns: int) -> None:
+        pass
+
+    def on_result(self, result: "MediationResult", elapsed_ns: int, cached: bool) -> None:
+        pass
+
+
+# read by mediate_intent on every call; replaced, never mutated
+HOOKS: Tuple[MediationHook, ...] = ()
+_HOOKS_LOCK = threading.Lock()
+# hooks run on whichever thread mediates; += on a global is not atomic
+_HOOK_ERRORS_LOCK = threading.Lock()
+_hook_errors = 0
+
+
+def add_hook(hook: MediationHook) -> MediationHook:
+    global HOOKS
+    with _HOOKS_LOCK:
+        if hook not in HOOKS:
+            HOOKS = HOOKS + (hook,)
+    return hook
+
+
+def remove_hook(hook: MediationHook) -> None:
+    global HOOKS
+    with _HOOKS_LOCK:
+        HOOKS = tuple(h for h in HOOKS if h is not hook)
+
+
+def hook_errors() -> int:
+    return _hook_errors
+
+
+def _hook_failed() -> None:
+    global _hook_errors
+    with _HOOK_ERRORS_LOCK:
+        _hook_errors += 1
+
+
+def stage_done(hooks: Sequence[MediationHook], stage: str, since_ns: int) -> int:
+    """
+    Report `stage` as finished; returns the clock reading for the next stage.
+    """
+    now = time.perf_counter_ns()
+    elapsed = now - since_ns
+    for hook in hooks:
+        try:
+            hook.on_stage(stage, elapsed)
+        except Exception:
+            _hook_failed()
+    return now
+
+
+def mediation_done(
+    hooks: Sequence[MediationHook],
+    result: "MediationResult",
+    started_ns: int,
+    *,
+    cached: bool,
+) -> None:
+    elapsed = time.perf_counter_ns() - started_ns
+    for hook in hooks:
+        try:
+            hook.on_result(result, elapsed, cached)
+        except Exception:
+            _hook_failed()
+
+
+# ---- Latency histogram ----
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of nanosecond values.
+
+    Values below 2**sub_bits are counted exactly; above that each power-of-two
+    range is split into 2**(sub_bits - 1) linear sub-buckets, so any recorded
+    value is reported within a relative error of 2**-(sub_bits - 1)
+    (under 1.6% with the default of 7 bits). Recording is O(1).
+    """
+
+    def __init__(self, sub_bits: int = 7) -> None:
+        if not 2 <= sub_bits <= 16:
+            raise ValueError("sub_bits must be within [2, 16].")
+        self._sub_bits = sub_bits
+        self._half = 1 << (sub_bits - 1)
+        self._counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self._sub_bits
+        if shift <= 0:
+            return value
+        # bucket start (value >> shift) lies in [half, 2 * half)
+        return ((shift + 1) << (self._sub_bits - 1)) + ((value >> shift) - self._half)
+
+    def _upper(self, index: int) -> int:
+        # largest value that maps to `index`
+        if index < (1 << self._sub_bits):
+            return index
+        shift = (index >> (self._sub_bits - 1)) - 1
+        start = (index & (self._half - 1)) + self._half
+        return ((start + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        if value < 0:
+            value = 0
+        index = self._index(value)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def _sorted_counts(self) -> List[Tuple[int, int]]:
+        with self._lock:
+            return sorted(self._counts.items())
+
+    def percentile(self, q: float) -> int:
+        """
+        Value at percentile q (0..100), as the upper bound of its bucket.
+        """
+        counts = self._sorted_counts()
+        total = sum(c for _, c in counts)
+        if not total:
+            return 0
+        # nearest rank; q * total first so an exact rank does not round up
+        rank = max(1, math.ceil(q * total / 100.0))
+        seen = 0
+        for index, c in counts:
+            seen += c
+            if seen >= rank:
+                return min(self._upper(index), self.max or 0)
+        return self.max or 0
+
+    def cumulative(self, bounds: Sequence[int]) -> List[int]:
+        """
+        Counts of values <= each bound (bounds ascending), bucket-accurate.
+        """
+        counts = self._sorted_counts()
+        out: List[int] = []
+        seen = 0
+        i = 0
+        for bound in bounds:
+            while i < len(counts) and self._upper(counts[i][0]) <= bound:
+                seen += counts[i][1]
+                i += 1
+            out.append(seen)
+        return out
+
+
+# ---- Built-in metrics hook ----
+
+# Prometheus histogram bounds: 1-2-5 steps from 10us to 10s
+_BOUNDS_NS: Tuple[int, ...] = tuple(
+    m * 10 ** e for e in range(4, 10) for m in (1, 2, 5)
+) + (10 ** 10,)
+_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MediationMetrics(MediationHook):
+    """
+    Stage latency histograms and outcome counters, exported as Prometheus text.
+    """
+
+    def __init__(self, *, prefix: str = "aegis_mediation") -> None:
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._total = LatencyHistogram()
+        self._decisions: Dict[str, int] = {}
+        self._finding_codes: Dict[str, int] = {}
+        self._cache_hits = 0
+        self._collectors: Tuple[Callable[[], str], ...] = ()
+
+    def _histogram(self, stage: str) -> LatencyHistogram:
+        h = self._stages.get(stage)
+        if h is None:
+            with self._lock:
+                h = self._stages.setdefault(stage, LatencyHistogram())
+        return h
+
+    def on_stage(self, stage: str, elapsed_ns: int) -> None:
+        self._histogram(stage).record(elapsed_ns)
+
+    def on_result(self, result: "MediationResult", elapsed_ns: int, cached: bool) -> None:
+        self._total.record(elapsed_ns)
+        refusal = result.refusal
+        with self._lock:
+            if cached:
+                self._cache_hits += 1
+            if refusal is not None:
+                decision = refusal.decision.value
+                self._decisions[decision] = self._decisions.get(decision, 0) + 1
+                for reason in refusal.reasons:
+                    self._finding_codes[reason.code] = self._finding_codes.get(reason.code, 0) + 1
+
+    # ---- Inspection ----
+
+    def stage_histogram(self, stage: str) -> Optional[LatencyHistogram]:
+        return self._stages.get(stage)
+
+    @property
+    def total_histogram(self) -> LatencyHistogram:
+        return self._total
+
+    def decisions(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._decisions)
+
+    def finding_codes(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._finding_codes)
+
+    # ---- Export ----
+
+    def add_collector(self, collector: Callable[[], str]) -> None:
+        """
+        Append another component's Prometheus text (e.g. daemon admission
+        control) to every render.
+        """
+        with self._lock:
+            self._collectors = self._collectors + (collector,)
+
+    def render_prometheus(self) -> str:
+        p = self.prefix
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, series: Iterable[Tuple[str, LatencyHistogram]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, h in series:
+                sep = "," if labels else ""
+                for bound, c in zip(_BOUNDS_NS, h.cumulative(_BOUNDS_NS)):
+                    lines.append(f'{name}_bucket{{{labels}{sep}le="{bound / 1e9:g}"}} {c}')
+                lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {h.count}')
+                block = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{block} {h.total / 1e9:.9f}")
+                lines.append(f"{name}_count{block} {h.count}")
+
+        def quantiles(name: str, help_text: str, series: Iterable[Tuple[str, LatencyHistogram]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for labels, h in series:
+                sep = "," if labels else ""
+                for q in _QUANTILES:
+                    lines.append(f'{name}{{{labels}{sep}quantile="{q:g}"}} {h.percentile(q * 100) / 1e9:.9f}')
+                block = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{block} {h.total / 1e9:.9f}")
+                lines.append(f"{name}_count{block} {h.count}")
+
+        with self._lock:
+            stages = sorted(self._stages.items())
+            decisions = sorted(self._decisions.items())
+            codes = sorted(self._finding_codes.items())
+            cache_hits = self._cache_hits
+
+        stage_series = [(f'stage="{_escape(s)}"', h) for s, h in stages]
+        histogram(f"{p}_stage_duration_seconds", "Time spent per mediation stage.", stage_series)
+        histogram(f"{p}_duration_seconds", "End-to-end mediate_intent time.", [("", self._total)])
+        quantiles(
+            f"{p}_stage_duration_quantile_seconds",
+            "Stage latency quantiles from the HDR histograms.",
+            stage_series + [('stage="total"', self._total)],
+        )
+
+        lines.append(f"# HELP {p}_decisions_total Mediations by refusal decision.")
+        lines.append(f"# TYPE {p}_decisions_total counter")
+        for decision, n in decisions:
+            lines.append(f'{p}_decisions_total{{decision="{_escape(decision)}"}} {n}')
+
+        lines.append(f"# HELP {p}_findings_total Refusal reasons by finding code.")
+        lines.append(f"# TYPE {p}_findings_total counter")
+        for code, n in codes:
+            lines.append(f'{p}_findings_total{{code="{_escape(code)}"}} {n}')
+
+        lines.append(f"# HELP {p}_cache_hits_total Mediations answered from the mediation cache.")
+        lines.append(f"# TYPE {p}_cache_hits_total counter")
+        lines.append(f"{p}_cache_hits_total {cache_hits}")
+
+        lines.append(f"# HELP {p}_hook_errors_total Exceptions raised by instrumentation hooks.")
+        lines.append(f"# TYPE {p}_hook_errors_total counter")
+        lines.append(f"{p}_hook_errors_total {hook_errors()}")
+        return "\n".join(lines) + "\n" + "".join(collector() for collector in self._collectors)
+
+
+def enable_metrics(metrics: Optional[MediationMetrics] = None) -> MediationMetrics:
+    """
+    Register (and return) a MediationMetrics hook.
+    """
+    return add_hook(metrics or MediationMetrics())
+
+
+# ---- Exporters ----
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def write_prometheus_file(metrics: MediationMetrics, path: str) -> None:
+    """
+    Atomically replace `path` with the current metrics text.
+    """
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(metrics.render_prometheus())
+    os.replace(tmp, path)
+
+
+class MetricsFileExporter:
+    """
+    Background thread rewriting a metrics file every `interval` seconds.
+    """
+
+    def __init__(self, metrics: MediationMetrics, path: str, *, interval: float = 15.0) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be > 0.")
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsFileExporter":
+        self._thread = threading.Thread(target=self._run, name="aegis-metrics-file", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while True:
+            try:
+                write_prometheus_file(self.metrics, self.path)
+            except OSError as e:
+                print(f"Aegis metrics: cannot write {self.path}: {e}", file=sys.stderr, flush=True)
+            if self._stop.wait(self.interval):
+                break
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        write_prometheus_file(self.metrics, self.path)
+
+
+class MetricsHTTPServer:
+    """
+    Serve GET /metrics on a local address from a background thread.
+    """
+
+    def __init__(self, metrics: MediationMetrics, *, host: str = "127.0.0.1", port: int = 9464) -> None:
+        # http.server pulls in email/http.client; only daemons that serve
+        # metrics pay for the import (see daemon.main startup timing)
+        from http.server import ThreadingHTTPServer
+
+        handler = _handler_for(metrics)
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        host, port = self._httpd.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> "MetricsHTTPServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="aegis-metrics-http", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def _handler_for(metrics: MediationMetrics) -> type:
+    from http.server import BaseHTTPRequestHandler
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            # scrapes are frequent; keep the daemon's stdout quiet
+            pass
+
+    return _MetricsHandler
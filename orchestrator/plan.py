@@ -13,10 +13,16 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence, Tuple
+import sys
 import uuid
 
-ALLOWED_PLANNING_STATE = "clarified"
+from orchestrator.schema_compiler import compiled_validators
+
+if TYPE_CHECKING:
+    from orchestrator.policy import PolicyLike
+
+ALLOWED_PLANNING_STATE = "approved"  # AEGIS_INTENT_CARD_SPEC.md: approved -> planned
 
 class RiskLevel(str, Enum):
     # Must match AEGIS_ACTION_SCHEMA.json enum exactly
@@ -25,15 +31,49 @@ class RiskLevel(str, Enum):
     HIGH = "High"
 
 
-@dataclass(frozen=True)
+# ---- Plan representation ----
+#
+# Plans can sit in memory in large numbers (queued, cached, pending
+# confirmation), so these types are slotted and tuple-backed: no
+# per-instance __dict__, sequences are immutable tuples (lists passed in are
+# converted once), action and scope-token strings are interned, and steps
+# without constraints share EMPTY_CONSTRAINTS.
+
+def _as_tuple(value: Any) -> Any:
+    # lists/iterables -> tuple; non-iterables are left for validation to report
+    if type(value) is tuple:
+        return value
+    if isinstance(value, (list, set, frozenset)):
+        return tuple(value)
+    return value
+
+
+_intern_str = sys.intern
+_set = object.__setattr__   # frozen dataclasses: normalize once, in __post_init__
+
+
+@dataclass(frozen=True, slots=True)
 class ScopeConstraints:
     # Mirrors $defs.scopeSpec.properties.constraints
-    paths: List[str] = field(default_factory=list)
-    domains: List[str] = field(default_factory=list)
-    apps: List[str] = field(default_factory=list)
-    methods: List[str] = field(default_factory=list)
+    paths: Sequence[str] = ()
+    domains: Sequence[str] = ()
+    apps: Sequence[str] = ()
+    methods: Sequence[str] = ()
     max_bytes: Optional[int] = None
 
+    def __post_init__(self) -> None:
+        if not (
+            type(self.paths) is tuple
+            and type(self.domains) is tuple
+            and type(self.apps) is tuple
+            and type(self.methods) is tuple
+        ):
+            for name in ("paths", "domains", "apps", "methods"):
+                _set(self, name, _as_tuple(getattr(self, name)))
+
+    def is_empty(self) -> bool:
+        return not (self.paths or self.domains or self.apps or self.methods) and self.max_bytes is None
+
     def to_dict(self) -> Dict[str, Any]:
         d: Dict[str, Any] = {
             "paths": list(self.paths),
@@ -46,11 +86,18 @@ class ScopeConstraints:
         return d
 
 
-@dataclass(frozen=True)
+EMPTY_CONSTRAINTS = ScopeConstraints()
+
+
+@dataclass(frozen=True, slots=True)
 class ScopeSpec:
     # Mirrors $defs.scopeSpec
     scope_token: str
-    constraints: ScopeConstraints = field(default_factory=ScopeConstraints)
+    constraints: ScopeConstraints = EMPTY_CONSTRAINTS
+
+    def __post_init__(self) -> None:
+        if type(self.scope_token) is str:
+            _set(self, "scope_token", _intern_str(self.scope_token))
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -59,7 +106,7 @@ class ScopeSpec:
         }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PlanStep:
     # Mirrors $defs.planStep
     step_id: int                     # schema: integer >= 1
@@ -69,8 +116,16 @@ class PlanStep:
     risk: RiskLevel                  # schema: riskLevel enum
     reversible: bool
     requires_confirmation: bool
-    validators: List[str] = field(default_factory=list)
+    validators: Sequence[str] = ()
     dry_run_supported: bool = True
+    # canonical JSON, filled by orchestrator.serialization on first encode
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if type(self.action) is str:
+            _set(self, "action", _intern_str(self.action))
+        if type(self.validators) is not tuple:
+            _set(self, "validators", _as_tuple(self.validators))
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -86,12 +141,17 @@ class PlanStep:
         }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Plan:
     # Mirrors $defs.plan
     plan_id: str
-    steps: List[PlanStep]
+    steps: Sequence[PlanStep]
     notes: Optional[str] = None
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if type(self.steps) is not tuple:
+            _set(self, "steps", _as_tuple(self.steps))
 
     def to_dict(self) -> Dict[str, Any]:
         d: Dict[str, Any] = {
@@ -102,6 +162,24 @@ class Plan:
             d["notes"] = self.notes
         return d
 
+    def to_json(self) -> bytes:
+        """Canonical JSON bytes (see orchestrator.serialization)."""
+        from orchestrator.serialization import plan_to_json
+
+        return plan_to_json(self)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Plan":
+        from orchestrator.serialization import plan_from_dict
+
+        return plan_from_dict(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Plan":
+        from orchestrator.serialization import plan_from_bytes
+
+        return plan_from_bytes(data)
+
 
 @dataclass(frozen=True)
 class PlanAudit:
@@ -140,71 +218,87 @@ def _coerce_risk(risk_str: str) -> RiskLevel:
 
 # ---- Validation ----
 
-def validate_step_schema(step: PlanStep) -> List[str]:
-    """
-    Minimal structural validation consistent with AEGIS_ACTION_SCHEMA.json.
-    We avoid pulling in a full jsonschema dependency in V0.
-    """
-    errors: List[str] = []
-
-    if step.step_id < 1:
-        errors.append("step_id must be >= 1.")
+_SCHEMA_VALIDATORS = None
 
-    if not isinstance(step.action, str) or not step.action.strip():
-        errors.append("action must be a non-empty string.")
 
-    if not isinstance(step.args, dict):
-        errors.append("args must be an object (dict).")
+def _schema_validators():
+    global _SCHEMA_VALIDATORS
+    if _SCHEMA_VALIDATORS is None:
+        _SCHEMA_VALIDATORS = compiled_validators("object")
+    return _SCHEMA_VALIDATORS
 
-    if not isinstance(step.scope.scope_token, str) or not step.scope.scope_token.strip():
-        errors.append("scope.scope_token must be a non-empty string.")
 
-    # constraints additionalProperties=False: we ensure only known fields exist via dataclass
-    if step.scope.constraints.max_bytes is not None and step.scope.constraints.max_bytes < 0:
-        errors.append("scope.constraints.max_bytes must be >= 0 when provided.")
+def _is_blank(value: Any) -> bool:
+    return isinstance(value, str) and not value.strip()
 
-    # risk must be RiskLevel enum
-    if not isinstance(step.risk, RiskLevel):
-        errors.append("risk must be one of: Low, Medium, High.")
 
-    if not isinstance(step.reversible, bool):
-        errors.append("reversible must be boolean.")
+def validate_step_schema(step: PlanStep) -> List[str]:
+    """
+    Structural validation against AEGIS_ACTION_SCHEMA.json ($defs.planStep).
 
-    if not isinstance(step.requires_confirmation, bool):
-        errors.append("requires_confirmation must be boolean.")
+    Uses validators compiled from the schema itself (see
+    orchestrator.schema_compiler) rather than jsonschema. Valid steps take
+    the fast path and allocate nothing; messages are only built on failure.
+    """
+    validators = _schema_validators()
+    if validators.check_planStep(step) and not _is_blank(step.action) and not _is_blank(step.scope.scope_token):
+        return []
 
-    if not isinstance(step.validators, list) or any(not isinstance(v, str) for v in step.validators):
-        errors.append("validators must be a list of strings.")
+    errors = validators.errors_planStep(step)
 
-    if not isinstance(step.dry_run_supported, bool):
-        errors.append("dry_run_supported must be boolean.")
+    # beyond the schema: identifiers must carry content
+    if _is_blank(step.action):
+        errors.append("action must be a non-empty string.")
+    if _is_blank(getattr(step.scope, "scope_token", None)):
+        errors.append("scope.scope_token must be a non-empty string.")
 
     return errors
 
 
-def validate_plan(plan: Plan, allowed_action_index: Dict[str, Dict[str, Any]]) -> List[str]:
+def _plan_semantics_hold(plan: Plan, allowed_action_index: Mapping[str, Any]) -> bool:
+    # fast-path companion to check_plan: strictly increasing ids imply uniqueness
+    if _is_blank(plan.plan_id):
+        return False
+    previous = 0
+    for s in plan.steps:
+        # types already confirmed by check_plan
+        if s.step_id <= previous or s.action not in allowed_action_index:
+            return False
+        if not s.action.strip() or not s.scope.scope_token.strip():
+            return False
+        previous = s.step_id
+    return True
+
+
+def validate_plan(plan: Plan, allowed_action_index: Mapping[str, Any]) -> List[str]:
+    validators = _schema_validators()
+    if validators.check_plan(plan) and _plan_semantics_hold(plan, allowed_action_index):
+        return []
+
     errors: List[str] = []
 
-    if not isinstance(plan.plan_id, str) or not plan.plan_id.strip():
+    # plan-level schema errors; steps are reported per step below
+    validators.errors_plan(plan, "", errors, deep=False)
+
+    if _is_blank(plan.plan_id):
         errors.append("plan_id must be a non-empty string.")
 
-    if not plan.steps:
-        errors.append("steps must contain at least one step.")
+    steps = plan.steps if isinstance(plan.steps, (list, tuple)) else []
 
     # step ids must be unique and start at 1 (recommended)
-    step_ids = [s.step_id for s in plan.steps]
+    step_ids = [s.step_id for s in steps]
     if len(step_ids) != len(set(step_ids)):
         errors.append("step_id values must be unique within a plan.")
     if step_ids and min(step_ids) < 1:
         errors.append("step_id values must be >= 1.")
 
     # action must be allowed
-    for s in plan.steps:
+    for s in steps:
         if s.action not in allowed_action_index:
             errors.append(f"Step {s.step_id}: action '{s.action}' is not present in AEGIS_ALLOWED_ACTIONS_V1.json.")
 
     # structural step validation
-    for s in plan.steps:
+    for s in steps:
         for err in validate_step_schema(s):
             errors.append(f"Step {s.step_id}: {err}")
 
@@ -213,16 +307,72 @@ def validate_plan(plan: Plan, allowed_action_index: Dict[str, Dict[str, Any]]) -
 
 # ---- Plan construction ----
 
+def build_plan_step(step_id: int, raw: Mapping[str, Any], allowed_index: Mapping[str, Any]) -> PlanStep:
+    """
+    Build one PlanStep from a requested step description (see
+    create_dry_run_plan); risk and reversibility come from the compiled
+    policy index. Raises ValueError for an invalid or disallowed step.
+    """
+    action = raw.get("action")
+    if not isinstance(action, str) or not action.strip():
+        raise ValueError(f"Step {step_id}: missing/invalid 'action'.")
+
+    action_policy = allowed_index.get(action)
+    if action_policy is None:
+        raise ValueError(f"Step {step_id}: action '{action}' is not allowed by AEGIS_ALLOWED_ACTIONS_V1.json.")
+
+    risk = action_policy.risk
+    reversible = action_policy.reversible
+
+    scope_token = raw.get("scope_token")
+    if not isinstance(scope_token, str) or not scope_token.strip():
+        raise ValueError(f"Step {step_id}: missing/invalid 'scope_token'.")
+
+    constraints_raw = raw.get("constraints", {}) or {}
+    if not isinstance(constraints_raw, dict):
+        raise ValueError(f"Step {step_id}: 'constraints' must be an object when provided.")
+
+    if constraints_raw:
+        constraints = ScopeConstraints(
+            paths=tuple(constraints_raw.get("paths", ()) or ()),
+            domains=tuple(constraints_raw.get("domains", ()) or ()),
+            apps=tuple(constraints_raw.get("apps", ()) or ()),
+            methods=tuple(constraints_raw.get("methods", ()) or ()),
+            max_bytes=constraints_raw.get("max_bytes", None),
+        )
+        if constraints.is_empty():
+            constraints = EMPTY_CONSTRAINTS
+    else:
+        constraints = EMPTY_CONSTRAINTS
+
+    return PlanStep(
+        step_id=step_id,
+        action=action_policy.action,
+        args=dict(raw.get("args", {}) or {}),
+        scope=ScopeSpec(scope_token=scope_token, constraints=constraints),
+        risk=risk,
+        reversible=reversible,
+        requires_confirmation=bool(raw.get("requires_confirmation", True)),
+        validators=tuple(raw.get("validators", ()) or ()),
+        dry_run_supported=bool(raw.get("dry_run_supported", True)),
+    )
+
+
 def create_dry_run_plan(
     *,
     derived_from_intent_id: str,
     requested_steps: List[Dict[str, Any]],
-    allowed_actions_json: Dict[str, Any],
+    allowed_actions_json: Optional[Dict[str, Any]] = None,
+    policy: Optional["PolicyLike"] = None,
     notes: Optional[str] = None,
 ) -> Tuple[Plan, PlanAudit]:
     """
     Create a Plan from requested step descriptions.
 
+    The allowed-actions policy is taken from `policy` (a PolicyRegistry or
+    CompiledPolicy, see orchestrator.policy) when given, otherwise compiled
+    from the raw `allowed_actions_json` dict.
+
     requested_steps items are dicts with:
       - action: str
       - args: dict (optional; default {})
@@ -234,55 +384,18 @@ def create_dry_run_plan(
 
     risk/reversible are derived from AEGIS_ALLOWED_ACTIONS_V1.json for the action.
     """
-    allowed_index = build_allowed_action_index(allowed_actions_json)
-
-    steps: List[PlanStep] = []
-    for i, raw in enumerate(requested_steps, start=1):
-        action = raw.get("action")
-        if not isinstance(action, str) or not action.strip():
-            raise ValueError(f"Step {i}: missing/invalid 'action'.")
+    from orchestrator.policy import resolve_policy
 
-        policy = allowed_index.get(action)
-        if policy is None:
-            raise ValueError(f"Step {i}: action '{action}' is not allowed by AEGIS_ALLOWED_ACTIONS_V1.json.")
+    compiled = resolve_policy(policy, allowed_actions_json)
+    allowed_index = compiled.actions
 
-        risk = _coerce_risk(str(policy.get("risk")))
-        reversible = bool(policy.get("reversible", False))
-
-        scope_token = raw.get("scope_token")
-        if not isinstance(scope_token, str) or not scope_token.strip():
-            raise ValueError(f"Step {i}: missing/invalid 'scope_token'.")
-
-        constraints_raw = raw.get("constraints", {}) or {}
-        if not isinstance(constraints_raw, dict):
-            raise ValueError(f"Step {i}: 'constraints' must be an object when provided.")
-
-        constraints = ScopeConstraints(
-            paths=list(constraints_raw.get("paths", []) or []),
-            domains=list(constraints_raw.get("domains", []) or []),
-            apps=list(constraints_raw.get("apps", []) or []),
-            methods=list(constraints_raw.get("methods", []) or []),
-            max_bytes=constraints_raw.get("max_bytes", None),
-        )
-
-        step = PlanStep(
-            step_id=i,
-            action=action,
-            args=dict(raw.get("args", {}) or {}),
-            scope=ScopeSpec(scope_token=scope_token, constraints=constraints),
-            risk=risk,
-            reversible=reversible,
-            requires_confirmation=bool(raw.get("requires_confirmation", True)),
-            validators=list(raw.get("validators", []) or []),
-            dry_run_supported=bool(raw.get("dry_run_supported", True)),
-        )
-        steps.append(step)
+    steps = [build_plan_step(i, raw, allowed_index) for i, raw in enumerate(requested_steps, start=1)]
 
-    plan = Plan(plan_id=str(uuid.uuid4()), steps=steps, notes=notes)
+    plan = Plan(plan_id=str(uuid.uuid4()), steps=tuple(steps), notes=notes)
     audit = PlanAudit(created_at=datetime.now(timezone.utc), derived_from_intent_id=derived_from_intent_id)
 
     # final validation (defensive)
-    errors = validate_plan(plan, build_allowed_action_index(allowed_actions_json))
+    errors = validate_plan(plan, allowed_index)
     if errors:
         raise ValueError("Plan failed validation:\n- " + "\n- ".join(errors))
 
@@ -291,20 +404,22 @@ def create_dry_run_plan(
 def plan_from_intent(
     *,
     intent,
-    allowed_actions_json: Dict[str, Any],
+    allowed_actions_json: Optional[Dict[str, Any]] = None,
+    policy: Optional["PolicyLike"] = None,
     notes: Optional[str] = None,
 ) -> Tuple[Plan, PlanAudit]:
     """
     Lifecycle-gated entry point for dry-run plan generation.
 
-    Planning is permitted only when intent.state == 'clarified',
-    per AEGIS_INTENT_CARD_SPEC.md.
+    Planning is permitted only when intent.state == 'approved',
+    per AEGIS_INTENT_CARD_SPEC.md (approved -> planned).
     """
 
-    if getattr(intent, "state", None) != ALLOWED_PLANNING_STATE:
+    state = getattr(intent, "state", None)
+    if state != ALLOWED_PLANNING_STATE:
         raise ValueError(
             f"Intent {getattr(intent, 'intent_id', '<unknown>')} is in state "
-            f"'{getattr(intent, 'state', None)}'. Planning is only permitted "
+            f"'{getattr(state, 'value', state)}'. Planning is only permitted "
             f"from state '{ALLOWED_PLANNING_STATE}'."
         )
 
@@ -312,5 +427,6 @@ def plan_from_intent(
         derived_from_intent_id=intent.intent_id,
         requested_steps=intent.requested_steps,
         allowed_actions_json=allowed_actions_json,
+        policy=policy,
         notes=notes,
     )
@@ -0,0 +1,365 @@
+"""
+Aegis V0 — Streaming dry-run plan construction (plan generation only)
+
+create_dry_run_plan() builds every PlanStep into a list and validates the
+whole plan before a single error is reported. Bulk plans (index.local over
+a large tree) can carry 10^5-10^6 steps. StreamingPlanBuilder instead
+takes requested steps one at a time, from any iterator:
+
+- each step is built, schema-validated and run through the step hooks as
+  it arrives. Step ids are assigned 1..n in arrival order, so the
+  uniqueness and ordering checks of validate_plan hold by construction;
+- fail_fast=True raises ValueError at the first invalid step. Otherwise
+  errors are collected (the first MAX_REPORTED_ERRORS verbatim) and
+  finish() raises them together;
+- with spill=True, built steps are written in batches of `spill_after`
+  as canonical JSON to an anonymous temporary file, and the plan's steps
+  become a read-only sequence over it (SpilledSteps). Memory is then
+  bounded by one batch plus 8 bytes per step. Findings are still kept;
+  they grow with the problems found, not with the number of steps.
+
+The plan steps, the report and any error are what create_dry_run_plan()
+and run_verification() produce for the same requested steps. A spilled
+plan is not a tuple-backed Plan: compare it step by step, and stream it
+out with write_plan_json() rather than Plan.to_json().
+
+Nothing here executes anything.
+
+Authoritative structure: AEGIS_ACTION_SCHEMA.json ($defs.plan, $defs.planStep)
+Allowed actions/risk/reversibility: AEGIS_ALLOWED_ACTIONS_V1.json
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence as SequenceABC
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+import os
+import tempfile
+import uuid
+
+from orchestrator.plan import (
+    Plan,
+    PlanAudit,
+    PlanStep,
+    _schema_validators,
+    _set,
+    build_plan_step,
+    validate_step_schema,
+)
+from orchestrator.policy import PolicyLike, resolve_policy
+from orchestrator.serialization import _esc, loads, plan_step_from_dict, plan_step_to_json
+from orchestrator.verification import VerificationFinding, VerificationReport, VerifierRegistry, resolve_registry
+
+DEFAULT_SPILL_AFTER = 4096
+MAX_REPORTED_ERRORS = 20
+
+# bytes read per pread() when iterating spilled steps
+_READ_BLOCK = 1 << 20
+
+
+# ---- Spilled steps ----
+
+class SpilledSteps(SequenceABC):
+    """
+    Read-only sequence of plan steps stored as canonical JSON in a file.
+
+    Steps are decoded on access and not cached; each decoded step keeps its
+    stored bytes as its canonical encoding. close() releases the file.
+    """
+
+    def __init__(self, file: IO[bytes], offsets: array) -> None:
+        # offsets[i] is where step i starts; offsets[-1] is the end of data
+        self._file = file
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _raw(self, index: int) -> bytes:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return os.pread(self._file.fileno(), end - start, start)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("step index out of range")
+        return _decode(self._raw(index))
+
+    def iter_json(self) -> Iterator[bytes]:
+        """
+        Canonical JSON of each step, read sequentially in large blocks.
+        """
+        offsets, fd, count = self._offsets, self._file.fileno(), len(self)
+        i = 0
+        while i < count:
+            start = offsets[i]
+            j = max(i + 1, bisect_right(offsets, start + _READ_BLOCK, i + 1, count + 1) - 1)
+            block = os.pread(fd, offsets[j] - start, start)
+            for k in range(i, j):
+                yield block[offsets[k] - start : offsets[k + 1] - start]
+            i = j
+
+    def __iter__(self) -> Iterator[PlanStep]:
+        for raw in self.iter_json():
+            yield _decode(raw)
+
+    @property
+    def nbytes(self) -> int:
+        return self._offsets[-1]
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _decode(raw: bytes) -> PlanStep:
+    step = plan_step_from_dict(loads(raw))
+    _set(step, "_json", raw)
+    return step
+
+
+def write_plan_json(plan: Plan, out: IO[bytes]) -> int:
+    """
+    Write plan.to_json() to `out` without holding every step in memory
+    (spilled steps are copied as stored). Returns the bytes written.
+    """
+    head = f'{{"notes":{_esc(plan.notes)},' if plan.notes else "{"
+    written = out.write(f'{head}"plan_id":{_esc(plan.plan_id)},"steps":['.encode("ascii"))
+    steps = plan.steps
+    chunks = steps.iter_json() if isinstance(steps, SpilledSteps) else (plan_step_to_json(s) for s in steps)
+    for n, chunk in enumerate(chunks):
+        if n:
+            written += out.write(b",")
+        written += out.write(chunk)
+    return written + out.write(b"]}")
+
+
+# ---- Builder ----
+
+@dataclass(frozen=True)
+class StreamedPlan:
+    """
+    Result of StreamingPlanBuilder.finish(). close() releases the spill
+    file, if any; the plan's steps are unreadable afterwards.
+    """
+    plan: Plan
+    audit: PlanAudit
+    verification: VerificationReport
+
+    @property
+    def spilled(self) -> bool:
+        return isinstance(self.plan.steps, SpilledSteps)
+
+    def close(self) -> None:
+        if isinstance(self.plan.steps, SpilledSteps):
+            self.plan.steps.close()
+
+    def __enter__(self) -> "StreamedPlan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class StreamingPlanBuilder:
+    """
+    Builds, validates and verifies a dry-run plan one requested step at a
+    time (see the module docstring). Use add()/extend(), then finish().
+    """
+
+    def __init__(
+        self,
+        *,
+        derived_from_intent_id: str,
+        policy: Optional[PolicyLike] = None,
+        allowed_actions_json: Optional[Dict[str, Any]] = None,
+        verifiers: Optional[VerifierRegistry] = None,
+        notes: Optional[str] = None,
+        fail_fast: bool = False,
+        spill: bool = False,
+        spill_after: int = DEFAULT_SPILL_AFTER,
+        spill_dir: Optional[Union[str, os.PathLike]] = None,
+    ) -> None:
+        if spill_after < 1:
+            raise ValueError("spill_after must be >= 1.")
+        self._index = resolve_policy(policy, allowed_actions_json).actions
+        self._registry = resolve_registry(verifiers)
+        self._step_findings = self._registry.step_findings
+        self._by_hook: List[List[VerificationFinding]] = [[] for _ in self._registry.step_hooks]
+        self.derived_from_intent_id = derived_from_intent_id
+        self.notes = notes
+        self.fail_fast = fail_fast
+        self.spill = spill
+        self.spill_after = spill_after
+        self.spill_dir = spill_dir
+        self._count = 0
+        self._first: Optional[PlanStep] = None
+        self._steps: List[PlanStep] = []
+        self._errors: List[str] = []
+        self._error_count = 0
+        self._file: Optional[IO[bytes]] = None
+        self._offsets = array("Q", [0])
+        self._finished = False
+
+    @property
+    def count(self) -> int:
+        """Requested steps consumed so far."""
+        return self._count
+
+    @property
+    def error_count(self) -> int:
+        return self._error_count
+
+    def _error(self, messages: List[str], *, validation: bool) -> None:
+        if self.fail_fast:
+            self._discard()
+            # the messages create_dry_run_plan raises
+            if validation:
+                raise ValueError("Plan failed validation:\n- " + "\n- ".join(messages))
+            raise ValueError(messages[0])
+        self._error_count += len(messages)
+        self._errors.extend(messages[: MAX_REPORTED_ERRORS - len(self._errors)])
+        # the plan can no longer be produced; stop holding its steps
+        self._steps.clear()
+
+    def add(self, raw: Mapping[str, Any]) -> bool:
+        """
+        Consume one requested step (as for create_dry_run_plan). Returns
+        False if it was invalid (fail_fast raises ValueError instead).
+        """
+        if self._finished:
+            raise ValueError("This plan builder has already finished.")
+        self._count = step_id = self._count + 1
+        if not isinstance(raw, Mapping):
+            self._error([f"Step {step_id}: requested step must be an object."], validation=False)
+            return False
+        try:
+            step = build_plan_step(step_id, raw, self._index)
+        except ValueError as e:
+            self._error([str(e)], validation=False)
+            return False
+        errors = validate_step_schema(step)
+        if errors:
+            self._error([f"Step {step_id}: {err}" for err in errors], validation=True)
+            return False
+        if self._error_count:
+            return True
+
+        for bucket, found in zip(self._by_hook, self._step_findings(step)):
+            if found:
+                bucket.extend(found)
+        if self._first is None:
+            self._first = step
+        self._steps.append(step)
+        if self.spill and len(self._steps) >= self.spill_after:
+            self._flush()
+        return True
+
+    def extend(self, requested_steps: Iterable[Mapping[str, Any]]) -> int:
+        """
+        add() every step of an iterable, read lazily. Returns the number
+        of invalid steps among them.
+        """
+        invalid = 0
+        add = self.add
+        for raw in requested_steps:
+            if not add(raw):
+                invalid += 1
+        return invalid
+
+    def _flush(self) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="aegis-plan-", dir=self.spill_dir)
+        offsets = self._offsets
+        end = offsets[-1]
+        chunks = []
+        for step in self._steps:
+            data = plan_step_to_json(step)
+            chunks.append(data)
+            end += len(data)
+            offsets.append(end)
+        self._file.write(b"".join(chunks))
+        self._steps.clear()
+
+    def _discard(self) -> None:
+        self._finished = True
+        self._steps.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> StreamedPlan:
+        """
+        Close the stream: raise ValueError if any step was invalid (or none
+        was given), else return the plan with its verification report.
+        """
+        if self._finished:
+            raise ValueError("This plan builder has already finished.")
+        plan_id = str(uuid.uuid4())
+        plan_errors: List[str] = []
+        if not self._error_count:
+            # plan-level schema checks (steps were validated as they arrived)
+            head = Plan(plan_id=plan_id, steps=(self._first,) if self._first is not None else (), notes=self.notes)
+            plan_errors = _schema_validators().errors_plan(head, "", [], deep=False)
+        if plan_errors or self._error_count:
+            errors = plan_errors + self._errors
+            hidden = self._error_count - len(self._errors)
+            if hidden > 0:
+                errors.append(f"... and {hidden} more.")
+            self._discard()
+            raise ValueError("Plan failed validation:\n- " + "\n- ".join(errors))
+
+        if self._file is not None:
+            self._flush()
+            self._file.flush()
+            steps: Any = SpilledSteps(self._file, self._offsets)
+            self._file = None
+        else:
+            steps = tuple(self._steps)
+        self._steps = []
+        self._finished = True
+
+        plan = Plan(plan_id=plan_id, steps=steps, notes=self.notes)
+        return StreamedPlan(
+            plan=plan,
+            audit=PlanAudit(created_at=datetime.now(timezone.utc), derived_from_intent_id=self.derived_from_intent_id),
+            verification=self._registry.assemble_by_hook(plan, self._by_hook),
+        )
+
+
+def stream_dry_run_plan(
+    *,
+    derived_from_intent_id: str,
+    requested_steps: Iterable[Mapping[str, Any]],
+    allowed_actions_json: Optional[Dict[str, Any]] = None,
+    policy: Optional[PolicyLike] = None,
+    verifiers: Optional[VerifierRegistry] = None,
+    notes: Optional[str] = None,
+    fail_fast: bool = False,
+    spill: bool = False,
+    spill_after: int = DEFAULT_SPILL_AFTER,
+    spill_dir: Optional[Union[str, os.PathLike]] = None,
+) -> StreamedPlan:
+    """
+    create_dry_run_plan() + run_verification() over an iterator of
+    requested steps, consumed lazily. See StreamingPlanBuilder.
+    """
+    builder = StreamingPlanBuilder(
+        derived_from_intent_id=derived_from_intent_id,
+        policy=policy,
+        allowed_actions_json=allowed_actions_json,
+        verifiers=verifiers,
+        notes=notes,
+        fail_fast=fail_fast,
+        spill=spill,
+        spill_after=spill_after,
+        spill_dir=spill_dir,
+    )
+    builder.extend(requested_steps)
+    return builder.finish()
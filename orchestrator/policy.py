@@ -0,0 +1,309 @@
+"""
+Aegis V0 — Compiled allowed-actions policy (read-only)
+
+This module compiles AEGIS_ALLOWED_ACTIONS_V1.json once into an immutable
+action index that every plan build can share. It grants nothing: it only
+answers "is this action allowed, and with what risk/reversibility?".
+
+A compiled policy is identified by the SHA-256 of its source bytes. The same
+content compiles to the same (cached) CompiledPolicy object while it is among
+the COMPILED_CACHE_SIZE most recently used policies, so repeated hot reloads
+do not keep every old policy alive.
+
+PolicyRegistry holds the *current* compiled policy for a policy file and can
+hot-reload it. Reload swaps a single reference; callers that already took a
+snapshot keep using it until they finish, so in-flight mediations are never
+blocked or observe a half-loaded policy.
+
+Authoritative sources:
+- AEGIS_ALLOWED_ACTIONS_V1.json
+- AEGIS_ACTION_SCHEMA.json ($defs.riskLevel)
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+import hashlib
+import json
+import os
+import sys
+import threading
+
+from orchestrator.plan import RiskLevel, _coerce_risk
+
+DEFAULT_POLICY_PATH = Path(__file__).resolve().parent.parent / "AEGIS_ALLOWED_ACTIONS_V1.json"
+
+
+@dataclass(frozen=True)
+class ActionPolicy:
+    """
+    One allowed action, with risk and reversibility already coerced.
+    """
+    action: str
+    risk: RiskLevel
+    reversible: bool
+    description: str = ""
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """
+    Immutable, pre-coerced view of an allowed-actions document.
+
+    `actions` is a read-only mapping and can be passed anywhere an
+    allowed-action index is expected (e.g. validate_plan).
+    """
+    content_hash: str
+    version: Optional[str]
+    actions: Mapping[str, ActionPolicy]
+    source: bytes
+
+    def get(self, action: str) -> Optional[ActionPolicy]:
+        return self.actions.get(action)
+
+    def __contains__(self, action: object) -> bool:
+        return action in self.actions
+
+    def __reduce__(self):
+        # MappingProxyType does not pickle; rebuild from the source bytes.
+        return (compile_policy_bytes, (self.source,))
+
+
+# ---- Compilation ----
+
+# content hash -> policy, least recently used first
+COMPILED_CACHE_SIZE = 8
+_COMPILED: "OrderedDict[str, CompiledPolicy]" = OrderedDict()
+_COMPILED_LOCK = threading.Lock()
+
+
+def policy_content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cached(content_hash: str) -> Optional[CompiledPolicy]:
+    with _COMPILED_LOCK:
+        compiled = _COMPILED.get(content_hash)
+        if compiled is not None:
+            _COMPILED.move_to_end(content_hash)
+        return compiled
+
+
+def _remember(compiled: CompiledPolicy) -> CompiledPolicy:
+    # a concurrent compile of the same content may have won: keep its object
+    with _COMPILED_LOCK:
+        compiled = _COMPILED.setdefault(compiled.content_hash, compiled)
+        _COMPILED.move_to_end(compiled.content_hash)
+        while len(_COMPILED) > COMPILED_CACHE_SIZE:
+            _COMPILED.popitem(last=False)
+        return compiled
+
+
+def _compile(data: bytes, content_hash: str) -> CompiledPolicy:
+    try:
+        doc = json.loads(data)
+    except ValueError as e:
+        raise ValueError(f"Allowed-actions policy is not valid JSON: {e}") from e
+    if not isinstance(doc, dict):
+        raise ValueError("Allowed-actions policy must be a JSON object.")
+
+    actions: Dict[str, ActionPolicy] = {}
+    for entry in doc.get("allowed_actions", []) or []:
+        action = entry.get("action") if isinstance(entry, dict) else None
+        if not isinstance(action, str) or not action:
+            continue
+        action = sys.intern(action)
+        actions[action] = ActionPolicy(
+            action=action,
+            risk=_coerce_risk(str(entry.get("risk"))),
+            reversible=bool(entry.get("reversible", False)),
+            description=str(entry.get("description", "")),
+        )
+
+    version = doc.get("version")
+    return CompiledPolicy(
+        content_hash=content_hash,
+        version=version if isinstance(version, str) else None,
+        actions=MappingProxyType(actions),
+        source=data,
+    )
+
+
+def compile_policy_bytes(data: bytes) -> CompiledPolicy:
+    """
+    Compile raw policy bytes, reusing a previous compilation of identical content.
+    """
+    content_hash = policy_content_hash(data)
+    compiled = _cached(content_hash)
+    if compiled is not None:
+        return compiled
+    return _remember(_compile(data, content_hash))
+
+
+def compile_policy(allowed_actions_json: Dict[str, Any]) -> CompiledPolicy:
+    """
+    Compile an already-parsed allowed-actions dict.
+
+    The dict is canonicalized before hashing so that key order does not
+    produce distinct policies.
+    """
+    data = json.dumps(allowed_actions_json, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return compile_policy_bytes(data)
+
+
+def policy_index_rows(policy: CompiledPolicy) -> Tuple[Tuple[str, str, bool, str], ...]:
+    """
+    The action index as plain tuples (action, risk, reversible, description),
+    e.g. for a startup snapshot (orchestrator.snapshot).
+    """
+    return tuple((a.action, a.risk.value, a.reversible, a.description) for a in policy.actions.values())
+
+
+def restore_compiled_policy(
+    data: bytes,
+    content_hash: str,
+    version: Optional[str],
+    rows: Tuple[Tuple[str, str, bool, str], ...],
+) -> CompiledPolicy:
+    """
+    Rebuild a CompiledPolicy from policy_index_rows() without re-parsing
+    `data`, and register it like compile_policy_bytes would. The caller
+    vouches that `content_hash` is the hash of `data`.
+    """
+    compiled = _cached(content_hash)
+    if compiled is not None:
+        return compiled
+    actions: Dict[str, ActionPolicy] = {}
+    for action, risk, reversible, description in rows:
+        action = sys.intern(action)
+        actions[action] = ActionPolicy(
+            action=action,
+            risk=RiskLevel(risk),
+            reversible=reversible,
+            description=description,
+        )
+    return _remember(
+        CompiledPolicy(
+            content_hash=content_hash,
+            version=version,
+            actions=MappingProxyType(actions),
+            source=data,
+        )
+    )
+
+
+def load_policy(path: Union[str, os.PathLike] = DEFAULT_POLICY_PATH) -> CompiledPolicy:
+    return compile_policy_bytes(Path(path).read_bytes())
+
+
+# ---- Registry ----
+
+class PolicyRegistry:
+    """
+    Holds the current CompiledPolicy for one policy file.
+
+    Readers call `current` (a plain attribute read) and keep the returned
+    snapshot for the duration of their work. `reload()` compiles the new
+    content off to the side and publishes it with a single reference swap.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike] = DEFAULT_POLICY_PATH,
+        *,
+        policy: Optional[CompiledPolicy] = None,
+    ) -> None:
+        self._path = Path(path)
+        self._reload_lock = threading.Lock()
+        self._stat_key: Optional[Tuple[int, int]] = None
+        if policy is None:
+            self._stat_key = self._stat()
+            policy = compile_policy_bytes(self._path.read_bytes())
+        self._current: CompiledPolicy = policy
+
+    @classmethod
+    def from_policy(cls, policy: CompiledPolicy, path: Union[str, os.PathLike] = DEFAULT_POLICY_PATH) -> "PolicyRegistry":
+        return cls(path, policy=policy)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def current(self) -> CompiledPolicy:
+        return self._current
+
+    @property
+    def content_hash(self) -> str:
+        return self._current.content_hash
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self._path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload(self) -> bool:
+        """
+        Re-read the policy file and publish it if its content changed.
+
+        Returns True when a new policy was published. A file that fails to
+        compile raises ValueError and leaves the current policy in place.
+        """
+        with self._reload_lock:
+            stat_key = self._stat()
+            data = self._path.read_bytes()
+            compiled = compile_policy_bytes(data)
+            self._stat_key = stat_key
+            if compiled.content_hash == self._current.content_hash:
+                return False
+            self._current = compiled
+            return True
+
+    def publish(self, policy: CompiledPolicy) -> bool:
+        """
+        Publish a policy compiled elsewhere (e.g. by the pre-fork
+        supervisor) for this registry's file. Returns True if it differs
+        from the current one.
+        """
+        with self._reload_lock:
+            if policy.content_hash == self._current.content_hash:
+                return False
+            self._stat_key = None
+            self._current = policy
+            return True
+
+    def reload_if_changed(self) -> bool:
+        """
+        Cheap stat() check; only re-reads and hashes the file when its
+        mtime or size moved.
+        """
+        if self._stat() == self._stat_key:
+            return False
+        return self.reload()
+
+
+PolicyLike = Union[PolicyRegistry, CompiledPolicy]
+
+
+def resolve_policy(
+    policy: Optional[PolicyLike] = None,
+    allowed_actions_json: Optional[Dict[str, Any]] = None,
+) -> CompiledPolicy:
+    """
+    Take a snapshot from whichever policy source the caller supplied.
+    """
+    if isinstance(policy, PolicyRegistry):
+        return policy.current
+    if isinstance(policy, CompiledPolicy):
+        return policy
+    if policy is not None:
+        raise TypeError("policy must be a PolicyRegistry or CompiledPolicy.")
+    if allowed_actions_json is None:
+        raise ValueError("Either policy or allowed_actions_json must be provided.")
+    return compile_policy(allowed_actions_json)
@@ -15,13 +15,13 @@ Authoritative sources:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List
+from typing import Any, Dict, List, Mapping, Optional
 
 from orchestrator.intent import Intent
 from orchestrator.plan import Plan
-from orchestrator.verification import VerificationReport, VerificationSeverity
+from orchestrator.verification import VerificationReport, VerificationLevel
 
 
 class RefusalDecisionType(str, Enum):
@@ -32,7 +32,7 @@ class RefusalDecisionType(str, Enum):
 
 @dataclass(frozen=True)
 class RefusalReason:
-    severity: VerificationSeverity
+    severity: VerificationLevel
     code: str
     message: str
     step_id: int | None = None
@@ -49,6 +49,40 @@ class RefusalDecision:
     decision: RefusalDecisionType
     reasons: List[RefusalReason]
     summary: str
+    # canonical JSON, filled by orchestrator.serialization on first encode
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "decision": self.decision.value,
+            "summary": self.summary,
+            "reasons": [
+                {
+                    "severity": r.severity.value,
+                    "code": r.code,
+                    "message": r.message,
+                    "step_id": r.step_id,
+                }
+                for r in self.reasons
+            ],
+        }
+
+    def to_json(self) -> bytes:
+        from orchestrator.serialization import refusal_to_json
+
+        return refusal_to_json(self)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "RefusalDecision":
+        from orchestrator.serialization import refusal_from_dict
+
+        return refusal_from_dict(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RefusalDecision":
+        from orchestrator.serialization import refusal_from_bytes
+
+        return refusal_from_bytes(data)
 
 
 # ---- Decision Logic ----
@@ -56,18 +90,33 @@ class RefusalDecision:
 def decide_refusal(
     *,
     intent: Intent,
-    plan: Plan,
-    verification: VerificationReport,
+    plan: Optional[Plan],
+    verification: Optional[VerificationReport],
+    error: Optional[str] = None,
 ) -> RefusalDecision:
     """
     Determine whether the plan may proceed, must warn, or must refuse.
 
     Rules (V0):
+    - Planning error (no plan) → REFUSE
     - Any BLOCK finding → REFUSE
     - WARN findings only → WARN
     - PASS only → PASS
     """
 
+    if error is not None or plan is None or verification is None:
+        return RefusalDecision(
+            decision=RefusalDecisionType.REFUSE,
+            reasons=[
+                RefusalReason(
+                    severity=VerificationLevel.BLOCK,
+                    code="PLAN_INVALID",
+                    message=error or "No verified plan was produced.",
+                )
+            ],
+            summary="Plan refused because a valid dry-run plan could not be produced.",
+        )
+
     reasons: List[RefusalReason] = []
 
     has_block = False
@@ -75,16 +124,16 @@ def decide_refusal(
 
     for finding in verification.findings:
         reason = RefusalReason(
-            severity=finding.severity,
+            severity=finding.level,
             code=finding.code,
             message=finding.message,
             step_id=finding.step_id,
         )
         reasons.append(reason)
 
-        if finding.severity == VerificationSeverity.BLOCK:
+        if finding.level == VerificationLevel.BLOCK:
             has_block = True
-        elif finding.severity == VerificationSeverity.WARN:
+        elif finding.level == VerificationLevel.WARN:
             has_warn = True
 
     if has_block:
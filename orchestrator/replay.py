@@ -0,0 +1,479 @@
+"""
+Aegis V0 — Policy change impact analysis by replay (no execution)
+
+Before an allowed-actions policy change ships (say, raising the risk of
+net.fetch or dropping app.automate), replay a corpus of recorded intents
+under the current and the proposed policy. The result is a report of the
+decisions that would change (PASS -> REFUSE, WARN -> PASS, ...), grouped
+by action and by finding.
+
+Each intent goes through the live pipeline once per policy:
+create_dry_run_plan -> run_verification -> decide_refusal. Two shortcuts
+make a corpus of millions of records practical, and neither changes a
+result:
+
+- The pipeline sees a policy only through the entries of the actions
+  that an intent requests (presence, risk, reversibility). An intent that
+  requests none of the changed actions (diff_policies) is decided the same
+  way under both policies. It is counted as unaffected without being
+  replayed. Lines are screened for the changed action names before they
+  are parsed, so most of a corpus never reaches a worker.
+- Outcomes are memoized per worker by requested steps, so a step shape
+  that repeats is decided once per policy.
+
+Corpus lines are intent requests (as for `mediate`) or intent records
+(Intent.to_dict(), e.g. the lines of a session snapshot). Audit events
+record no requested steps, so they and snapshot headers are counted as
+not replayable.
+
+Authoritative sources:
+- AEGIS_ALLOWED_ACTIONS_V1.json
+- AEGIS_REFUSAL_GUIDELINES.md
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+import json
+import re
+import time
+
+from orchestrator.intent import Intent, intent_from_dict, intent_from_record
+from orchestrator.mediation import numbered_lines, _stream_through_pool
+from orchestrator.plan import create_dry_run_plan
+from orchestrator.policy import ActionPolicy, CompiledPolicy, PolicyLike, compile_policy_bytes, resolve_policy
+from orchestrator.refusal import decide_refusal
+from orchestrator.serialization import loads
+from orchestrator.verification import run_verification
+
+ARROW = "->"
+UNKNOWN_ACTION = "*"
+PLAN_INVALID = "PLAN_INVALID"  # decide_refusal's code for a plan that could not be built
+DEFAULT_CHUNKSIZE = 256
+DEFAULT_MEMO_SIZE = 65536
+DEFAULT_SAMPLES = 5
+
+# plan construction errors name the failing step ("Step 3: action ...")
+_STEP_RE = re.compile(r"Step (\d+):")
+
+# (decision, frozenset of (finding code, action))
+Outcome = Tuple[str, FrozenSet[Tuple[str, str]]]
+
+
+# ---- Policy diff ----
+
+@dataclass(frozen=True)
+class ActionChange:
+    """
+    One action whose policy entry differs in a way planning can observe.
+    """
+    action: str
+    before: Optional[ActionPolicy]
+    after: Optional[ActionPolicy]
+
+    def describe(self) -> str:
+        if self.before is None:
+            return f"{self.action}: added ({_entry(self.after)})"
+        if self.after is None:
+            return f"{self.action}: removed (was {_entry(self.before)})"
+        parts = []
+        if self.before.risk != self.after.risk:
+            parts.append(f"risk {self.before.risk.value} {ARROW} {self.after.risk.value}")
+        if self.before.reversible != self.after.reversible:
+            parts.append(f"reversible {self.before.reversible} {ARROW} {self.after.reversible}")
+        return f"{self.action}: " + ", ".join(parts)
+
+
+def _entry(policy: ActionPolicy) -> str:
+    return f"{policy.risk.value}, {'reversible' if policy.reversible else 'irreversible'}"
+
+
+def diff_policies(old: CompiledPolicy, new: CompiledPolicy) -> Tuple[ActionChange, ...]:
+    """
+    Actions added, removed, or with a different risk or reversibility,
+    sorted by name. Description-only edits are not changes.
+    """
+    changes = []
+    for action in sorted(set(old.actions) | set(new.actions)):
+        before, after = old.get(action), new.get(action)
+        if (
+            before is None
+            or after is None
+            or before.risk != after.risk
+            or before.reversible != after.reversible
+        ):
+            changes.append(ActionChange(action=action, before=before, after=after))
+    return tuple(changes)
+
+
+# ---- Replaying one intent ----
+
+def _step_action(requested_steps: List[Dict[str, Any]], step_id: Optional[int]) -> str:
+    if step_id is None or not 1 <= step_id <= len(requested_steps):
+        return UNKNOWN_ACTION
+    action = requested_steps[step_id - 1].get("action")
+    return action if isinstance(action, str) else UNKNOWN_ACTION
+
+
+def replay_outcome(intent: Intent, policy: CompiledPolicy) -> Outcome:
+    """
+    Mediate `intent` under `policy` as mediate_intent would and reduce the
+    result to its decision plus (finding code, action) pairs.
+    """
+    try:
+        plan, _audit = create_dry_run_plan(
+            derived_from_intent_id=intent.intent_id,
+            requested_steps=intent.requested_steps,
+            policy=policy,
+        )
+    except Exception as e:
+        refusal = decide_refusal(intent=intent, plan=None, verification=None, error=str(e))
+        match = _STEP_RE.search(str(e))
+        action = _step_action(intent.requested_steps, int(match.group(1)) if match else None)
+        return refusal.decision.value, frozenset((r.code, action) for r in refusal.reasons)
+    verification = run_verification(plan)
+    refusal = decide_refusal(intent=intent, plan=plan, verification=verification)
+    return refusal.decision.value, frozenset(
+        (r.code, _step_action(intent.requested_steps, r.step_id)) for r in refusal.reasons
+    )
+
+
+# ---- Tallies ----
+
+class _Tally:
+    """
+    Counts for one chunk of the corpus; chunks are merged by the caller.
+    """
+
+    __slots__ = (
+        "records",
+        "replayed",
+        "unaffected",
+        "unreplayable",
+        "malformed",
+        "reasons_changed",
+        "transitions",
+        "by_action",
+        "by_finding",
+        "samples",
+    )
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.replayed = 0
+        self.unaffected = 0
+        self.unreplayable = 0
+        self.malformed = 0
+        self.reasons_changed = 0
+        self.transitions: Counter = Counter()
+        self.by_action: Counter = Counter()
+        self.by_finding: Counter = Counter()
+        self.samples: Dict[str, List[int]] = {}
+
+    def merge(self, other: "_Tally", max_samples: int) -> None:
+        self.records += other.records
+        self.replayed += other.replayed
+        self.unaffected += other.unaffected
+        self.unreplayable += other.unreplayable
+        self.malformed += other.malformed
+        self.reasons_changed += other.reasons_changed
+        self.transitions.update(other.transitions)
+        self.by_action.update(other.by_action)
+        self.by_finding.update(other.by_finding)
+        for transition, lines in other.samples.items():
+            kept = self.samples.setdefault(transition, [])
+            kept.extend(lines[: max_samples - len(kept)])
+
+
+class _Replayer:
+    """
+    Replays corpus lines under both policies. One per thread pool, or one
+    per worker process (set up by _init_replay_worker).
+    """
+
+    def __init__(
+        self,
+        old: CompiledPolicy,
+        new: CompiledPolicy,
+        *,
+        prune: bool = True,
+        samples: int = DEFAULT_SAMPLES,
+        memo_size: int = DEFAULT_MEMO_SIZE,
+    ) -> None:
+        self.old = old
+        self.new = new
+        self.prune = prune
+        self.samples = samples
+        self.memo_size = memo_size
+        self.changed: FrozenSet[str] = frozenset(c.action for c in diff_policies(old, new))
+        self._needles = tuple(json.dumps(a) for a in sorted(self.changed))
+        self._byte_needles = tuple(n.encode("utf-8") for n in self._needles)
+        self._memo: Dict[str, Tuple[Outcome, Outcome]] = {}
+
+    def may_be_affected(self, line: Union[str, bytes]) -> bool:
+        """
+        Cheap screen on the raw line: False only if it cannot request a
+        changed action. Lines with escapes are always let through.
+        """
+        if not self.prune:
+            return True
+        if isinstance(line, bytes):
+            return b"\\" in line or any(n in line for n in self._byte_needles)
+        return "\\" in line or any(n in line for n in self._needles)
+
+    def _requests_change(self, intent: Intent) -> bool:
+        for step in intent.requested_steps:
+            action = step.get("action")
+            if isinstance(action, str) and action in self.changed:
+                return True
+        return False
+
+    def _outcomes(self, intent: Intent) -> Tuple[Outcome, Outcome]:
+        try:
+            key = json.dumps(intent.requested_steps, sort_keys=True, separators=(",", ":"), allow_nan=False)
+        except (TypeError, ValueError):
+            return replay_outcome(intent, self.old), replay_outcome(intent, self.new)
+        outcomes = self._memo.get(key)
+        if outcomes is None:
+            outcomes = replay_outcome(intent, self.old), replay_outcome(intent, self.new)
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[key] = outcomes
+        return outcomes
+
+    def run(self, chunk: List[Tuple[int, Union[str, bytes]]]) -> List[_Tally]:
+        tally = _Tally()
+        for number, line in chunk:
+            try:
+                intent = _corpus_intent(loads(line))
+            except ValueError:
+                tally.malformed += 1
+                continue
+            if intent is None:
+                tally.unreplayable += 1
+                continue
+            if self.prune and not self._requests_change(intent):
+                tally.unaffected += 1
+                continue
+            tally.replayed += 1
+            (before, before_findings), (after, after_findings) = self._outcomes(intent)
+            if before == after:
+                if before_findings != after_findings:
+                    tally.reasons_changed += 1
+                continue
+            transition = f"{before}{ARROW}{after}"
+            tally.transitions[transition] += 1
+            added = after_findings - before_findings
+            removed = before_findings - after_findings
+            if any(code == PLAN_INVALID for code, _action in added):
+                # the findings of a plan that no longer builds are moot
+                removed = frozenset()
+            actions = set()
+            for sign, findings in (("-", removed), ("+", added)):
+                for code, action in findings:
+                    tally.by_finding[(transition, sign + code)] += 1
+                    actions.add(action)
+            for action in actions:
+                tally.by_action[(transition, action)] += 1
+            lines = tally.samples.setdefault(transition, [])
+            if len(lines) < self.samples:
+                lines.append(number)
+        return [tally]
+
+
+def _corpus_intent(record: Any) -> Optional[Intent]:
+    """
+    The intent a corpus record carries, or None for records without
+    requested steps (audit events, snapshot headers).
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Corpus record must be a JSON object.")
+    if isinstance(record.get("intent"), dict):
+        return intent_from_record(record["intent"])
+    if "metadata" in record:
+        return intent_from_record(record)
+    if "requested_steps" not in record:
+        return None
+    return intent_from_dict(record, source="replay")
+
+
+def _replay_chunk(
+    chunk: List[Tuple[int, Union[str, bytes]]],
+    _policy: CompiledPolicy,
+    replayer: _Replayer,
+) -> List[_Tally]:
+    return replayer.run(chunk)
+
+
+# Per-process replayer for process-pool workers (set once by the initializer)
+_WORKER_REPLAYER: Optional[_Replayer] = None
+
+
+def _init_replay_worker(old_source: bytes, new_source: bytes, prune: bool, samples: int) -> None:
+    global _WORKER_REPLAYER
+    _WORKER_REPLAYER = _Replayer(
+        compile_policy_bytes(old_source), compile_policy_bytes(new_source), prune=prune, samples=samples
+    )
+
+
+def _replay_chunk_in_process(chunk: List[Tuple[int, Union[str, bytes]]]) -> List[_Tally]:
+    if _WORKER_REPLAYER is None:
+        raise RuntimeError("Replay worker was started without policies.")
+    return _WORKER_REPLAYER.run(chunk)
+
+
+# ---- Report ----
+
+@dataclass(frozen=True)
+class ImpactReport:
+    """
+    Decision deltas between two policies over one corpus.
+
+    `by_action` and `by_finding` are keyed by transition ("PASS->REFUSE").
+    Finding keys are "+CODE" for findings only the new policy produces and
+    "-CODE" for findings it no longer produces; `by_action` counts the
+    actions those findings name. Intents that keep their decision but get
+    different findings are only counted (`reasons_changed`). `samples`
+    holds corpus line numbers. Lines screened out before parsing count as
+    unaffected, even if malformed.
+    """
+    old_hash: str
+    old_version: Optional[str]
+    new_hash: str
+    new_version: Optional[str]
+    changes: Tuple[ActionChange, ...]
+    records: int
+    replayed: int
+    unaffected: int
+    unreplayable: int
+    malformed: int
+    reasons_changed: int
+    transitions: Dict[str, int]
+    by_action: Dict[str, Dict[str, int]]
+    by_finding: Dict[str, Dict[str, int]]
+    samples: Dict[str, List[int]]
+    seconds: float
+
+    @property
+    def changed(self) -> int:
+        return sum(self.transitions.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "old_policy": {"version": self.old_version, "hash": self.old_hash},
+            "new_policy": {"version": self.new_version, "hash": self.new_hash},
+            "changed_actions": [c.describe() for c in self.changes],
+            "records": self.records,
+            "replayed": self.replayed,
+            "unaffected": self.unaffected,
+            "unreplayable": self.unreplayable,
+            "malformed": self.malformed,
+            "changed": self.changed,
+            "reasons_changed": self.reasons_changed,
+            "transitions": self.transitions,
+            "by_action": self.by_action,
+            "by_finding": self.by_finding,
+            "samples": self.samples,
+            "seconds": round(self.seconds, 3),
+        }
+
+    def render_text(self) -> str:
+        lines = [
+            f"Policy {self.old_version} ({self.old_hash[:12]}) {ARROW} {self.new_version} ({self.new_hash[:12]})",
+            "Changed actions:" if self.changes else "Changed actions: none",
+        ]
+        lines.extend(f"  {c.describe()}" for c in self.changes)
+        lines.append(
+            f"{self.records} record(s): {self.replayed} replayed, {self.unaffected} unaffected, "
+            f"{self.unreplayable} not replayable, {self.malformed} malformed; "
+            f"{self.changed} decision change(s), {self.reasons_changed} with other findings only; "
+            f"{self.seconds:.1f} s"
+        )
+        for transition, count in self.transitions.items():
+            lines.append(f"{transition}  {count}")
+            actions = ", ".join(f"{a} {n}" for a, n in self.by_action.get(transition, {}).items())
+            findings = ", ".join(f"{f} {n}" for f, n in self.by_finding.get(transition, {}).items())
+            lines.append(f"  by action:  {actions}")
+            lines.append(f"  by finding: {findings}")
+            lines.append("  lines:      " + ", ".join(str(n) for n in self.samples.get(transition, ())))
+        return "\n".join(lines)
+
+
+def _grouped(counts: Counter) -> Dict[str, Dict[str, int]]:
+    grouped: Dict[str, Dict[str, int]] = {}
+    for (transition, key), count in counts.most_common():
+        grouped.setdefault(transition, {})[key] = count
+    return grouped
+
+
+# ---- Entry point ----
+
+def replay_policy_change(
+    lines: Iterable[Union[str, bytes]],
+    *,
+    old: PolicyLike,
+    new: PolicyLike,
+    workers: Optional[int] = None,
+    executor: str = "thread",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    max_in_flight: Optional[int] = None,
+    prune: bool = True,
+    samples: int = DEFAULT_SAMPLES,
+) -> ImpactReport:
+    """
+    Replay a JSONL corpus under `old` and `new` and report the outcome
+    deltas. Pool options as for mediate_jsonl; use executor="process" for
+    large corpora. prune=False replays every intent, including those that
+    request no changed action (for cross-checking the shortcut).
+    """
+    started = time.perf_counter()
+    old_policy = resolve_policy(old)
+    new_policy = resolve_policy(new)
+    replayer = _Replayer(old_policy, new_policy, prune=prune, samples=samples)
+    total = _Tally()
+
+    def screened() -> Iterable[Tuple[int, Union[str, bytes]]]:
+        for number, line in numbered_lines(lines):
+            total.records += 1
+            if replayer.may_be_affected(line):
+                yield number, line
+            else:
+                total.unaffected += 1
+
+    tallies = _stream_through_pool(
+        screened(),
+        run_chunk=partial(_replay_chunk, replayer=replayer),
+        run_chunk_in_process=_replay_chunk_in_process,
+        snapshot=old_policy,
+        coalesce=False,
+        workers=workers,
+        executor=executor,
+        ordered=False,
+        chunksize=chunksize,
+        max_in_flight=max_in_flight,
+        init_process=(_init_replay_worker, (old_policy.source, new_policy.source, prune, samples)),
+    )
+    for tally in tallies:
+        total.merge(tally, samples)
+
+    return ImpactReport(
+        old_hash=old_policy.content_hash,
+        old_version=old_policy.version,
+        new_hash=new_policy.content_hash,
+        new_version=new_policy.version,
+        changes=diff_policies(old_policy, new_policy),
+        records=total.records,
+        replayed=total.replayed,
+        unaffected=total.unaffected,
+        unreplayable=total.unreplayable,
+        malformed=total.malformed,
+        reasons_changed=total.reasons_changed,
+        transitions=dict(total.transitions.most_common()),
+        by_action=_grouped(total.by_action),
+        by_finding=_grouped(total.by_finding),
+        samples={t: sorted(n) for t, n in total.samples.items()},
+        seconds=time.perf_counter() - started,
+    )
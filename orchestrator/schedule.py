@@ -0,0 +1,606 @@
+"""
+Aegis V0 — Step dependency graph and parallel dry-run scheduling (no execution)
+
+Plan.steps is a total order, but most steps do not depend on each other: a
+fs.snapshot of one file and a fs.write of another, net.fetch calls to
+different domains. build_step_graph() derives the dependencies the order
+actually implies, from each step's action and scope constraints:
+
+- each action reads or writes the resources named by one dimension of its
+  scope (ACTION_ACCESS): fs.write writes its paths, fs.read and
+  fs.snapshot read theirs, net.fetch reads its domains, app.launch and
+  app.automate write their apps. Any other non-empty paths/domains/apps
+  count as reads.
+- two steps conflict when their resources overlap and at least one of
+  them writes. Paths overlap when one is the other or lies beneath it,
+  after normalization; relative paths are compared with each other and
+  overlap every absolute path. Domains overlap when equal or one is a
+  subdomain of the other ("*.example.com" is taken as example.com). Apps
+  overlap when equal. An empty dimension is unbounded and overlaps
+  everything of its kind.
+- a step depends on every earlier step it conflicts with. Actions missing
+  from ACTION_ACCESS (http.respond, whose response reflects the work
+  before it, and any action a newer policy adds) are barriers: they come
+  after every earlier step and before every later one.
+
+Dependencies only point to earlier steps, so plan order is always a valid
+schedule. The graph is built in one pass with a trie per resource kind:
+O(steps x path depth), plus the edges.
+
+Steps are costed per action (ActionCost: fixed time plus time per MiB of
+max_bytes, or of a default size when the step sets none). estimate()
+reports the serial time, the critical path (the longest chain of dependent
+steps, which bounds wall time at any parallelism) and the wall time of
+list scheduling on N workers. Costs are planning estimates of execution
+time, not measurements.
+
+schedule_dry_run() runs each step's dry-run simulation (the verification
+step hooks, plus an optional `simulate` callable) on a thread pool. A step
+starts once its dependencies have finished, longest remaining path first.
+Findings are reported as run_verification() reports them. Threads pay off
+when `simulate` waits on I/O; the built-in hooks are pure Python.
+
+Authoritative structure: AEGIS_ACTION_SCHEMA.json ($defs.plan, $defs.planStep, $defs.scopeSpec)
+Allowed actions: AEGIS_ALLOWED_ACTIONS_V1.json
+"""
+
+from __future__ import annotations
+
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+import heapq
+import os
+import time
+
+from orchestrator.plan import Plan, PlanStep, _set
+from orchestrator.scope import normalize_domain, normalize_path
+from orchestrator.verification import VerificationReport, VerifierRegistry, resolve_registry
+
+READ = "read"
+WRITE = "write"
+MIB = 1 << 20
+
+# action -> (scope dimension it acts on, READ | WRITE)
+ACTION_ACCESS: Mapping[str, Tuple[str, str]] = MappingProxyType({
+    "fs.read": ("paths", READ),
+    "fs.write": ("paths", WRITE),
+    "fs.snapshot": ("paths", READ),
+    "render.html": ("paths", READ),
+    "index.local": ("paths", READ),
+    "summarize.local": ("paths", READ),
+    "net.fetch": ("domains", READ),
+    "app.launch": ("apps", WRITE),
+    "app.automate": ("apps", WRITE),
+})
+
+_DIMENSIONS = ("paths", "domains", "apps")
+
+# shown by render_text(); the full path is in to_dict()
+_SHOWN_PATH_STEPS = 20
+
+
+# ---- Cost model ----
+
+@dataclass(frozen=True)
+class ActionCost:
+    """
+    Estimated execution time of one step: fixed_ms + ms_per_mib per MiB
+    of max_bytes (default_bytes when the step sets no max_bytes).
+    """
+    fixed_ms: float
+    ms_per_mib: float = 0.0
+    default_bytes: int = 0
+
+    def estimate_ms(self, step: PlanStep) -> float:
+        size = step.scope.constraints.max_bytes
+        if size is None:
+            size = self.default_bytes
+        return self.fixed_ms + self.ms_per_mib * size / MIB
+
+
+# Rough defaults for local disk, a WAN fetch and interactive apps; pass a
+# calibrated model to build_step_graph(costs=...) where one exists.
+DEFAULT_COST_MODEL: Mapping[str, ActionCost] = MappingProxyType({
+    "fs.read": ActionCost(1.0, 4.0, 64 * 1024),
+    "fs.write": ActionCost(2.0, 8.0, 64 * 1024),
+    "fs.snapshot": ActionCost(5.0, 4.0, 64 * 1024),
+    "render.html": ActionCost(5.0, 20.0, 16 * 1024),
+    "http.respond": ActionCost(2.0, 10.0, 16 * 1024),
+    "net.fetch": ActionCost(150.0, 100.0, 256 * 1024),
+    "app.launch": ActionCost(800.0),
+    "app.automate": ActionCost(1500.0),
+    "index.local": ActionCost(20.0, 50.0, MIB),
+    "summarize.local": ActionCost(200.0, 400.0, 64 * 1024),
+})
+
+# actions the model does not know
+FALLBACK_COST = ActionCost(10.0)
+
+
+# ---- Resource tries ----
+
+class _Node:
+    __slots__ = ("children", "writer", "readers", "below_w", "below_r")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.writer = -1            # last step writing exactly here
+        self.readers: List[int] = []  # steps reading exactly here since then
+        self.below_w: Set[int] = set()  # live writers/readers strictly beneath
+        self.below_r: Set[int] = set()
+
+
+def _gather(node: _Node, write: bool, deps: Set[int], *, below: bool) -> None:
+    if node.writer >= 0:
+        deps.add(node.writer)
+    if write:
+        deps.update(node.readers)
+    if below:
+        deps.update(node.below_w)
+        if write:
+            deps.update(node.below_r)
+
+
+class _ResourceTrie:
+    """
+    Live accesses to one kind of resource. A write clears everything
+    beneath it: later overlapping steps reach those accesses through it.
+    """
+
+    def __init__(self, linked: Tuple[str, ...] = ()) -> None:
+        self._root = _Node()
+        # top-level keys whose subtrees all overlap each other
+        self._linked = linked
+
+    def access(self, parts: Sequence[str], write: bool, step: int, deps: Set[int]) -> None:
+        node = self._root
+        ancestors: List[_Node] = []
+        for part in parts:
+            _gather(node, write, deps, below=False)
+            ancestors.append(node)
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _Node()
+            node = child
+        _gather(node, write, deps, below=True)
+        if parts and parts[0] in self._linked:
+            for key in self._linked:
+                other = self._root.children.get(key)
+                if key != parts[0] and other is not None:
+                    _gather(other, write, deps, below=True)
+
+        if not write:
+            node.readers.append(step)
+            for a in ancestors:
+                a.below_r.add(step)
+            return
+        gone_w = node.below_w
+        gone_r = node.below_r
+        if node.writer >= 0:
+            gone_w.add(node.writer)
+        gone_r.update(node.readers)
+        node.children = {}
+        node.below_w, node.below_r = set(), set()
+        node.readers = []
+        node.writer = step
+        for a in ancestors:
+            a.below_w -= gone_w
+            a.below_r -= gone_r
+            a.below_w.add(step)
+
+
+_ABSOLUTE = "/"
+_RELATIVE = "\0rel"
+
+
+def _path_parts(path: str) -> List[str]:
+    if (
+        type(path) is str
+        and path[:1] == "/"
+        and path[-1:] != "/"
+        and "//" not in path
+        and "/." not in path
+        and "\\" not in path
+    ):
+        # already normalized: what normalize_path would return
+        parts = path.split("/")
+        parts[0] = _ABSOLUTE
+        return parts
+    parts = normalize_path(path)
+    if parts is None:
+        return []  # unreadable: treat as unbounded
+    if parts[0] == _ABSOLUTE:
+        return parts
+    return [_RELATIVE] + parts
+
+
+def _domain_parts(domain: str) -> List[str]:
+    labels = normalize_domain(domain)
+    if labels is None:
+        return []
+    if labels[-1] == "*":
+        labels.pop()
+    return labels
+
+
+_PARTS: Dict[str, Callable[[str], List[str]]] = {
+    "paths": _path_parts,
+    "domains": _domain_parts,
+    "apps": lambda app: [app] if isinstance(app, str) else [],
+}
+
+
+# ---- Step graph ----
+
+@dataclass(frozen=True)
+class ScheduleEstimate:
+    """
+    Estimated execution time of a plan. `wall_ms` is for `workers` workers
+    (None: unlimited, where it equals critical_path_ms).
+    """
+    plan_id: str
+    steps: int
+    edges: int
+    waves: int
+    max_width: int
+    serial_ms: float
+    critical_path_ms: float
+    critical_path: Tuple[int, ...]
+    workers: Optional[int]
+    wall_ms: float
+
+    @property
+    def speedup(self) -> float:
+        return self.serial_ms / self.wall_ms if self.wall_ms else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "plan_id": self.plan_id,
+            "steps": self.steps,
+            "edges": self.edges,
+            "waves": self.waves,
+            "max_width": self.max_width,
+            "serial_ms": round(self.serial_ms, 3),
+            "critical_path_ms": round(self.critical_path_ms, 3),
+            "critical_path": list(self.critical_path),
+            "workers": self.workers,
+            "wall_ms": round(self.wall_ms, 3),
+        }
+
+    def render_text(self) -> str:
+        on = f"{self.workers} worker(s)" if self.workers else "unlimited workers"
+        shown = " -> ".join(str(s) for s in self.critical_path[:_SHOWN_PATH_STEPS])
+        hidden = len(self.critical_path) - _SHOWN_PATH_STEPS
+        if hidden > 0:
+            shown += f" -> ... ({hidden} more)"
+        return "\n".join([
+            f"Plan {self.plan_id}: {self.steps} step(s), {self.edges} dependency edge(s), "
+            f"{self.waves} wave(s), widest {self.max_width}",
+            f"Estimated: serial {self.serial_ms:.1f} ms, critical path {self.critical_path_ms:.1f} ms, "
+            f"{on} {self.wall_ms:.1f} ms ({self.speedup:.1f}x)",
+            f"Critical path: steps {shown}" if shown else "Critical path: none",
+        ])
+
+
+@dataclass(frozen=True)
+class StepGraph:
+    """
+    Dependencies between the steps of one plan. Steps are addressed by
+    their position in plan.steps; predecessors are always earlier.
+    """
+    plan_id: str
+    step_ids: Tuple[int, ...]
+    costs_ms: Tuple[float, ...]
+    # CSR: the predecessors of i are preds[pred_offsets[i]:pred_offsets[i + 1]]
+    pred_offsets: array
+    preds: array
+    _succ: Optional[Tuple[array, array]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.step_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.preds)
+
+    def predecessors(self, index: int) -> Sequence[int]:
+        return self.preds[self.pred_offsets[index] : self.pred_offsets[index + 1]]
+
+    def _successors(self) -> Tuple[array, array]:
+        if self._succ is None:
+            n = len(self.step_ids)
+            counts = [0] * (n + 1)
+            for p in self.preds:
+                counts[p + 1] += 1
+            for i in range(n):
+                counts[i + 1] += counts[i]
+            offsets = array("Q", counts)
+            succ = array("I", bytes(4 * len(self.preds)))
+            fill = counts[:n]
+            offs, preds = self.pred_offsets, self.preds
+            for i in range(n):
+                for k in range(offs[i], offs[i + 1]):
+                    p = preds[k]
+                    succ[fill[p]] = i
+                    fill[p] += 1
+            _set(self, "_succ", (offsets, succ))
+        return self._succ
+
+    def successors(self, index: int) -> Sequence[int]:
+        offsets, succ = self._successors()
+        return succ[offsets[index] : offsets[index + 1]]
+
+    def levels(self) -> List[List[int]]:
+        """
+        Step ids by wave: a step is in the wave after its latest
+        predecessor's, so each wave only depends on earlier ones.
+        """
+        level = self._levels()
+        waves: List[List[int]] = [[] for _ in range(max(level, default=-1) + 1)]
+        for i, w in enumerate(level):
+            waves[w].append(self.step_ids[i])
+        return waves
+
+    def _levels(self) -> List[int]:
+        level = [0] * len(self.step_ids)
+        offs, preds = self.pred_offsets, self.preds
+        for i in range(len(level)):
+            start, end = offs[i], offs[i + 1]
+            if start != end:
+                level[i] = 1 + max(level[p] for p in preds[start:end])
+        return level
+
+    def _ranks(self) -> List[float]:
+        # longest cost from the start of each step to the end of the plan
+        offsets, succ = self._successors()
+        costs = self.costs_ms
+        rank = [0.0] * len(costs)
+        for i in range(len(costs) - 1, -1, -1):
+            start, end = offsets[i], offsets[i + 1]
+            rank[i] = costs[i] + (max(rank[s] for s in succ[start:end]) if start != end else 0.0)
+        return rank
+
+    def critical_path(self) -> Tuple[float, Tuple[int, ...]]:
+        """
+        The longest chain of dependent steps: (its cost in ms, step ids).
+        """
+        n = len(self.step_ids)
+        if not n:
+            return 0.0, ()
+        finish = [0.0] * n
+        via = [-1] * n
+        offs, preds, costs = self.pred_offsets, self.preds, self.costs_ms
+        for i in range(n):
+            best, best_p = 0.0, -1
+            for k in range(offs[i], offs[i + 1]):
+                p = preds[k]
+                if finish[p] > best:
+                    best, best_p = finish[p], p
+            finish[i] = best + costs[i]
+            via[i] = best_p
+        i = max(range(n), key=finish.__getitem__)
+        length = finish[i]
+        chain: List[int] = []
+        while i >= 0:
+            chain.append(self.step_ids[i])
+            i = via[i]
+        chain.reverse()
+        return length, tuple(chain)
+
+    def list_schedule_ms(self, workers: int) -> float:
+        """
+        Wall time when `workers` workers always start the ready step with
+        the longest remaining path (list scheduling).
+        """
+        if workers < 1:
+            raise ValueError("workers must be >= 1.")
+        offsets, succ = self._successors()
+        rank, costs = self._ranks(), self.costs_ms
+        pending = [self.pred_offsets[i + 1] - self.pred_offsets[i] for i in range(len(costs))]
+        ready = [(-rank[i], i) for i, c in enumerate(pending) if not c]
+        heapq.heapify(ready)
+        running: List[Tuple[float, int]] = []
+        now = 0.0
+        while ready or running:
+            while ready and len(running) < workers:
+                _, i = heapq.heappop(ready)
+                heapq.heappush(running, (now + costs[i], i))
+            now, i = heapq.heappop(running)
+            for k in range(offsets[i], offsets[i + 1]):
+                s = succ[k]
+                pending[s] -= 1
+                if not pending[s]:
+                    heapq.heappush(ready, (-rank[s], s))
+        return now
+
+    def estimate(self, workers: Optional[int] = None) -> ScheduleEstimate:
+        """
+        Serial, critical-path and `workers`-worker wall time (see the
+        module docstring). workers=None assumes unlimited workers.
+        """
+        length, chain = self.critical_path()
+        level = self._levels()
+        width: Dict[int, int] = {}
+        for w in level:
+            width[w] = width.get(w, 0) + 1
+        return ScheduleEstimate(
+            plan_id=self.plan_id,
+            steps=len(self.step_ids),
+            edges=self.edge_count,
+            waves=len(width),
+            max_width=max(width.values(), default=0),
+            serial_ms=sum(self.costs_ms),
+            critical_path_ms=length,
+            critical_path=chain,
+            workers=workers,
+            wall_ms=length if workers is None else self.list_schedule_ms(workers),
+        )
+
+
+def build_step_graph(
+    plan: Plan,
+    *,
+    access: Mapping[str, Tuple[str, str]] = ACTION_ACCESS,
+    costs: Mapping[str, ActionCost] = DEFAULT_COST_MODEL,
+) -> StepGraph:
+    """
+    Derive the dependency graph of a plan's steps (see the module
+    docstring). plan.steps is read once, in order, so spilled plans
+    (orchestrator.plan_stream) are not loaded into memory.
+    """
+    tries = _fresh_tries()
+    step_ids: List[int] = []
+    costs_ms: List[float] = []
+    offsets = array("Q", [0])
+    preds = array("I")
+    has_succ = bytearray()
+    barrier = -1
+
+    for i, step in enumerate(plan.steps):
+        step_ids.append(step.step_id)
+        costs_ms.append((costs.get(step.action) or FALLBACK_COST).estimate_ms(step))
+        has_succ.append(0)
+        deps: Set[int] = set()
+        kind = access.get(step.action)
+
+        if kind is None:
+            # barrier: after the open ends of everything since the last one
+            deps.update(j for j in range(barrier + 1, i) if not has_succ[j])
+            if not deps and barrier >= 0:
+                deps.add(barrier)
+            barrier = i
+            tries = _fresh_tries()
+        else:
+            constraints = step.scope.constraints
+            primary, mode = kind
+            for dimension in _DIMENSIONS:
+                values = getattr(constraints, dimension)
+                if dimension != primary and not values:
+                    continue
+                write = dimension == primary and mode == WRITE
+                trie, to_parts = tries[dimension], _PARTS[dimension]
+                for parts in [to_parts(v) for v in values] if values else [[]]:
+                    trie.access(parts, write, i, deps)
+            deps.discard(i)
+            if not deps and barrier >= 0:
+                deps.add(barrier)
+
+        for p in sorted(deps):
+            preds.append(p)
+            has_succ[p] = 1
+        offsets.append(len(preds))
+
+    return StepGraph(
+        plan_id=plan.plan_id,
+        step_ids=tuple(step_ids),
+        costs_ms=tuple(costs_ms),
+        pred_offsets=offsets,
+        preds=preds,
+    )
+
+
+def _fresh_tries() -> Dict[str, _ResourceTrie]:
+    return {
+        "paths": _ResourceTrie(linked=(_ABSOLUTE, _RELATIVE)),
+        "domains": _ResourceTrie(),
+        "apps": _ResourceTrie(),
+    }
+
+
+# ---- Parallel dry-run ----
+
+@dataclass(frozen=True)
+class DryRunSchedule:
+    """
+    Result of schedule_dry_run(). `results` holds simulate(step) per step
+    in plan order (None without simulate); `max_concurrency` is the most
+    steps that were in flight at once.
+    """
+    graph: StepGraph
+    estimate: ScheduleEstimate
+    verification: VerificationReport
+    results: Optional[Tuple[Any, ...]]
+    max_concurrency: int
+    seconds: float
+
+
+def schedule_dry_run(
+    plan: Plan,
+    *,
+    simulate: Optional[Callable[[PlanStep], Any]] = None,
+    registry: Optional[VerifierRegistry] = None,
+    workers: Optional[int] = None,
+    graph: Optional[StepGraph] = None,
+) -> DryRunSchedule:
+    """
+    Simulate every step of a plan, running independent steps concurrently
+    (see the module docstring). An exception from `simulate` stops the
+    schedule and is re-raised once the steps in flight have finished.
+    A single worker runs inline on the caller's thread.
+    """
+    started = time.perf_counter()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be >= 1.")
+    # StepGraph defines __len__: test for None, not truth
+    if graph is None:
+        graph = build_step_graph(plan)
+    registry = resolve_registry(registry)
+    steps = plan.steps
+    n = len(steps)
+    if len(graph) != n:
+        raise ValueError("graph was built for a different plan.")
+    step_findings = registry.step_findings
+
+    def run_step(i: int) -> Tuple[Any, Any]:
+        step = steps[i]
+        return step_findings(step), (simulate(step) if simulate is not None else None)
+
+    per_step: List[Any] = [None] * n
+    results: Optional[List[Any]] = [None] * n if simulate is not None else None
+    offsets, succ = graph._successors()
+    rank = graph._ranks()
+    pending = [graph.pred_offsets[i + 1] - graph.pred_offsets[i] for i in range(n)]
+    ready = [(-rank[i], i) for i, c in enumerate(pending) if not c]
+    heapq.heapify(ready)
+
+    def finish(i: int, outcome: Tuple[Any, Any]) -> None:
+        per_step[i] = outcome[0]
+        if results is not None:
+            results[i] = outcome[1]
+        for k in range(offsets[i], offsets[i + 1]):
+            s = succ[k]
+            pending[s] -= 1
+            if not pending[s]:
+                heapq.heappush(ready, (-rank[s], s))
+
+    max_concurrency = 0
+    if workers == 1:
+        while ready:
+            _, i = heapq.heappop(ready)
+            finish(i, run_step(i))
+        max_concurrency = 1 if n else 0
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aegis-dry-run") as pool:
+            running: Dict[Any, int] = {}
+            while ready or running:
+                while ready and len(running) < workers:
+                    _, i = heapq.heappop(ready)
+                    running[pool.submit(run_step, i)] = i
+                max_concurrency = max(max_concurrency, len(running))
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+
+    return DryRunSchedule(
+        graph=graph,
+        estimate=graph.estimate(workers),
+        verification=registry.assemble(plan, per_step),
+        results=tuple(results) if results is not None else None,
+        max_concurrency=max_concurrency,
+        seconds=time.perf_counter() - started,
+    )
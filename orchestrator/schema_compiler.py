@@ -0,0 +1,461 @@
+"""
+Aegis V0 — Schema validator compiler (no jsonschema dependency)
+
+Turns selected $defs of AEGIS_ACTION_SCHEMA.json into specialized Python
+functions, generated as source once and compiled with compile()/exec. The
+schema stays the single source of truth; nothing here hand-restates it.
+
+For every compiled definition <name> two functions are generated:
+
+- check_<name>(value) -> bool
+    Fast path. Straight-line checks with no allocation; returns True when
+    the value is valid.
+- errors_<name>(value, path="", errors=None, deep=True) -> List[str]
+    Slow path, only used after check_<name> failed. Builds one message per
+    violation, prefixed with the dotted property path. deep=False skips
+    nested $ref definitions (the caller reports those itself).
+
+Two instance modes are supported:
+
+- "dict": JSON documents (dicts/lists), e.g. parsed requests.
+- "object": the frozen dataclasses in orchestrator.plan, whose attribute
+  names mirror the schema. A None attribute for a non-required property is
+  treated as absent; arrays may be lists or tuples.
+
+Supported keywords (the subset used by the compiled defs): type (incl.
+type lists), properties, required, additionalProperties=false, items,
+minItems, minimum, enum, const, $ref to #/$defs/*.
+
+Authoritative source: AEGIS_ACTION_SCHEMA.json
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_SCHEMA_PATH = Path(__file__).resolve().parent.parent / "AEGIS_ACTION_SCHEMA.json"
+DEFAULT_DEFS = ("plan", "planStep", "scopeSpec")
+MODES = ("dict", "object")
+
+_REF_PREFIX = "#/$defs/"
+
+_TYPE_NAMES = {
+    "string": "a string",
+    "integer": "an integer",
+    "number": "a number",
+    "boolean": "boolean",
+    "object": "an object",
+    "array": "an array",
+    "null": "null",
+}
+
+
+class SchemaCompileError(ValueError):
+    pass
+
+
+class _Generator:
+    """
+    Emits Python source for one (schema, defs, mode) combination.
+    """
+
+    def __init__(self, schema: Dict[str, Any], defs: Iterable[str], mode: str) -> None:
+        if mode not in MODES:
+            raise SchemaCompileError(f"mode must be one of {MODES}, got '{mode}'.")
+        self.schema = schema
+        self.all_defs: Dict[str, Any] = schema.get("$defs", {})
+        self.defs = tuple(defs)
+        for name in self.defs:
+            if name not in self.all_defs:
+                raise SchemaCompileError(f"Unknown $defs entry '{name}'.")
+        self.mode = mode
+        self.consts: Dict[str, Any] = {}
+        self.lines: List[str] = []
+        self._tmp = 0
+        self._expanding: set = set()
+
+    # ---- helpers ----
+
+    def const(self, value: Any) -> str:
+        for name, existing in self.consts.items():
+            if existing == value and type(existing) is type(value):
+                return name
+        name = f"_C{len(self.consts)}"
+        self.consts[name] = value
+        return name
+
+    def tmp(self) -> str:
+        self._tmp += 1
+        return f"_v{self._tmp}"
+
+    def emit(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def resolve(self, node: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Return (compiled_def_name or None, schema node). Refs to defs that
+        are not compiled as functions are inlined.
+        """
+        seen = 0
+        ref_name: Optional[str] = None
+        while "$ref" in node:
+            ref = node["$ref"]
+            if not isinstance(ref, str) or not ref.startswith(_REF_PREFIX):
+                raise SchemaCompileError(f"Unsupported $ref '{ref}'.")
+            ref_name = ref[len(_REF_PREFIX):]
+            if ref_name in self.defs:
+                return ref_name, self.all_defs[ref_name]
+            node = self.all_defs[ref_name]
+            seen += 1
+            if seen > 32:
+                raise SchemaCompileError("Recursive $ref chain.")
+        return None, node
+
+    def is_structured(self, node: Dict[str, Any]) -> bool:
+        # objects with declared properties are accessed by attribute in object mode
+        return self.mode == "object" and "properties" in node
+
+    # ---- type expressions (no allocation) ----
+
+    def type_test(self, var: str, typ: str, node: Dict[str, Any]) -> str:
+        if typ == "string":
+            return f"isinstance({var}, str)"
+        if typ == "integer":
+            # exact type: excludes bool (an int subclass in Python)
+            return f"type({var}) is int"
+        if typ == "number":
+            return f"(isinstance({var}, (int, float)) and {var} is not True and {var} is not False)"
+        if typ == "boolean":
+            return f"({var} is True or {var} is False)"
+        if typ == "null":
+            return f"{var} is None"
+        if typ == "array":
+            return f"isinstance({var}, (list, tuple))" if self.mode == "object" else f"isinstance({var}, list)"
+        if typ == "object":
+            if self.is_structured(node):
+                return f"{var} is not None"
+            return f"isinstance({var}, dict)"
+        raise SchemaCompileError(f"Unsupported type '{typ}'.")
+
+    def types_of(self, node: Dict[str, Any]) -> List[str]:
+        typ = node.get("type")
+        if typ is None:
+            return []
+        return list(typ) if isinstance(typ, list) else [typ]
+
+    # ---- fast path ----
+
+    def gen_check(self, var: str, node: Dict[str, Any], indent: int) -> None:
+        """
+        Emit statements that `return False` when `var` violates `node`.
+        """
+        ref_name, node = self.resolve(node)
+        if ref_name is not None:
+            if ref_name in self._expanding:
+                self.emit(indent, f"if not check_{ref_name}({var}):")
+                self.emit(indent + 1, "return False")
+                return
+            # inline non-recursive refs: saves a call per nested object
+            self._expanding.add(ref_name)
+            try:
+                self.gen_check(var, node, indent)
+            finally:
+                self._expanding.discard(ref_name)
+            return
+
+        types = self.types_of(node)
+        if types:
+            test = " or ".join(self.type_test(var, t, node) for t in types)
+            self.emit(indent, f"if not ({test}):")
+            self.emit(indent + 1, "return False")
+
+        if "const" in node:
+            self.emit(indent, f"if {var} != {self.const(node['const'])}:")
+            self.emit(indent + 1, "return False")
+        if "enum" in node:
+            self.emit(indent, f"if {var} not in {self.const(frozenset(node['enum']))}:")
+            self.emit(indent + 1, "return False")
+
+        numeric = [t for t in types if t in ("integer", "number")]
+        if "minimum" in node and numeric:
+            guard = f"{var} is not None and " if "null" in types else ""
+            self.emit(indent, f"if {guard}{var} < {node['minimum']!r}:")
+            self.emit(indent + 1, "return False")
+
+        if "array" in types or "items" in node or "minItems" in node:
+            self.gen_check_array(var, node, indent)
+        if "properties" in node:
+            self.gen_check_object(var, node, indent)
+
+    def gen_check_array(self, var: str, node: Dict[str, Any], indent: int) -> None:
+        if "minItems" in node:
+            self.emit(indent, f"if len({var}) < {int(node['minItems'])}:")
+            self.emit(indent + 1, "return False")
+        items = node.get("items")
+        if isinstance(items, dict) and items:
+            item = self.tmp()
+            self.emit(indent, f"for {item} in {var}:")
+            self.gen_check(item, items, indent + 1)
+
+    def gen_check_object(self, var: str, node: Dict[str, Any], indent: int) -> None:
+        props: Dict[str, Any] = node.get("properties", {})
+        required = set(node.get("required", []))
+
+        if self.mode == "dict":
+            for name in sorted(required):
+                self.emit(indent, f"if {name!r} not in {var}:")
+                self.emit(indent + 1, "return False")
+            if node.get("additionalProperties") is False:
+                key = self.tmp()
+                self.emit(indent, f"for {key} in {var}:")
+                self.emit(indent + 1, f"if {key} not in {self.const(frozenset(props))}:")
+                self.emit(indent + 2, "return False")
+
+        for name, sub in props.items():
+            val = self.tmp()
+            if self.mode == "dict":
+                self.emit(indent, f"{val} = {var}.get({name!r}, _MISSING)")
+                self.emit(indent, f"if {val} is not _MISSING:")
+            else:
+                self.emit(indent, f"{val} = {var}.{name}")
+                if name in required:
+                    self.gen_check(val, sub, indent)
+                    continue
+                self.emit(indent, f"if {val} is not None:")
+            before = len(self.lines)
+            self.gen_check(val, sub, indent + 1)
+            if len(self.lines) == before:
+                self.emit(indent + 1, "pass")
+
+    # ---- slow path ----
+
+    def gen_errors(self, var: str, path: str, label: str, node: Dict[str, Any], indent: int) -> None:
+        """
+        Emit statements appending messages for violations of `node`.
+        `path` is a Python expression for the prefix; `label` a literal
+        for the property name (may be empty at the top level).
+        """
+        where = f"{{{path}}}{label}" if label else f"{{{path}}}"
+        ref_name, node = self.resolve(node)
+        if ref_name is not None:
+            self.emit(indent, "if deep:")
+            sub_path = f"{path} + {label + '.'!r}" if label else path
+            self.emit(indent + 1, f"errors_{ref_name}({var}, {sub_path}, errors, deep)")
+            return
+
+        types = self.types_of(node)
+        else_at: Optional[int] = None
+        if types:
+            test = " or ".join(self.type_test(var, t, node) for t in types)
+            expected = " or ".join(_TYPE_NAMES[t] for t in types)
+            self.emit(indent, f"if not ({test}):")
+            self.emit(indent + 1, f"errors.append(f\"{where} must be {expected}.\")")
+            # further checks only make sense once the type is right
+            self.emit(indent, "else:")
+            else_at = len(self.lines)
+            indent += 1
+
+        if "const" in node:
+            self.emit(indent, f"if {var} != {self.const(node['const'])}:")
+            self.emit(indent + 1, f"errors.append(f\"{where} must equal {node['const']!r}.\")")
+        if "enum" in node:
+            choices = ", ".join(str(v) for v in node["enum"])
+            self.emit(indent, f"if {var} not in {self.const(frozenset(node['enum']))}:")
+            self.emit(indent + 1, f"errors.append(f\"{where} must be one of: {choices}.\")")
+
+        numeric = [t for t in types if t in ("integer", "number")]
+        if "minimum" in node and numeric:
+            guard = f"{var} is not None and " if "null" in types else ""
+            self.emit(indent, f"if {guard}{var} < {node['minimum']!r}:")
+            self.emit(indent + 1, f"errors.append(f\"{where} must be >= {node['minimum']!r}.\")")
+
+        if "minItems" in node:
+            n = int(node["minItems"])
+            noun = "item" if n == 1 else "items"
+            self.emit(indent, f"if len({var}) < {n}:")
+            self.emit(indent + 1, f"errors.append(f\"{where} must contain at least {n} {noun}.\")")
+        items = node.get("items")
+        if isinstance(items, dict) and items:
+            idx, item = self.tmp(), self.tmp()
+            self.emit(indent, f"for {idx}, {item} in enumerate({var}):")
+            item_path = self.tmp()
+            self.emit(indent + 1, f"{item_path} = f\"{where}[{{{idx}}}].\"")
+            self.gen_item_errors(item, item_path, f"{where}[{{{idx}}}]", items, indent + 1)
+
+        if "properties" in node:
+            obj_path = path if not label else f"{path} + {label + '.'!r}"
+            self.gen_errors_object(var, obj_path, node, indent)
+
+        if else_at is not None and len(self.lines) == else_at:
+            self.lines.pop()  # nothing left to check: drop the empty "else:"
+
+    def gen_item_errors(self, var: str, path_var: str, where: str, node: Dict[str, Any], indent: int) -> None:
+        ref_name, resolved = self.resolve(node)
+        if ref_name is not None:
+            self.emit(indent, "if deep:")
+            self.emit(indent + 1, f"errors_{ref_name}({var}, {path_var}, errors, deep)")
+            return
+        types = self.types_of(resolved)
+        if types:
+            test = " or ".join(self.type_test(var, t, resolved) for t in types)
+            expected = " or ".join(_TYPE_NAMES[t] for t in types)
+            self.emit(indent, f"if not ({test}):")
+            self.emit(indent + 1, f"errors.append(f\"{where} must be {expected}.\")")
+        if "enum" in resolved:
+            choices = ", ".join(str(v) for v in resolved["enum"])
+            self.emit(indent, f"if {var} not in {self.const(frozenset(resolved['enum']))}:")
+            self.emit(indent + 1, f"errors.append(f\"{where} must be one of: {choices}.\")")
+
+    def gen_errors_object(self, var: str, path: str, node: Dict[str, Any], indent: int) -> None:
+        props: Dict[str, Any] = node.get("properties", {})
+        required = set(node.get("required", []))
+
+        if self.mode == "dict":
+            for name in sorted(required):
+                self.emit(indent, f"if {name!r} not in {var}:")
+                self.emit(indent + 1, f"errors.append(f\"{{{path}}}{name} is required.\")")
+            if node.get("additionalProperties") is False:
+                key = self.tmp()
+                self.emit(indent, f"for {key} in {var}:")
+                self.emit(indent + 1, f"if {key} not in {self.const(frozenset(props))}:")
+                self.emit(indent + 2, f"errors.append(f\"{{{path}}}{{{key}}} is not an allowed property.\")")
+
+        for name, sub in props.items():
+            val = self.tmp()
+            if self.mode == "dict":
+                self.emit(indent, f"{val} = {var}.get({name!r}, _MISSING)")
+                self.emit(indent, f"if {val} is not _MISSING:")
+            else:
+                self.emit(indent, f"{val} = getattr({var}, {name!r}, None)")
+                if name in required:
+                    self.gen_errors(val, path, name, sub, indent)
+                    continue
+                self.emit(indent, f"if {val} is not None:")
+            before = len(self.lines)
+            self.gen_errors(val, path, name, sub, indent + 1)
+            if len(self.lines) == before:
+                self.emit(indent + 1, "pass")
+
+    # ---- module ----
+
+    def generate(self) -> str:
+        for name in self.defs:
+            node = self.all_defs[name]
+            self.emit(0, f"def check_{name}(value):")
+            before = len(self.lines)
+            self._expanding = {name}
+            self.gen_check("value", node, 1)
+            if len(self.lines) == before:
+                self.emit(1, "pass")
+            self.emit(1, "return True")
+            self.emit(0, "")
+            self.emit(0, f"def errors_{name}(value, path='', errors=None, deep=True):")
+            self.emit(1, "if errors is None:")
+            self.emit(2, "errors = []")
+            self.gen_errors("value", "path", "", node, 1)
+            self.emit(1, "return errors")
+            self.emit(0, "")
+        return "\n".join(self.lines) + "\n"
+
+
+def generate_validator_source(
+    schema: Dict[str, Any],
+    defs: Iterable[str] = DEFAULT_DEFS,
+    mode: str = "object",
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Return (python_source, constants) for the requested defs.
+    """
+    gen = _Generator(schema, defs, mode)
+    source = gen.generate()
+    return source, dict(gen.consts)
+
+
+def build_validators(
+    schema: Dict[str, Any],
+    defs: Iterable[str] = DEFAULT_DEFS,
+    mode: str = "object",
+    *,
+    filename: str = "<aegis-schema>",
+) -> SimpleNamespace:
+    """
+    Generate, compile and load validators; returns a namespace exposing
+    check_<def>/errors_<def> plus `source` and `defs`.
+    """
+    defs = tuple(defs)
+    source, consts = generate_validator_source(schema, defs, mode)
+    code = compile(source, filename, "exec")
+    return load_validators(code, consts, defs, source)
+
+
+def load_validators(code: Any, consts: Dict[str, Any], defs: Tuple[str, ...], source: str = "") -> SimpleNamespace:
+    namespace: Dict[str, Any] = {"_MISSING": object(), "__builtins__": __builtins__}
+    namespace.update(consts)
+    exec(code, namespace)
+    exported = {}
+    for name in defs:
+        exported[f"check_{name}"] = namespace[f"check_{name}"]
+        exported[f"errors_{name}"] = namespace[f"errors_{name}"]
+    return SimpleNamespace(source=source, defs=defs, **exported)
+
+
+# ---- First-use cache ----
+
+_CACHE: Dict[Tuple[str, Tuple[str, ...], str], SimpleNamespace] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def compiled_validators(
+    mode: str = "object",
+    defs: Iterable[str] = DEFAULT_DEFS,
+    schema_path: Union[str, os.PathLike, None] = None,
+) -> SimpleNamespace:
+    """
+    Validators for the on-disk schema (AEGIS_ACTION_SCHEMA.json by default),
+    compiled on first use and cached by (schema content hash, defs, mode).
+    """
+    defs = tuple(defs)
+    fast_key = (str(schema_path or DEFAULT_SCHEMA_PATH), defs, mode)
+    compiled = _BY_PATH.get(fast_key)
+    if compiled is not None:
+        return compiled
+
+    data = Path(fast_key[0]).read_bytes()
+    key = (hashlib.sha256(data).hexdigest(), defs, mode)
+    with _CACHE_LOCK:
+        compiled = _CACHE.get(key)
+        if compiled is None:
+            compiled = build_validators(
+                json.loads(data), defs, mode, filename=f"<aegis-schema:{key[0][:12]}:{mode}>"
+            )
+            _CACHE[key] = compiled
+        _BY_PATH[fast_key] = compiled
+    return compiled
+
+
+def register_validators(
+    compiled: SimpleNamespace,
+    content_hash: str,
+    mode: str = "object",
+    schema_path: Union[str, os.PathLike, None] = None,
+) -> SimpleNamespace:
+    """
+    Install validators built elsewhere (e.g. loaded from a startup snapshot,
+    see orchestrator.snapshot) so compiled_validators() returns them without
+    compiling. `content_hash` is the SHA-256 of the schema file's bytes.
+    """
+    key = (content_hash, tuple(compiled.defs), mode)
+    with _CACHE_LOCK:
+        compiled = _CACHE.setdefault(key, compiled)
+        _BY_PATH[(str(schema_path or DEFAULT_SCHEMA_PATH), key[1], mode)] = compiled
+    return compiled
+
+
+# path-keyed memo so the hot path does not re-read and re-hash the schema
+_BY_PATH: Dict[Tuple[str, Tuple[str, ...], str], SimpleNamespace] = {}
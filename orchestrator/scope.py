@@ -0,0 +1,347 @@
+"""
+Aegis V0 — Scope grant matching (read-only)
+
+A scope token (scopeSpec.scope_token) references a granted scope. This
+module compiles the grants behind those tokens into lookup structures and
+answers one question: do a step's requested constraints stay inside what
+its token grants?
+
+Per scope token the index holds:
+- paths: a trie over normalized path components; a granted path covers
+  itself and everything beneath it.
+- domains: a trie over reversed labels. "example.com" grants exactly that
+  host; "*.example.com" grants any subdomain (not the apex).
+- apps, methods: hashed sets (methods compared case-insensitively).
+- max_bytes: the granted upper bound, if any.
+
+Every check walks the requested value once, so cost is O(length of the
+path / domain), independent of how many grants exist.
+
+A request that leaves a dimension empty is unbounded in it. That exceeds
+any grant that restricts the dimension, just as a request without
+max_bytes exceeds a granted byte limit.
+
+A grant document mirrors $defs.scopeSpec:
+
+    {"grants": [{"scope_token": "...",
+                 "constraints": {"paths": [...], "domains": [...],
+                                 "apps": [...], "methods": [...],
+                                 "max_bytes": 1048576}}]}
+
+Authoritative sources:
+- AEGIS_ACTION_SCHEMA.json ($defs.scopeSpec)
+- AEGIS_RUNTIME_ARCHITECTURE.md (4.1 Capability Gate)
+- AEGIS_SECURITY_MODEL.md
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence
+import posixpath
+
+from orchestrator.plan import PlanStep, ScopeConstraints
+from orchestrator.verification import (
+    NO_FINDINGS,
+    VerificationFinding,
+    VerificationLevel,
+    Verifier,
+)
+
+# trie node keys that cannot collide with path components or labels
+_END = "\0end"
+_WILDCARD = "\0any"
+
+
+@dataclass(frozen=True)
+class ScopeGrant:
+    # Mirrors $defs.scopeSpec, as granted rather than requested
+    scope_token: str
+    paths: Sequence[str] = ()
+    domains: Sequence[str] = ()
+    apps: Sequence[str] = ()
+    methods: Sequence[str] = ()
+    max_bytes: Optional[int] = None
+
+
+# ---- Normalization ----
+
+def normalize_path(path: str) -> Optional[List[str]]:
+    """
+    Split a path into normalized components; None for empty paths.
+
+    Normalization collapses "." / ".." / duplicate separators, so
+    "/srv/site/../secret" is matched as "/srv/secret".
+    """
+    if not isinstance(path, str) or not path.strip():
+        return None
+    norm = posixpath.normpath(path.replace("\\", "/"))
+    parts = [p for p in norm.split("/") if p]
+    if norm.startswith("/"):
+        parts.insert(0, "/")
+    return parts
+
+
+def normalize_domain(domain: str) -> Optional[List[str]]:
+    """
+    Lower-cased labels in reverse order ("a.example.com" -> com, example, a).
+    """
+    if not isinstance(domain, str):
+        return None
+    domain = domain.strip().lower().rstrip(".")
+    if not domain:
+        return None
+    labels = domain.split(".")
+    if any(not label for label in labels):
+        return None
+    labels.reverse()
+    return labels
+
+
+# ---- Tries ----
+
+class PathPrefixTrie:
+    """
+    Granted path prefixes; covers(path) is True if some grant is the path
+    itself or one of its ancestors.
+    """
+
+    def __init__(self, paths: Iterable[str] = ()) -> None:
+        self._root: Dict[str, Any] = {}
+        for path in paths:
+            self.add(path)
+
+    def add(self, path: str) -> None:
+        parts = normalize_path(path)
+        if parts is None:
+            raise ValueError(f"Invalid granted path '{path}'.")
+        node = self._root
+        for part in parts:
+            node = node.setdefault(part, {})
+        node[_END] = True
+
+    def __bool__(self) -> bool:
+        return bool(self._root)
+
+    def covers(self, path: str) -> bool:
+        parts = normalize_path(path)
+        if parts is None:
+            return False
+        node = self._root
+        for part in parts:
+            if _END in node:
+                return True
+            node = node.get(part)
+            if node is None:
+                return False
+        return _END in node
+
+
+class DomainSuffixTrie:
+    """
+    Granted domains over reversed labels, with "*." subdomain wildcards.
+    """
+
+    def __init__(self, domains: Iterable[str] = ()) -> None:
+        self._root: Dict[str, Any] = {}
+        for domain in domains:
+            self.add(domain)
+
+    def add(self, domain: str) -> None:
+        wildcard = isinstance(domain, str) and domain.strip().startswith("*.")
+        labels = normalize_domain(domain.strip()[2:] if wildcard else domain)
+        if labels is None:
+            raise ValueError(f"Invalid granted domain '{domain}'.")
+        node = self._root
+        for label in labels:
+            node = node.setdefault(label, {})
+        node[_WILDCARD if wildcard else _END] = True
+
+    def __bool__(self) -> bool:
+        return bool(self._root)
+
+    def covers(self, domain: str) -> bool:
+        labels = normalize_domain(domain)
+        if labels is None:
+            return False
+        node = self._root
+        last = len(labels) - 1
+        for i, label in enumerate(labels):
+            node = node.get(label)
+            if node is None:
+                return False
+            if i < last and _WILDCARD in node:
+                return True
+        return _END in node
+
+
+# ---- Compiled grant index ----
+
+@dataclass(frozen=True)
+class CompiledGrant:
+    scope_token: str
+    paths: PathPrefixTrie
+    domains: DomainSuffixTrie
+    apps: FrozenSet[str]
+    methods: FrozenSet[str]
+    max_bytes: Optional[int]
+
+
+@dataclass(frozen=True)
+class ScopeViolation:
+    code: str                 # SCOPE_NOT_GRANTED | SCOPE_EXCEEDS_GRANT
+    dimension: Optional[str]  # paths | domains | apps | methods | max_bytes
+    values: Sequence[Any] = field(default_factory=tuple)
+
+
+class ScopeGrantIndex:
+    """
+    Immutable index: scope token -> compiled grant.
+
+    Several grants for the same token are merged (their union is granted);
+    max_bytes keeps the largest bound, and an unbounded grant wins.
+    """
+
+    def __init__(self, grants: Iterable[ScopeGrant] = ()) -> None:
+        merged: Dict[str, List[ScopeGrant]] = {}
+        for grant in grants:
+            if not isinstance(grant.scope_token, str) or not grant.scope_token.strip():
+                raise ValueError("Scope grant must have a non-empty scope_token.")
+            merged.setdefault(grant.scope_token, []).append(grant)
+
+        self._grants: Dict[str, CompiledGrant] = {}
+        for token, group in merged.items():
+            bounds = [g.max_bytes for g in group]
+            self._grants[token] = CompiledGrant(
+                scope_token=token,
+                paths=PathPrefixTrie(p for g in group for p in g.paths),
+                domains=DomainSuffixTrie(d for g in group for d in g.domains),
+                apps=frozenset(a for g in group for a in g.apps),
+                methods=frozenset(m.upper() for g in group for m in g.methods),
+                max_bytes=None if any(b is None for b in bounds) else max(bounds),
+            )
+
+    def __contains__(self, scope_token: object) -> bool:
+        return scope_token in self._grants
+
+    def __len__(self) -> int:
+        return len(self._grants)
+
+    def get(self, scope_token: str) -> Optional[CompiledGrant]:
+        return self._grants.get(scope_token)
+
+    def violations(self, scope_token: str, constraints: ScopeConstraints) -> List[ScopeViolation]:
+        """
+        Return every way `constraints` exceed the grant behind `scope_token`
+        (empty when the request is within the grant).
+        """
+        grant = self._grants.get(scope_token)
+        if grant is None:
+            return [ScopeViolation(code="SCOPE_NOT_GRANTED", dimension=None)]
+
+        found: List[ScopeViolation] = []
+        # a dimension the request leaves empty is unbounded in it, which
+        # exceeds any grant that restricts that dimension
+        if constraints.paths:
+            bad = [p for p in constraints.paths if not grant.paths.covers(p)]
+            if bad:
+                found.append(ScopeViolation("SCOPE_EXCEEDS_GRANT", "paths", tuple(bad)))
+        elif grant.paths:
+            found.append(ScopeViolation("SCOPE_EXCEEDS_GRANT", "paths"))
+        if constraints.domains:
+            bad = [d for d in constraints.domains if not grant.domains.covers(d)]
+            if bad:
+                found.append(ScopeViolation("SCOPE_EXCEEDS_GRANT", "domains", tuple(bad)))
+        elif grant.domains:
+            found.append(ScopeViolation("SCOPE_EXCEEDS_GRANT", "domains"))
+        if constraints.apps:
+            bad = [a for a in constraints.apps if a not in grant.apps]
+            if bad:
+                found.append(ScopeViolation("SCOPE_EXCEEDS_GRANT", "apps", tuple(bad)))
+        elif grant.apps:
+            found.append(ScopeViolation("SCOPE_EXCEEDS_GRANT", "apps"))
+        if constraints.methods:
+            bad = [m for m in constraints.methods if not isinstance(m, str) or m.upper() not in grant.methods]
+            if bad:
+                found.append(ScopeViolation("SCOPE_EXCEEDS_GRANT", "methods", tuple(bad)))
+        elif grant.methods:
+            found.append(ScopeViolation("SCOPE_EXCEEDS_GRANT", "methods"))
+        if grant.max_bytes is not None:
+            requested = constraints.max_bytes
+            if requested is None or requested > grant.max_bytes:
+                found.append(ScopeViolation("SCOPE_EXCEEDS_GRANT", "max_bytes", (requested,)))
+        return found
+
+
+def scope_grants_from_json(document: Mapping[str, Any]) -> List[ScopeGrant]:
+    """
+    Parse a grant document (see module docstring). Raises ValueError.
+    """
+    raw = document.get("grants")
+    if not isinstance(raw, list):
+        raise ValueError("Scope grant document must contain a 'grants' array.")
+    grants: List[ScopeGrant] = []
+    for i, entry in enumerate(raw, start=1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Grant {i}: must be an object.")
+        constraints = entry.get("constraints", {}) or {}
+        if not isinstance(constraints, dict):
+            raise ValueError(f"Grant {i}: 'constraints' must be an object.")
+        max_bytes = constraints.get("max_bytes")
+        if max_bytes is not None and (type(max_bytes) is not int or max_bytes < 0):
+            raise ValueError(f"Grant {i}: 'max_bytes' must be an integer >= 0.")
+        grants.append(
+            ScopeGrant(
+                scope_token=str(entry.get("scope_token", "")),
+                paths=tuple(constraints.get("paths", []) or []),
+                domains=tuple(constraints.get("domains", []) or []),
+                apps=tuple(constraints.get("apps", []) or []),
+                methods=tuple(constraints.get("methods", []) or []),
+                max_bytes=max_bytes,
+            )
+        )
+    return grants
+
+
+# ---- Verifier ----
+
+_MAX_LISTED = 3
+
+
+def _describe(violation: ScopeViolation, step: PlanStep) -> str:
+    if violation.code == "SCOPE_NOT_GRANTED":
+        return f"Step {step.step_id} references scope token '{step.scope.scope_token}', which is not granted."
+    if violation.dimension == "max_bytes":
+        requested = violation.values[0]
+        wanted = "no byte limit" if requested is None else f"max_bytes={requested}"
+        return f"Step {step.step_id} requests {wanted}, exceeding the granted byte limit."
+    if not violation.values:
+        return f"Step {step.step_id} leaves {violation.dimension} unbounded, but its grant restricts them."
+    shown = ", ".join(repr(v) for v in violation.values[:_MAX_LISTED])
+    more = len(violation.values) - _MAX_LISTED
+    if more > 0:
+        shown += f" (+{more} more)"
+    return f"Step {step.step_id} requests {violation.dimension} outside its grant: {shown}."
+
+
+def make_scope_grant_verifier(index: ScopeGrantIndex, *, name: str = "scope_within_grant") -> Verifier:
+    """
+    A step verifier that BLOCKs steps whose constraints exceed their grant.
+    Register it on a VerifierRegistry alongside the defaults.
+    """
+
+    def check_step(step: PlanStep):
+        violations = index.violations(step.scope.scope_token, step.scope.constraints)
+        if not violations:
+            return NO_FINDINGS
+        return tuple(
+            VerificationFinding(
+                level=VerificationLevel.BLOCK,
+                code=v.code,
+                step_id=step.step_id,
+                message=_describe(v, step),
+            )
+            for v in violations
+        )
+
+    return Verifier(name=name, step_hook=check_step)
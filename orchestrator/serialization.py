@@ -0,0 +1,353 @@
+"""
+Aegis V0 — Canonical JSON serialization (no execution)
+
+Direct encoders for Plan, VerificationReport, RefusalDecision and
+MediationResult. They write canonical JSON without first building the
+to_dict() tree. Canonical means sorted keys, compact separators and ASCII
+escapes, byte-for-byte equal to:
+
+    json.dumps(obj.to_dict(), sort_keys=True, separators=(",", ":")).encode()
+
+This is the form the audit log hashes (PLAN_PROPOSED output_hash).
+
+Encoded bytes are cached on the (frozen) object in its private `_json`
+slot, so a plan, report or decision shared between results is encoded once.
+Objects must not be mutated after they were encoded.
+
+Decoding (from_dict / from_bytes) builds the dataclasses directly. It uses
+orjson when it is installed and falls back to the standard library.
+Encoding always uses the standard library C encoder, so canonical bytes and
+hashes never depend on which optional packages are present.
+
+Authoritative structure: AEGIS_ACTION_SCHEMA.json ($defs.plan, $defs.planStep)
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Union
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from orchestrator.intent import Intent, IntentMetadata
+from orchestrator.plan import EMPTY_CONSTRAINTS, Plan, PlanStep, RiskLevel, ScopeConstraints, ScopeSpec
+from orchestrator.refusal import RefusalDecision, RefusalDecisionType, RefusalReason
+from orchestrator.verification import VerificationFinding, VerificationLevel, VerificationReport
+
+if TYPE_CHECKING:
+    from orchestrator.mediation import MediationResult
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+loads: Callable[[Union[str, bytes]], Any] = orjson.loads if orjson is not None else json.loads
+
+_esc = json.encoder.encode_basestring_ascii  # C accelerated where available
+_BOOL = ("false", "true")
+
+
+def _cache(obj: Any, data: bytes) -> bytes:
+    object.__setattr__(obj, "_json", data)
+    return data
+
+
+def _dumps(value: Any) -> str:
+    # canonical fallback for free-form values (args) and unexpected types
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def _str_list(values: Sequence[Any]) -> str:
+    try:
+        return "[" + ",".join(map(_esc, values)) + "]"
+    except TypeError:
+        return _dumps(list(values))
+
+
+def _int(value: Any) -> str:
+    return str(value) if type(value) is int else _dumps(int(value))
+
+
+def _opt_int(value: Any) -> str:
+    return "null" if value is None else _int(value)
+
+
+# ---- Encoding ----
+
+_EMPTY_CONSTRAINTS_JSON = '{"apps":[],"domains":[],"methods":[],"paths":[]}'
+
+
+def _constraints_json(c: ScopeConstraints) -> str:
+    if c is EMPTY_CONSTRAINTS:
+        return _EMPTY_CONSTRAINTS_JSON
+    max_bytes = "" if c.max_bytes is None else f'"max_bytes":{_int(c.max_bytes)},'
+    return (
+        f'{{"apps":{_str_list(c.apps)},"domains":{_str_list(c.domains)},{max_bytes}'
+        f'"methods":{_str_list(c.methods)},"paths":{_str_list(c.paths)}}}'
+    )
+
+
+def plan_step_to_json(step: PlanStep) -> bytes:
+    cached = step._json
+    if cached is not None:
+        return cached
+    args = "{}" if not step.args else _dumps(dict(step.args))
+    text = (
+        f'{{"action":{_esc(step.action)},"args":{args},'
+        f'"dry_run_supported":{_BOOL[bool(step.dry_run_supported)]},'
+        f'"requires_confirmation":{_BOOL[bool(step.requires_confirmation)]},'
+        f'"reversible":{_BOOL[bool(step.reversible)]},'
+        f'"risk":{_esc(step.risk.value)},'
+        f'"scope":{{"constraints":{_constraints_json(step.scope.constraints)},'
+        f'"scope_token":{_esc(step.scope.scope_token)}}},'
+        f'"step_id":{_int(step.step_id)},"validators":{_str_list(step.validators)}}}'
+    )
+    return _cache(step, text.encode("ascii"))
+
+
+def plan_to_json(plan: Plan) -> bytes:
+    cached = plan._json
+    if cached is not None:
+        return cached
+    head = f'{{"notes":{_esc(plan.notes)},' if plan.notes else "{"
+    data = b"".join(
+        (
+            f'{head}"plan_id":{_esc(plan.plan_id)},"steps":['.encode("ascii"),
+            b",".join([plan_step_to_json(s) for s in plan.steps]),
+            b"]}",
+        )
+    )
+    return _cache(plan, data)
+
+
+def _finding_json(f: VerificationFinding) -> str:
+    return (
+        f'{{"code":{_esc(f.code)},"level":{_esc(f.level.value)},'
+        f'"message":{_esc(f.message)},"step_id":{_opt_int(f.step_id)}}}'
+    )
+
+
+def verification_to_json(report: VerificationReport) -> bytes:
+    cached = report._json
+    if cached is not None:
+        return cached
+    text = '{"findings":[' + ",".join([_finding_json(f) for f in report.findings]) + "]}"
+    return _cache(report, text.encode("ascii"))
+
+
+def _reason_json(r: RefusalReason) -> str:
+    return (
+        f'{{"code":{_esc(r.code)},"message":{_esc(r.message)},'
+        f'"severity":{_esc(r.severity.value)},"step_id":{_opt_int(r.step_id)}}}'
+    )
+
+
+def refusal_to_json(decision: RefusalDecision) -> bytes:
+    cached = decision._json
+    if cached is not None:
+        return cached
+    text = (
+        f'{{"decision":{_esc(decision.decision.value)},'
+        f'"reasons":[{",".join([_reason_json(r) for r in decision.reasons])}],'
+        f'"summary":{_esc(decision.summary)}}}'
+    )
+    return _cache(decision, text.encode("ascii"))
+
+
+def mediation_result_to_json(result: "MediationResult") -> bytes:
+    cached = result._json
+    if cached is not None:
+        return cached
+    data = b"".join(
+        (
+            b'{"intent_id":',
+            _esc(result.intent.intent_id).encode("ascii"),
+            b',"plan":',
+            plan_to_json(result.plan) if result.plan is not None else b"null",
+            b',"refusal":',
+            refusal_to_json(result.refusal) if result.refusal is not None else b"null",
+            b',"verification":',
+            verification_to_json(result.verification) if result.verification is not None else b"null",
+            b"}",
+        )
+    )
+    return _cache(result, data)
+
+
+# ---- Decoding ----
+
+_RISK = {r.value: r for r in RiskLevel}
+_LEVEL = {v.value: v for v in VerificationLevel}
+_DECISION = {d.value: d for d in RefusalDecisionType}
+# stand-in timestamp for intents rebuilt from a result (which carries only the id)
+_UNKNOWN_TIME = datetime.fromtimestamp(0, timezone.utc)
+
+
+def _enum(table: Mapping[str, Any], value: Any, what: str) -> Any:
+    try:
+        return table[value]
+    except (KeyError, TypeError):
+        raise ValueError(f"Invalid {what} '{value}'.") from None
+
+
+def _object(data: Any, what: str) -> Mapping[str, Any]:
+    if not isinstance(data, dict):
+        raise ValueError(f"{what} must be a JSON object.")
+    return data
+
+
+def _constraints_from_dict(d: Mapping[str, Any]) -> ScopeConstraints:
+    if not d or (not d.get("paths") and not d.get("domains") and not d.get("apps")
+                 and not d.get("methods") and d.get("max_bytes") is None):
+        return EMPTY_CONSTRAINTS
+    return ScopeConstraints(
+        paths=tuple(d.get("paths") or ()),
+        domains=tuple(d.get("domains") or ()),
+        apps=tuple(d.get("apps") or ()),
+        methods=tuple(d.get("methods") or ()),
+        max_bytes=d.get("max_bytes"),
+    )
+
+
+def plan_step_from_dict(data: Mapping[str, Any]) -> PlanStep:
+    d = _object(data, "Plan step")
+    try:
+        scope = _object(d["scope"], "scope")
+        return PlanStep(
+            step_id=d["step_id"],
+            action=d["action"],
+            args=dict(d.get("args") or {}),
+            scope=ScopeSpec(
+                scope_token=scope["scope_token"],
+                constraints=_constraints_from_dict(_object(scope.get("constraints") or {}, "constraints")),
+            ),
+            risk=_enum(_RISK, d["risk"], "risk level"),
+            reversible=d["reversible"],
+            requires_confirmation=d["requires_confirmation"],
+            validators=tuple(d.get("validators") or ()),
+            dry_run_supported=d.get("dry_run_supported", True),
+        )
+    except KeyError as e:
+        raise ValueError(f"Plan step is missing '{e.args[0]}'.") from None
+
+
+def plan_from_dict(data: Mapping[str, Any]) -> Plan:
+    d = _object(data, "Plan")
+    steps = d.get("steps")
+    if not isinstance(steps, list) or "plan_id" not in d:
+        raise ValueError("Plan requires 'plan_id' and a 'steps' array.")
+    return Plan(
+        plan_id=d["plan_id"],
+        steps=tuple([plan_step_from_dict(s) for s in steps]),
+        notes=d.get("notes"),
+    )
+
+
+def verification_from_dict(data: Mapping[str, Any]) -> VerificationReport:
+    d = _object(data, "Verification report")
+    findings: List[VerificationFinding] = []
+    for f in d.get("findings") or ():
+        f = _object(f, "Finding")
+        try:
+            findings.append(
+                VerificationFinding(
+                    level=_enum(_LEVEL, f["level"], "verification level"),
+                    message=f["message"],
+                    step_id=f.get("step_id"),
+                    code=f.get("code", "UNSPECIFIED"),
+                )
+            )
+        except KeyError as e:
+            raise ValueError(f"Finding is missing '{e.args[0]}'.") from None
+    return VerificationReport(findings=findings)
+
+
+def refusal_from_dict(data: Mapping[str, Any]) -> RefusalDecision:
+    d = _object(data, "Refusal decision")
+    try:
+        reasons = [
+            RefusalReason(
+                severity=_enum(_LEVEL, r["severity"], "severity"),
+                code=r["code"],
+                message=r["message"],
+                step_id=r.get("step_id"),
+            )
+            for r in (_object(x, "Refusal reason") for x in d.get("reasons") or ())
+        ]
+        return RefusalDecision(
+            decision=_enum(_DECISION, d["decision"], "decision"),
+            reasons=reasons,
+            summary=d["summary"],
+        )
+    except KeyError as e:
+        raise ValueError(f"Refusal decision is missing '{e.args[0]}'.") from None
+
+
+def mediation_result_from_dict(data: Mapping[str, Any], *, intent: Optional[Intent] = None) -> "MediationResult":
+    """
+    Rebuild a MediationResult. Serialized results carry only the intent id;
+    pass the original `intent` to restore it, otherwise a stand-in Intent
+    with that id (source "serialized") is attached.
+    """
+    from orchestrator.mediation import MediationResult
+
+    d = _object(data, "Mediation result")
+    intent_id = d.get("intent_id")
+    if not isinstance(intent_id, str):
+        raise ValueError("Mediation result requires a string 'intent_id'.")
+    if intent is None:
+        intent = Intent(
+            raw_input="",
+            goal="",
+            scope=[],
+            metadata=IntentMetadata(request_id=intent_id, timestamp=_UNKNOWN_TIME, source="serialized"),
+        )
+    elif intent.intent_id != intent_id:
+        raise ValueError(f"Intent '{intent.intent_id}' does not match result for '{intent_id}'.")
+    plan = d.get("plan")
+    verification = d.get("verification")
+    refusal = d.get("refusal")
+    return MediationResult(
+        intent=intent,
+        plan=plan_from_dict(plan) if plan is not None else None,
+        verification=verification_from_dict(verification) if verification is not None else None,
+        refusal=refusal_from_dict(refusal) if refusal is not None else None,
+    )
+
+
+def _parse(data: Union[str, bytes]) -> Any:
+    try:
+        return loads(data)
+    except ValueError as e:  # json.JSONDecodeError and orjson.JSONDecodeError
+        raise ValueError(f"Invalid JSON: {e}") from e
+
+
+def plan_from_bytes(data: Union[str, bytes]) -> Plan:
+    return plan_from_dict(_parse(data))
+
+
+def verification_from_bytes(data: Union[str, bytes]) -> VerificationReport:
+    return verification_from_dict(_parse(data))
+
+
+def refusal_from_bytes(data: Union[str, bytes]) -> RefusalDecision:
+    return refusal_from_dict(_parse(data))
+
+
+def mediation_result_from_bytes(data: Union[str, bytes], *, intent: Optional[Intent] = None) -> "MediationResult":
+    return mediation_result_from_dict(_parse(data), intent=intent)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Compact (non-canonical) JSON bytes for ad-hoc payloads, e.g. error
+    responses; uses orjson when installed.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            pass
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
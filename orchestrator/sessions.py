@@ -0,0 +1,408 @@
+"""
+Aegis V0 — Intent session store (in-memory, no execution)
+
+Holds intents through their lifecycle (AEGIS_INTENT_CARD_SPEC.md) between
+requests, keyed by request_id (= intent_id). Sized for hundreds of
+thousands of open sessions:
+
+- Sharded: keys are spread over `shards` independent shards, each an LRU
+  OrderedDict behind its own lock, so concurrent requests rarely contend.
+- Atomic transitions: transition() checks the allowed-transition table and
+  an optional expected current state, and records the transition, all under
+  the shard lock. Every transition keeps previous state, new state,
+  timestamp and rationale, as the spec requires.
+- TTL: a session not touched for `ttl` seconds is abandoned. Expired
+  sessions are dropped on access and by sweep(), which only looks at the
+  least recently used end of each shard.
+- LRU: capacity is enforced per shard (max_sessions / shards each, as in
+  any lock-striped cache); a full shard evicts its least recently used
+  session. Leave headroom: hashing spreads keys evenly, not exactly.
+- Snapshot: save()/load() write and read all live sessions as JSON lines,
+  so a restarted daemon resumes open sessions. Idle time is carried over
+  and keeps counting while the daemon is down.
+
+Nothing here advances state on its own; callers transition on explicit
+human action.
+
+Authoritative constraints:
+- AEGIS_INTENT_CARD_SPEC.md (Intent Lifecycle States)
+- AEGIS_SECURITY_MODEL.md
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import gc
+import os
+import threading
+import time
+
+from orchestrator.intent import ALLOWED_TRANSITIONS, Intent, IntentState, coerce_state, intent_from_record
+from orchestrator.serialization import dumps, loads
+
+if TYPE_CHECKING:
+    from orchestrator.plan import Plan, PlanAudit
+    from orchestrator.policy import PolicyLike
+
+SNAPSHOT_FORMAT = 1
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StateTransition:
+    previous: IntentState
+    new: IntentState
+    timestamp: datetime
+    rationale: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "previous": self.previous.value,
+            "new": self.new.value,
+            "timestamp": self.timestamp.isoformat(),
+            "rationale": self.rationale,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StateTransition":
+        return cls(
+            previous=coerce_state(data["previous"]),
+            new=coerce_state(data["new"]),
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            rationale=data["rationale"],
+        )
+
+
+class _Session:
+    __slots__ = ("intent", "history", "last_seen")
+
+    def __init__(self, intent: Intent, history: Tuple[StateTransition, ...], last_seen: float) -> None:
+        self.intent = intent
+        self.history = history
+        self.last_seen = last_seen
+
+
+class _Shard:
+    # counters are only changed under `lock`
+    __slots__ = ("lock", "entries", "opened", "closed", "transitions", "expired", "evicted")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, _Session]" = OrderedDict()
+        self.opened = self.closed = self.transitions = self.expired = self.evicted = 0
+
+
+@dataclass(frozen=True)
+class SessionStats:
+    size: int
+    opened: int
+    closed: int
+    transitions: int
+    expired: int
+    evicted: int
+
+
+class IntentSessionStore:
+    """
+    Thread-safe, sharded store of open intent sessions.
+
+    Reads return the (immutable) Intent; transitions and updates replace it
+    atomically. Missing or expired sessions raise KeyError.
+    """
+
+    def __init__(
+        self,
+        *,
+        shards: int = 64,
+        max_sessions: int = 500_000,
+        ttl: Optional[float] = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if shards < 1 or shards & (shards - 1):
+            raise ValueError("shards must be a power of two.")
+        if max_sessions < shards:
+            raise ValueError("max_sessions must be >= shards.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be > 0 when provided.")
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._mask = shards - 1
+        self._shards = tuple(_Shard() for _ in range(shards))
+        # capacity is enforced per shard; hashing keeps shards balanced
+        self._per_shard = -(-max_sessions // shards)
+
+    def _shard(self, request_id: str) -> _Shard:
+        return self._shards[hash(request_id) & self._mask]
+
+    def _insert(self, shard: _Shard, request_id: str, session: _Session) -> None:
+        # caller holds shard.lock
+        entries = shard.entries
+        entries[request_id] = session
+        entries.move_to_end(request_id)
+        while len(entries) > self._per_shard:
+            entries.popitem(last=False)
+            shard.evicted += 1
+
+    def _live(self, shard: _Shard, request_id: str, now: float) -> _Session:
+        # caller holds shard.lock
+        session = shard.entries.get(request_id)
+        if session is None:
+            raise KeyError(request_id)
+        if self.ttl is not None and now - session.last_seen >= self.ttl:
+            del shard.entries[request_id]
+            shard.expired += 1
+            raise KeyError(request_id)
+        session.last_seen = now
+        shard.entries.move_to_end(request_id)
+        return session
+
+    # ---- Sessions ----
+
+    def open(self, intent: Intent) -> Intent:
+        """
+        Start a session for `intent` (in its current state, normally draft).
+        Raises ValueError if a live session with the same id exists.
+        """
+        request_id = intent.intent_id
+        shard = self._shard(request_id)
+        now = self._clock()
+        with shard.lock:
+            try:
+                self._live(shard, request_id, now)
+            except KeyError:
+                pass
+            else:
+                raise ValueError(f"Session '{request_id}' is already open.")
+            self._insert(shard, request_id, _Session(intent, (), now))
+            shard.opened += 1
+        return intent
+
+    def get(self, request_id: str) -> Intent:
+        shard = self._shard(request_id)
+        with shard.lock:
+            return self._live(shard, request_id, self._clock()).intent
+
+    def history(self, request_id: str) -> Tuple[StateTransition, ...]:
+        shard = self._shard(request_id)
+        with shard.lock:
+            return self._live(shard, request_id, self._clock()).history
+
+    def transition(
+        self,
+        request_id: str,
+        state: Union[IntentState, str],
+        *,
+        rationale: str,
+        expected: Union[IntentState, str, None] = None,
+    ) -> Intent:
+        """
+        Move a session to `state` if the lifecycle allows it (and, when
+        `expected` is given, only if it is currently in that state).
+        Raises InvalidTransition otherwise.
+        """
+        new = coerce_state(state)
+        if not isinstance(rationale, str) or not rationale.strip():
+            raise ValueError("A transition requires a rationale.")
+        shard = self._shard(request_id)
+        with shard.lock:
+            session = self._live(shard, request_id, self._clock())
+            current = session.intent.state
+            if expected is not None and current is not coerce_state(expected):
+                raise InvalidTransition(
+                    f"Session '{request_id}' is in state '{current.value}', expected '{coerce_state(expected).value}'."
+                )
+            if new not in ALLOWED_TRANSITIONS[current]:
+                raise InvalidTransition(f"Transition {current.value} -> {new.value} is not allowed.")
+            session.intent = replace(session.intent, state=new)
+            session.history = session.history + (
+                StateTransition(previous=current, new=new, timestamp=datetime.now(timezone.utc), rationale=rationale),
+            )
+            shard.transitions += 1
+            return session.intent
+
+    def update(self, request_id: str, change: Callable[[Intent], Intent]) -> Intent:
+        """
+        Atomically replace a session's intent with change(intent), e.g. to
+        revise requested_steps during clarification. `change` runs under the
+        shard lock and must keep the id and the state.
+        """
+        shard = self._shard(request_id)
+        with shard.lock:
+            session = self._live(shard, request_id, self._clock())
+            updated = change(session.intent)
+            if updated.intent_id != request_id or updated.state is not session.intent.state:
+                raise ValueError("update() must not change the intent id or state; use transition().")
+            session.intent = updated
+            return updated
+
+    def plan(
+        self,
+        request_id: str,
+        *,
+        policy: Optional["PolicyLike"] = None,
+        allowed_actions_json: Optional[Dict[str, Any]] = None,
+        notes: Optional[str] = None,
+        rationale: str = "Dry-run plan generated.",
+    ) -> Tuple["Plan", "PlanAudit"]:
+        """
+        plan_from_intent() for an approved session, then approved -> planned.
+
+        Planning runs outside the shard lock; if the session left the
+        approved state meanwhile, the transition fails and the plan is
+        discarded.
+        """
+        from orchestrator.plan import plan_from_intent
+
+        plan, audit = plan_from_intent(
+            intent=self.get(request_id),
+            allowed_actions_json=allowed_actions_json,
+            policy=policy,
+            notes=notes,
+        )
+        self.transition(request_id, IntentState.PLANNED, rationale=rationale, expected=IntentState.APPROVED)
+        return plan, audit
+
+    def close(self, request_id: str) -> bool:
+        shard = self._shard(request_id)
+        with shard.lock:
+            if shard.entries.pop(request_id, None) is None:
+                return False
+            shard.closed += 1
+            return True
+
+    def __contains__(self, request_id: object) -> bool:
+        if not isinstance(request_id, str):
+            return False
+        shard = self._shard(request_id)
+        with shard.lock:
+            session = shard.entries.get(request_id)
+            return session is not None and (self.ttl is None or self._clock() - session.last_seen < self.ttl)
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    # ---- Eviction ----
+
+    def sweep(self) -> int:
+        """
+        Drop expired sessions; returns how many. Entries are in LRU order,
+        so each shard is scanned only up to its first live session.
+        """
+        if self.ttl is None:
+            return 0
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                deadline = self._clock() - self.ttl
+                entries = shard.entries
+                while entries:
+                    request_id, session = next(iter(entries.items()))
+                    if session.last_seen > deadline:
+                        break
+                    del entries[request_id]
+                    shard.expired += 1
+                    removed += 1
+        return removed
+
+    def stats(self) -> SessionStats:
+        totals = dict.fromkeys(("size", "opened", "closed", "transitions", "expired", "evicted"), 0)
+        for shard in self._shards:
+            with shard.lock:
+                totals["size"] += len(shard.entries)
+                for name in ("opened", "closed", "transitions", "expired", "evicted"):
+                    totals[name] += getattr(shard, name)
+        return SessionStats(**totals)
+
+    # ---- Snapshot ----
+
+    def _records(self) -> Iterator[Tuple[str, _Session, float]]:
+        # one shard locked at a time; sessions are copied, not held
+        for shard in self._shards:
+            with shard.lock:
+                now = self._clock()
+                live = [
+                    (request_id, _Session(s.intent, s.history, s.last_seen), now - s.last_seen)
+                    for request_id, s in shard.entries.items()
+                    if self.ttl is None or now - s.last_seen < self.ttl
+                ]
+            yield from live
+
+    def save(self, path: Union[str, os.PathLike]) -> int:
+        """
+        Write all live sessions to `path` (atomically replaced); returns the
+        number written. Each shard is consistent; shards are taken in turn.
+        """
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        wall = time.time()
+        count = 0
+        try:
+            with open(tmp, "wb") as f:
+                f.write(dumps({"format": SNAPSHOT_FORMAT, "saved_at": wall}) + b"\n")
+                for _request_id, session, idle in self._records():
+                    record = {
+                        "intent": session.intent.to_dict(),
+                        "history": [t.to_dict() for t in session.history],
+                        "last_seen": wall - idle,
+                    }
+                    f.write(dumps(record) + b"\n")
+                    count += 1
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return count
+
+    def load(self, path: Union[str, os.PathLike]) -> int:
+        """
+        Restore sessions written by save() into this store (existing ids
+        are overwritten). Sessions that expired in the meantime are skipped.
+        Returns the number restored; raises ValueError for a foreign or
+        malformed file.
+        """
+        wall = time.time()
+        now = self._clock()
+        restored: List[Tuple[str, _Session]] = []
+        # bulk allocation of long-lived objects: skip the cyclic GC passes
+        # it would otherwise trigger many times over
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, "rb") as f:
+                header = loads(f.readline() or b"null")
+                if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+                    raise ValueError(f"{path} is not an intent session snapshot.")
+                for number, line in enumerate(f, start=2):
+                    try:
+                        record = loads(line)
+                        idle = max(0.0, wall - float(record["last_seen"]))
+                        if self.ttl is not None and idle >= self.ttl:
+                            continue
+                        intent = intent_from_record(record["intent"])
+                        history = tuple([StateTransition.from_dict(t) for t in record.get("history") or ()])
+                    except (KeyError, TypeError, ValueError) as e:
+                        raise ValueError(f"{path}:{number}: malformed session record: {e}") from None
+                    restored.append((intent.intent_id, _Session(intent, history, now - idle)))
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        # oldest first, so LRU order matches the saved store
+        restored.sort(key=lambda item: item[1].last_seen)
+        for request_id, session in restored:
+            shard = self._shard(request_id)
+            with shard.lock:
+                self._insert(shard, request_id, session)
+                shard.opened += 1
+        return len(restored)
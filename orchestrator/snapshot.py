@@ -0,0 +1,359 @@
+"""
+Aegis V0 — Startup snapshot (read-only)
+
+A daemon restart would otherwise re-parse AEGIS_ALLOWED_ACTIONS_V1.json,
+re-parse AEGIS_ACTION_SCHEMA.json and regenerate the schema validators
+(orchestrator.schema_compiler). This module stores the compiled results in
+a versioned snapshot file:
+
+- the policy action index (rows of action, risk, reversible, description)
+- the schema validators as marshaled code objects plus their constants
+
+Snapshots are looked up by a key over the snapshot format, the exact
+interpreter version and the SHA-256 of both source files. Any content
+change (or interpreter upgrade) misses and rebuilds; nothing depends on
+mtimes. The sources themselves are still read and hashed on every start,
+so a snapshot can only skip parsing and compilation, never serve stale
+policy. The last KEEP_SNAPSHOTS files are kept, so rolling back to a
+previous policy is a hit as well.
+
+A snapshot is self-contained (it carries the policy source as well), so
+its bytes can also be handed to other processes as is: the pre-fork
+daemon publishes them in shared memory and its workers restore with
+restore_startup_payload() without touching the source files.
+
+Snapshots contain code and are loaded with marshal: the directory is
+created private to the daemon's user (0700). A snapshot is only loaded if
+the directory and the file are owned by the current user and writable by
+no one else (and neither is a symlink); otherwise it is a miss and nothing
+is written there.
+
+A hit saves compiling the policy index and validators (about 10 ms on the
+reference host). It cannot save the imports the daemon needs anyway
+(asyncio, dataclasses and the mediation modules), which dominate startup.
+
+Authoritative sources:
+- AEGIS_ALLOWED_ACTIONS_V1.json
+- AEGIS_ACTION_SCHEMA.json
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+import hashlib
+import json
+import marshal
+import os
+import stat
+import sys
+import time
+
+from orchestrator.policy import (
+    DEFAULT_POLICY_PATH,
+    CompiledPolicy,
+    compile_policy_bytes,
+    policy_content_hash,
+    policy_index_rows,
+    restore_compiled_policy,
+)
+from orchestrator.schema_compiler import (
+    DEFAULT_DEFS,
+    DEFAULT_SCHEMA_PATH,
+    generate_validator_source,
+    load_validators,
+    register_validators,
+)
+
+SNAPSHOT_FORMAT = 2
+# plan validation uses the object-mode validators (orchestrator.plan)
+SNAPSHOT_MODES = ("object",)
+KEEP_SNAPSHOTS = 8
+
+_PREFIX = "startup-"
+_SUFFIX = ".snapshot"
+
+
+def default_snapshot_dir() -> Path:
+    """
+    $AEGIS_CACHE_DIR, else $XDG_CACHE_HOME/aegis, else ~/.cache/aegis.
+    """
+    explicit = os.environ.get("AEGIS_CACHE_DIR")
+    if explicit:
+        return Path(explicit)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "aegis"
+
+
+def snapshot_key(
+    policy_hash: str,
+    schema_hash: str,
+    *,
+    modes: Iterable[str] = SNAPSHOT_MODES,
+    defs: Iterable[str] = DEFAULT_DEFS,
+) -> str:
+    h = hashlib.sha256()
+    # code objects are only portable within one interpreter build
+    interpreter = f"{sys.implementation.cache_tag}:{sys.hexversion:x}:{marshal.version}"
+    for part in (str(SNAPSHOT_FORMAT), interpreter, policy_hash, schema_hash, ",".join(modes), ",".join(defs)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class StartupLoad:
+    """
+    Outcome of load_startup().
+
+    status: "hit" (restored from a snapshot), "miss" (compiled from source;
+    a snapshot was written unless `error` says otherwise) or "off"
+    (snapshots disabled). `payload` holds the snapshot bytes in every case
+    (see restore_startup_payload).
+    """
+    policy: CompiledPolicy
+    status: str
+    path: Optional[Path]
+    seconds: float
+    error: Optional[str] = None
+    payload: bytes = field(default=b"", repr=False)
+
+
+# ---- Build / restore ----
+
+def _compile_validators(schema: Dict[str, Any], schema_hash: str, mode: str) -> Tuple[Any, Dict[str, Any], str]:
+    source, consts = generate_validator_source(schema, DEFAULT_DEFS, mode)
+    code = compile(source, f"<aegis-schema:{schema_hash[:12]}:{mode}>", "exec")
+    return code, consts, source
+
+
+def _build(
+    policy_data: bytes,
+    schema_data: bytes,
+    schema_hash: str,
+    modes: Tuple[str, ...],
+    schema_path: Union[str, os.PathLike],
+) -> Tuple[CompiledPolicy, Dict[str, Any]]:
+    policy = compile_policy_bytes(policy_data)
+    try:
+        schema = json.loads(schema_data)
+    except ValueError as e:
+        raise ValueError(f"Action schema is not valid JSON: {e}") from e
+    validators: Dict[str, Any] = {}
+    for mode in modes:
+        code, consts, source = _compile_validators(schema, schema_hash, mode)
+        register_validators(load_validators(code, consts, DEFAULT_DEFS, source), schema_hash, mode, schema_path)
+        validators[mode] = (code, consts, source)
+    return policy, validators
+
+
+def _restore(
+    payload: Any,
+    key: str,
+    policy_data: bytes,
+    policy_hash: str,
+    schema_hash: str,
+    schema_path: Union[str, os.PathLike],
+) -> CompiledPolicy:
+    if not isinstance(payload, dict) or payload.get("format") != SNAPSHOT_FORMAT or payload.get("key") != key:
+        raise ValueError("snapshot does not match its key")
+    policy = restore_compiled_policy(policy_data, policy_hash, payload["policy_version"], payload["policy_rows"])
+    defs = tuple(payload["defs"])
+    for mode, (code, consts, source) in payload["validators"].items():
+        register_validators(load_validators(code, consts, defs, source), schema_hash, mode, schema_path)
+    return policy
+
+
+def _payload(policy: CompiledPolicy, key: str, schema_hash: str, validators: Dict[str, Any]) -> bytes:
+    return marshal.dumps(
+        {
+            "format": SNAPSHOT_FORMAT,
+            "key": key,
+            "policy_version": policy.version,
+            "policy_rows": policy_index_rows(policy),
+            "policy_source": policy.source,
+            "policy_hash": policy.content_hash,
+            "schema_hash": schema_hash,
+            "defs": DEFAULT_DEFS,
+            "validators": validators,
+        }
+    )
+
+
+def restore_startup_payload(
+    data: Any,
+    schema_path: Union[str, os.PathLike, None] = None,
+) -> CompiledPolicy:
+    """
+    Register the policy and validators held in snapshot bytes (any
+    bytes-like object, e.g. a read-only mmap) and return the policy.
+    Raises ValueError if the bytes are not a snapshot of this format and
+    interpreter, or do not match their own key.
+    """
+    try:
+        payload = marshal.loads(data)
+        policy_data = payload["policy_source"]
+        policy_hash = payload["policy_hash"]
+        schema_hash = payload["schema_hash"]
+        key = snapshot_key(policy_hash, schema_hash, modes=tuple(payload["validators"]), defs=payload["defs"])
+    except (EOFError, TypeError, KeyError) as e:
+        raise ValueError(f"not a startup snapshot: {e!r}") from None
+    if policy_content_hash(policy_data) != policy_hash:
+        raise ValueError("snapshot policy source does not match its hash")
+    return _restore(payload, key, policy_data, policy_hash, schema_hash, schema_path or DEFAULT_SCHEMA_PATH)
+
+
+def _untrusted(st: os.stat_result, kind: str) -> Optional[str]:
+    getuid = getattr(os, "getuid", None)
+    if getuid is not None and st.st_uid != getuid():
+        return f"{kind} is owned by uid {st.st_uid}"
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return f"{kind} is writable by group or others"
+    return None
+
+
+def _check_directory(directory: Path) -> Optional[str]:
+    """
+    Why snapshots in `directory` must not be trusted, or None. A missing
+    directory is fine: _write creates it private.
+    """
+    try:
+        st = os.lstat(directory)
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISDIR(st.st_mode):
+        return "snapshot directory is not a directory (or is a symlink)"
+    return _untrusted(st, "snapshot directory")
+
+
+def _read_trusted(path: Path) -> bytes:
+    """
+    Snapshot bytes, if the file is a regular file owned by us and writable
+    by no one else; raises ValueError otherwise (FileNotFoundError if
+    absent). Checked on the open descriptor, so the file cannot be swapped
+    after the check.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    with os.fdopen(fd, "rb") as f:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode):
+            raise ValueError("not a regular file")
+        reason = _untrusted(st, "snapshot")
+        if reason is not None:
+            raise ValueError(reason)
+        return f.read()
+
+
+def _write(path: Path, payload: bytes) -> None:
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def prune_snapshots(directory: Union[str, os.PathLike], keep: int = KEEP_SNAPSHOTS) -> int:
+    """
+    Delete all but the `keep` most recently written snapshots; returns how
+    many were removed.
+    """
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.startswith(_PREFIX) and entry.name.endswith(_SUFFIX):
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+            except OSError:
+                continue
+    entries.sort(reverse=True)
+    removed = 0
+    for _mtime, path in entries[keep:]:
+        try:
+            os.unlink(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def load_startup(
+    policy_path: Union[str, os.PathLike] = DEFAULT_POLICY_PATH,
+    schema_path: Union[str, os.PathLike, None] = None,
+    *,
+    directory: Union[str, os.PathLike, None] = None,
+    modes: Iterable[str] = SNAPSHOT_MODES,
+    enabled: bool = True,
+) -> StartupLoad:
+    """
+    Compile (or restore) the policy index and schema validators for a
+    daemon start. Afterwards load_policy()/PolicyRegistry and
+    compiled_validators() return the registered objects without compiling.
+
+    Snapshot problems never fail startup: an unreadable or mismatching
+    snapshot falls back to compiling from source, an unwritable directory
+    only skips writing. Invalid policy or schema files raise ValueError as
+    usual.
+    """
+    started = time.perf_counter()
+    modes = tuple(modes)
+    schema_path = schema_path or DEFAULT_SCHEMA_PATH
+    policy_data = Path(policy_path).read_bytes()
+    schema_data = Path(schema_path).read_bytes()
+    policy_hash = policy_content_hash(policy_data)
+    schema_hash = hashlib.sha256(schema_data).hexdigest()
+
+    key = snapshot_key(policy_hash, schema_hash, modes=modes)
+    if not enabled:
+        policy, validators = _build(policy_data, schema_data, schema_hash, modes, schema_path)
+        return StartupLoad(
+            policy=policy,
+            status="off",
+            path=None,
+            seconds=time.perf_counter() - started,
+            payload=_payload(policy, key, schema_hash, validators),
+        )
+
+    directory = Path(directory) if directory is not None else default_snapshot_dir()
+    path = directory / f"{_PREFIX}{key[:32]}{_SUFFIX}"
+
+    # an untrusted directory is a miss: nothing is read from or written to it
+    untrusted = _check_directory(directory)
+    error: Optional[str] = None
+    if untrusted is None:
+        try:
+            data = _read_trusted(path)
+            policy = _restore(marshal.loads(data), key, policy_data, policy_hash, schema_hash, schema_path)
+            return StartupLoad(
+                policy=policy, status="hit", path=path, seconds=time.perf_counter() - started, payload=data
+            )
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, ValueError, TypeError, KeyError) as e:
+            error = f"ignored unreadable snapshot {path}: {e}"
+
+    policy, validators = _build(policy_data, schema_data, schema_hash, modes, schema_path)
+    payload = _payload(policy, key, schema_hash, validators)
+    if untrusted is not None:
+        error = f"not using snapshot directory {directory}: {untrusted}"
+    else:
+        try:
+            _write(path, payload)
+            prune_snapshots(directory)
+        except (OSError, ValueError) as e:
+            error = f"could not write snapshot {path}: {e}"
+    return StartupLoad(
+        policy=policy,
+        status="miss",
+        path=path,
+        seconds=time.perf_counter() - started,
+        error=error,
+        payload=payload,
+    )
@@ -4,6 +4,10 @@ Aegis V0 — Verification pipeline (stubs only)
 Verifiers examine a dry-run Plan and produce explain-only findings.
 They do not execute actions, mutate state, or approve execution.
 
+Verifiers are registered in a VerifierRegistry and declare a per-step hook,
+a per-plan hook, or both. The registry fuses all step hooks into a single
+traversal of plan.steps, so adding verifiers does not add passes.
+
 Authoritative constraints:
 - AEGIS_IMPLEMENTATION_ROADMAP.md (V0 — Skeleton)
 - AEGIS_SECURITY_MODEL.md
@@ -11,11 +15,13 @@ Authoritative constraints:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import itertools
+import time
 
-from orchestrator.plan import Plan
+from orchestrator.plan import Plan, PlanStep
 
 
 class VerificationLevel(str, Enum):
@@ -29,11 +35,16 @@ class VerificationFinding:
     level: VerificationLevel
     message: str
     step_id: Optional[int] = None
+    code: str = "UNSPECIFIED"
 
 
 @dataclass(frozen=True)
 class VerificationReport:
     findings: List[VerificationFinding]
+    # verifier name -> nanoseconds spent, when timings were requested
+    timings: Optional[Dict[str, int]] = field(default=None, compare=False)
+    # canonical JSON, filled by orchestrator.serialization on first encode
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def has_blockers(self) -> bool:
@@ -44,6 +55,7 @@ class VerificationReport:
             "findings": [
                 {
                     "level": f.level.value,
+                    "code": f.code,
                     "message": f.message,
                     "step_id": f.step_id,
                 }
@@ -51,28 +63,304 @@ class VerificationReport:
             ]
         }
 
+    def to_json(self) -> bytes:
+        from orchestrator.serialization import verification_to_json
+
+        return verification_to_json(self)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "VerificationReport":
+        from orchestrator.serialization import verification_from_dict
+
+        return verification_from_dict(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "VerificationReport":
+        from orchestrator.serialization import verification_from_bytes
+
+        return verification_from_bytes(data)
+
+
+# ---- Verifier registry ----
+
+# registry versions are drawn from one counter, so no two registries (or
+# two states of one registry) ever share a version within a process
+_REGISTRY_VERSIONS = itertools.count(1)
+
+StepHook = Callable[[PlanStep], Sequence[VerificationFinding]]
+PlanHook = Callable[[Plan], Sequence[VerificationFinding]]
+
+# returned by step hooks that found nothing (avoids a fresh list per step)
+NO_FINDINGS: Tuple[VerificationFinding, ...] = ()
+
+
+@dataclass(frozen=True)
+class Verifier:
+    """
+    A named verifier.
+
+    step_hook runs once per step; plan_hook once per plan, after the step
+    traversal. Hooks must be pure: same input, same findings.
+    """
+    name: str
+    step_hook: Optional[StepHook] = None
+    plan_hook: Optional[PlanHook] = None
+
+    def __post_init__(self) -> None:
+        if self.step_hook is None and self.plan_hook is None:
+            raise ValueError(f"Verifier '{self.name}' must declare a step_hook or a plan_hook.")
+
+
+class VerifierRegistry:
+    """
+    Ordered set of verifiers run as one fused pass over a plan.
+
+    Findings are reported grouped by verifier in registration order (step
+    findings in step order, then plan findings), which is what the
+    verifiers would produce if each ran its own loop.
+    """
+
+    def __init__(self, verifiers: Iterable[Verifier] = ()) -> None:
+        self._verifiers: Tuple[Verifier, ...] = ()
+        self._step_hooks: Tuple[Tuple[int, StepHook], ...] = ()
+        self._plan_hooks: Tuple[Tuple[int, PlanHook], ...] = ()
+        self._version = next(_REGISTRY_VERSIONS)
+        for verifier in verifiers:
+            self.register(verifier)
+
+    def register(self, verifier: Verifier) -> Verifier:
+        if any(v.name == verifier.name for v in self._verifiers):
+            raise ValueError(f"Verifier '{verifier.name}' is already registered.")
+        self._rebuild(self._verifiers + (verifier,))
+        return verifier
+
+    def unregister(self, name: str) -> None:
+        remaining = tuple(v for v in self._verifiers if v.name != name)
+        if len(remaining) == len(self._verifiers):
+            raise KeyError(name)
+        self._rebuild(remaining)
+
+    def _rebuild(self, verifiers: Tuple[Verifier, ...]) -> None:
+        # publish all tuples and the version together; readers take them in one go
+        self._verifiers, self._step_hooks, self._plan_hooks, self._version = (
+            verifiers,
+            tuple((i, v.step_hook) for i, v in enumerate(verifiers) if v.step_hook is not None),
+            tuple((i, v.plan_hook) for i, v in enumerate(verifiers) if v.plan_hook is not None),
+            next(_REGISTRY_VERSIONS),
+        )
+
+    def copy(self) -> "VerifierRegistry":
+        return VerifierRegistry(self._verifiers)
+
+    @property
+    def version(self) -> int:
+        """
+        Changes on every register()/unregister() and differs between
+        registries, e.g. for keying cached outcomes on the verifier set.
+        """
+        return self._version
+
+    @property
+    def names(self) -> List[str]:
+        return [v.name for v in self._verifiers]
+
+    def __iter__(self):
+        return iter(self._verifiers)
+
+    def __len__(self) -> int:
+        return len(self._verifiers)
+
+    def run(
+        self,
+        plan: Plan,
+        *,
+        stop_at_first_block: bool = False,
+        collect_timings: bool = False,
+    ) -> VerificationReport:
+        """
+        Verify a plan in one traversal of its steps.
+
+        stop_at_first_block returns as soon as any BLOCK finding appears; the
+        report then only holds findings gathered so far, but has_blockers
+        is exact. collect_timings records per-verifier time (ns) in
+        report.timings.
+        """
+        verifiers, step_hooks, plan_hooks = self._verifiers, self._step_hooks, self._plan_hooks
+        buckets: List[List[VerificationFinding]] = [[] for _ in verifiers]
+        timings: Optional[List[int]] = [0] * len(verifiers) if collect_timings else None
+
+        if timings is None and not stop_at_first_block:
+            # hot path: no per-hook bookkeeping
+            for step in plan.steps:
+                for i, hook in step_hooks:
+                    found = hook(step)
+                    if found:
+                        buckets[i].extend(found)
+            for i, hook in plan_hooks:
+                found = hook(plan)
+                if found:
+                    buckets[i].extend(found)
+            return VerificationReport(findings=_flatten(buckets))
+
+        clock = time.perf_counter_ns
+        blocked = False
+        for step in plan.steps:
+            for i, hook in step_hooks:
+                if timings is not None:
+                    t0 = clock()
+                    found = hook(step)
+                    timings[i] += clock() - t0
+                else:
+                    found = hook(step)
+                if found:
+                    buckets[i].extend(found)
+                    if stop_at_first_block and _any_block(found):
+                        blocked = True
+                        break
+            if blocked:
+                break
+
+        if not blocked:
+            for i, hook in plan_hooks:
+                if timings is not None:
+                    t0 = clock()
+                    found = hook(plan)
+                    timings[i] += clock() - t0
+                else:
+                    found = hook(plan)
+                if found:
+                    buckets[i].extend(found)
+                    if stop_at_first_block and _any_block(found):
+                        break
+
+        return VerificationReport(
+            findings=_flatten(buckets),
+            timings={v.name: t for v, t in zip(verifiers, timings)} if timings is not None else None,
+        )
+
+    # ---- Incremental verification (see orchestrator.amendment) ----
+
+    @property
+    def step_hooks(self) -> Tuple[StepHook, ...]:
+        return tuple(hook for _, hook in self._step_hooks)
+
+    def step_findings(self, step: PlanStep) -> Tuple[Sequence[VerificationFinding], ...]:
+        """
+        Findings of every step hook for one step, in step_hooks order.
+        """
+        return tuple([hook(step) for _, hook in self._step_hooks])
+
+    def assemble(
+        self,
+        plan: Plan,
+        per_step: Sequence[Tuple[Sequence[VerificationFinding], ...]],
+    ) -> VerificationReport:
+        """
+        The report run(plan) would return, built from step_findings() of
+        each step (aligned with plan.steps). Only plan hooks are run.
+        """
+        if len(per_step) != len(plan.steps):
+            raise ValueError("per_step must hold one entry per plan step.")
+        by_hook: List[List[VerificationFinding]] = [[] for _ in self._step_hooks]
+        for found_by_hook in per_step:
+            if len(found_by_hook) != len(by_hook):
+                raise ValueError("Step findings were produced by a different set of step hooks.")
+            for bucket, found in zip(by_hook, found_by_hook):
+                if found:
+                    bucket.extend(found)
+        return self.assemble_by_hook(plan, by_hook)
+
+    def assemble_by_hook(
+        self,
+        plan: Plan,
+        by_hook: Sequence[Sequence[VerificationFinding]],
+    ) -> VerificationReport:
+        """
+        Like assemble(), from each step hook's findings over all steps (in
+        step_hooks order, steps in plan order), e.g. gathered while the
+        plan was streamed (orchestrator.plan_stream). Only plan hooks are run.
+        """
+        verifiers, step_hooks, plan_hooks = self._verifiers, self._step_hooks, self._plan_hooks
+        if len(by_hook) != len(step_hooks):
+            raise ValueError("Step findings were produced by a different set of step hooks.")
+        buckets: List[List[VerificationFinding]] = [[] for _ in verifiers]
+        for (i, _hook), found in zip(step_hooks, by_hook):
+            if found:
+                buckets[i].extend(found)
+        for i, hook in plan_hooks:
+            found = hook(plan)
+            if found:
+                buckets[i].extend(found)
+        return VerificationReport(findings=_flatten(buckets))
+
+
+def _flatten(buckets: List[List[VerificationFinding]]) -> List[VerificationFinding]:
+    if len(buckets) == 1:
+        return buckets[0]
+    findings: List[VerificationFinding] = []
+    for bucket in buckets:
+        findings.extend(bucket)
+    return findings
+
+
+def _any_block(findings: Sequence[VerificationFinding]) -> bool:
+    return any(f.level == VerificationLevel.BLOCK for f in findings)
+
+
+# ---- Built-in verifiers ----
+
+def check_step_requires_confirmation(step: PlanStep) -> Sequence[VerificationFinding]:
+    """
+    Warn if a step with Medium or High risk does not require confirmation.
+    """
+    if step.risk.value in ("Medium", "High") and not step.requires_confirmation:
+        return (
+            VerificationFinding(
+                level=VerificationLevel.WARN,
+                code="CONFIRMATION_REQUIRED",
+                step_id=step.step_id,
+                message=(
+                    f"Step {step.step_id} has risk level '{step.risk.value}' "
+                    "but does not require explicit confirmation."
+                ),
+            ),
+        )
+    return NO_FINDINGS
+
+
+def check_step_scope_is_present(step: PlanStep) -> Sequence[VerificationFinding]:
+    """
+    Block if a step lacks scope constraints entirely.
+    """
+    constraints = step.scope.constraints
+    if not (
+        constraints.paths
+        or constraints.domains
+        or constraints.apps
+        or constraints.methods
+        or constraints.max_bytes is not None
+    ):
+        return (
+            VerificationFinding(
+                level=VerificationLevel.BLOCK,
+                code="SCOPE_UNBOUNDED",
+                step_id=step.step_id,
+                message=(
+                    f"Step {step.step_id} has no scope constraints defined. "
+                    "Unbounded scope is not permitted."
+                ),
+            ),
+        )
+    return NO_FINDINGS
 
-# ---- Verifier stubs ----
 
 def verify_requires_confirmation(plan: Plan) -> List[VerificationFinding]:
     """
     Warn if a step with Medium or High risk does not require confirmation.
     """
     findings: List[VerificationFinding] = []
-
     for step in plan.steps:
-        if step.risk.value in ("Medium", "High") and not step.requires_confirmation:
-            findings.append(
-                VerificationFinding(
-                    level=VerificationLevel.WARN,
-                    step_id=step.step_id,
-                    message=(
-                        f"Step {step.step_id} has risk level '{step.risk.value}' "
-                        "but does not require explicit confirmation."
-                    ),
-                )
-            )
-
+        findings.extend(check_step_requires_confirmation(step))
     return findings
 
 
@@ -81,41 +369,51 @@ def verify_scope_is_present(plan: Plan) -> List[VerificationFinding]:
     Block if any step lacks scope constraints entirely.
     """
     findings: List[VerificationFinding] = []
-
     for step in plan.steps:
-        constraints = step.scope.constraints
-        if not any(
-            [
-                constraints.paths,
-                constraints.domains,
-                constraints.apps,
-                constraints.methods,
-                constraints.max_bytes is not None,
-            ]
-        ):
-            findings.append(
-                VerificationFinding(
-                    level=VerificationLevel.BLOCK,
-                    step_id=step.step_id,
-                    message=(
-                        f"Step {step.step_id} has no scope constraints defined. "
-                        "Unbounded scope is not permitted."
-                    ),
-                )
-            )
-
+        findings.extend(check_step_scope_is_present(step))
     return findings
 
 
-# ---- Verification entry point ----
+# V0 verifiers, in the order their findings are reported
+DEFAULT_VERIFIERS = VerifierRegistry(
+    [
+        Verifier(name="requires_confirmation", step_hook=check_step_requires_confirmation),
+        Verifier(name="scope_is_present", step_hook=check_step_scope_is_present),
+    ]
+)
 
-def run_verification(plan: Plan) -> VerificationReport:
+
+def register_verifier(verifier: Verifier) -> Verifier:
     """
-    Run all V0 verifier stubs against a plan and return a report.
+    Add a verifier to the default registry used by run_verification.
     """
-    findings: List[VerificationFinding] = []
+    return DEFAULT_VERIFIERS.register(verifier)
 
-    findings.extend(verify_requires_confirmation(plan))
-    findings.extend(verify_scope_is_present(plan))
 
-    return VerificationReport(findings=findings)
+def resolve_registry(registry: Optional[VerifierRegistry]) -> VerifierRegistry:
+    """
+    Return `registry`, or DEFAULT_VERIFIERS when it is None.
+
+    An empty registry is falsy (__len__) but still means "no verifiers",
+    so callers must not write `registry or DEFAULT_VERIFIERS`.
+    """
+    return DEFAULT_VERIFIERS if registry is None else registry
+
+
+# ---- Verification entry point ----
+
+def run_verification(
+    plan: Plan,
+    *,
+    registry: Optional[VerifierRegistry] = None,
+    stop_at_first_block: bool = False,
+    collect_timings: bool = False,
+) -> VerificationReport:
+    """
+    Run all registered verifiers against a plan and return a report.
+    """
+    return resolve_registry(registry).run(
+        plan,
+        stop_at_first_block=stop_at_first_block,
+        collect_timings=collect_timings,
+    )
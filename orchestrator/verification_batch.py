@@ -0,0 +1,289 @@
+"""
+Aegis V0 — Columnar batch verification (explain-only)
+
+Re-verifying a queue of plans one Python object at a time costs a few
+attribute lookups and hook calls per step. This module packs the steps of
+many plans into columns once:
+
+- risk        uint8   (0 Low, 1 Medium, 2 High)
+- reversible  bool
+- confirm     bool    (requires_confirmation)
+- mask        uint8   constraint presence bits (CONSTRAINT_* below)
+- max_bytes   int64   (-1 when absent or not an integer)
+- step_id     int64
+- offsets     int64   plan i owns steps offsets[i]:offsets[i + 1]
+
+The built-in verifiers are then evaluated as array expressions over the
+whole batch. Findings are only materialized for flagged steps, by calling
+the same step hook run_verification uses, so reports are identical to
+running run_verification on each plan. Verifiers without a vectorized form
+(e.g. scope grants) run per plan as usual, keeping registration order.
+
+NumPy is optional. Without it, packing still works and verification falls
+back to the per-plan path.
+
+Authoritative constraints:
+- AEGIS_IMPLEMENTATION_ROADMAP.md (V0 — Skeleton)
+- AEGIS_SECURITY_MODEL.md
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from orchestrator.plan import EMPTY_CONSTRAINTS, Plan, PlanStep, RiskLevel
+from orchestrator.verification import (
+    VerificationFinding,
+    VerificationLevel,
+    VerificationReport,
+    VerifierRegistry,
+    check_step_requires_confirmation,
+    check_step_scope_is_present,
+    resolve_registry,
+)
+
+HAVE_NUMPY = np is not None
+
+CONSTRAINT_PATHS = 1
+CONSTRAINT_DOMAINS = 2
+CONSTRAINT_APPS = 4
+CONSTRAINT_METHODS = 8
+CONSTRAINT_MAX_BYTES = 16
+
+_RISK_CODES = {"Low": 0, "Medium": 1, "High": 2}
+_RISK_MEDIUM = 1
+# Enum .value is a descriptor call; members are singletons, so map by id
+_RISK_BY_MEMBER = {id(level): _RISK_CODES[level.value] for level in RiskLevel}
+
+
+@dataclass(frozen=True)
+class StepColumns:
+    """
+    A packed batch as NumPy arrays (copies; safe to keep).
+    """
+    risk: Any
+    reversible: Any
+    confirm: Any
+    mask: Any
+    max_bytes: Any
+    step_id: Any
+    offsets: Any
+
+    def __len__(self) -> int:
+        return len(self.risk)
+
+    def plan_of(self, step_indices: Any) -> Any:
+        """
+        Plan index owning each global step index.
+        """
+        return np.searchsorted(self.offsets, step_indices, side="right") - 1
+
+
+class PlanBatch:
+    """
+    An append-only batch of plans packed into step columns.
+
+    Packing happens as plans are added, so a queue that is re-verified
+    repeatedly (e.g. after registering a verifier) pays it once.
+    """
+
+    def __init__(self, plans: Iterable[Plan] = ()) -> None:
+        self._plans: List[Plan] = []
+        self._steps: List[PlanStep] = []
+        # plain lists: extending them is cheaper than array.array, and
+        # np.array() converts them in one C pass
+        self._risk: List[int] = []
+        self._reversible: List[bool] = []
+        self._confirm: List[bool] = []
+        self._mask: List[int] = []
+        self._max_bytes: List[int] = []
+        self._step_id: List[int] = []
+        self._offsets: List[int] = [0]
+        self._columns: Optional[StepColumns] = None
+        self.extend(plans)
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    @property
+    def plans(self) -> List[Plan]:
+        return list(self._plans)
+
+    @property
+    def step_count(self) -> int:
+        return len(self._steps)
+
+    def append(self, plan: Plan) -> None:
+        self.extend((plan,))
+
+    def extend(self, plans: Iterable[Plan]) -> None:
+        plans = list(plans)
+        if not plans:
+            return
+        start = len(self._steps)
+        for plan in plans:
+            self._steps.extend(plan.steps)
+            self._offsets.append(len(self._steps))
+        self._plans.extend(plans)
+
+        # one pass per column: cheaper than six appends per step
+        new_steps = self._steps[start:] if start else self._steps
+        by_member = _RISK_BY_MEMBER
+        risk = [by_member.get(id(s.risk), -1) for s in new_steps]
+        if -1 in risk:
+            for i, code in enumerate(risk):
+                if code == -1:
+                    risk[i] = _RISK_CODES.get(getattr(new_steps[i].risk, "value", None), 0)
+        constraints = [s.scope.constraints for s in new_steps]
+        self._risk.extend(risk)
+        self._reversible.extend([not not s.reversible for s in new_steps])
+        self._confirm.extend([not not s.requires_confirmation for s in new_steps])
+        self._mask.extend([
+            0 if c is EMPTY_CONSTRAINTS else
+            (CONSTRAINT_PATHS if c.paths else 0)
+            | (CONSTRAINT_DOMAINS if c.domains else 0)
+            | (CONSTRAINT_APPS if c.apps else 0)
+            | (CONSTRAINT_METHODS if c.methods else 0)
+            | (CONSTRAINT_MAX_BYTES if c.max_bytes is not None else 0)
+            for c in constraints
+        ])
+        self._max_bytes.extend([c.max_bytes if type(c.max_bytes) is int else -1 for c in constraints])
+        self._step_id.extend([s.step_id for s in new_steps])
+        self._columns = None
+
+    def columns(self) -> StepColumns:
+        """
+        The packed columns as NumPy arrays. Requires NumPy.
+        """
+        if np is None:
+            raise RuntimeError("Columnar verification requires numpy.")
+        if self._columns is None:
+            self._columns = StepColumns(
+                risk=np.array(self._risk, dtype=np.uint8),
+                reversible=np.array(self._reversible, dtype=bool),
+                confirm=np.array(self._confirm, dtype=bool),
+                mask=np.array(self._mask, dtype=np.uint8),
+                max_bytes=np.array(self._max_bytes, dtype=np.int64),
+                step_id=np.array(self._step_id, dtype=np.int64),
+                offsets=np.array(self._offsets, dtype=np.int64),
+            )
+        return self._columns
+
+    def verify(self, *, registry: Optional[VerifierRegistry] = None) -> List[VerificationReport]:
+        """
+        One VerificationReport per plan, in batch order; identical to
+        run_verification(plan, registry=registry) for each plan.
+        """
+        registry = resolve_registry(registry)
+        per_plan: List[List[VerificationFinding]] = [[] for _ in self._plans]
+
+        # verifiers run outermost, so findings stay grouped per verifier in
+        # registration order and in step order within a verifier
+        for verifier in registry:
+            vectorized = _VECTORIZED.get(verifier.step_hook) if verifier.plan_hook is None else None
+            if vectorized is not None and np is not None:
+                self._run_vectorized(verifier.step_hook, vectorized, per_plan)
+            else:
+                single = VerifierRegistry([verifier])
+                for findings, plan in zip(per_plan, self._plans):
+                    findings.extend(single.run(plan).findings)
+
+        return [VerificationReport(findings=findings) for findings in per_plan]
+
+    def has_blockers(self, *, registry: Optional[VerifierRegistry] = None) -> Any:
+        """
+        Boolean array, one entry per plan: would its report have blockers?
+
+        Stays in array form for vectorized verifiers (no findings are
+        built), which makes it the cheap way to triage a large queue.
+        """
+        if np is None:
+            raise RuntimeError("Columnar verification requires numpy.")
+        registry = resolve_registry(registry)
+        blocked = np.zeros(len(self._plans), dtype=bool)
+        for verifier in registry:
+            vectorized = _VECTORIZED.get(verifier.step_hook) if verifier.plan_hook is None else None
+            if vectorized is not None:
+                if vectorized.level is VerificationLevel.BLOCK and self._steps:
+                    cols = self.columns()
+                    blocked[cols.plan_of(np.flatnonzero(vectorized.flag(cols)))] = True
+            else:
+                single = VerifierRegistry([verifier])
+                for i, plan in enumerate(self._plans):
+                    if not blocked[i] and single.run(plan, stop_at_first_block=True).has_blockers:
+                        blocked[i] = True
+        return blocked
+
+    def _run_vectorized(
+        self,
+        hook: Callable[[PlanStep], Any],
+        vectorized: "_Vectorized",
+        per_plan: List[List[VerificationFinding]],
+    ) -> None:
+        if not self._steps:
+            return
+        cols = self.columns()
+        flagged = np.flatnonzero(vectorized.flag(cols))
+        if not len(flagged):
+            return
+        # findings are frozen and determined by the key columns, so each
+        # distinct key is built once (by the scalar hook) and shared
+        memo: Dict[int, Any] = {}
+        steps = self._steps
+        keys = vectorized.key(cols)[flagged].tolist()
+        for g, p, k in zip(flagged.tolist(), cols.plan_of(flagged).tolist(), keys):
+            found = memo.get(k)
+            if found is None:
+                found = memo[k] = hook(steps[g])
+            per_plan[p].extend(found)
+
+
+# ---- Vectorized forms of the built-in verifiers ----
+
+def flag_requires_confirmation(cols: StepColumns) -> Any:
+    # check_step_requires_confirmation: Medium/High risk without confirmation
+    return (cols.risk >= _RISK_MEDIUM) & ~cols.confirm
+
+
+def flag_scope_unbounded(cols: StepColumns) -> Any:
+    # check_step_scope_is_present: no constraint of any kind
+    return cols.mask == 0
+
+
+@dataclass(frozen=True)
+class _Vectorized:
+    flag: Callable[[StepColumns], Any]
+    level: VerificationLevel
+    # columns that fully determine the hook's findings for a flagged step
+    key: Callable[[StepColumns], Any]
+
+
+_VECTORIZED: Dict[Callable[..., Any], _Vectorized] = {
+    check_step_requires_confirmation: _Vectorized(
+        flag=flag_requires_confirmation,
+        level=VerificationLevel.WARN,
+        key=lambda cols: cols.step_id * 4 + cols.risk,
+    ),
+    check_step_scope_is_present: _Vectorized(
+        flag=flag_scope_unbounded,
+        level=VerificationLevel.BLOCK,
+        key=lambda cols: cols.step_id,
+    ),
+}
+
+
+def verify_batch(
+    plans: Iterable[Plan],
+    *,
+    registry: Optional[VerifierRegistry] = None,
+) -> List[VerificationReport]:
+    """
+    Verify many plans at once; see PlanBatch.verify.
+    """
+    return PlanBatch(plans).verify(registry=registry)
@@ -0,0 +1,27 @@
+import pytest
+
+from orchestrator.intent import intent_from_dict
+from orchestrator.policy import load_policy
+
+
+def requested_step(action="fs.read", *, paths=("/srv/a.txt",), domains=(), apps=(), max_bytes=None,
+                   requires_confirmation=True, scope_token="t"):
+    constraints = {"paths": list(paths), "domains": list(domains), "apps": list(apps), "methods": []}
+    if max_bytes is not None:
+        constraints["max_bytes"] = max_bytes
+    return {
+        "action": action,
+        "args": {},
+        "scope_token": scope_token,
+        "constraints": constraints,
+        "requires_confirmation": requires_confirmation,
+    }
+
+
+def make_intent(steps, **extra):
+    return intent_from_dict({"raw_input": "test", "requested_steps": list(steps), **extra})
+
+
+@pytest.fixture(scope="session")
+def policy():
+    return load_policy()
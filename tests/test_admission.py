@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+
+from daemon.admission import AdmissionController, AdmissionLimits, tenant_of
+from daemon.server import MediationServer
+from orchestrator.intent import intent_from_dict
+from orchestrator.policy import PolicyRegistry
+
+from tests.conftest import make_intent, requested_step
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _codes(refusal):
+    return [r.code for r in refusal.reasons] if refusal is not None else []
+
+
+def test_user_bucket_refuses_over_burst_and_refills(policy):
+    clock = FakeClock()
+    admission = AdmissionController(AdmissionLimits(user_rate=1.0, user_burst=2), clock=clock)
+    intents = [make_intent([requested_step()], user_id="u") for _ in range(3)]
+    assert admission.offer(intents[0], 0, policy=policy)[0] is None
+    assert admission.offer(intents[1], 1, policy=policy)[0] is None
+    assert _codes(admission.offer(intents[2], 2, policy=policy)[0]) == ["ADMISSION_RATE_LIMITED"]
+    clock.now = 1.0
+    assert admission.offer(intents[2], 2, policy=policy)[0] is None
+
+
+def test_principal_keys_buckets_and_tenant_not_claimed_user(policy):
+    # regression: rotating user_id per request bought a fresh bucket each time
+    admission = AdmissionController(AdmissionLimits(user_rate=1.0, user_burst=2), clock=FakeClock())
+    results = [
+        admission.offer(make_intent([requested_step()], user_id=f"u{i}"), i, policy=policy, principal="uid:7")[0]
+        for i in range(3)
+    ]
+    assert _codes(results[2]) == ["ADMISSION_RATE_LIMITED"]
+    assert admission.stats().tenants == 1
+    assert tenant_of(make_intent([], user_id="x"), "uid:7") == "uid:7"
+
+
+def test_connection_bucket(policy):
+    admission = AdmissionController(AdmissionLimits(connection_rate=1.0, connection_burst=1), clock=FakeClock())
+    intent = make_intent([requested_step()])
+    assert admission.charge(intent, connection="conn:1") is None
+    assert _codes(admission.charge(intent, connection="conn:1")) == ["ADMISSION_RATE_LIMITED"]
+    assert admission.charge(intent, connection="conn:2") is None
+
+
+def test_source_bucket_is_not_shared_by_peers(policy):
+    # regression: every daemon intent has source "daemon", so one peer drained the bucket for all
+    limits = AdmissionLimits(user_rate=1.0, user_burst=1, source_rate=1.0, source_burst=1)
+    admission = AdmissionController(limits, clock=FakeClock())
+    intent = intent_from_dict({"raw_input": "x", "requested_steps": [requested_step()]}, source="daemon")
+    assert admission.charge(intent, principal="uid:1000") is None
+    assert admission.charge(intent, principal="uid:1001") is None
+    assert "user 'uid:1000'" in admission.charge(intent, principal="uid:1000").reasons[0].message
+    # without a principal the source bucket still applies
+    assert admission.charge(intent) is None
+    assert _codes(admission.charge(intent)) == ["ADMISSION_RATE_LIMITED"]
+
+
+def test_fair_queue_interleaves_tenants(policy):
+    admission = AdmissionController()
+    step = [requested_step("fs.write", paths=["/srv/x"])]
+    for i in range(4):
+        admission.offer(make_intent(step), ("a", i), policy=policy, principal="uid:1")
+    admission.offer(make_intent(step), ("b", 0), policy=policy, principal="uid:2")
+    order = [admission.pop()[1] for _ in range(5)]
+    assert order.index(("b", 0)) <= 1
+
+
+def test_low_risk_intents_take_the_priority_lane(policy):
+    admission = AdmissionController()
+    admission.offer(make_intent([requested_step("fs.write", paths=["/srv/x"])]), "regular", policy=policy)
+    admission.offer(make_intent([requested_step("fs.read")]), "priority", policy=policy)
+    assert admission.pop()[1] == "priority"
+    assert admission.pop()[1] == "regular"
+    assert admission.pop() is None
+
+
+def test_full_queue_sheds_the_busiest_tenant(policy):
+    admission = AdmissionController(AdmissionLimits(max_depth=2))
+    step = [requested_step("fs.write", paths=["/srv/x"])]
+    admission.offer(make_intent(step), "a1", policy=policy, principal="uid:1")
+    admission.offer(make_intent(step), "a2", policy=policy, principal="uid:1")
+    refusal, displaced = admission.offer(make_intent(step), "b1", policy=policy, principal="uid:2")
+    assert refusal is None
+    assert [(item, _codes(r)) for _, item, r in displaced] == [("a2", ["ADMISSION_QUEUE_FULL"])]
+
+
+def test_limits_validation():
+    with pytest.raises(ValueError):
+        AdmissionLimits(connection_rate=0)
+
+
+def test_daemon_parsing_ignores_claimed_source():
+    intent = intent_from_dict({"raw_input": "x", "source": "trusted"}, source="daemon", allow_source=False)
+    assert intent.metadata.source == "daemon"
+    assert intent_from_dict({"raw_input": "x", "source": "cli"}).metadata.source == "cli"
+
+
+def test_daemon_rate_limits_by_peer_not_by_claimed_user(policy, tmp_path):
+    path = str(tmp_path / "d.sock")
+
+    async def scenario():
+        admission = AdmissionController(AdmissionLimits(user_rate=0.001, user_burst=2))
+        server = MediationServer(path, policy=PolicyRegistry.from_policy(policy), admission=admission)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            for i in range(3):
+                request = {"raw_input": "x", "user_id": f"rotated-{i}", "requested_steps": [requested_step()]}
+                writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(3)]
+            writer.close()
+            return responses
+        finally:
+            await server.drain()
+
+    responses = asyncio.run(scenario())
+    codes = [[r["code"] for r in resp["refusal"]["reasons"]] for resp in responses]
+    assert "ADMISSION_RATE_LIMITED" not in codes[0] + codes[1]
+    assert codes[2] == ["ADMISSION_RATE_LIMITED"]
@@ -0,0 +1,33 @@
+import pytest
+
+from orchestrator.amendment import PlanDiff, amend_plan, verify_plan
+from orchestrator.plan import create_dry_run_plan
+from orchestrator.verification import run_verification
+from tests.conftest import requested_step
+
+
+def _verified(policy, steps, **kw):
+    plan, _audit = create_dry_run_plan(derived_from_intent_id="i", requested_steps=steps, policy=policy)
+    return verify_plan(plan, policy=policy, **kw)
+
+
+def test_amended_report_matches_full_verification(policy):
+    steps = [requested_step("fs.read"), requested_step("fs.write", requires_confirmation=False), requested_step()]
+    previous = _verified(policy, steps)
+    diff = PlanDiff(
+        replace={1: requested_step("net.fetch", paths=(), domains=("example.com",))},
+        remove=[3],
+        append=[requested_step("fs.write", paths=())],
+    )
+    amended = amend_plan(previous, diff, policy=policy)
+    assert amended.plan.plan_id != previous.plan.plan_id
+    assert [s.action for s in amended.plan.steps] == ["net.fetch", "fs.write", "fs.write"]
+    assert amended.verification == run_verification(amended.plan)
+    # only the replaced and appended steps were re-verified
+    assert len(amended.reverified) == 2
+
+
+def test_unknown_step_id_is_rejected(policy):
+    previous = _verified(policy, [requested_step()])
+    with pytest.raises(ValueError):
+        amend_plan(previous, PlanDiff(remove=[9]), policy=policy)
@@ -0,0 +1,53 @@
+from orchestrator.audit import (
+    AuditEventType,
+    AuditLogWriter,
+    audit_event,
+    iter_audit_events,
+    iter_audit_records,
+    list_segments,
+    truncate_torn_tail,
+)
+
+
+def _event(i):
+    return audit_event(AuditEventType.INTENT_CREATED, f"intent-{i}", reason=f"r{i}")
+
+
+def test_events_round_trip_in_order(tmp_path):
+    events = [_event(i) for i in range(50)]
+    with AuditLogWriter(tmp_path, fsync=False) as writer:
+        writer.wait_committed(writer.append_many(events), timeout=5)
+    assert list(iter_audit_events(tmp_path)) == events
+
+
+def test_segments_rotate_at_the_size_limit(tmp_path):
+    with AuditLogWriter(tmp_path, segment_max_bytes=512, fsync=False) as writer:
+        writer.append_many([_event(i) for i in range(20)])
+        writer.flush(timeout=5)
+    assert len(list_segments(tmp_path)) > 1
+    assert [r["intent_id"] for r in iter_audit_records(tmp_path)] == [f"intent-{i}" for i in range(20)]
+
+
+def test_reopen_after_crash_cuts_torn_line(tmp_path):
+    # regression: the next event was glued onto the partial line
+    with AuditLogWriter(tmp_path, fsync=False) as writer:
+        writer.append(_event(0))
+        writer.flush(timeout=5)
+    [(_, segment)] = list_segments(tmp_path)
+    with open(segment, "ab") as f:
+        f.write(b'{"timestamp_utc":"2026-01-01T00:00:00Z","event_ty')
+    with AuditLogWriter(tmp_path, fsync=False) as writer:
+        writer.append(_event(1))
+        writer.flush(timeout=5)
+    assert [r["intent_id"] for r in iter_audit_records(tmp_path)] == ["intent-0", "intent-1"]
+
+
+def test_truncate_torn_tail(tmp_path):
+    path = tmp_path / "f.log"
+    path.write_bytes(b"a\nb\npartial")
+    assert truncate_torn_tail(path) == 7
+    assert path.read_bytes() == b"a\nb\n"
+    assert truncate_torn_tail(path) == 0
+    path.write_bytes(b"x" * 100_000)
+    assert truncate_torn_tail(path) == 100_000
+    assert path.read_bytes() == b""
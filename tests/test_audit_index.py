@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+
+from orchestrator.audit import AuditActor, AuditEventType, AuditLogWriter, audit_event, iter_audit_records, list_segments
+from orchestrator.audit_index import AuditIndex, AuditIndexer, index_path_for, rebuild_indexes
+from orchestrator.audit_index import _read_index_lines
+
+
+def _write(writer, n, start=0):
+    events = [
+        audit_event(
+            AuditEventType.INTENT_CREATED if i % 2 else AuditEventType.PLAN_PROPOSED,
+            f"intent-{i % 7}",
+            actor=AuditActor.AEGIS if i % 3 else AuditActor.USER,
+        )
+        for i in range(start, start + n)
+    ]
+    writer.wait_committed(writer.append_many(events), timeout=5)
+
+
+def _sidecar_ranges(directory):
+    ranges = []
+    for _number, path in list_segments(directory):
+        ranges.extend((b["start"], b["end"]) for b in _read_index_lines(index_path_for(path)))
+    return ranges
+
+
+def test_queries_match_a_full_scan(tmp_path):
+    with AuditLogWriter(tmp_path, segment_max_bytes=4096, fsync=False) as writer:
+        AuditIndexer(tmp_path).attach(writer)
+        _write(writer, 200)
+    records = list(iter_audit_records(tmp_path))
+    index = AuditIndex(tmp_path)
+    assert list(index.query(intent_id="intent-3")) == [r for r in records if r["intent_id"] == "intent-3"]
+    assert list(index.query(actor="user", event_type="INTENT_CREATED")) == [
+        r for r in records if r["actor"] == "user" and r["event_type"] == "INTENT_CREATED"
+    ]
+    since = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert len(list(index.query(actor="aegis", since=since))) == sum(r["actor"] == "aegis" for r in records)
+
+
+def test_catch_up_next_to_a_live_writer_does_not_double_index(tmp_path):
+    # regression: a second indexer (AuditIndex(catch_up=True)) indexed a
+    # committed batch before the writer's own indexer saw it; the writer's
+    # indexer then appended the same range again from its cached end, and
+    # time-bounded queries returned every event twice
+    with AuditLogWriter(tmp_path, fsync=False) as writer:
+        writer.add_commit_listener(lambda *_: AuditIndex(tmp_path, catch_up=True))
+        AuditIndexer(tmp_path).attach(writer)
+        for start in range(0, 30, 10):
+            _write(writer, 10, start=start)
+
+    ranges = sorted(_sidecar_ranges(tmp_path))
+    assert all(a_end <= b_start for (_, a_end), (b_start, _) in zip(ranges, ranges[1:]))
+    since = datetime.now(timezone.utc) - timedelta(hours=1)
+    found = list(AuditIndex(tmp_path).query(actor="aegis", since=since))
+    assert len(found) == sum(r["actor"] == "aegis" for r in iter_audit_records(tmp_path)) == 20
+
+
+def test_rebuild_matches_incremental(tmp_path):
+    with AuditLogWriter(tmp_path, segment_max_bytes=2048, fsync=False) as writer:
+        AuditIndexer(tmp_path).attach(writer)
+        _write(writer, 60)
+    before = list(AuditIndex(tmp_path).query(event_type="PLAN_PROPOSED"))
+    rebuild_indexes(tmp_path)
+    assert list(AuditIndex(tmp_path, catch_up=False).query(event_type="PLAN_PROPOSED")) == before
+
+
+def test_intent_ids_with_separators_match_a_full_scan(tmp_path):
+    # regression: a raw newline in intent_id split its bucket line and hid the event
+    odd = ["b\nc 1 5", "b", "c", "sp ace", 'q"uote']
+    with AuditLogWriter(tmp_path, fsync=False) as writer:
+        AuditIndexer(tmp_path).attach(writer)
+        events = [audit_event(AuditEventType.INTENT_CREATED, intent_id) for intent_id in odd]
+        writer.wait_committed(writer.append_many(events), timeout=5)
+    records = list(iter_audit_records(tmp_path))
+    index = AuditIndex(tmp_path)
+    for intent_id in odd + ["c 1 5"]:
+        assert list(index.query(intent_id=intent_id)) == [r for r in records if r["intent_id"] == intent_id]
+    assert len(list(index.query(intent_id="b\nc 1 5"))) == 1
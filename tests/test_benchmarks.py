@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from benchmarks.pipeline import compare_runs, percentile
+from benchmarks.workload import WorkloadSpec, generate_intents
+from orchestrator.mediation import mediate_intent
+
+
+def test_workload_is_deterministic(policy):
+    spec = WorkloadSpec(seed=3, intents=50)
+    first, second = generate_intents(spec, policy), generate_intents(spec, policy)
+    assert [i.requested_steps for i in first] == [i.requested_steps for i in second]
+    assert [i.intent_id for i in first] == [f"bench-3-{n:07d}" for n in range(50)]
+    assert [i.requested_steps for i in generate_intents(WorkloadSpec(seed=4, intents=50), policy)] != [
+        i.requested_steps for i in first
+    ]
+
+
+@pytest.mark.parametrize(
+    "changes, decision",
+    [
+        (dict(refusal_ratio=0.0, warn_ratio=0.0), "PASS"),
+        (dict(refusal_ratio=1.0, invalid_share=0.0), "REFUSE"),
+        (dict(refusal_ratio=1.0, invalid_share=1.0), "REFUSE"),
+    ],
+)
+def test_workload_produces_the_requested_outcomes(policy, changes, decision):
+    for intent in generate_intents(WorkloadSpec(seed=5, intents=30, **changes), policy):
+        assert mediate_intent(intent=intent, policy=policy).refusal.decision.value == decision
+
+
+def test_workload_spec_validation():
+    with pytest.raises(ValueError):
+        WorkloadSpec(min_steps=3, max_steps=2)
+    with pytest.raises(ValueError):
+        WorkloadSpec(warn_ratio=1.5)
+
+
+def test_compare_runs_reports_slowdown_per_shared_stage():
+    baseline = {"stages": {"verify": {"p50_us": 20.0}, "plan": {"p50_us": 10.0}}}
+    candidate = {"stages": {"plan": {"p50_us": 15.0}}}
+    rows = compare_runs(baseline, candidate)
+    assert [(r.stage, r.slowdown) for r in rows] == [("plan", 0.5)]
+    with pytest.raises(ValueError):
+        compare_runs(baseline, candidate, metric="max_us")
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 7, 10, 20, 100, 101, 1000])
+@pytest.mark.parametrize("q", [0, 1, 7, 25, 50, 90, 95, 99, 99.9, 100])
+def test_percentile_is_nearest_rank(n, q):
+    values = list(range(1, n + 1))
+    # nearest rank: the smallest value with at least q% of values <= it
+    expected = next(v for v in values if v * 100 >= q * n) if q else values[0]
+    assert percentile(values, q) == expected
+
+
+def test_p90_of_ten_values_is_the_ninth():
+    # regression: round(x + 0.5) picked the tenth
+    assert percentile(list(range(1, 11)), 90) == 9
+    assert percentile([], 50) == 0.0
+    assert math.isclose(percentile([0.5], 99), 0.5)
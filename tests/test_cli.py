@@ -0,0 +1,56 @@
+import json
+
+from orchestrator.plan import create_dry_run_plan
+from orchestrator.policy import DEFAULT_POLICY_PATH
+from ui.cli import run
+from tests.conftest import requested_step
+
+
+def test_mediate_writes_one_result_per_line(tmp_path, capsys):
+    source = tmp_path / "in.jsonl"
+    source.write_text(
+        json.dumps({"raw_input": "x", "requested_steps": [requested_step()]}) + "\n\n{bad\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "out.jsonl"
+    assert run(["mediate", str(source), "-o", str(out), "--workers", "2", "--executor", "thread", "-q"]) == 0
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["line"] for r in records] == [1, 3]
+    assert records[0]["plan"]["steps"][0]["action"] == "fs.read"
+    assert "error" in records[1]
+    assert capsys.readouterr().err == ""
+
+
+def test_replay_fails_on_change(tmp_path, capsys):
+    doc = json.loads(DEFAULT_POLICY_PATH.read_bytes())
+    doc["allowed_actions"] = [e for e in doc["allowed_actions"] if e["action"] != "fs.write"]
+    proposed = tmp_path / "proposed.json"
+    proposed.write_text(json.dumps(doc), encoding="utf-8")
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text(
+        "\n".join(
+            json.dumps({"raw_input": "x", "requested_steps": [requested_step(action)]})
+            for action in ("fs.read", "fs.write")
+        ),
+        encoding="utf-8",
+    )
+    args = ["replay", str(corpus), "--new", str(proposed), "--json"]
+    assert run(args) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert (report["records"], report["replayed"], report["changed"]) == (2, 1, 1)
+    assert report["changed_actions"] == ["fs.write: removed (was Medium, reversible)"]
+    assert run(args + ["--fail-on-change"]) == 1
+
+
+def test_schedule_reports_waves(tmp_path, capsys, policy):
+    steps = [
+        requested_step(paths=("/srv/a",)),
+        requested_step(paths=("/srv/b",)),
+        requested_step("fs.write", paths=("/srv/a",)),
+    ]
+    plan, _ = create_dry_run_plan(derived_from_intent_id="i", requested_steps=steps, policy=policy)
+    path = tmp_path / "plan.json"
+    path.write_bytes(plan.to_json())
+    assert run(["schedule", str(path), "--workers", "2", "--json"]) == 0
+    out = json.loads(capsys.readouterr().out)
+    assert out["levels"] == [[1, 2], [3]]
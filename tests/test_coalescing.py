@@ -0,0 +1,107 @@
+import asyncio
+
+from daemon.admission import AdmissionController, AdmissionLimits
+from daemon.server import MediationServer
+from orchestrator.coalescing import MediationCoalescer, rebase_result
+from orchestrator.mediation import MediationResult, mediate_intent
+from orchestrator.policy import PolicyRegistry
+
+from tests.conftest import make_intent, requested_step
+
+
+def test_rebase_keeps_outcome_with_new_identity(policy):
+    result = mediate_intent(intent=make_intent([requested_step()]), policy=policy)
+    other = make_intent([requested_step()])
+    rebased = rebase_result(result, other)
+    assert rebased.intent is other
+    assert rebased.plan.steps == result.plan.steps
+    assert rebased.plan.plan_id != result.plan.plan_id
+    assert rebased.refusal == result.refusal
+
+
+def test_async_followers_share_one_mediation(policy):
+    coalescer = MediationCoalescer()
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def run(intent):
+            calls.append(intent)
+            await release.wait()
+            return mediate_intent(intent=intent, policy=policy)
+
+        intents = [make_intent([requested_step()]) for _ in range(3)]
+        tasks = [asyncio.create_task(coalescer.mediate_async(i, policy=policy, run=run)) for i in intents]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        return intents, results
+
+    intents, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert [r.intent for r in results] == intents
+    assert len({r.plan.plan_id for r in results}) == 3
+    stats = coalescer.stats()
+    assert (stats.leaders, stats.followers, stats.in_flight) == (1, 2, 0)
+
+
+def test_abandon_returns_unresolved_followers(policy):
+    coalescer = MediationCoalescer()
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        leader, follower = loop.create_future(), loop.create_future()
+        intent = make_intent([requested_step()])
+        key = coalescer.key_for(intent, policy)
+        coalescer.lead(key, leader)
+        assert coalescer.follow(key, intent, follower)
+        assert coalescer.abandon(leader) == (key, [(intent, follower)])
+        assert not coalescer.in_flight(key)
+        leader.set_result("refused")
+        await asyncio.sleep(0)
+        return follower.done()
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_shed_leader_does_not_pass_its_refusal_to_followers(policy, tmp_path):
+    # regression: a displaced leader's ADMISSION_QUEUE_FULL refusal was
+    # rebased onto every follower
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        admission = AdmissionController(AdmissionLimits(max_depth=2))
+        server = MediationServer(str(tmp_path / "s.sock"), policy=PolicyRegistry.from_policy(policy),
+                                 admission=admission)
+        server._work_ready = asyncio.Event()
+        shared = [requested_step(paths=["/srv/shared"])]
+        other = make_intent([requested_step(paths=["/srv/other"])], user_id="a")
+        lead = make_intent(shared, user_id="a")
+        follower = make_intent(shared, user_id="b")
+        f_other, f_lead, f_follower, f_new = (loop.create_future() for _ in range(4))
+
+        assert admission.offer(other, f_other, policy=policy) == (None, [])
+        assert admission.offer(lead, f_lead, policy=policy) == (None, [])
+        key = server.coalescer.key_for(lead, policy)
+        server.coalescer.lead(key, f_lead)
+        assert admission.charge(follower) is None
+        assert server.coalescer.follow(key, follower, f_follower)
+
+        refusal, displaced = admission.offer(make_intent([requested_step()], user_id="c"), f_new, policy=policy)
+        assert refusal is None and displaced[0][1] is f_lead
+        server._shed(displaced, policy)
+        assert f_lead.result().refusal.reasons[0].code == "ADMISSION_QUEUE_FULL"
+        assert not f_follower.done()
+
+        server._mediator = asyncio.create_task(server._mediate_forever())
+        server._work_ready.set()
+        try:
+            return await asyncio.wait_for(f_follower, 10), follower
+        finally:
+            server._mediator.cancel()
+
+    result, follower = asyncio.run(scenario())
+    assert isinstance(result, MediationResult)
+    assert result.intent is follower
+    assert result.plan is not None
+    assert all(not r.code.startswith("ADMISSION_") for r in result.refusal.reasons)
@@ -0,0 +1,87 @@
+import pytest
+
+from orchestrator.context_store import REFS_LOG, ContextStore, context_ref, ref_digest
+from tests.conftest import make_intent
+
+
+def test_blobs_are_stored_once_and_read_back(tmp_path):
+    with ContextStore(tmp_path) as store:
+        a = store.put(b"hello", holder="i1")
+        b = store.put_stream(iter([b"hel", b"lo"]), holder="i2")
+        assert a == b == context_ref(ref_digest(a))
+        assert store.read(a) == b"hello"
+        assert store.verify(a)
+        assert store.refcount(a) == 2
+        assert store.stats().deduplicated == 1
+
+
+def test_references_survive_reopen(tmp_path):
+    with ContextStore(tmp_path) as store:
+        ref = store.put(b"x" * 100, holder="i1")
+        store.acquire(ref, "i2")
+        store.release(ref, "i1")
+    with ContextStore(tmp_path) as store:
+        assert store.refcount(ref) == 1
+
+
+def test_journal_is_compacted_while_open(tmp_path):
+    # regression: refs.log was only compacted when the store was reopened
+    with ContextStore(tmp_path) as store:
+        ref = store.put(b"x" * 100, holder="kept")
+        for i in range(3000):
+            store.acquire(ref, f"i{i}")
+            store.release(ref, f"i{i}")
+        assert store.refcount(ref) == 1
+        assert len((tmp_path / REFS_LOG).read_bytes().splitlines()) < 2000
+    with ContextStore(tmp_path) as store:
+        assert store.refcount(ref) == 1
+
+
+def test_collect_evicts_only_unreferenced_blobs_lru_first(tmp_path):
+    with ContextStore(tmp_path) as store:
+        kept = store.put(b"a" * 100, holder="i1")
+        old = store.put(b"b" * 100)
+        new = store.put(b"c" * 100)
+        store.collect(budget_bytes=200)
+        assert kept in store and new in store and old not in store
+
+
+def test_negative_budget_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ContextStore(tmp_path, budget_bytes=-1)
+
+
+def test_attach_and_release_intent(tmp_path):
+    with ContextStore(tmp_path) as store:
+        intent = store.attach(make_intent([]), b"doc")
+        assert store.attach(intent, b"doc").context_refs == intent.context_refs
+        assert store.release_intent(intent) == 1
+        assert store.refcount(intent.context_refs[0]) == 0
+
+
+def test_torn_journal_line_is_cut_before_appending(tmp_path):
+    # regression: the next entry was glued onto the partial line, so its
+    # reference was lost on replay and the blob became collectable
+    with ContextStore(tmp_path) as store:
+        first = store.put(b"first", holder="i1")
+        second = store.put(b"second")
+    with open(tmp_path / REFS_LOG, "ab") as f:
+        f.write(f"+{ref_digest(first)} i".encode())
+    with ContextStore(tmp_path) as store:
+        store.acquire(second, "i2")
+    with ContextStore(tmp_path) as store:
+        assert store.refcount(first) == 1
+        assert store.refcount(second) == 1
+        store.collect(budget_bytes=0)
+        assert second in store
+
+
+def test_replay_ignores_invalid_holders(tmp_path):
+    with ContextStore(tmp_path) as store:
+        ref = store.put(b"blob", holder="i1")
+    digest = ref_digest(ref)
+    with open(tmp_path / REFS_LOG, "ab") as f:
+        f.write(f"+{digest} \n+{digest} a b\n+{'z' * 64} i3\n".encode())
+        f.write(b"+" + digest.encode() + b" \xff\n")
+    with ContextStore(tmp_path) as store:
+        assert store.refcount(ref) == 1
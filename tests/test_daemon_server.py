@@ -0,0 +1,124 @@
+import asyncio
+import errno
+import json
+import socket
+import threading
+
+import pytest
+
+from daemon import server as server_module
+from daemon.prefork import Supervisor
+from daemon.server import MediationServer, claim_socket_path
+from orchestrator.policy import PolicyRegistry
+from tests.conftest import requested_step
+
+
+def _request(**extra):
+    return json.dumps({"raw_input": "x", "requested_steps": [requested_step()], **extra}).encode() + b"\n"
+
+
+def test_mediates_over_the_socket(policy, tmp_path):
+    path = str(tmp_path / "d.sock")
+
+    async def scenario():
+        server = MediationServer(path, policy=PolicyRegistry.from_policy(policy))
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(_request(request_id="r1") + b"not json\n")
+            first, second = json.loads(await reader.readline()), json.loads(await reader.readline())
+            writer.close()
+            return first, second
+        finally:
+            await server.drain()
+
+    first, second = asyncio.run(scenario())
+    assert first["intent_id"] == "r1" and first["plan"] is not None
+    assert "error" in second
+
+
+def test_mediation_does_not_block_the_event_loop(policy, tmp_path, monkeypatch):
+    # regression: mediate_intent ran on the loop, so one slow mediation
+    # stalled every connection
+    path = str(tmp_path / "d.sock")
+    release = threading.Event()
+    mediate = server_module.mediate_intent
+
+    def slow_mediate(**kw):
+        release.wait(5)
+        return mediate(**kw)
+
+    monkeypatch.setattr(server_module, "mediate_intent", slow_mediate)
+
+    async def scenario():
+        server = MediationServer(path, policy=PolicyRegistry.from_policy(policy))
+        await server.start()
+        try:
+            slow_r, slow_w = await asyncio.open_unix_connection(path)
+            slow_w.write(_request())
+            await asyncio.sleep(0.05)
+            fast_r, fast_w = await asyncio.open_unix_connection(path)
+            fast_w.write(b"not json\n")
+            answered = json.loads(await asyncio.wait_for(fast_r.readline(), 2))
+            release.set()
+            mediated = json.loads(await asyncio.wait_for(slow_r.readline(), 5))
+            slow_w.close()
+            fast_w.close()
+            return answered, mediated
+        finally:
+            release.set()
+            await server.drain()
+
+    answered, mediated = asyncio.run(scenario())
+    assert "error" in answered
+    assert mediated["plan"] is not None
+
+
+def test_start_refuses_a_socket_another_daemon_is_listening_on(policy, tmp_path):
+    path = str(tmp_path / "d.sock")
+    live = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    live.bind(path)
+    live.listen(1)
+    try:
+        async def scenario():
+            await MediationServer(path, policy=PolicyRegistry.from_policy(policy)).start()
+
+        with pytest.raises(OSError) as raised:
+            asyncio.run(scenario())
+        assert raised.value.errno == errno.EADDRINUSE
+        # still reachable
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        probe.connect(path)
+        probe.close()
+    finally:
+        live.close()
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    path = str(tmp_path / "d.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    claim_socket_path(path)
+    assert not (tmp_path / "d.sock").exists()
+
+
+def test_non_socket_file_is_left_alone(tmp_path):
+    path = tmp_path / "d.sock"
+    path.write_text("not a socket")
+    claim_socket_path(str(path))
+    assert path.read_text() == "not a socket"
+
+
+def test_supervisor_refuses_a_live_socket(tmp_path):
+    path = str(tmp_path / "d.sock")
+    live = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    live.bind(path)
+    live.listen(1)
+    try:
+        supervisor = Supervisor(path, workers=1, startup=None, run_worker=lambda ctx: None, policy_path="unused")
+        with pytest.raises(OSError) as raised:
+            supervisor.run()
+        assert raised.value.errno == errno.EADDRINUSE
+    finally:
+        live.close()
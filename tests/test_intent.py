@@ -0,0 +1,76 @@
+import pytest
+
+from orchestrator.intent import (
+    ALLOWED_TRANSITIONS,
+    IntentState,
+    coerce_state,
+    create_intent,
+    intent_from_dict,
+    intent_from_record,
+)
+
+
+def test_record_round_trip():
+    intent = intent_from_dict(
+        {
+            "raw_input": "read a file",
+            "scope": ["/srv"],
+            "constraints": {"k": "v"},
+            "requested_steps": [{"action": "fs.read", "scope_token": "t"}],
+            "context_refs": [{"scheme": "mem", "ref": "mem://abc"}],
+            "user_id": "u",
+            "request_id": "r-1",
+        }
+    )
+    restored = intent_from_record(intent.to_dict())
+    assert restored == intent
+    assert restored.to_dict() == intent.to_dict()
+
+    planned = intent_from_record({**intent.to_dict(), "state": "planned"})
+    assert planned.state is IntentState.PLANNED and planned.metadata == intent.metadata
+
+
+def test_malformed_record_raises_value_error():
+    record = create_intent("x", "x", []).to_dict()
+    del record["metadata"]
+    with pytest.raises(ValueError, match="Malformed intent record"):
+        intent_from_record(record)
+    with pytest.raises(ValueError):
+        intent_from_record({**create_intent("x", "x", []).to_dict(), "state": "executing"})
+
+
+def test_coerce_state():
+    for state in IntentState:
+        assert coerce_state(state) is state
+        assert coerce_state(state.value) is state
+    for value in ("APPROVED", None, [], 1):
+        with pytest.raises(ValueError, match="Invalid intent state"):
+            coerce_state(value)
+
+
+def test_planned_is_terminal_and_every_state_has_transitions():
+    assert set(ALLOWED_TRANSITIONS) == set(IntentState)
+    assert ALLOWED_TRANSITIONS[IntentState.PLANNED] == frozenset()
+    assert IntentState.PLANNED not in ALLOWED_TRANSITIONS[IntentState.DRAFT]
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        [],
+        {"raw_input": 1},
+        {"scope": "/srv"},
+        {"requested_steps": ["fs.read"]},
+        {"context_refs": [{"scheme": "ftp", "ref": "x"}]},
+        {"constraints": ["x"]},
+        {"user_id": 5},
+    ],
+)
+def test_untrusted_requests_are_rejected(request_):
+    with pytest.raises(ValueError):
+        intent_from_dict(request_)
+
+
+def test_source_can_be_pinned_by_the_caller():
+    assert intent_from_dict({"source": "web"}).metadata.source == "web"
+    assert intent_from_dict({"source": "web"}, source="daemon", allow_source=False).metadata.source == "daemon"
@@ -0,0 +1,90 @@
+import json
+import random
+
+import pytest
+
+from orchestrator.mediation import mediate_intent, mediate_intents, mediate_jsonl
+from tests.conftest import make_intent, requested_step
+
+_ACTIONS = ("fs.read", "fs.write", "net.fetch", "app.automate", "rm.rf")
+
+
+def _random_intents(seed, count=40):
+    rng = random.Random(seed)
+    intents = []
+    for _ in range(count):
+        steps = [
+            requested_step(
+                rng.choice(_ACTIONS),
+                paths=rng.sample(["/srv/a", "/srv/b", "/etc/passwd"], rng.randint(0, 2)),
+                max_bytes=rng.choice([None, 10, 1 << 30]),
+                requires_confirmation=rng.random() < 0.8,
+            )
+            for _ in range(rng.randint(1, 4))
+        ]
+        intents.append(make_intent(steps))
+    return intents
+
+
+def _outcome(result):
+    # plan_id is a fresh uuid per mediation; everything else must match
+    d = result.to_dict()
+    if d["plan"] is not None:
+        d["plan"].pop("plan_id")
+    return d
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+@pytest.mark.parametrize("ordered", [True, False])
+def test_pool_matches_sequential_mediation(policy, executor, ordered):
+    intents = _random_intents(7)
+    expected = {i.intent_id: _outcome(mediate_intent(intent=i, policy=policy)) for i in intents}
+    results = list(
+        mediate_intents(intents, workers=3, executor=executor, ordered=ordered, chunksize=4, policy=policy)
+    )
+    assert len(results) == len(intents)
+    if ordered:
+        assert [r.intent.intent_id for r in results] == [i.intent_id for i in intents]
+    assert {r.intent.intent_id: _outcome(r) for r in results} == expected
+
+
+def test_coalesced_pool_matches_sequential_mediation(policy):
+    intents = _random_intents(11) * 2
+    expected = [_outcome(mediate_intent(intent=i, policy=policy)) for i in intents]
+    results = list(mediate_intents(intents, workers=4, coalesce=True, policy=policy))
+    assert [_outcome(r) for r in results] == expected
+
+
+def test_jsonl_numbers_lines_and_reports_errors(policy):
+    lines = [
+        json.dumps({"raw_input": "x", "requested_steps": [requested_step()]}),
+        "",
+        "{not json",
+        json.dumps({"raw_input": 3}),
+        json.dumps({"raw_input": "y", "requested_steps": [requested_step("rm.rf")]}),
+    ]
+    out = list(mediate_jsonl(lines, workers=2, chunksize=2, policy=policy))
+    records = [json.loads(line) for _, line in out]
+    assert [r["line"] for r in records] == [1, 3, 4, 5]
+    assert out[0][0] == records[0]["refusal"]["decision"]
+    assert records[0]["plan"] is not None
+    assert [o for o, _ in out[1:3]] == ["ERROR", "ERROR"]
+    assert "error" in records[1] and "error" in records[2]
+    assert records[3]["plan"] is None
+    assert out[3][0] == records[3]["refusal"]["decision"] != "ERROR"
+
+
+def test_jsonl_process_matches_thread(policy):
+    lines = [json.dumps({"raw_input": "x", "requested_steps": i.requested_steps}) for i in _random_intents(3)]
+
+    def stripped(executor):
+        out = []
+        for outcome, line in mediate_jsonl(lines, workers=2, executor=executor, policy=policy):
+            record = json.loads(line)
+            record.pop("intent_id")
+            if record["plan"] is not None:
+                record["plan"].pop("plan_id")
+            out.append((outcome, record))
+        return out
+
+    assert stripped("process") == stripped("thread")
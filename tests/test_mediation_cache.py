@@ -0,0 +1,81 @@
+import copy
+
+from orchestrator.mediation import mediate_intent
+from orchestrator.mediation_cache import MediationCache, plan_fingerprint
+from orchestrator.refusal import RefusalDecisionType
+from orchestrator.verification import (
+    DEFAULT_VERIFIERS,
+    VerificationFinding,
+    VerificationLevel,
+    Verifier,
+    VerifierRegistry,
+    register_verifier,
+)
+
+from tests.conftest import make_intent, requested_step
+
+
+def _block_all(step):
+    return (VerificationFinding(level=VerificationLevel.BLOCK, message="blocked", step_id=step.step_id, code="TEST_BLOCK"),)
+
+
+def test_fingerprint_ignores_key_order_but_not_content(policy):
+    a = [{"action": "fs.read", "scope_token": "t"}]
+    b = [{"scope_token": "t", "action": "fs.read"}]
+    assert plan_fingerprint(a, policy.content_hash) == plan_fingerprint(b, policy.content_hash)
+    assert plan_fingerprint(a, policy.content_hash) != plan_fingerprint(a, "0" * 64)
+
+
+def test_cached_result_matches_uncached_with_new_plan_id(policy):
+    cache = MediationCache()
+    steps = [requested_step()]
+    first = mediate_intent(intent=make_intent(steps), policy=policy, cache=cache)
+    second = mediate_intent(intent=make_intent(steps), policy=policy, cache=cache)
+    assert cache.stats().hits == 1
+    assert second.plan.steps == first.plan.steps
+    assert second.plan.plan_id != first.plan.plan_id
+    assert second.refusal == first.refusal
+
+
+def test_editing_a_result_does_not_change_later_hits(policy):
+    cache = MediationCache()
+    steps = [{**requested_step("fs.write", requires_confirmation=False), "args": {"k": "v", "nested": {"n": 1}}}]
+    first = mediate_intent(intent=make_intent(copy.deepcopy(steps)), policy=policy, cache=cache)
+    expected = mediate_intent(intent=make_intent(steps), policy=policy)
+    first.plan.steps[0].args["k"] = "injected"
+    first.plan.steps[0].args["nested"]["n"] = 2
+    first.verification.findings.clear()
+    first.refusal.reasons.clear()
+
+    for _ in range(2):
+        hit = mediate_intent(intent=make_intent(copy.deepcopy(steps)), policy=policy, cache=cache)
+        assert hit.plan.steps == expected.plan.steps
+        assert hit.verification == expected.verification and hit.verification.findings
+        assert hit.refusal == expected.refusal
+        assert b"injected" not in hit.to_json()
+        hit.plan.steps[0].args["k"] = "injected"
+    assert cache.stats().hits == 2
+
+
+def test_registry_version_changes_on_register_and_differs_between_registries():
+    registry = VerifierRegistry()
+    other = VerifierRegistry()
+    before = registry.version
+    registry.register(Verifier(name="x", step_hook=_block_all))
+    assert registry.version != before
+    assert registry.version != other.version
+
+
+def test_default_registry_change_invalidates_cache(policy):
+    # regression: the default registry's contents were not part of the key
+    cache = MediationCache()
+    steps = [requested_step()]
+    assert mediate_intent(intent=make_intent(steps), policy=policy, cache=cache).refusal.decision \
+        == RefusalDecisionType.PASS
+    register_verifier(Verifier(name="test_block_all", step_hook=_block_all))
+    try:
+        cached = mediate_intent(intent=make_intent(steps), policy=policy, cache=cache)
+        fresh = mediate_intent(intent=make_intent(steps), policy=policy)
+        assert cached.refusal.decision == fresh.refusal.decision == RefusalDecisionType.REFUSE
+    finally:
+        DEFAULT_VERIFIERS.unregister("test_block_all")
@@ -0,0 +1,96 @@
+import math
+import random
+import threading
+
+import pytest
+
+from orchestrator import metrics
+from orchestrator.mediation import mediate_intent
+from orchestrator.metrics import LatencyHistogram, MediationHook, MediationMetrics
+from tests.conftest import make_intent, requested_step
+
+
+def test_percentile_is_nearest_rank_for_exact_values():
+    # regression: int(x + 0.5) rounded the rank, so p90 of 1..10 was 10
+    h = LatencyHistogram()
+    for v in range(1, 11):
+        h.record(v)
+    assert [h.percentile(q) for q in (0, 10, 50, 90, 91, 100)] == [1, 1, 5, 9, 10, 10]
+
+
+def test_percentile_stays_within_the_bucket_error():
+    rng = random.Random(5)
+    values = sorted(rng.randrange(1, 10**9) for _ in range(5000))
+    h = LatencyHistogram()
+    for v in values:
+        h.record(v)
+    for q in (50, 90, 99, 99.9):
+        exact = values[max(1, math.ceil(q * len(values) / 100)) - 1]
+        assert exact <= h.percentile(q) <= exact * (1 + 2 ** -6)
+
+
+def test_hook_errors_are_counted_from_many_threads():
+    class Broken(MediationHook):
+        def on_stage(self, stage, elapsed_ns):
+            raise RuntimeError(stage)
+
+    before = metrics.hook_errors()
+    hooks = (Broken(),)
+
+    def fail():
+        for _ in range(2000):
+            metrics.stage_done(hooks, "plan", 0)
+
+    threads = [threading.Thread(target=fail) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert metrics.hook_errors() - before == 16000
+
+
+def test_quantiles_are_exported_as_a_summary(policy):
+    collected = MediationMetrics()
+    metrics.add_hook(collected)
+    try:
+        for _ in range(5):
+            mediate_intent(intent=make_intent([requested_step()]), policy=policy)
+    finally:
+        metrics.remove_hook(collected)
+    text = collected.render_prometheus()
+    name = "aegis_mediation_stage_duration_quantile_seconds"
+    assert f"# TYPE {name} summary" in text
+    assert f'{name}_count{{stage="total"}} 5' in text
+    assert f'{name}_sum{{stage="plan"}} ' in text
+    assert 'aegis_mediation_decisions_total{decision="PASS"} 5' in text
+
+
+def test_hooks_record_stages_and_decisions(policy):
+    collected = MediationMetrics()
+    metrics.add_hook(collected)
+    try:
+        for steps in ([requested_step()], [requested_step()], [requested_step("rm.rf")]):
+            mediate_intent(intent=make_intent(steps), policy=policy)
+    finally:
+        metrics.remove_hook(collected)
+    assert collected.decisions() == {"PASS": 2, "REFUSE": 1}
+    assert collected.stage_histogram("plan") is not None
+    text = collected.render_prometheus()
+    assert 'aegis_mediation_stage_duration_seconds_count{stage="plan"} 3' in text
+    assert 'aegis_mediation_decisions_total{decision="REFUSE"} 1' in text
+
+
+@pytest.mark.parametrize("sub_bits", [1, 17])
+def test_histogram_rejects_bad_precision(sub_bits):
+    with pytest.raises(ValueError):
+        LatencyHistogram(sub_bits)
+
+
+def test_file_exporter_reports_write_errors_on_stderr(tmp_path, capsys):
+    exporter = metrics.MetricsFileExporter(MediationMetrics(), str(tmp_path / "missing" / "aegis.prom"), interval=60)
+    exporter.start()
+    with pytest.raises(OSError):
+        exporter.stop()
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "Aegis metrics: cannot write" in captured.err
@@ -0,0 +1,97 @@
+import pytest
+
+from orchestrator.plan import (
+    EMPTY_CONSTRAINTS,
+    Plan,
+    PlanStep,
+    RiskLevel,
+    ScopeConstraints,
+    ScopeSpec,
+    create_dry_run_plan,
+    validate_plan,
+)
+from tests.conftest import requested_step
+
+
+def _step(step_id=1, action="fs.read", **changes):
+    fields = dict(
+        step_id=step_id,
+        action=action,
+        args={},
+        scope=ScopeSpec("t", ScopeConstraints(paths=["/srv/a"])),
+        risk=RiskLevel.LOW,
+        reversible=True,
+        requires_confirmation=True,
+        validators=["v"],
+    )
+    fields.update(changes)
+    return PlanStep(**fields)
+
+
+def test_sequences_are_normalized_to_tuples():
+    step = _step()
+    plan = Plan("p", [step])
+    assert plan.steps == (step,)
+    assert step.validators == ("v",)
+    assert step.scope.constraints.paths == ("/srv/a",)
+    assert step.to_dict()["scope"]["constraints"]["paths"] == ["/srv/a"]
+    assert step.to_dict()["validators"] == ["v"]
+    assert Plan("p", (step,)) == plan
+
+
+def test_steps_without_constraints_share_empty_constraints(policy):
+    steps = [requested_step(paths=()), requested_step("fs.write", paths=())]
+    plan, _ = create_dry_run_plan(derived_from_intent_id="i", requested_steps=steps, policy=policy)
+    assert all(s.scope.constraints is EMPTY_CONSTRAINTS for s in plan.steps)
+    assert plan.steps[0].to_dict()["scope"]["constraints"] == {"paths": [], "domains": [], "apps": [], "methods": []}
+
+
+def test_plan_to_dict_layout(policy):
+    plan, audit = create_dry_run_plan(
+        derived_from_intent_id="i", requested_steps=[requested_step(max_bytes=10)], policy=policy
+    )
+    assert audit.derived_from_intent_id == "i"
+    assert plan.to_dict() == {
+        "plan_id": plan.plan_id,
+        "steps": [
+            {
+                "step_id": 1,
+                "action": "fs.read",
+                "args": {},
+                "scope": {
+                    "scope_token": "t",
+                    "constraints": {"paths": ["/srv/a.txt"], "domains": [], "apps": [], "methods": [], "max_bytes": 10},
+                },
+                "risk": "Low",
+                "reversible": True,
+                "requires_confirmation": True,
+                "validators": [],
+                "dry_run_supported": True,
+            }
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "raw, message",
+    [
+        ({"scope_token": "t"}, "missing/invalid 'action'"),
+        (requested_step("rm.rf"), "is not allowed"),
+        (requested_step(scope_token=" "), "missing/invalid 'scope_token'"),
+        ({**requested_step(), "constraints": ["/srv"]}, "'constraints' must be an object"),
+    ],
+)
+def test_invalid_requested_steps_raise(policy, raw, message):
+    with pytest.raises(ValueError, match=message):
+        create_dry_run_plan(derived_from_intent_id="i", requested_steps=[raw], policy=policy)
+
+
+def test_validate_plan_reports_semantic_errors(policy):
+    plan = Plan(" ", (_step(1), _step(1, action="rm.rf"), _step(0, scope=ScopeSpec(" "))))
+    errors = validate_plan(plan, policy.actions)
+    assert "plan_id must be a non-empty string." in errors
+    assert "step_id values must be unique within a plan." in errors
+    assert "step_id values must be >= 1." in errors
+    assert any("'rm.rf' is not present" in e for e in errors)
+    assert any(e.startswith("Step 0:") and "scope_token" in e for e in errors)
+    assert validate_plan(Plan("p", (_step(1), _step(2))), policy.actions) == []
@@ -0,0 +1,31 @@
+import pytest
+
+from orchestrator.plan import create_dry_run_plan
+from orchestrator.verification import run_verification
+from orchestrator.plan_stream import stream_dry_run_plan
+from tests.conftest import requested_step
+
+
+def _steps(n):
+    return [
+        requested_step(("fs.read", "fs.write", "net.fetch")[i % 3], paths=() if i % 5 == 0 else (f"/srv/{i}",),
+                       requires_confirmation=i % 2 == 0)
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("spill", [False, True])
+def test_streamed_plan_matches_create_dry_run_plan(policy, spill):
+    steps = _steps(40)
+    plan, _audit = create_dry_run_plan(derived_from_intent_id="i", requested_steps=steps, policy=policy)
+    with stream_dry_run_plan(derived_from_intent_id="i", requested_steps=iter(steps), policy=policy,
+                             spill=spill, spill_after=7) as streamed:
+        assert streamed.spilled == spill
+        assert list(streamed.plan.steps) == list(plan.steps)
+        assert streamed.verification == run_verification(plan)
+
+
+def test_invalid_step_fails_the_plan(policy):
+    with pytest.raises(ValueError):
+        stream_dry_run_plan(derived_from_intent_id="i", requested_steps=[requested_step(), {"action": "rm.rf"}],
+                            policy=policy)
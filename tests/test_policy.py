@@ -0,0 +1,98 @@
+import json
+import pickle
+
+import pytest
+
+from orchestrator.plan import RiskLevel, create_dry_run_plan
+from orchestrator.policy import (
+    COMPILED_CACHE_SIZE,
+    DEFAULT_POLICY_PATH,
+    PolicyRegistry,
+    compile_policy,
+    compile_policy_bytes,
+    load_policy,
+    policy_content_hash,
+    policy_index_rows,
+    resolve_policy,
+    restore_compiled_policy,
+)
+from tests.conftest import requested_step
+
+
+def _document(**changes):
+    doc = json.loads(DEFAULT_POLICY_PATH.read_bytes())
+    for entry in doc["allowed_actions"]:
+        entry.update(changes.get(entry["action"], {}))
+    return doc
+
+
+def test_compiled_policy_is_cached_by_content():
+    data = DEFAULT_POLICY_PATH.read_bytes()
+    policy = compile_policy_bytes(data)
+    assert policy is compile_policy_bytes(bytes(data)) is load_policy()
+    assert policy.content_hash == policy_content_hash(data)
+    assert policy.get("fs.write").risk is RiskLevel.MEDIUM
+    assert "rm.rf" not in policy
+
+
+def test_compiled_policy_cache_is_bounded():
+    # regression: every policy ever compiled stayed cached
+    sources = [json.dumps({"version": f"v{i}", "allowed_actions": []}).encode() for i in range(COMPILED_CACHE_SIZE + 1)]
+    first = compile_policy_bytes(sources[0])
+    kept = compile_policy_bytes(sources[1])
+    for data in sources[2:]:
+        assert compile_policy_bytes(kept.source) is kept
+        compile_policy_bytes(data)
+    assert compile_policy_bytes(sources[0]) is not first
+    assert compile_policy_bytes(sources[1]) is kept
+
+
+def test_actions_are_read_only():
+    with pytest.raises(TypeError):
+        load_policy().actions["rm.rf"] = None
+
+
+def test_pickle_and_index_rows_round_trip():
+    policy = load_policy()
+    assert pickle.loads(pickle.dumps(policy)).content_hash == policy.content_hash
+    restored = restore_compiled_policy(policy.source, policy.content_hash, policy.version, policy_index_rows(policy))
+    assert restored.actions == policy.actions
+
+
+def test_dict_and_compiled_policy_build_the_same_plan():
+    steps = [requested_step("fs.write"), requested_step("net.fetch", paths=(), domains=("example.com",))]
+    doc = json.loads(DEFAULT_POLICY_PATH.read_bytes())
+    from_dict, _ = create_dry_run_plan(derived_from_intent_id="i", requested_steps=steps, allowed_actions_json=doc)
+    compiled, _ = create_dry_run_plan(derived_from_intent_id="i", requested_steps=steps, policy=load_policy())
+    assert from_dict.steps == compiled.steps
+
+
+def test_registry_reload_swaps_the_snapshot(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps(_document()))
+    registry = PolicyRegistry(path)
+    before = registry.current
+    assert not registry.reload_if_changed()
+
+    path.write_text(json.dumps(_document(**{"fs.read": {"risk": "High"}})))
+    assert registry.reload()
+    assert registry.current.get("fs.read").risk is RiskLevel.HIGH
+    # readers holding the old snapshot keep it
+    assert before.get("fs.read").risk is RiskLevel.LOW
+
+    path.write_text("{not json")
+    with pytest.raises(ValueError):
+        registry.reload()
+    assert registry.current.get("fs.read").risk is RiskLevel.HIGH
+
+
+def test_resolve_policy():
+    policy = load_policy()
+    assert resolve_policy(PolicyRegistry.from_policy(policy)) is policy
+    assert resolve_policy(policy) is policy
+    assert resolve_policy(None, json.loads(DEFAULT_POLICY_PATH.read_bytes())).actions == policy.actions
+    with pytest.raises(ValueError):
+        resolve_policy()
+    with pytest.raises(TypeError):
+        resolve_policy({"allowed_actions": []})
+    assert compile_policy(_document()).actions == policy.actions
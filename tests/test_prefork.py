@@ -0,0 +1,192 @@
+import glob
+import json
+import os
+import queue
+import re
+import signal
+import stat
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from daemon.prefork import PolicySegment, default_segment_dir, map_policy_segment
+from orchestrator.policy import DEFAULT_POLICY_PATH, policy_content_hash
+from orchestrator.snapshot import load_startup
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs a two-worker Supervisor. Each worker prints its pid, when it is
+# serving and every policy it publishes; worker 1 refuses reloads while
+# the `refuse` file exists.
+SUPERVISOR_DRIVER = """
+import asyncio, os, sys
+from daemon import prefork
+from daemon.server import serve
+from orchestrator.snapshot import load_startup
+
+socket_path, policy_path, refuse = sys.argv[1:4]
+
+def run_worker(ctx):
+    print(f"worker {ctx.index} pid {os.getpid()}", flush=True)
+    publish = ctx.policy.publish
+
+    def reporting_publish(policy):
+        changed = publish(policy)
+        print(f"worker {ctx.index} serving {policy.content_hash}", flush=True)
+        return changed
+
+    ctx.policy.publish = reporting_publish
+    if ctx.index == 1:
+        real_map = prefork.map_policy_segment
+
+        def map_unless_refusing(path, schema_path=None):
+            if os.path.exists(refuse):
+                raise ValueError("refused")
+            return real_map(path, schema_path)
+
+        prefork.map_policy_segment = map_unless_refusing
+
+    def ready(server):
+        ctx.on_ready(server)
+        print(f"worker {ctx.index} ready", flush=True)
+
+    asyncio.run(serve(socket_path, policy=ctx.policy, on_ready=ready, reload_on_sighup=False, sock=ctx.listener))
+
+loaded = load_startup(policy_path, enabled=False)
+sys.exit(prefork.Supervisor(
+    socket_path, workers=2, startup=loaded, run_worker=run_worker, policy_path=policy_path,
+    snapshot_enabled=False, stop_timeout=10.0, on_ready=lambda: print("all ready", flush=True),
+).run())
+"""
+
+
+def test_policy_segment_round_trip(tmp_path):
+    loaded = load_startup(enabled=False)
+    segment = PolicySegment.publish(loaded.payload, loaded.policy.content_hash, generation=1, directory=str(tmp_path))
+    try:
+        st = os.stat(segment.path)
+        assert stat.S_IMODE(st.st_mode) == 0o400
+        policy = map_policy_segment(segment.path)
+        assert policy.content_hash == segment.policy_hash == loaded.policy.content_hash
+        assert policy.actions == loaded.policy.actions
+        with pytest.raises(FileExistsError):
+            PolicySegment.publish(loaded.payload, segment.policy_hash, generation=1, directory=str(tmp_path))
+    finally:
+        segment.unlink()
+    assert not os.path.exists(segment.path)
+    segment.unlink()
+
+
+def test_truncated_segment_is_rejected(tmp_path):
+    loaded = load_startup(enabled=False)
+    payload = loaded.payload[: len(loaded.payload) // 2]
+    segment = PolicySegment.publish(payload, "x", generation=2, directory=str(tmp_path))
+    try:
+        with pytest.raises(ValueError):
+            map_policy_segment(segment.path)
+    finally:
+        segment.unlink()
+
+
+class _Output:
+    def __init__(self, stream):
+        self.lines = []
+        self._queue = queue.Queue()
+        threading.Thread(target=lambda: [self._queue.put(line.rstrip("\n")) for line in stream], daemon=True).start()
+
+    def expect(self, pattern, since=0, timeout=15.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            for index in range(since, len(self.lines)):
+                match = re.fullmatch(pattern, self.lines[index])
+                if match:
+                    return match
+            try:
+                self.lines.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                raise AssertionError(f"no line matching {pattern!r} in {self.lines}") from None
+
+
+def _segment_names(pattern, expected, timeout=10.0):
+    # the supervisor unlinks a segment only after the workers acknowledge
+    deadline = time.monotonic() + timeout
+    while True:
+        names = sorted(os.path.basename(p) for p in glob.glob(pattern))
+        if names == expected or time.monotonic() >= deadline:
+            return names
+        time.sleep(0.05)
+
+
+def _write_policy(path, version):
+    doc = json.loads(DEFAULT_POLICY_PATH.read_text())
+    doc["version"] = version
+    data = json.dumps(doc).encode()
+    path.write_bytes(data)
+    return policy_content_hash(data)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork needs os.fork")
+def test_supervisor_restarts_reloads_rolls_back_and_cleans_up(tmp_path):
+    socket_path, policy_path, refuse = tmp_path / "d.sock", tmp_path / "policy.json", tmp_path / "refuse"
+    _write_policy(policy_path, "v1")
+    proc = subprocess.Popen(
+        [sys.executable, "-c", SUPERVISOR_DRIVER, str(socket_path), str(policy_path), str(refuse)],
+        cwd=ROOT,
+        # buffered output, so each flushed line reaches the pipe in one write
+        env={k: v for k, v in os.environ.items() if k != "PYTHONUNBUFFERED"},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    out = _Output(proc.stdout)
+    segments = os.path.join(default_segment_dir(), f"aegis-policy-{proc.pid}-*")
+    try:
+        out.expect("all ready")
+        assert socket_path.exists() and len(glob.glob(segments)) == 1
+
+        # a worker killed soon after it started comes back after a growing backoff
+        pid = int(out.expect(r"worker 1 pid (\d+)").group(1))
+        for delay in ("0.5", "1.0"):
+            since = len(out.lines)
+            killed_at = time.monotonic()
+            os.kill(pid, signal.SIGKILL)
+            out.expect(rf"Aegis daemon: worker 1 \(pid {pid}\) killed by signal 9; restarting in {delay}s", since)
+            restarted = int(out.expect(r"worker 1 pid (\d+)", since).group(1))
+            assert restarted != pid and time.monotonic() - killed_at >= float(delay)
+            out.expect("worker 1 ready", since)
+            pid = restarted
+
+        # SIGHUP rolls the new policy out to every worker
+        since = len(out.lines)
+        reloaded = _write_policy(policy_path, "v2")
+        proc.send_signal(signal.SIGHUP)
+        out.expect(rf"Policy v2 \({reloaded[:12]}\) rolled out to 2 worker\(s\)\.", since)
+        for index in (0, 1):
+            out.expect(f"worker {index} serving {reloaded}", since)
+        assert _segment_names(segments, [f"aegis-policy-{proc.pid}-1"]) == [f"aegis-policy-{proc.pid}-1"]
+
+        # worker 1 rejects the next one: worker 0 is moved back to v2
+        since = len(out.lines)
+        refuse.touch()
+        rejected = _write_policy(policy_path, "v3")
+        proc.send_signal(signal.SIGHUP)
+        out.expect(rf"Aegis daemon: worker 1 did not apply policy {rejected[:12]}; rolling 1 worker\(s\) back\.", since)
+        out.expect(f"worker 0 serving {rejected}", since)
+        out.expect(f"worker 0 serving {reloaded}", out.lines.index(f"worker 0 serving {rejected}", since) + 1)
+        assert not any(line == f"worker 1 serving {rejected}" for line in out.lines[since:])
+        assert _segment_names(segments, [f"aegis-policy-{proc.pid}-1"]) == [f"aegis-policy-{proc.pid}-1"]
+
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=20) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+            for path in glob.glob(segments):
+                os.unlink(path)
+    assert not socket_path.exists()
+    assert glob.glob(segments) == []
@@ -0,0 +1,94 @@
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from orchestrator.intent import intent_from_dict
+from orchestrator.policy import DEFAULT_POLICY_PATH, compile_policy, load_policy
+from orchestrator.replay import diff_policies, replay_outcome, replay_policy_change
+from tests.conftest import make_intent, requested_step
+
+_ACTIONS = ("fs.read", "fs.write", "net.fetch", "app.automate", "rm.rf")
+
+
+def _proposed():
+    doc = json.loads(DEFAULT_POLICY_PATH.read_bytes())
+    entries = [e for e in doc["allowed_actions"] if e["action"] != "app.automate"]
+    for entry in entries:
+        if entry["action"] == "net.fetch":
+            entry["risk"] = "High"
+        if entry["action"] == "fs.write":
+            entry["description"] = "reworded"
+    entries.append({"action": "rm.rf", "risk": "Low", "reversible": True})
+    return compile_policy({**doc, "allowed_actions": entries})
+
+
+def _corpus(seed=5, count=300):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        steps = [
+            requested_step(
+                rng.choice(_ACTIONS),
+                paths=rng.sample(["/srv/a", "/etc/passwd"], rng.randint(0, 2)),
+                requires_confirmation=rng.random() < 0.7,
+            )
+            for _ in range(rng.randint(1, 3))
+        ]
+        if rng.random() < 0.5:
+            lines.append(json.dumps({"raw_input": "x", "requested_steps": steps}))
+        else:
+            lines.append(json.dumps(make_intent(steps).to_dict()))
+    return lines + ["", "{broken", json.dumps({"format": 1, "saved_at": 0})]
+
+
+def test_diff_policies_ignores_descriptions():
+    old, new = load_policy(), _proposed()
+    described = {c.action: c.describe() for c in diff_policies(old, new)}
+    assert described == {
+        "app.automate": "app.automate: removed (was High, irreversible)",
+        "net.fetch": "net.fetch: risk Medium -> High",
+        "rm.rf": "rm.rf: added (Low, reversible)",
+    }
+    assert diff_policies(old, old) == ()
+
+
+def _deltas(report):
+    d = report.to_dict()
+    # screened-out lines are counted as unaffected, even malformed ones
+    for key in ("seconds", "samples", "unaffected", "replayed", "unreplayable", "malformed"):
+        d.pop(key)
+    return d
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_pruned_replay_matches_full_replay(executor):
+    old, new, lines = load_policy(), _proposed(), _corpus()
+    pruned = replay_policy_change(lines, old=old, new=new, workers=2, executor=executor, chunksize=16)
+    full = replay_policy_change(lines, old=old, new=new, workers=2, executor=executor, chunksize=16, prune=False)
+    assert _deltas(pruned) == _deltas(full)
+    assert pruned.replayed < full.replayed
+    assert pruned.records == full.records == 302
+    assert pruned.changed > 0
+    assert (full.malformed, full.unreplayable) == (1, 1)
+
+
+def test_replay_matches_outcomes_decided_one_by_one():
+    old, new, lines = load_policy(), _proposed(), _corpus(count=120)
+    expected = Counter()
+    for line in lines[:120]:
+        record = json.loads(line)
+        intent = intent_from_dict(record) if "metadata" not in record else make_intent(record["requested_steps"])
+        before, after = replay_outcome(intent, old), replay_outcome(intent, new)
+        if before[0] != after[0]:
+            expected[f"{before[0]}->{after[0]}"] += 1
+    report = replay_policy_change(lines[:120], old=old, new=new, workers=1)
+    assert report.transitions == dict(expected)
+
+
+def test_unchanged_policy_reports_nothing():
+    policy = load_policy()
+    report = replay_policy_change(_corpus(count=50), old=policy, new=policy)
+    assert report.changed == 0 and report.replayed == 0
+    assert report.unaffected == report.records
@@ -0,0 +1,114 @@
+import random
+import threading
+import time
+
+import pytest
+
+from orchestrator.plan import create_dry_run_plan
+from orchestrator.schedule import ACTION_ACCESS, WRITE, build_step_graph, schedule_dry_run
+from orchestrator.verification import run_verification
+from tests.conftest import requested_step
+
+PATHS = ("/srv", "/srv/a", "/srv/a/x", "/srv/b", "/tmp/c")
+DOMAINS = ("example.com", "api.example.com", "other.org")
+APPS = ("editor", "browser")
+
+
+def _plan(policy, steps):
+    plan, _audit = create_dry_run_plan(derived_from_intent_id="i", requested_steps=steps, policy=policy)
+    return plan
+
+
+def _random_step(rng):
+    action = rng.choice(("fs.read", "fs.write", "fs.snapshot", "net.fetch", "app.launch", "http.respond"))
+    return requested_step(
+        action,
+        paths=rng.sample(PATHS, rng.randint(0, 2)),
+        domains=rng.sample(DOMAINS, rng.randint(0, 1)),
+        apps=rng.sample(APPS, rng.randint(0, 1)),
+    )
+
+
+def _overlap(dimension, a, b):
+    if not a or not b:
+        return True
+    for x in a:
+        for y in b:
+            if dimension == "paths" and (x == y or x.startswith(y + "/") or y.startswith(x + "/")):
+                return True
+            if dimension == "domains" and (x == y or x.endswith("." + y) or y.endswith("." + x)):
+                return True
+            if dimension == "apps" and x == y:
+                return True
+    return False
+
+
+def _accesses(step):
+    kind = ACTION_ACCESS.get(step.action)
+    if kind is None:
+        return None
+    found = {}
+    for dimension in ("paths", "domains", "apps"):
+        values = getattr(step.scope.constraints, dimension)
+        if dimension == kind[0] or values:
+            found[dimension] = (values, dimension == kind[0] and kind[1] == WRITE)
+    return found
+
+
+def _conflict(a, b):
+    if a is None or b is None:
+        return True
+    return any(
+        (wa or b[d][1]) and _overlap(d, va, b[d][0])
+        for d, (va, wa) in a.items()
+        if d in b
+    )
+
+
+def _closure(n, edges):
+    reach = [set() for _ in range(n)]
+    for i in range(n):
+        for j in edges[i]:
+            reach[i] |= {j} | reach[j]
+    return reach
+
+
+def test_graph_matches_pairwise_conflicts(policy):
+    rng = random.Random(3)
+    for _ in range(150):
+        plan = _plan(policy, [_random_step(rng) for _ in range(rng.randint(1, 12))])
+        graph = build_step_graph(plan)
+        access = [_accesses(s) for s in plan.steps]
+        n = len(plan.steps)
+        brute = [[j for j in range(i) if _conflict(access[j], access[i])] for i in range(n)]
+        assert _closure(n, brute) == _closure(n, [list(graph.predecessors(i)) for i in range(n)])
+
+
+def test_disjoint_steps_run_concurrently(policy):
+    plan = _plan(policy, [requested_step("fs.write", paths=(f"/srv/{i}",)) for i in range(8)])
+    assert build_step_graph(plan).edge_count == 0
+    gate = threading.Barrier(4, timeout=5)
+    schedule = schedule_dry_run(plan, simulate=lambda step: gate.wait() is not None, workers=4)
+    assert schedule.max_concurrency == 4
+    assert schedule.results == (True,) * 8
+    assert schedule.verification == run_verification(plan)
+
+
+def test_dependent_steps_run_in_order(policy):
+    plan = _plan(policy, [requested_step("fs.write", paths=("/srv/a",)) for _ in range(5)])
+    seen = []
+
+    def simulate(step):
+        time.sleep(0.001)
+        seen.append(step.step_id)
+
+    schedule = schedule_dry_run(plan, simulate=simulate, workers=4)
+    assert seen == [1, 2, 3, 4, 5]
+    assert schedule.estimate.critical_path == (1, 2, 3, 4, 5)
+    assert schedule.estimate.wall_ms == schedule.estimate.serial_ms
+
+
+def test_zero_workers_is_rejected(policy):
+    # regression: workers=0 was silently replaced by the CPU count
+    with pytest.raises(ValueError):
+        schedule_dry_run(_plan(policy, [requested_step()]), workers=0)
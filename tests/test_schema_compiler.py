@@ -0,0 +1,118 @@
+import copy
+import dataclasses
+import random
+
+import pytest
+
+from orchestrator.plan import RiskLevel, ScopeConstraints, ScopeSpec, create_dry_run_plan
+from orchestrator.schema_compiler import SchemaCompileError, build_validators, compiled_validators
+from tests.conftest import requested_step
+
+# (path into the plan document, replacement); _DROP removes the key
+_DROP = object()
+_MUTATIONS = [
+    (("plan_id",), _DROP),
+    (("plan_id",), 3),
+    (("steps",), []),
+    (("steps",), {}),
+    (("notes",), 1),
+    (("extra",), True),
+    (("steps", 0, "step_id"), 0),
+    (("steps", 0, "step_id"), True),
+    (("steps", 0, "step_id"), 1.5),
+    (("steps", 0, "action"), _DROP),
+    (("steps", 0, "args"), []),
+    (("steps", 0, "risk"), "Severe"),
+    (("steps", 0, "reversible"), 1),
+    (("steps", 0, "validators"), ["ok", 2]),
+    (("steps", 0, "unknown"), 1),
+    (("steps", 0, "scope", "scope_token"), None),
+    (("steps", 0, "scope", "constraints"), _DROP),
+    (("steps", 0, "scope", "constraints", "max_bytes"), -1),
+    (("steps", 0, "scope", "constraints", "paths"), ["/a", None]),
+    (("steps", 0, "scope", "constraints", "verbs"), []),
+    (("steps", 1, "scope", "constraints", "max_bytes"), 0),
+    (("steps", 1, "dry_run_supported"), False),
+]
+_VALID = {("steps", 1, "scope", "constraints", "max_bytes"), ("steps", 1, "dry_run_supported")}
+
+
+def _apply(doc, path, value):
+    target = doc
+    for key in path[:-1]:
+        target = target[key]
+    if value is _DROP:
+        del target[path[-1]]
+    else:
+        target[path[-1]] = value
+
+
+@pytest.fixture(scope="module")
+def plan(policy):
+    steps = [requested_step(max_bytes=10), requested_step("fs.write")]
+    return create_dry_run_plan(derived_from_intent_id="i", requested_steps=steps, policy=policy, notes="n")[0]
+
+
+def test_dict_mode_check_agrees_with_errors(plan):
+    validators = compiled_validators("dict")
+    assert validators.check_plan(plan.to_dict()) and validators.errors_plan(plan.to_dict()) == []
+    rng = random.Random(3)
+    for count in (1, 1, 2, 3) * 30:
+        doc = plan.to_dict()
+        chosen = rng.sample(_MUTATIONS, count)
+        for path, value in chosen:
+            try:
+                _apply(doc, path, copy.deepcopy(value))
+            except (KeyError, IndexError, TypeError):
+                pass
+        errors = validators.errors_plan(doc)
+        assert validators.check_plan(doc) is (not errors), (chosen, errors)
+        if any(path not in _VALID for path, _ in chosen):
+            assert errors
+
+
+def test_object_mode_check_agrees_with_errors(plan):
+    validators = compiled_validators("object")
+    step = plan.steps[0]
+    assert validators.check_plan(plan) and validators.errors_plan(plan) == []
+    bad = [
+        dataclasses.replace(step, step_id=0),
+        dataclasses.replace(step, action=None),
+        dataclasses.replace(step, risk="Severe"),
+        dataclasses.replace(step, validators=("v", 1)),
+        dataclasses.replace(step, scope=ScopeSpec("t", ScopeConstraints(max_bytes=-1))),
+        dataclasses.replace(step, scope=ScopeSpec(5)),
+    ]
+    for candidate in bad:
+        errors = validators.errors_planStep(candidate)
+        assert errors and not validators.check_planStep(candidate)
+    good = dataclasses.replace(step, risk=RiskLevel.HIGH, validators=["v"])
+    assert validators.check_planStep(good) and validators.errors_planStep(good) == []
+
+
+def test_errors_name_the_path():
+    errors = compiled_validators("dict").errors_planStep({"step_id": 0, "scope": {"scope_token": 1}})
+    assert any(e.startswith("step_id") for e in errors)
+    assert any(e.startswith("scope.scope_token") for e in errors)
+    assert any("action" in e for e in errors)
+
+
+def test_compile_errors():
+    schema = {
+        "$defs": {
+            "a": {"type": "widget"},
+            "b": {"properties": {"x": {"$ref": "#/$defs/loop"}}},
+            "c": {"$ref": "http://x"},
+            "loop": {"$ref": "#/$defs/loop"},
+        }
+    }
+    for defs in (["a"], ["b"], ["c"], ["missing"]):
+        with pytest.raises(SchemaCompileError):
+            build_validators(schema, defs, "dict")
+    with pytest.raises(SchemaCompileError):
+        build_validators(schema, ["a"], "yaml")
+
+
+def test_validators_are_cached():
+    assert compiled_validators("dict") is compiled_validators("dict")
+    assert compiled_validators("dict") is not compiled_validators("object")
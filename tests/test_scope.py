@@ -0,0 +1,77 @@
+import pytest
+
+from orchestrator.plan import PlanStep, RiskLevel, ScopeConstraints, ScopeSpec
+from orchestrator.scope import (
+    DomainSuffixTrie,
+    PathPrefixTrie,
+    ScopeGrant,
+    ScopeGrantIndex,
+    make_scope_grant_verifier,
+    scope_grants_from_json,
+)
+
+
+def _index():
+    return ScopeGrantIndex([
+        ScopeGrant("t", paths=("/srv",), domains=("a.com", "*.b.com"), apps=("editor",), methods=("get",),
+                   max_bytes=1024),
+    ])
+
+
+def test_path_trie_covers_prefix_after_normalization():
+    trie = PathPrefixTrie(["/srv/site"])
+    assert trie.covers("/srv/site")
+    assert trie.covers("/srv/site/a/b.txt")
+    assert not trie.covers("/srv/sitex")
+    assert not trie.covers("/srv/site/../secret")
+
+
+def test_domain_trie_wildcard_excludes_apex():
+    trie = DomainSuffixTrie(["example.com", "*.b.com"])
+    assert trie.covers("EXAMPLE.com.")
+    assert not trie.covers("a.example.com")
+    assert trie.covers("x.y.b.com")
+    assert not trie.covers("b.com")
+
+
+def test_request_within_grant_has_no_violations():
+    constraints = ScopeConstraints(paths=("/srv/x",), domains=("c.b.com",), apps=("editor",), methods=("GET",),
+                                   max_bytes=10)
+    assert _index().violations("t", constraints) == []
+
+
+def test_unknown_token_is_not_granted():
+    [v] = _index().violations("other", ScopeConstraints(paths=("/srv",)))
+    assert v.code == "SCOPE_NOT_GRANTED"
+
+
+def test_outside_values_are_reported_per_dimension():
+    constraints = ScopeConstraints(paths=("/etc",), domains=("a.com",), apps=("editor",), methods=("GET",),
+                                   max_bytes=4096)
+    found = {v.dimension: v.values for v in _index().violations("t", constraints)}
+    assert found == {"paths": ("/etc",), "max_bytes": (4096,)}
+
+
+def test_empty_dimension_exceeds_restricting_grant():
+    # regression: an unbounded request used to pass a grant limited to /srv and a.com
+    index = ScopeGrantIndex([ScopeGrant("t", paths=("/srv",), domains=("a.com",))])
+    found = index.violations("t", ScopeConstraints())
+    assert [(v.code, v.dimension) for v in found] == [
+        ("SCOPE_EXCEEDS_GRANT", "paths"),
+        ("SCOPE_EXCEEDS_GRANT", "domains"),
+    ]
+    assert index.violations("t", ScopeConstraints(paths=("/srv/a",), domains=("a.com",))) == []
+
+
+def test_verifier_blocks_unbounded_step():
+    verifier = make_scope_grant_verifier(_index())
+    step = PlanStep(1, "fs.read", {}, ScopeSpec("t", ScopeConstraints(paths=("/srv/a",), max_bytes=1)),
+                    RiskLevel.LOW, True, False)
+    findings = verifier.step_hook(step)
+    assert {f.code for f in findings} == {"SCOPE_EXCEEDS_GRANT"}
+    assert any("domains unbounded" in f.message for f in findings)
+
+
+def test_grant_document_rejects_bad_max_bytes():
+    with pytest.raises(ValueError):
+        scope_grants_from_json({"grants": [{"scope_token": "t", "constraints": {"max_bytes": -1}}]})
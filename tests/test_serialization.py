@@ -0,0 +1,58 @@
+import json
+
+from orchestrator.mediation import MediationResult, mediate_intent
+from orchestrator.plan import Plan, create_dry_run_plan
+from orchestrator.refusal import RefusalDecision
+from orchestrator.serialization import dumps, loads
+from orchestrator.verification import VerificationReport
+from tests.conftest import make_intent, requested_step
+
+
+def _canonical(obj):
+    return json.dumps(obj.to_dict(), sort_keys=True, separators=(",", ":")).encode("ascii")
+
+
+def _results(policy):
+    intents = [
+        make_intent([requested_step(), requested_step("fs.write", max_bytes=4096, requires_confirmation=False)]),
+        make_intent([requested_step("net.fetch", paths=(), domains=("ünicode.example",))], raw_input="naïve ✓"),
+        make_intent([requested_step("fs.write", paths=())]),
+        make_intent([{"action": "rm.rf"}]),
+    ]
+    return [mediate_intent(intent=i, policy=policy) for i in intents]
+
+
+def test_encoding_is_byte_identical_to_sorted_json_dumps(policy):
+    for result in _results(policy):
+        assert result.to_json() == _canonical(result)
+        if result.plan is not None:
+            assert result.plan.to_json() == _canonical(result.plan)
+            assert result.verification.to_json() == _canonical(result.verification)
+        assert result.refusal.to_json() == _canonical(result.refusal)
+
+
+def test_encoding_is_cached(policy):
+    result = _results(policy)[0]
+    assert result.plan.to_json() is result.plan.to_json()
+
+
+def test_round_trips(policy):
+    for result in _results(policy):
+        assert MediationResult.from_bytes(result.to_json(), intent=result.intent) == result
+        assert RefusalDecision.from_bytes(result.refusal.to_json()) == result.refusal
+        if result.plan is not None:
+            assert Plan.from_bytes(result.plan.to_json()) == result.plan
+            assert Plan.from_dict(result.plan.to_dict()) == result.plan
+            assert VerificationReport.from_bytes(result.verification.to_json()) == result.verification
+
+
+def test_notes_and_empty_constraints(policy):
+    steps = [requested_step(paths=(), scope_token="t")]
+    plan, _ = create_dry_run_plan(derived_from_intent_id="i", requested_steps=steps, policy=policy, notes="n")
+    assert plan.to_json() == _canonical(plan)
+    assert Plan.from_bytes(plan.to_json()).notes == "n"
+
+
+def test_dumps_and_loads():
+    value = {"b": [1, 2.5, None], "a": "✓"}
+    assert loads(dumps(value)) == value
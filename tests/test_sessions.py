@@ -0,0 +1,109 @@
+import pytest
+
+from orchestrator.intent import IntentState, create_intent
+from orchestrator.sessions import InvalidTransition, IntentSessionStore
+from tests.conftest import make_intent, requested_step
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _store(**kwargs):
+    clock = _Clock()
+    return IntentSessionStore(shards=4, max_sessions=64, clock=clock, **kwargs), clock
+
+
+def test_transitions_follow_the_lifecycle_and_are_recorded():
+    store, _ = _store()
+    intent = store.open(make_intent([requested_step()]))
+    store.transition(intent.intent_id, "clarifying", rationale="needs a path")
+    assert store.transition(intent.intent_id, IntentState.APPROVED, rationale="ok").state is IntentState.APPROVED
+    history = store.history(intent.intent_id)
+    assert [(t.previous, t.new, t.rationale) for t in history] == [
+        (IntentState.DRAFT, IntentState.CLARIFYING, "needs a path"),
+        (IntentState.CLARIFYING, IntentState.APPROVED, "ok"),
+    ]
+
+    with pytest.raises(InvalidTransition):
+        store.transition(intent.intent_id, "draft", rationale="undo")
+    with pytest.raises(InvalidTransition):
+        store.transition(intent.intent_id, "planned", rationale="x", expected="draft")
+    with pytest.raises(ValueError):
+        store.transition(intent.intent_id, "planned", rationale=" ")
+    with pytest.raises(ValueError):
+        store.transition(intent.intent_id, "executed", rationale="x")
+    assert store.get(intent.intent_id).state is IntentState.APPROVED
+    assert store.stats().transitions == 2
+
+
+def test_open_twice_and_update_guards():
+    store, _ = _store()
+    intent = store.open(make_intent([requested_step()]))
+    with pytest.raises(ValueError, match="already open"):
+        store.open(intent)
+    updated = store.update(intent.intent_id, lambda i: i.__class__(**{**i.__dict__, "goal": "revised"}))
+    assert store.get(intent.intent_id) is updated and updated.goal == "revised"
+    with pytest.raises(ValueError):
+        store.update(intent.intent_id, lambda i: create_intent("x", "x", []))
+    assert store.close(intent.intent_id) and not store.close(intent.intent_id)
+    with pytest.raises(KeyError):
+        store.get(intent.intent_id)
+
+
+def test_ttl_expiry_and_sweep():
+    store, clock = _store(ttl=10.0)
+    old = [store.open(make_intent([requested_step()])) for _ in range(5)]
+    clock.now += 6
+    fresh = store.open(make_intent([requested_step()]))
+    store.get(old[0].intent_id)
+    clock.now += 5
+    assert old[1].intent_id not in store and old[0].intent_id in store
+    assert store.sweep() == 4
+    assert len(store) == 2 and fresh.intent_id in store
+    clock.now += 10
+    with pytest.raises(KeyError):
+        store.get(fresh.intent_id)
+    assert store.stats().expired == 5
+
+
+def test_full_shard_evicts_least_recently_used():
+    store = IntentSessionStore(shards=1, max_sessions=2)
+    a, b, c = (store.open(make_intent([requested_step()])) for _ in range(3))
+    assert a.intent_id not in store and b.intent_id in store and c.intent_id in store
+    assert store.stats().evicted == 1
+
+
+def test_save_load_round_trip(tmp_path):
+    store, _ = _store()
+    intents = [store.open(make_intent([requested_step()], user_id=f"u{n}")) for n in range(10)]
+    store.transition(intents[0].intent_id, "approved", rationale="ok")
+    path = tmp_path / "sessions.jsonl"
+    assert store.save(path) == 10
+
+    restored, _ = _store()
+    assert restored.load(path) == 10
+    for intent in intents:
+        assert restored.get(intent.intent_id).to_dict() == store.get(intent.intent_id).to_dict()
+        assert restored.history(intent.intent_id) == store.history(intent.intent_id)
+
+    (tmp_path / "other.jsonl").write_text('{"format": 99}\n')
+    with pytest.raises(ValueError, match="not an intent session snapshot"):
+        restored.load(tmp_path / "other.jsonl")
+
+
+def test_plan_requires_approval_and_moves_to_planned(policy):
+    store, _ = _store()
+    intent = store.open(make_intent([requested_step()]))
+    with pytest.raises(ValueError):
+        store.plan(intent.intent_id, policy=policy)
+    assert store.get(intent.intent_id).state is IntentState.DRAFT
+    store.transition(intent.intent_id, "approved", rationale="ok")
+    plan, audit = store.plan(intent.intent_id, policy=policy)
+    assert [s.action for s in plan.steps] == ["fs.read"]
+    assert audit.derived_from_intent_id == intent.intent_id
+    assert store.get(intent.intent_id).state is IntentState.PLANNED
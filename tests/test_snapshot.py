@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from orchestrator.policy import load_policy
+from orchestrator.snapshot import load_startup, restore_startup_payload
+
+
+def _snapshots(directory):
+    return sorted(p for p in directory.iterdir() if p.suffix == ".snapshot")
+
+
+def test_miss_then_hit_restores_the_same_policy(tmp_path):
+    directory = tmp_path / "snap"
+    first = load_startup(directory=directory)
+    assert first.status == "miss" and first.error is None
+    assert oct(directory.stat().st_mode & 0o777) == oct(0o700)
+    second = load_startup(directory=directory)
+    assert second.status == "hit"
+    assert second.payload == first.payload
+    assert second.policy.content_hash == first.policy.content_hash == load_policy().content_hash
+    assert restore_startup_payload(second.payload).content_hash == first.policy.content_hash
+
+
+def test_disabled_snapshot_writes_nothing(tmp_path):
+    loaded = load_startup(directory=tmp_path / "snap", enabled=False)
+    assert loaded.status == "off" and not (tmp_path / "snap").exists()
+
+
+def test_group_writable_directory_is_not_trusted(tmp_path):
+    directory = tmp_path / "snap"
+    load_startup(directory=directory)
+    os.chmod(directory, 0o770)
+    loaded = load_startup(directory=directory)
+    assert loaded.status == "miss"
+    assert "writable by group or others" in loaded.error
+
+
+def test_group_writable_snapshot_is_not_loaded(tmp_path):
+    directory = tmp_path / "snap"
+    load_startup(directory=directory)
+    [path] = _snapshots(directory)
+    os.chmod(path, 0o666)
+    loaded = load_startup(directory=directory)
+    assert loaded.status == "miss" and "writable by group or others" in loaded.error
+    # rewritten private, so the next start hits again
+    assert path.stat().st_mode & 0o777 == 0o600
+    assert load_startup(directory=directory).status == "hit"
+
+
+def test_symlinked_snapshot_is_not_followed(tmp_path):
+    directory = tmp_path / "snap"
+    load_startup(directory=directory)
+    [path] = _snapshots(directory)
+    elsewhere = tmp_path / "elsewhere"
+    path.rename(elsewhere)
+    path.symlink_to(elsewhere)
+    assert load_startup(directory=directory).status == "miss"
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="needs root to chown")
+def test_snapshot_owned_by_someone_else_is_not_loaded(tmp_path):
+    directory = tmp_path / "snap"
+    load_startup(directory=directory)
+    [path] = _snapshots(directory)
+    os.chown(path, 12345, 12345)
+    loaded = load_startup(directory=directory)
+    assert loaded.status == "miss" and "owned by uid 12345" in loaded.error
@@ -0,0 +1,89 @@
+import pytest
+
+from orchestrator.amendment import PlanDiff, amend_plan, verify_plan
+from orchestrator.plan import create_dry_run_plan
+from orchestrator.plan_stream import stream_dry_run_plan
+from orchestrator.schedule import schedule_dry_run
+from orchestrator.verification import (
+    DEFAULT_VERIFIERS,
+    VerificationLevel,
+    VerifierRegistry,
+    resolve_registry,
+    run_verification,
+)
+from orchestrator.verification_batch import PlanBatch
+from tests.conftest import requested_step
+
+
+def _plan(policy, *steps):
+    plan, _audit = create_dry_run_plan(derived_from_intent_id="i", requested_steps=list(steps), policy=policy)
+    return plan
+
+
+def test_default_verifiers_flag_unconfirmed_and_unbounded_steps(policy):
+    plan = _plan(policy, requested_step("fs.write", paths=(), requires_confirmation=False))
+    report = run_verification(plan)
+    assert {f.code for f in report.findings} == {"CONFIRMATION_REQUIRED", "SCOPE_UNBOUNDED"}
+    assert report.has_blockers
+    assert [f.level for f in report.findings if f.code == "SCOPE_UNBOUNDED"] == [VerificationLevel.BLOCK]
+
+
+def test_bounded_confirmed_step_passes(policy):
+    assert run_verification(_plan(policy, requested_step("fs.read"))).findings == []
+
+
+def _unbounded_steps():
+    return [requested_step("fs.write", paths=(), requires_confirmation=False)]
+
+
+# every entry point that takes a registry; each returns whether anything was flagged
+_ENTRY_POINTS = {
+    "run_verification": lambda policy, reg: bool(
+        run_verification(_plan(policy, *_unbounded_steps()), registry=reg).findings
+    ),
+    "PlanBatch.verify": lambda policy, reg: any(
+        r.findings for r in PlanBatch([_plan(policy, *_unbounded_steps())]).verify(registry=reg)
+    ),
+    "PlanBatch.has_blockers": lambda policy, reg: bool(
+        PlanBatch([_plan(policy, *_unbounded_steps())]).has_blockers(registry=reg).any()
+    ),
+    "verify_plan": lambda policy, reg: bool(
+        verify_plan(_plan(policy, *_unbounded_steps()), policy=policy, registry=reg).verification.findings
+    ),
+    "amend_plan": lambda policy, reg: bool(
+        amend_plan(
+            verify_plan(_plan(policy, requested_step("fs.read")), policy=policy, registry=reg),
+            PlanDiff(append=_unbounded_steps()),
+            policy=policy,
+            registry=reg,
+        ).verification.findings
+    ),
+    "stream_dry_run_plan": lambda policy, reg: bool(
+        stream_dry_run_plan(
+            derived_from_intent_id="i", requested_steps=_unbounded_steps(), policy=policy, verifiers=reg
+        ).verification.findings
+    ),
+    "schedule_dry_run": lambda policy, reg: bool(
+        schedule_dry_run(_plan(policy, *_unbounded_steps()), registry=reg, workers=2).verification.findings
+    ),
+}
+
+
+@pytest.mark.parametrize("entry", sorted(_ENTRY_POINTS))
+def test_empty_registry_runs_no_verifiers(policy, entry):
+    # regression: an empty registry is falsy and fell back to the defaults
+    assert _ENTRY_POINTS[entry](policy, None)
+    assert not _ENTRY_POINTS[entry](policy, VerifierRegistry())
+
+
+def test_resolve_registry():
+    empty = VerifierRegistry()
+    assert resolve_registry(None) is DEFAULT_VERIFIERS
+    assert resolve_registry(empty) is empty
+
+
+def test_registry_copy_is_independent():
+    copy = DEFAULT_VERIFIERS.copy()
+    copy.unregister(copy.names[0])
+    assert len(copy) == len(DEFAULT_VERIFIERS) - 1
+    assert copy.version != DEFAULT_VERIFIERS.version
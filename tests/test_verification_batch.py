@@ -0,0 +1,37 @@
+import random
+
+from orchestrator.plan import create_dry_run_plan
+from orchestrator.verification import run_verification
+from orchestrator.verification_batch import PlanBatch, verify_batch
+from tests.conftest import requested_step
+
+ACTIONS = ("fs.read", "fs.write", "net.fetch", "app.launch")
+
+
+def _random_plans(policy, n, seed=7):
+    rng = random.Random(seed)
+    plans = []
+    for i in range(n):
+        steps = [
+            requested_step(
+                rng.choice(ACTIONS),
+                paths=rng.choice([(), ("/srv/a",), ("/srv/a", "/tmp/b")]),
+                requires_confirmation=rng.random() < 0.5,
+                max_bytes=rng.choice([None, 1024]),
+            )
+            for _ in range(rng.randint(1, 4))
+        ]
+        plan, _audit = create_dry_run_plan(derived_from_intent_id=f"i{i}", requested_steps=steps, policy=policy)
+        plans.append(plan)
+    return plans
+
+
+def test_batch_reports_match_per_plan_verification(policy):
+    plans = _random_plans(policy, 200)
+    assert verify_batch(plans) == [run_verification(p) for p in plans]
+
+
+def test_has_blockers_matches_reports(policy):
+    plans = _random_plans(policy, 200, seed=11)
+    batch = PlanBatch(plans)
+    assert batch.has_blockers().tolist() == [r.has_blockers for r in batch.verify()]
@@ -1,4 +1,285 @@
-"""CLI stub for Aegis V0."""
+"""CLI for Aegis V0.
 
-def run():
-    print("Aegis CLI (stub)")
+Read-only tooling: nothing here executes actions.
+
+    python -m ui.cli audit lifecycle <intent_id> --dir <audit_dir>
+    python -m ui.cli audit query --dir <audit_dir> --type REFUSAL --since 1h
+    python -m ui.cli audit reindex --dir <audit_dir>
+    python -m ui.cli mediate requests.jsonl --workers 8 > results.jsonl
+    python -m ui.cli replay intents.jsonl --new proposed_policy.json --workers 8
+    python -m ui.cli schedule plan.json --workers 4
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+_DURATION_RE = re.compile(r"^(\d+)([smhd])$")
+_DURATION_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def _parse_since(value):
+    """Accept a relative window (30m, 1h, 7d) or an ISO-8601 timestamp."""
+    if value is None:
+        return None
+    m = _DURATION_RE.match(value)
+    if m:
+        delta = timedelta(**{_DURATION_UNITS[m.group(2)]: int(m.group(1))})
+        return datetime.now(timezone.utc) - delta
+    from orchestrator.audit import parse_timestamp
+
+    return parse_timestamp(value)
+
+
+def _print_records(records, started):
+    count = 0
+    for record in records:
+        sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+        count += 1
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{count} event(s) in {elapsed_ms:.1f} ms", file=sys.stderr)
+    return count
+
+
+def _cmd_audit_query(args):
+    from orchestrator.audit_index import AuditIndex
+
+    started = time.perf_counter()
+    index = AuditIndex(args.dir)
+    records = index.query(
+        intent_id=args.intent,
+        event_type=args.type,
+        actor=args.actor,
+        since=_parse_since(args.since),
+        until=_parse_since(args.until),
+        limit=args.limit,
+    )
+    _print_records(records, started)
+    return 0
+
+
+def _cmd_audit_lifecycle(args):
+    from orchestrator.audit_index import AuditIndex
+
+    started = time.perf_counter()
+    records = AuditIndex(args.dir).query(intent_id=args.intent_id)
+    if args.json:
+        count = _print_records(records, started)
+    else:
+        count = 0
+        for record in records:
+            detail = record.get("reason") or record.get("result") or ""
+            print(f"{record['timestamp_utc']}  {record['actor']:<5}  {record['event_type']:<24}  {detail}")
+            count += 1
+        print(f"{count} event(s) in {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return 0 if count else 1
+
+
+def _cmd_audit_reindex(args):
+    from orchestrator.audit_index import rebuild_indexes
+
+    started = time.perf_counter()
+    n = rebuild_indexes(args.dir)
+    print(f"Reindexed {n} segment(s) in {time.perf_counter() - started:.2f} s", file=sys.stderr)
+    return 0
+
+
+class _Progress:
+    """Periodic throughput line on stderr."""
+
+    def __init__(self, interval, enabled):
+        self.interval = interval
+        self.enabled = enabled
+        self.started = self.last = time.perf_counter()
+        self.count = 0
+        self.outcomes = {}
+
+    def record(self, outcome):
+        self.count += 1
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if self.enabled and self.interval > 0:
+            now = time.perf_counter()
+            if now - self.last >= self.interval:
+                self.last = now
+                self.report(now, final=False)
+
+    def report(self, now=None, final=True):
+        elapsed = (now or time.perf_counter()) - self.started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        outcomes = ", ".join(f"{k} {v}" for k, v in sorted(self.outcomes.items()))
+        label = "done" if final else "progress"
+        print(
+            f"mediate {label}: {self.count} record(s) in {elapsed:.1f} s, {rate:.0f}/s"
+            + (f" ({outcomes})" if outcomes else ""),
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+def _cmd_mediate(args):
+    from orchestrator.mediation import mediate_jsonl
+    from orchestrator.policy import DEFAULT_POLICY_PATH, load_policy
+
+    policy = load_policy(args.policy or DEFAULT_POLICY_PATH)
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    sink = sys.stdout if args.output in (None, "-") else open(args.output, "w", encoding="utf-8")
+    progress = _Progress(args.progress_interval, enabled=not args.quiet)
+    try:
+        results = mediate_jsonl(
+            source,
+            workers=args.workers,
+            executor=args.executor or ("process" if args.workers > 1 else "thread"),
+            ordered=not args.unordered,
+            chunksize=args.chunksize,
+            policy=policy,
+        )
+        for outcome, line in results:
+            sink.write(line)
+            sink.write("\n")
+            sink.flush()
+            progress.record(outcome)
+    except BrokenPipeError:
+        # downstream closed (e.g. piped into head); stop quietly
+        sys.stderr.close()
+        return 0
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    if not args.quiet:
+        progress.report()
+    return 0
+
+
+def _cmd_replay(args):
+    from orchestrator.policy import DEFAULT_POLICY_PATH, load_policy
+    from orchestrator.replay import replay_policy_change
+
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    try:
+        report = replay_policy_change(
+            source,
+            old=load_policy(args.old or DEFAULT_POLICY_PATH),
+            new=load_policy(args.new),
+            workers=args.workers,
+            executor=args.executor or ("process" if args.workers > 1 else "thread"),
+            chunksize=args.chunksize,
+            prune=not args.no_prune,
+            samples=args.samples,
+        )
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.render_text())
+    return 1 if args.fail_on_change and report.changed else 0
+
+
+def _cmd_schedule(args):
+    from orchestrator.plan import Plan
+    from orchestrator.schedule import schedule_dry_run
+    from orchestrator.verification import VerificationLevel
+
+    if args.input == "-":
+        data = sys.stdin.buffer.read()
+    else:
+        with open(args.input, "rb") as f:
+            data = f.read()
+    result = schedule_dry_run(Plan.from_bytes(data), workers=args.workers)
+    if args.json:
+        out = result.estimate.to_dict()
+        out["verification"] = result.verification.to_dict()
+        out["levels"] = result.graph.levels()
+        print(json.dumps(out, indent=2))
+    else:
+        print(result.estimate.render_text())
+        findings = result.verification.findings
+        blocking = sum(1 for f in findings if f.level == VerificationLevel.BLOCK)
+        print(f"{len(findings)} finding(s), {blocking} blocking; dry run {result.seconds * 1000:.1f} ms")
+    return 1 if result.verification.has_blockers else 0
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="aegis", description="Aegis V0 CLI (no execution).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    audit = commands.add_parser("audit", help="Inspect the append-only audit log.")
+    audit_commands = audit.add_subparsers(dest="audit_command", required=True)
+
+    query = audit_commands.add_parser("query", help="Indexed event query.")
+    query.add_argument("--dir", required=True, help="Audit log directory.")
+    query.add_argument("--intent", help="Filter by intent_id.")
+    query.add_argument("--type", help="Filter by event_type (e.g. REFUSAL).")
+    query.add_argument("--actor", choices=["user", "aegis", "tool"], help="Filter by actor.")
+    query.add_argument("--since", help="Start time: ISO-8601 or a window like 1h, 30m, 7d.")
+    query.add_argument("--until", help="End time (exclusive), same formats as --since.")
+    query.add_argument("--limit", type=int, help="Maximum number of events.")
+    query.set_defaults(func=_cmd_audit_query)
+
+    lifecycle = audit_commands.add_parser("lifecycle", help="Replay one intent's recorded lifecycle.")
+    lifecycle.add_argument("intent_id")
+    lifecycle.add_argument("--dir", required=True, help="Audit log directory.")
+    lifecycle.add_argument("--json", action="store_true", help="Print raw JSON events.")
+    lifecycle.set_defaults(func=_cmd_audit_lifecycle)
+
+    reindex = audit_commands.add_parser("reindex", help="Rebuild secondary indexes from the segments.")
+    reindex.add_argument("--dir", required=True, help="Audit log directory.")
+    reindex.set_defaults(func=_cmd_audit_reindex)
+
+    mediate = commands.add_parser("mediate", help="Mediate a JSONL stream of intent requests.")
+    mediate.add_argument("input", nargs="?", default="-", help="JSONL file, or - for stdin (default).")
+    mediate.add_argument("--output", "-o", help="Write results here instead of stdout.")
+    mediate.add_argument("--policy", help="Allowed-actions policy file (default: repository policy).")
+    mediate.add_argument("--workers", type=int, default=1, help="Parallel workers (default 1).")
+    mediate.add_argument(
+        "--executor", choices=["thread", "process"], help="Worker kind (default: process when --workers > 1)."
+    )
+    mediate.add_argument("--unordered", action="store_true", help="Emit results as they complete.")
+    mediate.add_argument("--chunksize", type=int, default=64, help="Lines per worker task.")
+    mediate.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines.")
+    mediate.add_argument("--quiet", "-q", action="store_true", help="No progress or summary on stderr.")
+    mediate.set_defaults(func=_cmd_mediate)
+
+    replay = commands.add_parser(
+        "replay", help="Report which recorded intents a policy change would decide differently."
+    )
+    replay.add_argument("input", nargs="?", default="-", help="JSONL corpus of intents, or - for stdin (default).")
+    replay.add_argument("--new", required=True, help="Proposed allowed-actions policy file.")
+    replay.add_argument("--old", help="Current policy file (default: repository policy).")
+    replay.add_argument("--workers", type=int, default=1, help="Parallel workers (default 1).")
+    replay.add_argument(
+        "--executor", choices=["thread", "process"], help="Worker kind (default: process when --workers > 1)."
+    )
+    replay.add_argument("--chunksize", type=int, default=256, help="Lines per worker task.")
+    replay.add_argument("--samples", type=int, default=5, help="Example line numbers kept per transition.")
+    replay.add_argument(
+        "--no-prune", action="store_true", help="Replay every intent, not only those requesting changed actions."
+    )
+    replay.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    replay.add_argument("--fail-on-change", action="store_true", help="Exit 1 if any outcome would change.")
+    replay.set_defaults(func=_cmd_replay)
+
+    schedule = commands.add_parser(
+        "schedule", help="Dependency graph, critical path and estimated wall time of a dry-run plan."
+    )
+    schedule.add_argument("input", nargs="?", default="-", help="Plan JSON file, or - for stdin (default).")
+    schedule.add_argument("--workers", type=int, default=1, help="Workers to simulate and estimate for (default 1).")
+    schedule.add_argument("--json", action="store_true", help="Print the estimate, waves and findings as JSON.")
+    schedule.set_defaults(func=_cmd_schedule)
+
+    return parser
+
+
+def run(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(run())